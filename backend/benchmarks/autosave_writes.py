@@ -0,0 +1,154 @@
+"""Autosave write size and latency versus turn count.
+
+Compares the old full-document autosave (``gameState`` and ``storyLog``
+rewritten every turn) with the append-only update (scalar ``$set`` plus a
+``$push`` of the new entry). Both are fed what the game client sends to
+/api/story: its whole log as ``previousEvents`` and no ``gameState.storyLog``,
+so the old path's size came from storing ``previousEvents`` whole:
+
+    python -m backend.benchmarks.autosave_writes --turns 10 50 100 200 400
+
+Bytes are the BSON size of the update document sent to Mongo; latency is the
+time to encode it. Pass ``--mongo-uri`` to also time real ``update_one`` calls
+against a scratch collection (dropped afterwards), or ``--in-memory`` to run
+the same calls against the in-memory store (deterministic, no server needed).
+"""
+import argparse
+import asyncio
+import datetime
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+import bson
+
+from backend.core.autosave import (
+    AUTOSAVE_EVENTS_TAIL,
+    build_append_update,
+    build_rewrite_update,
+)
+from backend.core.memory_store import MemoryDatabase
+
+PLAYER_ID = "BenchHero"
+STORY_TEXT = (
+    "The torchlight gutters as you step into the vaulted hall. Ancient banners hang in tatters "
+    "and something shifts in the darkness beyond the broken altar."
+)
+
+
+def _entry(turn: int) -> Dict[str, Any]:
+    return {"t": f"2026-01-01T00:{turn // 60 % 60:02d}:{turn % 60:02d}+00:00", "text": STORY_TEXT, "type": "story"}
+
+
+def _client_events(turn: int) -> List[Dict[str, Any]]:
+    """The client's storyLog: ``{id, text, timestamp, type}`` with its own ids."""
+    return [
+        {"id": str(1767225600000 + i * 1000), "text": STORY_TEXT, "timestamp": _entry(i)["t"], "type": "story"}
+        for i in range(turn)
+    ]
+
+
+def _state_fields(turn: int) -> Dict[str, Any]:
+    return {
+        "player": {"name": PLAYER_ID, "class": "Warrior", "level": 5, "health": 80, "inventory": [{"name": "Sword"}] * 6},
+        "genre": "Fantasy",
+        "previousEvents": _client_events(turn),
+        "choice": "Open the door",
+        "story": STORY_TEXT,
+        "choices": ["Fight", "Hide", "Run"],
+        "storyPhase": "exploration",
+        "turnCount": turn,
+        "combatEncounters": 2,
+        "combatEscapes": 1,
+        "isAfterCombat": False,
+        "isFinalPhase": False,
+        "puzzle": None,
+        "questProgress": 40,
+        "activeQuest": {"title": "The Drowned Sigil", "progress": 40},
+    }
+
+
+def _updates(turn: int) -> Dict[str, Dict[str, Any]]:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    fields = _state_fields(turn)
+    # The old path stored the client's whole event list next to a storyLog that,
+    # with no gameState.storyLog sent, only ever held the new entry; the new one
+    # keeps a tail of previousEvents and pushes the entry.
+    tail_fields = {**fields, "previousEvents": fields["previousEvents"][-AUTOSAVE_EVENTS_TAIL:]}
+    return {
+        "before": build_rewrite_update(PLAYER_ID, fields, [_entry(turn)], now, [], []),
+        "after": build_append_update(PLAYER_ID, tail_fields, _entry(turn), now, [], []),
+    }
+
+
+def _encode_ms(update: Dict[str, Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        bson.encode(update)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def _collection_ms(collection, turn: int, repeat: int) -> Dict[str, float]:
+    updates = _updates(turn)
+    results = {}
+    for label in ("before", "after"):
+        await collection.drop()
+        await collection.insert_one(
+            {"playerId": PLAYER_ID, "saveSlot": 1, **updates["before"]["$set"]}
+        )
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await collection.update_one({"playerId": PLAYER_ID, "saveSlot": 1}, updates[label])
+            samples.append((time.perf_counter() - started) * 1000)
+        results[label] = statistics.median(samples)
+    await collection.drop()
+    return results
+
+
+async def _mongo_ms(uri: str, turn: int, repeat: int) -> Dict[str, float]:
+    if uri == "memory":
+        return await _collection_ms(MemoryDatabase().saves, turn, repeat)
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(uri)
+    collection = client.autosave_benchmark[f"saves_{turn}"]
+    try:
+        return await _collection_ms(collection, turn, repeat)
+    finally:
+        await collection.drop()
+        client.close()
+
+
+async def _run(turns: List[int], repeat: int, mongo_uri: Optional[str]) -> None:
+    header = f"{'turns':>6} {'before B':>10} {'after B':>9} {'before enc ms':>14} {'after enc ms':>13}"
+    if mongo_uri:
+        header += f" {'before db ms':>13} {'after db ms':>12}"
+    print(header)
+    for turn in turns:
+        updates = _updates(turn)
+        row = (
+            f"{turn:>6} {len(bson.encode(updates['before'])):>10} {len(bson.encode(updates['after'])):>9} "
+            f"{_encode_ms(updates['before'], repeat):>14.3f} {_encode_ms(updates['after'], repeat):>13.3f}"
+        )
+        if mongo_uri:
+            db_ms = await _mongo_ms(mongo_uri, turn, repeat)
+            row += f" {db_ms['before']:>13.2f} {db_ms['after']:>12.2f}"
+        print(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Autosave write size/latency benchmark.")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 100, 200, 400])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--mongo-uri", default=None, help="Also time update_one against this MongoDB.")
+    parser.add_argument("--in-memory", action="store_true", help="Also time update_one against the in-memory store.")
+    args = parser.parse_args()
+    asyncio.run(_run(args.turns, args.repeat, "memory" if args.in_memory else args.mongo_uri))
+
+
+if __name__ == "__main__":
+    main()
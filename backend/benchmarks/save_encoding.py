@@ -0,0 +1,168 @@
+"""Save document size and encode/decode latency, schema v1 versus v2.
+
+v1 stores the client's ``gameState`` as nested BSON; v2 keeps the hot fields
+plain and compresses the rest into ``coldState``:
+
+    python -m backend.benchmarks.save_encoding --scale 1 4 16
+
+``--scale`` multiplies the cold history (quests, codex, choices, location
+stats). Write latency is the time to build and encode the document, read
+latency the time to decode it and expand ``gameState``. Pass ``--mongo-uri``
+to also time ``replace_one``/``find_one`` against a scratch collection
+(dropped afterwards).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import bson
+
+from backend.core.save_codec import SAVE_SCHEMA_VERSION, encode_cold_state, expand_game_state, split_game_state
+
+PLAYER_ID = "BenchHero"
+LORE = {
+    "en": "Beneath the drowned abbey the bells still toll, and every toll wakes something older than the sea.",
+    "es": "Bajo la abadía ahogada las campanas aún doblan, y cada toque despierta algo más antiguo que el mar.",
+    "hi": "डूबे हुए मठ के नीचे घंटियाँ अब भी बजती हैं, और हर आवाज़ समुद्र से भी पुरानी किसी चीज़ को जगाती है।",
+}
+
+
+def _game_state(scale: int) -> Dict[str, Any]:
+    quests = [
+        {
+            "id": f"q{i}",
+            "title": f"The Sigil of the {i}th Tide",
+            "description": LORE["en"],
+            "objectives": [{"text": LORE["en"][:60], "done": i % 2 == 0}] * 3,
+            "rewards": {"xp": 50 * i, "gold": 10 * i},
+        }
+        for i in range(6 * scale)
+    ]
+    return {
+        "player": {
+            "name": PLAYER_ID,
+            "class": "Warrior",
+            "level": 12,
+            "xp": 4200,
+            "health": 80,
+            "inventory": [{"name": "Sword", "description": LORE["en"], "rarity": "rare"}] * 12,
+        },
+        "genre": "Fantasy",
+        "storyLog": [{"t": f"{i:04d}", "text": LORE["en"], "type": "story"} for i in range(30)],
+        "gameState": {"turnCount": 120, "storyPhase": "climax", "combatEncounters": 9, "isFinalPhase": False},
+        "currentLocation": "Drowned Abbey",
+        "badges": [{"id": f"badge-{i}", "name": f"Badge {i}"} for i in range(8)],
+        "cameos": [],
+        "activeQuests": quests,
+        "completedQuests": quests,
+        "codex": {f"entry-{i}": {"title": f"Entry {i}", "text": LORE} for i in range(10 * scale)},
+        "choiceHistory": [{"turn": i, "choice": "Open the door", "text": LORE["es"]} for i in range(40 * scale)],
+        "locationStats": {f"loc-{i}": {"visits": i, "secrets": [LORE["hi"]]} for i in range(8 * scale)},
+        "discoveredLocations": [f"loc-{i}" for i in range(8 * scale)],
+        "progressionStats": {"kills": 120, "deaths": 3, "puzzlesSolved": 14},
+        "milestones": [{"id": f"m{i}", "reachedAt": "2026-01-01T00:00:00Z"} for i in range(5 * scale)],
+    }
+
+
+def _v1_doc(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {"playerId": PLAYER_ID, "saveSlot": 2, "schemaVersion": 1, "gameState": state}
+
+
+def _v2_doc(state: Dict[str, Any]) -> Dict[str, Any]:
+    hot, cold = split_game_state(state)
+    doc = {"playerId": PLAYER_ID, "saveSlot": 2, "schemaVersion": SAVE_SCHEMA_VERSION, "gameState": hot}
+    cold_state = encode_cold_state(cold)
+    if cold_state is not None:
+        doc["coldState"] = cold_state
+    return doc
+
+
+def _median_ms(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _timings(scale: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    state = _game_state(scale)
+    v1_raw = bson.encode(_v1_doc(state))
+    v2_raw = bson.encode(_v2_doc(state))
+    return {
+        "v1": {
+            "bytes": len(v1_raw),
+            "write": _median_ms(lambda: bson.encode(_v1_doc(state)), repeat),
+            "read": _median_ms(lambda: bson.decode(v1_raw)["gameState"], repeat),
+        },
+        "v2": {
+            "bytes": len(v2_raw),
+            "write": _median_ms(lambda: bson.encode(_v2_doc(state)), repeat),
+            "read": _median_ms(lambda: expand_game_state(bson.decode(v2_raw)), repeat),
+        },
+    }
+
+
+async def _mongo_ms(uri: str, scale: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(uri)
+    collection = client.save_encoding_benchmark[f"saves_{scale}"]
+    state = _game_state(scale)
+    try:
+        results = {}
+        for label, build in (("v1", _v1_doc), ("v2", _v2_doc)):
+            await collection.drop()
+            query = {"playerId": PLAYER_ID, "saveSlot": 2}
+            writes, reads = [], []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await collection.replace_one(query, build(state), upsert=True)
+                writes.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                expand_game_state(await collection.find_one(query))
+                reads.append((time.perf_counter() - started) * 1000)
+            results[label] = {"write": statistics.median(writes), "read": statistics.median(reads)}
+        return results
+    finally:
+        await collection.drop()
+        client.close()
+
+
+async def _run(scales: List[int], repeat: int, mongo_uri: Optional[str]) -> None:
+    header = (
+        f"{'scale':>6} {'v1 B':>8} {'v2 B':>8} {'v1 enc ms':>10} {'v2 enc ms':>10}"
+        f" {'v1 dec ms':>10} {'v2 dec ms':>10}"
+    )
+    if mongo_uri:
+        header += f" {'v1 wr ms':>9} {'v2 wr ms':>9} {'v1 rd ms':>9} {'v2 rd ms':>9}"
+    print(header)
+    for scale in scales:
+        t = _timings(scale, repeat)
+        row = (
+            f"{scale:>6} {t['v1']['bytes']:>8} {t['v2']['bytes']:>8} {t['v1']['write']:>10.3f} {t['v2']['write']:>10.3f}"
+            f" {t['v1']['read']:>10.3f} {t['v2']['read']:>10.3f}"
+        )
+        if mongo_uri:
+            db_ms = await _mongo_ms(mongo_uri, scale, repeat)
+            row += (
+                f" {db_ms['v1']['write']:>9.2f} {db_ms['v2']['write']:>9.2f}"
+                f" {db_ms['v1']['read']:>9.2f} {db_ms['v2']['read']:>9.2f}"
+            )
+        print(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Save schema v1/v2 size and latency benchmark.")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--mongo-uri", default=None, help="Also time replace_one/find_one against this MongoDB.")
+    args = parser.parse_args()
+    asyncio.run(_run(args.scale, args.repeat, args.mongo_uri))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Load generator for scene rendering.
+
+Drives ``POST /api/scene/render`` with a fixed concurrency and reports
+throughput, queue wait, p50/p95/p99 latency and the ready/pending/offline mix.
+
+Against a running scene service (start it with SCENE_IMAGE_PROVIDERS=fake to
+avoid FAL spend):
+
+    python -m backend.benchmarks.scene_load --url http://localhost:8100 --requests 200 --concurrency 16
+
+Or fully in-process against a fake provider pool, no Mongo required:
+
+    python -m backend.benchmarks.scene_load --in-process --providers 3 --latency-ms 800 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from backend.core.scene_orchestrator import SceneOrchestrator, SceneRenderRequest
+
+STORY_SNIPPETS = [
+    "The battle rages across the burning bridge as thunder splits the sky.",
+    "A calm river winds past the garden where the old sage rests.",
+    "Arcane runes flare inside the ancient temple at midnight.",
+    "Fog swallows the haunted crossroads; something moves in the dark.",
+    "Treasure spills from the vault as the crowd celebrates the victory.",
+]
+LOCATIONS = ["Ashen Bridge", "Willow Garden", "Temple of Echoes", "Crossroads", "Royal Vault"]
+
+_SERVER_TIMING_QUEUE = re.compile(r"queue;dur=([0-9.]+)")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[rank]
+
+
+def build_request(index: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "player": {"name": f"LoadHero{index % 50}", "class": "Warrior", "level": 1 + index % 20},
+        "genre": "Fantasy",
+        "storyText": " ".join(rng.choice(STORY_SNIPPETS) for _ in range(3)),
+        "currentLocation": rng.choice(LOCATIONS),
+        "gameState": {"turnCount": index},
+    }
+
+
+async def _drive(
+    total: int,
+    concurrency: int,
+    render: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    seed: int,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    queue_waits: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    next_index = 0
+
+    async def _worker() -> None:
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            body = build_request(index, rng)
+            started = time.perf_counter()
+            try:
+                result = await render(body)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            status = result.get("sceneStatus", "unknown")
+            statuses[status] = statuses.get(status, 0) + 1
+            if result.get("queueWaitMs") is not None:
+                queue_waits.append(float(result["queueWaitMs"]))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "queueWaits": queue_waits,
+        "statuses": statuses,
+        "errors": errors,
+    }
+
+
+def _print_report(label: str, results: Dict[str, Any], concurrency: int, pool_size: Optional[int]) -> None:
+    completed = len(results["latencies"])
+    statuses = results["statuses"]
+    print(f"\n== {label} ==")
+    print(f"pool size       {pool_size if pool_size is not None else 'n/a'}")
+    print(f"concurrency     {concurrency}")
+    print(f"completed       {completed} ({results['errors']} errors) in {results['elapsed']:.2f}s")
+    print(f"throughput      {completed / results['elapsed'] if results['elapsed'] else 0:.2f} renders/s")
+    for name, values in (("latency", results["latencies"]), ("queue wait", results["queueWaits"])):
+        if values:
+            print(
+                f"{name:<15} p50 {percentile(values, 50):8.1f} ms  "
+                f"p95 {percentile(values, 95):8.1f} ms  p99 {percentile(values, 99):8.1f} ms"
+            )
+    if completed:
+        summary = ", ".join(f"{status} {count} ({count / completed:.0%})" for status, count in sorted(statuses.items()))
+        print(f"outcomes        {summary}")
+        not_ready = statuses.get("pending", 0) + statuses.get("offline", 0)
+        print(f"pending+offline {not_ready / completed:.1%}")
+
+
+async def _run_http(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+
+        async def _render(body: Dict[str, Any]) -> Dict[str, Any]:
+            response = await client.post("/api/scene/render", json=body)
+            response.raise_for_status()
+            result = response.json()
+            match = _SERVER_TIMING_QUEUE.search(response.headers.get("server-timing", ""))
+            if match:
+                result["queueWaitMs"] = float(match.group(1))
+            return result
+
+        pool_size = None
+        try:
+            pool_size = len((await client.get("/api/provider")).json().get("providerPool", []))
+        except Exception:
+            pass
+        results = await _drive(args.requests, args.concurrency, _render, args.seed)
+    _print_report(f"HTTP {args.url}", results, args.concurrency, pool_size)
+
+
+async def _run_in_process(args: argparse.Namespace) -> None:
+    pool = [
+        {
+            "type": "fake",
+            "label": f"fake-{idx + 1}",
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "failure_rate": args.failure_rate,
+            "payload_shape": args.payload,
+            "seed": args.seed + idx,
+        }
+        for idx in range(args.providers)
+    ]
+    orchestrator = SceneOrchestrator(db=None, provider_pool=pool)
+
+    async def _render(body: Dict[str, Any]) -> Dict[str, Any]:
+        result = await orchestrator.render_scene(SceneRenderRequest(**body))
+        result["queueWaitMs"] = (result.get("timings") or {}).get("queueWaitMs")
+        return result
+
+    try:
+        results = await _drive(args.requests, args.concurrency, _render, args.seed)
+    finally:
+        background = [*orchestrator._upgrade_tasks.values(), *orchestrator._retry_tasks.values()]
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await orchestrator.stop_background_workers()
+    _print_report(
+        f"in-process fake pool (latency {args.latency_ms:.0f}ms, failure {args.failure_rate:.0%})",
+        results,
+        args.concurrency,
+        args.providers,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scene render load generator.")
+    parser.add_argument("--url", default="http://localhost:8100")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--in-process", action="store_true", help="Use an in-process orchestrator with fake providers.")
+    parser.add_argument("--providers", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--payload", default="images")
+    args = parser.parse_args()
+    asyncio.run(_run_in_process(args) if args.in_process else _run_http(args))
+
+
+if __name__ == "__main__":
+    main()
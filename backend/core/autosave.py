@@ -0,0 +1,278 @@
+import datetime
+import logging
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .save_codec import SAVE_SCHEMA_VERSION
+from .save_summary import build_save_summary, player_summary, summary_set_fields
+from .story_events import STORY_LOG_TAIL, StoryEventStore, migrate_save_story_log, story_log_last, story_log_tail
+
+logger = logging.getLogger(__name__)
+
+AUTOSAVE_SLOT = 1
+AUTOSAVE_NAME = "AutoSave"
+# Story generation only looks at the last few events; the full history lives in story_events.
+AUTOSAVE_EVENTS_TAIL = 20
+
+# Combat turns are bookkeeping, not story: they keep a short capped log of their own.
+AUTOSAVE_COMBAT_LOG_TAIL = 50
+
+AUTOSAVE_MODE_APPEND = "append"
+AUTOSAVE_MODE_REWRITE = "rewrite"
+
+
+def _base_fields(player_id: str, now: datetime.datetime, badges: Any, cameos: Any) -> Dict[str, Any]:
+    return {
+        "playerId": player_id,
+        "saveSlot": AUTOSAVE_SLOT,
+        "saveName": AUTOSAVE_NAME,
+        "updatedAt": now,
+        "deletedAt": None,
+        "badges": badges,
+        "cameos": cameos,
+    }
+
+
+def _push_tail(entry: Dict[str, Any], tail_size: int) -> Dict[str, Any]:
+    return {"$each": [entry], "$slice": -tail_size}
+
+
+def build_entry_append_update(
+    set_fields: Dict[str, Any],
+    log_entry: Dict[str, Any],
+    now: datetime.datetime,
+    mirror_to_game_state: bool = True,
+    tail_size: int = STORY_LOG_TAIL,
+) -> Dict[str, Any]:
+    """``$set`` the given fields and ``$push`` one entry onto the inline log tails.
+
+    ``mirror_to_game_state=False`` keeps bookkeeping entries (combat turns) out
+    of ``gameState.storyLog``, which is the log clients restore and display.
+    """
+    push = {"storyLog": _push_tail(log_entry, tail_size)}
+    if mirror_to_game_state:
+        push["gameState.storyLog"] = _push_tail(log_entry, tail_size)
+    return {
+        "$setOnInsert": {"createdAt": now, "schemaVersion": SAVE_SCHEMA_VERSION},
+        "$set": {**set_fields, "storyLogLast": story_log_last([log_entry])},
+        "$push": push,
+        "$inc": {"storyLogCount": 1},
+    }
+
+
+def build_append_update(
+    player_id: str,
+    state_fields: Dict[str, Any],
+    log_entry: Dict[str, Any],
+    now: datetime.datetime,
+    badges: Any = None,
+    cameos: Any = None,
+    tail_size: int = STORY_LOG_TAIL,
+) -> Dict[str, Any]:
+    """Autosave update whose size does not depend on how long the game has run.
+
+    Scalar game-state fields are ``$set`` by dotted path and the new log entry
+    is ``$push``ed onto the inline tails, instead of rewriting ``gameState``
+    and ``storyLog`` whole. ``storyLogCount`` is the story_events cursor.
+    """
+    set_fields = _base_fields(player_id, now, badges, cameos)
+    set_fields.update({f"gameState.{key}": value for key, value in state_fields.items()})
+    set_fields["gameState.badges"] = badges
+    set_fields["gameState.cameos"] = cameos
+    set_fields.update(summary_set_fields(build_save_summary(state_fields, badges)))
+    return build_entry_append_update(set_fields, log_entry, now, tail_size=tail_size)
+
+
+def build_rewrite_update(
+    player_id: str,
+    state_fields: Dict[str, Any],
+    story_log: List[Dict[str, Any]],
+    now: datetime.datetime,
+    badges: Any = None,
+    cameos: Any = None,
+    tail_size: int = STORY_LOG_TAIL,
+) -> Dict[str, Any]:
+    """Full-document autosave, used when the stored log is not the one the client extended."""
+    tail = story_log_tail(story_log, tail_size)
+    game_state = {**state_fields, "storyLog": tail, "badges": badges, "cameos": cameos}
+    return {
+        "$setOnInsert": {"createdAt": now, "schemaVersion": SAVE_SCHEMA_VERSION},
+        "$set": {
+            **_base_fields(player_id, now, badges, cameos),
+            "gameState": game_state,
+            "storyLog": tail,
+            "storyLogCount": len(story_log),
+            "storyLogLast": story_log_last(story_log),
+            "summary": build_save_summary(game_state, badges),
+        },
+    }
+
+
+def build_combat_turn_update(
+    player_id: str,
+    player: Dict[str, Any],
+    combat_entry: Dict[str, Any],
+    now: datetime.datetime,
+    badges: Optional[List[Dict[str, Any]]] = None,
+    tail_size: int = AUTOSAVE_COMBAT_LOG_TAIL,
+) -> Dict[str, Any]:
+    """Autosave update for one combat turn, applied without reading the save first.
+
+    The entry goes onto a capped ``combatLog`` instead of the story history, so
+    the write needs neither the ``storyLogCount`` cursor nor story_events.
+    Badges are only written when the caller resolved them (``None`` leaves the
+    stored ones alone).
+    """
+    set_fields: Dict[str, Any] = {
+        "playerId": player_id,
+        "saveSlot": AUTOSAVE_SLOT,
+        "saveName": AUTOSAVE_NAME,
+        "gameState.player": player,
+        "updatedAt": now,
+        "deletedAt": None,
+    }
+    set_fields.update(summary_set_fields(player_summary(player)))
+    if badges is not None:
+        set_fields["badges"] = badges
+        set_fields["gameState.badges"] = badges
+        set_fields["summary.badgesCount"] = len(badges)
+    return {
+        "$setOnInsert": {"createdAt": now, "schemaVersion": SAVE_SCHEMA_VERSION, "storyLogCount": 0},
+        "$set": set_fields,
+        "$push": {"combatLog": _push_tail(combat_entry, tail_size)},
+    }
+
+
+async def append_story_entry(
+    saves,
+    events: Optional[StoryEventStore],
+    player_id: str,
+    log_entry: Dict[str, Any],
+    update: Dict[str, Any],
+    query_extra: Optional[Dict[str, Any]] = None,
+    upsert: bool = True,
+) -> Optional[int]:
+    """Apply an append ``update`` to the autosave and record the entry in story_events.
+
+    Returns the entry's turn, or ``None`` when ``query_extra`` did not match.
+    A legacy save (no ``storyLogCount`` yet) is migrated first, so the
+    ``$slice`` on the inline tail never drops history that story_events lacks.
+    """
+    query = {"playerId": player_id, "saveSlot": AUTOSAVE_SLOT, **(query_extra or {})}
+    if events is not None:
+        query.setdefault("storyLogCount", {"$exists": True})
+
+    async def _apply():
+        return await saves.find_one_and_update(
+            query,
+            update,
+            projection={"storyLogCount": 1},
+            upsert=upsert,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    try:
+        saved = await _apply()
+    except DuplicateKeyError:
+        # The slot exists but predates storyLogCount: migrate it, then append.
+        legacy = await saves.find_one({"playerId": player_id, "saveSlot": AUTOSAVE_SLOT})
+        if legacy is None:
+            raise
+        await migrate_save_story_log(saves, events, legacy)
+        saved = await _apply()
+    if saved is None:
+        return None
+    turn = int(saved.get("storyLogCount") or 1) - 1
+    if events is not None:
+        await events.append(player_id, AUTOSAVE_SLOT, turn, log_entry)
+    return turn
+
+
+async def queue_story_autosave(
+    cache,
+    events: Optional[StoryEventStore],
+    player_id: str,
+    state_fields: Dict[str, Any],
+    log_entry: Dict[str, Any],
+    badges: Any = None,
+    cameos: Any = None,
+    now: Optional[datetime.datetime] = None,
+) -> int:
+    """Queue one story turn on the hot-save ``cache`` instead of writing it now.
+
+    The append update joins the player's other queued autosave writes (combat
+    turns included) and goes out with the next bulk flush; the turn's
+    story_events row is written right after it. The turn number comes from
+    the cached ``storyLogCount``, so only a player's first turn after a cache
+    miss reads the save (and migrates it, if it predates story_events).
+    Returns the entry's turn.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    state_fields = dict(state_fields)
+    state_fields["previousEvents"] = list(state_fields.get("previousEvents") or [])[-AUTOSAVE_EVENTS_TAIL:]
+
+    await cache.get(player_id)
+    turn = cache.take_story_turn(player_id)
+    if turn is None:
+        await cache.flush_player(player_id)
+        query = {"playerId": player_id, "saveSlot": AUTOSAVE_SLOT}
+        saved = await cache.saves.find_one(query, {"storyLogCount": 1}) if cache.saves is not None else None
+        if saved is not None and saved.get("storyLogCount") is None and events is not None:
+            saved = await migrate_save_story_log(cache.saves, events, await cache.saves.find_one(query))
+        count = int((saved or {}).get("storyLogCount") or 0)
+        cache.set_story_log_count(player_id, count)
+        turn = cache.take_story_turn(player_id)
+        if turn is None:  # Evicted meanwhile; the next turn reads the save again
+            turn = count
+
+    update = build_append_update(player_id, state_fields, log_entry, now, badges, cameos)
+    await cache.write(player_id, update, story_event=(turn, log_entry) if events is not None else None)
+    return turn
+
+
+async def write_story_autosave(
+    saves,
+    player_id: str,
+    state_fields: Dict[str, Any],
+    previous_log: Optional[List[Dict[str, Any]]],
+    log_entry: Dict[str, Any],
+    badges: Any = None,
+    cameos: Any = None,
+    now: Optional[datetime.datetime] = None,
+    events: Optional[StoryEventStore] = None,
+) -> str:
+    """Append one turn to the player's autosave, falling back to a full rewrite.
+
+    With ``previous_log=None`` the server-held history is extended as-is; that
+    is what the game client does, since it never sends ``gameState.storyLog``.
+    When a caller does send its own log, the append only applies while the
+    stored ``storyLogCount`` equals that log's length and ``storyLogLast``
+    equals its last entry's ``t``. Otherwise the stored history belongs to
+    another timeline (a loaded slot, a legacy save, a log of the same length
+    that ended differently), and the caller's log replaces it, as before.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    state_fields = dict(state_fields)
+    state_fields["previousEvents"] = list(state_fields.get("previousEvents") or [])[-AUTOSAVE_EVENTS_TAIL:]
+    update = build_append_update(player_id, state_fields, log_entry, now, badges, cameos)
+
+    if previous_log is None:
+        await append_story_entry(saves, events, player_id, log_entry, update)
+        return AUTOSAVE_MODE_APPEND
+
+    expected = {"storyLogCount": len(previous_log), "storyLogLast": story_log_last(previous_log)}
+    turn = await append_story_entry(saves, events, player_id, log_entry, update, query_extra=expected, upsert=False)
+    if turn is not None:
+        return AUTOSAVE_MODE_APPEND
+
+    story_log = list(previous_log) + [log_entry]
+    await saves.update_one(
+        {"playerId": player_id, "saveSlot": AUTOSAVE_SLOT},
+        build_rewrite_update(player_id, state_fields, story_log, now, badges, cameos),
+        upsert=True,
+    )
+    if events is not None:
+        await events.replace(player_id, AUTOSAVE_SLOT, story_log)
+    return AUTOSAVE_MODE_REWRITE
@@ -0,0 +1,493 @@
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .autosave import AUTOSAVE_SLOT
+
+logger = logging.getLogger(__name__)
+
+HOT_SAVE_MODE_WRITE_THROUGH = "write-through"
+HOT_SAVE_MODE_WRITE_BEHIND = "write-behind"
+
+# Autosave fields the turn path reads back: badge merging, cameo merging, friend stats,
+# and the story_events cursor that numbers queued story turns.
+HOT_SAVE_FIELDS = ("badges", "cameos", "gameState.player", "deletedAt", "updatedAt", "storyLogCount")
+HOT_SAVE_PROJECTION = {"_id": 0, **{field: 1 for field in HOT_SAVE_FIELDS}}
+
+_MERGEABLE_OPERATORS = ("$set", "$setOnInsert", "$push", "$inc")
+
+
+def _get_path(doc: Dict[str, Any], dotted: str) -> Any:
+    for part in dotted.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _overlaps(a: str, b: str) -> bool:
+    return a == b or a.startswith(b + ".") or b.startswith(a + ".")
+
+
+def merge_updates(first: Dict[str, Any], second: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Combine two update documents into one with the same effect, or ``None``.
+
+    Only ``$set``, ``$setOnInsert``, ``$inc`` and ``$push`` with ``$each`` are
+    merged. A path touched by different operators (or a ``$set`` of a parent
+    and a child) cannot be combined safely, so those updates stay separate.
+    The exception is a counter seeded by ``$setOnInsert`` and bumped by
+    ``$inc`` (a combat turn's ``storyLogCount: 0`` next to a story turn's
+    ``+1``): when the seed would be overwritten or is zero, the ``$inc`` alone
+    has the same effect.
+    """
+    if any(op not in _MERGEABLE_OPERATORS for op in (*first, *second)):
+        return None
+    for op_a, fields_a in first.items():
+        for op_b, fields_b in second.items():
+            if op_a == op_b and op_a != "$set":
+                continue
+            for path_a in fields_a:
+                for path_b in fields_b:
+                    if not _overlaps(path_a, path_b) or (op_a == op_b == "$set" and path_a == path_b):
+                        continue
+                    if path_a == path_b and (
+                        (op_a, op_b) == ("$inc", "$setOnInsert")
+                        or ((op_a, op_b) == ("$setOnInsert", "$inc") and fields_a[path_a] == 0)
+                    ):
+                        continue
+                    return None
+
+    merged: Dict[str, Any] = {op: dict(fields) for op, fields in first.items()}
+    for key, value in second.get("$set", {}).items():
+        merged.setdefault("$set", {})[key] = value
+    for key, value in second.get("$setOnInsert", {}).items():
+        merged.setdefault("$setOnInsert", {}).setdefault(key, value)
+    for key, amount in second.get("$inc", {}).items():
+        incs = merged.setdefault("$inc", {})
+        incs[key] = incs.get(key, 0) + amount
+    for key, push in second.get("$push", {}).items():
+        pushes = merged.setdefault("$push", {})
+        earlier = pushes.get(key)
+        if earlier is None:
+            pushes[key] = dict(push)
+        elif earlier.get("$slice") != push.get("$slice") or "$each" not in earlier or "$each" not in push:
+            return None
+        else:
+            pushes[key] = {**earlier, "$each": list(earlier["$each"]) + list(push["$each"])}
+    for key in merged.get("$inc", {}):
+        merged.get("$setOnInsert", {}).pop(key, None)
+    if "$setOnInsert" in merged and not merged["$setOnInsert"]:
+        del merged["$setOnInsert"]
+    return merged
+
+
+class HotSaveCache:
+    """Per-process cache of active players' slot-1 autosaves.
+
+    Holds the few autosave fields the turn path reads (``HOT_SAVE_FIELDS``),
+    keyed by player, in an LRU of ``max_players`` entries that are dropped
+    after ``idle_ttl`` seconds without use. Writes made through :meth:`write`
+    update the cached view first, then reach Mongo either immediately
+    (``write-through``) or, with ``write-behind``, as one coalesced update per
+    player every ``flush_interval`` seconds. A player with ``max_pending``
+    writes queued is flushed early. Writes that bypass the cache must call
+    :meth:`flush_player` first and :meth:`invalidate` after.
+
+    The periodic flush sends every player's queued update in unordered
+    ``bulk_write`` calls of up to ``batch_size`` operations. A batch holds at
+    most one update per player, so a player whose writes could not be
+    coalesced has them sent in order across consecutive batches.
+
+    Story turns are queued the same way: :meth:`take_story_turn` hands out the
+    next ``storyLogCount`` from the cached view, and the turn's story_events
+    row rides along with its update. Rows are written to ``events`` in one
+    unordered batch per flush, once the player's save updates have landed.
+
+    Other instances do not see this cache, so cached badges and cameos can lag
+    a write made elsewhere by up to ``idle_ttl``; story turns for one player
+    are expected to be served by one instance at a time.
+    """
+
+    def __init__(
+        self,
+        saves=None,
+        events=None,
+        mode: str = HOT_SAVE_MODE_WRITE_BEHIND,
+        flush_interval: float = 2.0,
+        max_pending: int = 20,
+        idle_ttl: float = 600.0,
+        max_players: int = 5000,
+        batch_size: int = 500,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.saves = saves
+        self.events = events
+        self.mode = mode if mode in (HOT_SAVE_MODE_WRITE_THROUGH, HOT_SAVE_MODE_WRITE_BEHIND) else HOT_SAVE_MODE_WRITE_BEHIND
+        self.flush_interval = max(0.05, flush_interval)
+        self.max_pending = max(1, max_pending)
+        self.idle_ttl = idle_ttl
+        self.max_players = max(1, max_players)
+        self.batch_size = max(1, batch_size)
+        self.clock = clock
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_events: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        self._pending_writes: Dict[str, int] = {}
+        self._queued_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._flush_lock = asyncio.Lock()
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "storyWrites": 0,
+            "storyEvents": 0,
+            "mongoWrites": 0,
+            "coalesced": 0,
+            "flushErrors": 0,
+            "evicted": 0,
+            "bulkWrites": 0,
+        }
+        # count / total / max / last of each bulk flush: operations sent, seconds taken,
+        # and seconds the oldest write in the batch had been queued.
+        self._flush_metrics = {
+            name: {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0} for name in ("batchSize", "flushSeconds", "queueLagSeconds")
+        }
+
+    def _lock(self, player_id: str) -> asyncio.Lock:
+        lock = self._locks.get(player_id)
+        if lock is None:
+            lock = self._locks[player_id] = asyncio.Lock()
+        return lock
+
+    def _touch(self, player_id: str, view: Dict[str, Any]) -> Dict[str, Any]:
+        entry = self._entries.get(player_id)
+        if entry is None:
+            entry = self._entries[player_id] = {"view": view}
+        entry["touched"] = self.clock()
+        self._entries.move_to_end(player_id)
+        return entry
+
+    async def get(self, player_id: str) -> Dict[str, Any]:
+        """Return the cached autosave view (``{}`` when the player has no autosave)."""
+        entry = self._entries.get(player_id)
+        if entry is not None:
+            self._stats["hits"] += 1
+            return copy.deepcopy(self._touch(player_id, entry["view"])["view"])
+        self._stats["misses"] += 1
+        view: Dict[str, Any] = {}
+        if self.saves is not None:
+            # Queued writes outlived an invalidate; the read must see them (storyLogCount).
+            if self.has_pending(player_id):
+                await self.flush_player(player_id)
+            save = await self.saves.find_one({"playerId": player_id, "saveSlot": AUTOSAVE_SLOT}, HOT_SAVE_PROJECTION)
+            view = {field: _get_path(save, field) for field in HOT_SAVE_FIELDS} if save else {}
+        # A write may have landed while the read was in flight; it is newer.
+        entry = self._entries.get(player_id)
+        if entry is None:
+            entry = self._touch(player_id, view)
+        await self._evict()
+        return copy.deepcopy(entry["view"])
+
+    def remember(self, player_id: str, fields: Dict[str, Any]) -> None:
+        """Fold fields of a write made outside the cache into the cached view."""
+        entry = self._entries.get(player_id)
+        if entry is None:
+            return
+        for key, value in fields.items():
+            if key in HOT_SAVE_FIELDS:
+                entry["view"][key] = copy.deepcopy(value)
+        if fields.get("gameState") and isinstance(fields["gameState"], dict) and "player" in fields["gameState"]:
+            entry["view"]["gameState.player"] = copy.deepcopy(fields["gameState"]["player"])
+
+    def take_story_turn(self, player_id: str) -> Optional[int]:
+        """Hand out the player's next story turn from the cached ``storyLogCount``.
+
+        Returns ``None`` when the count is not cached; the caller reads it from
+        the save and passes it to :meth:`set_story_log_count` first.
+        """
+        entry = self._entries.get(player_id)
+        count = entry["view"].get("storyLogCount") if entry is not None else None
+        if not isinstance(count, int):
+            return None
+        entry["view"]["storyLogCount"] = count + 1
+        return count
+
+    def set_story_log_count(self, player_id: str, count: int) -> None:
+        """Cache the save's ``storyLogCount``, unless a turn was handed out meanwhile."""
+        entry = self._entries.get(player_id)
+        if entry is not None and not isinstance(entry["view"].get("storyLogCount"), int):
+            entry["view"]["storyLogCount"] = count
+
+    async def write(
+        self,
+        player_id: str,
+        update: Dict[str, Any],
+        story_event: Optional[Tuple[int, Dict[str, Any]]] = None,
+    ) -> None:
+        """Apply ``update`` to the player's autosave (upserting it), through the cache.
+
+        ``story_event`` is the ``(turn, entry)`` story_events row of a story
+        turn; it is written once ``update`` has reached the save.
+        """
+        self._stats["writes"] += 1
+        if story_event is not None:
+            self._stats["storyWrites"] += 1
+        if player_id in self._entries:
+            self.remember(player_id, update.get("$set", {}))
+            self._touch(player_id, self._entries[player_id]["view"])
+        if self.mode == HOT_SAVE_MODE_WRITE_THROUGH or self.saves is None:
+            async with self._lock(player_id):
+                await self._send(player_id, [update])
+                if story_event is not None:
+                    await self._send_events([(player_id, *story_event)])
+            return
+
+        if story_event is not None:
+            self._pending_events.setdefault(player_id, []).append(story_event)
+        queue = self._pending.setdefault(player_id, [])
+        self._queued_at.setdefault(player_id, self.clock())
+        merged = merge_updates(queue[-1], update) if queue else None
+        if merged is not None:
+            queue[-1] = merged
+            self._stats["coalesced"] += 1
+        else:
+            queue.append(update)
+        self._pending_writes[player_id] = self._pending_writes.get(player_id, 0) + 1
+        if self._pending_writes[player_id] >= self.max_pending:
+            await self.flush_player(player_id)
+
+    async def _send(self, player_id: str, updates: List[Dict[str, Any]]) -> None:
+        if self.saves is None:
+            return
+        for update in updates:
+            await self.saves.update_one({"playerId": player_id, "saveSlot": AUTOSAVE_SLOT}, update, upsert=True)
+            self._stats["mongoWrites"] += 1
+
+    async def _send_events(self, rows: List[Tuple[str, int, Dict[str, Any]]]) -> None:
+        """Write ``(player, turn, entry)`` story_events rows; failed rows wait for the next flush."""
+        if not rows or self.events is None:
+            return
+        try:
+            await self.events.append_many(AUTOSAVE_SLOT, rows)
+        except Exception:
+            self._stats["flushErrors"] += 1
+            for player_id, turn, entry in reversed(rows):
+                self._pending_events.setdefault(player_id, []).insert(0, (turn, entry))
+            raise
+        self._stats["storyEvents"] += len(rows)
+
+    async def flush_player(self, player_id: str) -> None:
+        """Write the player's queued updates now, in order, then their story_events rows."""
+        async with self._lock(player_id):
+            queue = self._pending.pop(player_id, None)
+            self._pending_writes.pop(player_id, None)
+            queued_at = self._queued_at.pop(player_id, None)
+            story_events = self._pending_events.pop(player_id, [])
+            sent = 0
+            try:
+                for update in queue or []:
+                    await self._send(player_id, [update])
+                    sent += 1
+            except Exception:
+                self._stats["flushErrors"] += 1
+                self._requeue(player_id, queue[sent:], queued_at, story_events)
+                raise
+            await self._send_events([(player_id, turn, entry) for turn, entry in story_events])
+
+    def _requeue(
+        self,
+        player_id: str,
+        updates: List[Dict[str, Any]],
+        queued_at: Optional[float],
+        story_events: Optional[List[Tuple[int, Dict[str, Any]]]] = None,
+    ) -> None:
+        # Keep what did not make it ahead of anything queued meanwhile.
+        if story_events:
+            self._pending_events[player_id] = list(story_events) + self._pending_events.get(player_id, [])
+        if not updates:
+            return
+        self._pending[player_id] = updates + self._pending.get(player_id, [])
+        self._queued_at[player_id] = min(self._queued_at.get(player_id, self.clock()), queued_at or self.clock())
+
+    def _observe(self, name: str, value: float) -> None:
+        metric = self._flush_metrics[name]
+        metric["count"] += 1
+        metric["total"] += value
+        metric["max"] = max(metric["max"], value)
+        metric["last"] = value
+
+    async def _bulk_send(self, operations: List[UpdateOne]) -> set:
+        """Send one unordered batch; returns the indexes of operations that failed."""
+        started = self.clock()
+        try:
+            await self.saves.bulk_write(operations, ordered=False)
+            failed = set()
+        except BulkWriteError as bulk_err:
+            failed = {error["index"] for error in bulk_err.details.get("writeErrors", [])}
+        finally:
+            self._stats["bulkWrites"] += 1
+            self._observe("batchSize", len(operations))
+            self._observe("flushSeconds", self.clock() - started)
+        self._stats["mongoWrites"] += len(operations) - len(failed)
+        return failed
+
+    async def _flush_players(self, player_ids: List[str]) -> int:
+        locks = [self._lock(player_id) for player_id in player_ids]
+        for lock in locks:
+            await lock.acquire()
+        try:
+            queues: Dict[str, List[Dict[str, Any]]] = {}
+            queued_at: Dict[str, Optional[float]] = {}
+            story_events: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+            for player_id in player_ids:
+                queue = self._pending.pop(player_id, None)
+                self._pending_writes.pop(player_id, None)
+                queued_at[player_id] = self._queued_at.pop(player_id, None)
+                story_events[player_id] = self._pending_events.pop(player_id, [])
+                if queue:
+                    queues[player_id] = queue
+            if not queues:
+                # Only story_events rows whose save updates already landed
+                await self._send_events(
+                    [(player_id, turn, entry) for player_id, rows in story_events.items() for turn, entry in rows]
+                )
+                return 0
+            oldest = min((at for at in queued_at.values() if at is not None), default=self.clock())
+            self._observe("queueLagSeconds", self.clock() - oldest)
+
+            flushed = len(queues)
+            position = 0
+            while queues:
+                batch = list(queues)
+                operations = [
+                    UpdateOne({"playerId": player_id, "saveSlot": AUTOSAVE_SLOT}, queues[player_id][position], upsert=True)
+                    for player_id in batch
+                ]
+                try:
+                    failed = await self._bulk_send(operations)
+                except Exception:
+                    # Nothing is known to have landed; retry everything on the next flush.
+                    failed = set(range(len(batch)))
+                for index, player_id in enumerate(batch):
+                    if index in failed:
+                        self._stats["flushErrors"] += 1
+                        self._requeue(
+                            player_id, queues.pop(player_id)[position:], queued_at[player_id], story_events.pop(player_id)
+                        )
+                        flushed -= 1
+                    elif len(queues[player_id]) <= position + 1:
+                        del queues[player_id]
+                position += 1
+            # The turns' story_events rows go out together, after their save updates
+            await self._send_events(
+                [(player_id, turn, entry) for player_id, rows in story_events.items() for turn, entry in rows]
+            )
+            return flushed
+        finally:
+            for lock in locks:
+                lock.release()
+
+    async def flush(self) -> int:
+        """Flush every player with queued updates; returns how many were flushed.
+
+        Players are written ``batch_size`` at a time with ``bulk_write``; a
+        player whose batch fails keeps its updates queued for the next flush.
+        """
+        if self.saves is None:
+            return 0
+        flushed = 0
+        async with self._flush_lock:
+            players = list(dict.fromkeys([*self._pending, *self._pending_events]))
+            for start in range(0, len(players), self.batch_size):
+                try:
+                    flushed += await self._flush_players(players[start:start + self.batch_size])
+                except Exception as flush_err:
+                    logger.warning(f"Hot save bulk flush failed: {flush_err}")
+        return flushed
+
+    def has_pending(self, player_id: str) -> bool:
+        return bool(self._pending.get(player_id) or self._pending_events.get(player_id))
+
+    def invalidate(self, player_id: str) -> None:
+        self._entries.pop(player_id, None)
+
+    def reset(self) -> None:
+        """Drop every cached view and queued write, e.g. when ``saves`` is rebound.
+
+        Queued writes are discarded rather than flushed: they were meant for
+        the previous collection.
+        """
+        self._entries.clear()
+        self._pending.clear()
+        self._pending_events.clear()
+        self._pending_writes.clear()
+        self._queued_at.clear()
+
+    async def _evict(self) -> None:
+        now = self.clock()
+        while self._entries:
+            player_id, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_players and now - entry["touched"] < self.idle_ttl:
+                break
+            del self._entries[player_id]
+            self._stats["evicted"] += 1
+            if self.has_pending(player_id):
+                try:
+                    await self.flush_player(player_id)
+                except Exception as flush_err:
+                    logger.warning(f"Hot save flush failed for evicted '{player_id}': {flush_err}")
+            lock = self._locks.get(player_id)
+            if lock is not None and not lock.locked() and not self.has_pending(player_id):
+                del self._locks[player_id]
+
+    def start(self) -> None:
+        if self.mode == HOT_SAVE_MODE_WRITE_BEHIND and (self._worker is None or self._worker.done()):
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write everything still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                await self._evict()
+            except asyncio.CancelledError:
+                raise
+            except Exception as loop_err:
+                logger.warning(f"Hot save flush loop error: {loop_err}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = self.clock()
+        return {
+            **self._stats,
+            "mode": self.mode,
+            "batchLimit": self.batch_size,
+            "flushInterval": self.flush_interval,
+            "players": len(self._entries),
+            "pendingPlayers": len(self._pending),
+            "pendingUpdates": sum(len(queue) for queue in self._pending.values()),
+            "pendingStoryEvents": sum(len(rows) for rows in self._pending_events.values()),
+            "oldestPendingSeconds": max((now - at for at in self._queued_at.values()), default=0.0),
+            **{
+                name: {**metric, "avg": metric["total"] / metric["count"] if metric["count"] else 0.0}
+                for name, metric in self._flush_metrics.items()
+            },
+        }
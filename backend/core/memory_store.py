@@ -0,0 +1,718 @@
+"""In-memory stand-in for the Motor collections the backend uses.
+
+Implements the subset of the Motor API the repositories and core helpers call
+(CRUD, the update operators autosaves rely on, unique indexes, ``bulk_write``
+and the ``$group`` pipelines behind the leaderboards) with the same results
+Mongo gives. Documents round-trip through BSON on the way in and out, so
+stored values, copies and datetimes (naive UTC) behave as with a real server.
+
+Used by ``STORAGE_BACKEND=memory``, the tests and the benchmarks; it is a
+single-process store with no persistence.
+"""
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import bson
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.operations import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+_MISSING = object()
+
+
+def _copy(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return bson.decode(bson.encode(doc))
+
+
+def _get_values(doc: Any, dotted: str) -> List[Any]:
+    """Every value at ``dotted``, descending into arrays like Mongo does."""
+    values = [doc]
+    for part in dotted.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict):
+                if part in value:
+                    found.append(value[part])
+            elif isinstance(value, list):
+                if part.isdigit() and int(part) < len(value):
+                    found.append(value[int(part)])
+                else:
+                    found.extend(item[part] for item in value if isinstance(item, dict) and part in item)
+        values = found
+    return values
+
+
+def _get_path(doc: Dict[str, Any], dotted: str, default: Any = None) -> Any:
+    for part in dotted.split("."):
+        if isinstance(doc, dict) and part in doc:
+            doc = doc[part]
+        elif isinstance(doc, list) and part.isdigit() and int(part) < len(doc):
+            doc = doc[int(part)]
+        else:
+            return default
+    return doc
+
+
+def _set_path(doc: Dict[str, Any], dotted: str, value: Any) -> None:
+    parts = dotted.split(".")
+    for part in parts[:-1]:
+        child = doc.get(part)
+        if not isinstance(child, dict):
+            child = doc[part] = {}
+        doc = child
+    doc[parts[-1]] = value
+
+
+def _unset_path(doc: Dict[str, Any], dotted: str) -> None:
+    parts = dotted.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+# Cross-type ordering, as in Mongo's BSON comparison order.
+def _type_rank(value: Any) -> int:
+    if value is None or value is _MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime.datetime):
+        return 9
+    return 10
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    rank = _type_rank(value)
+    if rank in (1, 4, 5, 10):
+        return rank, str(value) if rank != 1 else ""
+    return rank, value
+
+
+def _compare(a: Any, b: Any) -> int:
+    ka, kb = _sort_key(a), _sort_key(b)
+    return (ka > kb) - (ka < kb)
+
+
+def _match_condition(values: List[Any], condition: Any) -> bool:
+    if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+        return all(_match_operator(values, op, arg) for op, arg in condition.items())
+    return _match_equal(values, condition)
+
+
+def _expand(values: List[Any]) -> List[Any]:
+    expanded = []
+    for value in values:
+        expanded.append(value)
+        if isinstance(value, list):
+            expanded.extend(value)
+    return expanded
+
+
+def _match_equal(values: List[Any], target: Any) -> bool:
+    if target is None and not values:
+        return True
+    return any(value == target for value in _expand(values))
+
+
+def _match_operator(values: List[Any], op: str, arg: Any) -> bool:
+    if op == "$eq":
+        return _match_equal(values, arg)
+    if op == "$ne":
+        return not _match_equal(values, arg)
+    if op == "$in":
+        return any(_match_equal(values, item) for item in arg)
+    if op == "$nin":
+        return not any(_match_equal(values, item) for item in arg)
+    if op == "$exists":
+        return bool(values) == bool(arg)
+    if op == "$not":
+        return not _match_condition(values, arg)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        for value in _expand(values):
+            if value is None or _type_rank(value) != _type_rank(arg):
+                continue
+            cmp = _compare(value, arg)
+            if (op == "$gt" and cmp > 0) or (op == "$gte" and cmp >= 0) or (op == "$lt" and cmp < 0) or (op == "$lte" and cmp <= 0):
+                return True
+        return False
+    if op == "$size":
+        return any(isinstance(value, list) and len(value) == arg for value in values)
+    raise NotImplementedError(f"Query operator {op} is not supported by the in-memory store")
+
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, sub) for sub in condition):
+                return False
+        elif not _match_condition(_get_values(doc, key), condition):
+            return False
+    return True
+
+
+def _project_include(doc: Any, paths: List[List[str]]) -> Any:
+    if isinstance(doc, list):
+        return [_project_include(item, paths) for item in doc if isinstance(item, (dict, list))]
+    if not isinstance(doc, dict):
+        return doc
+    result: Dict[str, Any] = {}
+    heads: Dict[str, List[List[str]]] = {}
+    for path in paths:
+        heads.setdefault(path[0], []).append(path[1:])
+    for head, rests in heads.items():
+        if head not in doc:
+            continue
+        if any(not rest for rest in rests):
+            result[head] = doc[head]
+        else:
+            result[head] = _project_include(doc[head], rests)
+    return result
+
+
+def project(doc: Dict[str, Any], projection: Optional[Any]) -> Dict[str, Any]:
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = bool(projection.get("_id", 1))
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if not fields and include_id:
+        return {"_id": doc["_id"]} if "_id" in doc else {}
+    if fields and all(fields.values()):
+        result = _project_include(doc, [key.split(".") for key in fields])
+        if include_id and "_id" in doc:
+            result = {"_id": doc["_id"], **result}
+        return result
+    result = dict(doc)
+    for key in fields:
+        _unset_path(result, key)
+    if not include_id:
+        result.pop("_id", None)
+    return result
+
+
+def _seed_from_query(query: Dict[str, Any]) -> Dict[str, Any]:
+    doc: Dict[str, Any] = {}
+    for key, value in query.items():
+        if key.startswith("$"):
+            if key == "$and":
+                for sub in value:
+                    for sub_key, sub_value in _seed_from_query(sub).items():
+                        doc[sub_key] = sub_value
+            continue
+        if isinstance(value, dict) and value and all(op.startswith("$") for op in value):
+            if "$eq" in value:
+                _set_path(doc, key, value["$eq"])
+            continue
+        _set_path(doc, key, value)
+    return doc
+
+
+def apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool = False) -> None:
+    if not any(key.startswith("$") for key in update):
+        raise ValueError("update only works with $ operators")
+    for op, fields in update.items():
+        if op == "$set":
+            for key, value in fields.items():
+                _set_path(doc, key, value)
+        elif op == "$setOnInsert":
+            if inserting:
+                for key, value in fields.items():
+                    _set_path(doc, key, value)
+        elif op == "$unset":
+            for key in fields:
+                _unset_path(doc, key)
+        elif op == "$inc":
+            for key, amount in fields.items():
+                _set_path(doc, key, _get_path(doc, key, 0) + amount)
+        elif op in ("$max", "$min"):
+            for key, value in fields.items():
+                current = _get_path(doc, key, _MISSING)
+                if current is _MISSING:
+                    _set_path(doc, key, value)
+                    continue
+                cmp = _compare(value, current)
+                if (op == "$max" and cmp > 0) or (op == "$min" and cmp < 0):
+                    _set_path(doc, key, value)
+        elif op in ("$push", "$addToSet"):
+            for key, value in fields.items():
+                current = list(_get_path(doc, key, None) or [])
+                items = list(value["$each"]) if isinstance(value, dict) and "$each" in value else [value]
+                if op == "$addToSet":
+                    current.extend(item for item in items if item not in current)
+                else:
+                    current.extend(items)
+                if op == "$push" and isinstance(value, dict) and "$slice" in value:
+                    limit = value["$slice"]
+                    current = current[limit:] if limit < 0 else current[:limit]
+                _set_path(doc, key, current)
+        elif op == "$pull":
+            for key, value in fields.items():
+                current = list(_get_path(doc, key, None) or [])
+                if isinstance(value, dict):
+                    current = [item for item in current if not (isinstance(item, dict) and matches(item, value))]
+                else:
+                    current = [item for item in current if item != value]
+                _set_path(doc, key, current)
+        else:
+            raise NotImplementedError(f"Update operator {op} is not supported by the in-memory store")
+
+
+class MemoryInsertOneResult:
+    def __init__(self, inserted_id: Any):
+        self.inserted_id = inserted_id
+        self.acknowledged = True
+
+
+class MemoryInsertManyResult:
+    def __init__(self, inserted_ids: List[Any]):
+        self.inserted_ids = inserted_ids
+        self.acknowledged = True
+
+
+class MemoryUpdateResult:
+    def __init__(self, matched_count: int, modified_count: int, upserted_id: Any = None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+        self.acknowledged = True
+
+
+class MemoryDeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+        self.acknowledged = True
+
+
+class MemoryBulkWriteResult:
+    def __init__(self, counts: Dict[str, int], upserted_ids: Dict[int, Any]):
+        self.inserted_count = counts["nInserted"]
+        self.matched_count = counts["nMatched"]
+        self.modified_count = counts["nModified"]
+        self.deleted_count = counts["nRemoved"]
+        self.upserted_count = counts["nUpserted"]
+        self.upserted_ids = upserted_ids
+        self.acknowledged = True
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", query: Optional[Dict[str, Any]], projection: Any = None):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[List[Dict[str, Any]]] = None
+
+    def sort(self, key_or_list: Any, direction: int = 1) -> "MemoryCursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "MemoryCursor":
+        return self
+
+    def _materialize(self) -> List[Dict[str, Any]]:
+        if self._results is None:
+            docs = self._collection._matching(self._query)
+            docs = _sorted(docs, self._sort)
+            docs = docs[self._skip:]
+            if self._limit:
+                docs = docs[: abs(self._limit)]
+            self._results = [project(_copy(doc), self._projection) for doc in docs]
+        return self._results
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = self._materialize()
+        return list(docs if length is None else docs[:length])
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._materialize():
+            yield doc
+
+
+def _sorted(docs: List[Dict[str, Any]], sort: Sequence[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    for key, direction in reversed(list(sort)):
+        docs = sorted(docs, key=lambda doc: _sort_key(_get_path(doc, key, None)), reverse=direction < 0)
+    return docs
+
+
+class MemoryCollection:
+    """One collection of a :class:`MemoryDatabase`."""
+
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._docs: List[Dict[str, Any]] = []
+        self._unique: Dict[str, Tuple[List[str], bool]] = {}
+
+    # --- indexes ---------------------------------------------------------------
+    async def create_index(self, keys: Any, unique: bool = False, sparse: bool = False, **kwargs: Any) -> str:
+        fields = [keys] if isinstance(keys, str) else [key for key, _ in keys]
+        name = kwargs.get("name") or "_".join(f"{field}_1" for field in fields)
+        if unique:
+            self._unique[name] = (fields, sparse)
+        return name
+
+    def _check_unique(self, candidate: Dict[str, Any], ignore: Optional[Dict[str, Any]] = None) -> None:
+        if any(doc is not ignore and doc.get("_id") == candidate.get("_id") for doc in self._docs):
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_", 11000)
+        for name, (fields, sparse) in self._unique.items():
+            key = tuple(_get_path(candidate, field, _MISSING) for field in fields)
+            if sparse and all(value is _MISSING for value in key):
+                continue
+            key = tuple(None if value is _MISSING else value for value in key)
+            for doc in self._docs:
+                if doc is ignore:
+                    continue
+                other = tuple(_get_path(doc, field, None) for field in fields)
+                if sparse and all(_get_path(doc, field, _MISSING) is _MISSING for field in fields):
+                    continue
+                if other == key:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}", 11000)
+
+    # --- reads -----------------------------------------------------------------
+    def _matching(self, query: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [doc for doc in self._docs if matches(doc, query)]
+
+    def _first(self, query: Optional[Dict[str, Any]], sort: Any = None) -> Optional[Dict[str, Any]]:
+        docs = self._matching(query)
+        if sort:
+            docs = _sorted(docs, sort)
+        return docs[0] if docs else None
+
+    def find(self, filter: Optional[Dict[str, Any]] = None, projection: Any = None, **kwargs: Any) -> MemoryCursor:
+        cursor = MemoryCursor(self, filter, projection)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        return cursor
+
+    async def find_one(self, filter: Optional[Dict[str, Any]] = None, projection: Any = None, sort: Any = None, **kwargs: Any):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        doc = self._first(filter, sort)
+        return project(_copy(doc), projection) if doc is not None else None
+
+    async def count_documents(self, filter: Dict[str, Any], **kwargs: Any) -> int:
+        return len(self._matching(filter))
+
+    async def estimated_document_count(self) -> int:
+        return len(self._docs)
+
+    async def distinct(self, key: str, filter: Optional[Dict[str, Any]] = None) -> List[Any]:
+        values: List[Any] = []
+        for doc in self._matching(filter):
+            for value in _expand(_get_values(doc, key)):
+                if not isinstance(value, list) and value not in values:
+                    values.append(value)
+        return values
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs: Any) -> MemoryCursor:
+        docs = [_copy(doc) for doc in self._docs]
+        for stage in pipeline:
+            docs = _run_stage(docs, stage)
+        cursor = MemoryCursor(self, None)
+        cursor._results = docs
+        return cursor
+
+    # --- writes ----------------------------------------------------------------
+    def _insert(self, document: Dict[str, Any]) -> Any:
+        if "_id" not in document:
+            # Like pymongo, the caller's document gets the generated _id.
+            document["_id"] = ObjectId()
+        stored = _copy(document)
+        self._check_unique(stored)
+        self._docs.append(stored)
+        return stored["_id"]
+
+    async def insert_one(self, document: Dict[str, Any], **kwargs: Any) -> MemoryInsertOneResult:
+        return MemoryInsertOneResult(self._insert(document))
+
+    async def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True, **kwargs: Any):
+        operations = [InsertOne(document) for document in documents]
+        self._bulk(operations, ordered)
+        return MemoryInsertManyResult([op._doc["_id"] for op in operations])
+
+    def _update(self, query: Dict[str, Any], update: Any, upsert: bool, multi: bool, replace: bool = False):
+        targets = self._matching(query)
+        if not multi:
+            targets = targets[:1]
+        modified = 0
+        for doc in targets:
+            before = _copy(doc)
+            if replace:
+                updated = {"_id": doc["_id"], **_copy(update)}
+            else:
+                updated = _copy(doc)
+                apply_update(updated, update)
+            if updated.get("_id") != doc.get("_id"):
+                raise ValueError("Performing an update on the path '_id' would modify the immutable field '_id'")
+            updated = _copy(updated)
+            self._check_unique(updated, ignore=doc)
+            doc.clear()
+            doc.update(updated)
+            modified += int(doc != before)
+        if targets or not upsert:
+            return MemoryUpdateResult(len(targets), modified)
+        seed = _seed_from_query(query)
+        if replace:
+            seed = {**({"_id": seed["_id"]} if "_id" in seed else {}), **_copy(update)}
+        else:
+            apply_update(seed, update, inserting=True)
+        upserted_id = self._insert(seed)
+        return MemoryUpdateResult(0, 0, upserted_id)
+
+    async def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs: Any):
+        return self._update(filter, update, upsert, multi=False)
+
+    async def update_many(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs: Any):
+        return self._update(filter, update, upsert, multi=True)
+
+    async def replace_one(self, filter: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False, **kwargs: Any):
+        return self._update(filter, replacement, upsert, multi=False, replace=True)
+
+    async def find_one_and_update(
+        self,
+        filter: Dict[str, Any],
+        update: Dict[str, Any],
+        projection: Any = None,
+        sort: Any = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+        **kwargs: Any,
+    ):
+        doc = self._first(filter, sort)
+        if doc is None:
+            if not upsert:
+                return None
+            result = self._update(filter, update, upsert=True, multi=False)
+            if return_document == ReturnDocument.BEFORE:
+                return None
+            return project(_copy(self._first({"_id": result.upserted_id})), projection)
+        before = _copy(doc)
+        self._update({"_id": doc["_id"]}, update, upsert=False, multi=False)
+        after = self._first({"_id": doc["_id"]})
+        return project(_copy(after) if return_document == ReturnDocument.AFTER else before, projection)
+
+    async def find_one_and_delete(self, filter: Dict[str, Any], projection: Any = None, sort: Any = None, **kwargs: Any):
+        doc = self._first(filter, sort)
+        if doc is None:
+            return None
+        self._docs.remove(doc)
+        return project(doc, projection)
+
+    def _delete(self, query: Dict[str, Any], multi: bool) -> MemoryDeleteResult:
+        targets = self._matching(query)
+        if not multi:
+            targets = targets[:1]
+        for doc in targets:
+            self._docs.remove(doc)
+        return MemoryDeleteResult(len(targets))
+
+    async def delete_one(self, filter: Dict[str, Any], **kwargs: Any) -> MemoryDeleteResult:
+        return self._delete(filter, multi=False)
+
+    async def delete_many(self, filter: Dict[str, Any], **kwargs: Any) -> MemoryDeleteResult:
+        return self._delete(filter, multi=True)
+
+    def _bulk(self, operations: Sequence[Any], ordered: bool) -> MemoryBulkWriteResult:
+        counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0}
+        upserted: Dict[int, Any] = {}
+        errors: List[Dict[str, Any]] = []
+        for index, op in enumerate(operations):
+            try:
+                if isinstance(op, InsertOne):
+                    self._insert(op._doc)
+                    counts["nInserted"] += 1
+                    continue
+                if isinstance(op, (DeleteOne, DeleteMany)):
+                    counts["nRemoved"] += self._delete(op._filter, multi=isinstance(op, DeleteMany)).deleted_count
+                    continue
+                if isinstance(op, (UpdateOne, UpdateMany, ReplaceOne)):
+                    result = self._update(
+                        op._filter, op._doc, bool(op._upsert), multi=isinstance(op, UpdateMany), replace=isinstance(op, ReplaceOne)
+                    )
+                    counts["nMatched"] += result.matched_count
+                    counts["nModified"] += result.modified_count
+                    if result.upserted_id is not None:
+                        counts["nUpserted"] += 1
+                        upserted[index] = result.upserted_id
+                    continue
+                raise TypeError(f"{type(op).__name__} is not a supported bulk operation")
+            except DuplicateKeyError as write_err:
+                errors.append({"index": index, "code": 11000, "errmsg": str(write_err), "op": op})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({**counts, "writeErrors": errors, "upserted": [{"index": i, "_id": v} for i, v in upserted.items()]})
+        return MemoryBulkWriteResult(counts, upserted)
+
+    async def bulk_write(self, requests: Sequence[Any], ordered: bool = True, **kwargs: Any) -> MemoryBulkWriteResult:
+        return self._bulk(list(requests), ordered)
+
+    async def drop(self) -> None:
+        self._docs.clear()
+        self._unique.clear()
+
+
+def _eval(expression: Any, doc: Dict[str, Any]) -> Any:
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get_path(doc, expression[1:], None)
+    if isinstance(expression, list):
+        return [_eval(item, doc) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if len(expression) == 1:
+        op, arg = next(iter(expression.items()))
+        if op == "$ifNull":
+            for item in arg:
+                value = _eval(item, doc)
+                if value is not None:
+                    return value
+            return None
+        if op == "$size":
+            value = _eval(arg, doc)
+            if not isinstance(value, list):
+                raise ValueError("The argument to $size must be an array")
+            return len(value)
+        if op == "$add":
+            values = [_eval(item, doc) for item in arg]
+            return None if any(value is None for value in values) else sum(values)
+        if op == "$multiply":
+            result = 1
+            for item in arg:
+                value = _eval(item, doc)
+                if value is None:
+                    return None
+                result *= value
+            return result
+        if op == "$literal":
+            return arg
+    return {key: _eval(value, doc) for key, value in expression.items()}
+
+
+def _accumulate(op: str, values: List[Any]) -> Any:
+    present = [value for value in values if value is not None]
+    if op == "$max":
+        return max(present, key=_sort_key) if present else None
+    if op == "$min":
+        return min(present, key=_sort_key) if present else None
+    if op == "$sum":
+        return sum(value for value in present if isinstance(value, (int, float)) and not isinstance(value, bool))
+    if op == "$avg":
+        numbers = [value for value in present if isinstance(value, (int, float))]
+        return sum(numbers) / len(numbers) if numbers else None
+    if op == "$first":
+        return values[0] if values else None
+    if op == "$last":
+        return values[-1] if values else None
+    if op == "$push":
+        return list(values)
+    raise NotImplementedError(f"Accumulator {op} is not supported by the in-memory store")
+
+
+def _run_stage(docs: List[Dict[str, Any]], stage: Dict[str, Any]) -> List[Dict[str, Any]]:
+    (name, spec), = stage.items()
+    if name == "$match":
+        return [doc for doc in docs if matches(doc, spec)]
+    if name == "$sort":
+        return _sorted(docs, list(spec.items()))
+    if name == "$limit":
+        return docs[:spec]
+    if name == "$skip":
+        return docs[spec:]
+    if name == "$project":
+        projected = []
+        for doc in docs:
+            out: Dict[str, Any] = {"_id": doc.get("_id")} if spec.get("_id", 1) else {}
+            for key, value in spec.items():
+                if key == "_id":
+                    continue
+                if value in (1, True):
+                    if _get_path(doc, key, _MISSING) is not _MISSING:
+                        _set_path(out, key, _get_path(doc, key))
+                elif value not in (0, False):
+                    _set_path(out, key, _eval(value, doc))
+            projected.append(out)
+        return projected
+    if name == "$group":
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        keys: Dict[Any, Any] = {}
+        for doc in docs:
+            key = _eval(spec["_id"], doc)
+            marker = bson.encode({"k": key})
+            groups.setdefault(marker, []).append(doc)
+            keys[marker] = key
+        grouped = []
+        for marker, members in groups.items():
+            out = {"_id": keys[marker]}
+            for field, accumulator in spec.items():
+                if field == "_id":
+                    continue
+                (op, expression), = accumulator.items()
+                out[field] = _accumulate(op, [_eval(expression, member) for member in members])
+            grouped.append(out)
+        return grouped
+    raise NotImplementedError(f"Pipeline stage {name} is not supported by the in-memory store")
+
+
+class MemoryDatabase:
+    """Collections created on first access, like ``client.<db>.<collection>``."""
+
+    def __init__(self, name: str = "memory"):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(self, name)
+        return collection
+
+    async def command(self, command: Any, **kwargs: Any) -> Dict[str, Any]:
+        if command == "ping" or (isinstance(command, dict) and "ping" in command):
+            return {"ok": 1.0}
+        raise NotImplementedError(f"Command {command!r} is not supported by the in-memory store")
+
+    async def list_collection_names(self) -> List[str]:
+        return sorted(self._collections)
@@ -0,0 +1,316 @@
+import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+
+from .memory_store import MemoryDatabase
+from .save_snapshots import SaveSnapshotStore
+
+STORAGE_BACKEND_MONGO = "mongo"
+STORAGE_BACKEND_MEMORY = "memory"
+
+
+class SaveRepository:
+    """Save slots, one document per (playerId, saveSlot).
+
+    Autosave, hot-cache, session and migration helpers take the collection
+    itself (``.collection``), since they build their own update documents.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("playerId", ASCENDING), ("saveSlot", ASCENDING)], unique=True)
+        await self.collection.create_index([("playerId", ASCENDING), ("updatedAt", DESCENDING)])
+        await self.collection.create_index([("deletedAt", ASCENDING)])
+
+    async def get(self, save_id: Any, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": save_id}, projection)
+
+    async def get_slot(self, player_id: str, save_slot: int, projection: Optional[Dict[str, Any]] = None):
+        return await self.collection.find_one({"playerId": player_id, "saveSlot": save_slot}, projection)
+
+    async def latest_for_player(self, player_id: str, projection: Optional[Dict[str, Any]] = None):
+        return await self.collection.find_one(
+            {"playerId": player_id, "deletedAt": None}, projection, sort=[("updatedAt", DESCENDING)]
+        )
+
+    async def list_for_player(self, player_id: str, projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({"playerId": player_id, "deletedAt": None}, projection).sort("updatedAt", DESCENDING)
+        return await cursor.to_list(length=None)
+
+    async def autosaves_for_players(self, player_ids: List[str], projection: Optional[Dict[str, Any]] = None):
+        cursor = self.collection.find({"playerId": {"$in": list(player_ids)}, "saveSlot": 1, "deletedAt": None}, projection)
+        return await cursor.to_list(length=None)
+
+    async def upsert_slot(self, player_id: str, save_slot: int, update: Dict[str, Any]):
+        return await self.collection.update_one({"playerId": player_id, "saveSlot": save_slot}, update, upsert=True)
+
+    async def set_fields(self, save_id: Any, fields: Dict[str, Any]) -> bool:
+        """``$set`` fields on one save; ``False`` when there is no such save."""
+        result = await self.collection.update_one({"_id": save_id}, {"$set": fields})
+        return result.matched_count > 0
+
+    async def set_slot_fields(self, player_id: str, save_slot: int, fields: Dict[str, Any]) -> None:
+        await self.collection.update_one({"playerId": player_id, "saveSlot": save_slot}, {"$set": fields})
+
+    async def soft_delete(self, save_id: Any, now: datetime.datetime) -> bool:
+        return await self.set_fields(save_id, {"deletedAt": now, "updatedAt": now})
+
+    async def global_leaderboard(self, limit: int) -> List[Dict[str, Any]]:
+        """Best autosave stats per player, scored level*100 + xp + badges*50."""
+        pipeline = [
+            {"$match": {"saveSlot": 1, "deletedAt": None}},
+            {"$group": {
+                "_id": "$playerId",
+                "level": {"$max": {"$ifNull": ["$summary.level", "$gameState.player.level"]}},
+                "totalXp": {"$max": {"$ifNull": ["$summary.xp", "$gameState.player.xp"]}},
+                "badgesCount": {"$max": {"$ifNull": ["$summary.badgesCount", {"$size": {"$ifNull": ["$badges", []]}}]}},
+                "lastPlayed": {"$max": "$updatedAt"}
+            }},
+            {"$project": {
+                "playerId": "$_id",
+                "level": 1,
+                "totalXp": 1,
+                "badgesCount": 1,
+                "score": {"$add": [{"$multiply": ["$level", 100]}, "$totalXp", {"$multiply": ["$badgesCount", 50]}]}
+            }},
+            {"$sort": {"score": -1}},
+            {"$limit": limit}
+        ]
+        return await self.collection.aggregate(pipeline).to_list(length=limit)
+
+
+class PlayerRepository:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("name", ASCENDING)], unique=True)
+        await self.collection.create_index([("googleId", ASCENDING)], unique=True, sparse=True)
+
+    @staticmethod
+    def identity_query(player: Dict[str, Any]) -> Dict[str, Any]:
+        """Google users are keyed by googleId, guests by name."""
+        if player.get("googleId"):
+            return {"googleId": player["googleId"]}
+        return {"name": player["name"]}
+
+    async def upsert(self, player: Dict[str, Any], now: datetime.datetime) -> Dict[str, Any]:
+        """Create or refresh a player record; returns the query that identifies it."""
+        query = self.identity_query(player)
+        await self.collection.update_one(
+            query,
+            {
+                "$setOnInsert": {"createdAt": now},
+                "$set": {**player, "updatedAt": now, "lastLoginAt": now},
+            },
+            upsert=True,
+        )
+        return query
+
+    async def find(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one(query)
+
+    async def by_google_id(self, google_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"googleId": google_id})
+
+    async def by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"name": name})
+
+
+class FriendRepository:
+    """Friend requests; an accepted request is the friendship."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("fromPlayerId", ASCENDING), ("toPlayerId", ASCENDING)])
+        await self.collection.create_index([("toPlayerId", ASCENDING), ("status", ASCENDING)])
+
+    async def between(self, player_a: str, player_b: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({
+            "$or": [
+                {"fromPlayerId": player_a, "toPlayerId": player_b},
+                {"fromPlayerId": player_b, "toPlayerId": player_a},
+            ]
+        })
+
+    async def create_request(self, from_player: str, to_player: str, now: datetime.datetime) -> None:
+        await self.collection.insert_one({
+            "fromPlayerId": from_player,
+            "toPlayerId": to_player,
+            "status": "pending",
+            "createdAt": now.isoformat(),
+        })
+
+    async def pending(self, from_player: str, to_player: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"fromPlayerId": from_player, "toPlayerId": to_player, "status": "pending"})
+
+    async def accept(self, request_id: Any, now: datetime.datetime) -> None:
+        await self.collection.update_one(
+            {"_id": request_id}, {"$set": {"status": "accepted", "acceptedAt": now.isoformat()}}
+        )
+
+    async def accepted_for(self, player_id: str) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({
+            "$or": [
+                {"fromPlayerId": player_id, "status": "accepted"},
+                {"toPlayerId": player_id, "status": "accepted"},
+            ]
+        })
+        return await cursor.to_list(length=None)
+
+    async def friend_ids(self, player_id: str) -> List[str]:
+        return [
+            f["toPlayerId"] if f["fromPlayerId"] == player_id else f["fromPlayerId"]
+            for f in await self.accepted_for(player_id)
+        ]
+
+
+class PuzzleProgressRepository:
+    """Per-player, per-puzzle arcade records."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("playerId", ASCENDING), ("puzzleId", ASCENDING)], unique=True)
+        await self.collection.create_index([("puzzleId", ASCENDING), ("highestScore", DESCENDING)])
+
+    async def get(self, player_id: str, puzzle_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"playerId": player_id, "puzzleId": puzzle_id})
+
+    async def put(self, player_id: str, puzzle_id: str, record: Dict[str, Any]) -> None:
+        await self.collection.update_one({"playerId": player_id, "puzzleId": puzzle_id}, {"$set": record}, upsert=True)
+
+    async def for_player(self, player_id: str) -> List[Dict[str, Any]]:
+        return await self.collection.find({"playerId": player_id}).to_list(length=None)
+
+    async def leaderboard(self, puzzle_id: str, limit: int) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({"puzzleId": puzzle_id}).sort(
+            [("highestScore", DESCENDING), ("bestTime", ASCENDING)]
+        ).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def count_won(self, player_id: str) -> int:
+        return await self.collection.count_documents({"playerId": player_id, "wins": {"$gt": 0}})
+
+
+class ChallengeRepository:
+    """Daily challenges and each player's completion streak."""
+
+    def __init__(self, challenges, streaks):
+        self.challenges = challenges
+        self.streaks = streaks
+
+    async def ensure_indexes(self) -> None:
+        await self.challenges.create_index([("playerId", ASCENDING), ("date", ASCENDING)])
+        await self.streaks.create_index([("playerId", ASCENDING)])
+
+    async def daily(self, player_id: str, date: str) -> Optional[Dict[str, Any]]:
+        return await self.challenges.find_one({"date": date, "playerId": player_id})
+
+    async def get(self, challenge_id: Any) -> Optional[Dict[str, Any]]:
+        return await self.challenges.find_one({"_id": challenge_id})
+
+    async def create(self, challenge: Dict[str, Any]) -> Any:
+        result = await self.challenges.insert_one(dict(challenge))
+        return result.inserted_id
+
+    async def complete(self, challenge_id: Any, completed_at: str) -> None:
+        await self.challenges.update_one(
+            {"_id": challenge_id}, {"$set": {"completed": True, "completedAt": completed_at}}
+        )
+
+    async def streak(self, player_id: str) -> Optional[Dict[str, Any]]:
+        return await self.streaks.find_one({"playerId": player_id})
+
+    async def record_completion(self, player_id: str, completed_at: str) -> int:
+        """Extend the player's streak by one; returns the new streak."""
+        streak_doc = await self.streaks.find_one({"playerId": player_id})
+        if streak_doc:
+            new_streak = streak_doc.get("streak", 0) + 1
+            await self.streaks.update_one(
+                {"playerId": player_id}, {"$set": {"streak": new_streak, "lastCompleted": completed_at}}
+            )
+            return new_streak
+        await self.streaks.insert_one({"playerId": player_id, "streak": 1, "lastCompleted": completed_at})
+        return 1
+
+
+class CameoInviteRepository:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("code", unique=True)
+        await self.collection.create_index("expiresAt", expireAfterSeconds=0)
+        await self.collection.create_index([("playerId", ASCENDING)])
+
+    async def create(self, invite: Dict[str, Any]) -> None:
+        """Insert an invite; raises ``DuplicateKeyError`` when its code is taken."""
+        await self.collection.insert_one(dict(invite))
+
+    async def by_code(self, code: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"code": code})
+
+    async def set_status(self, invite_id: Any, status: str, **fields: Any) -> None:
+        await self.collection.update_one({"_id": invite_id}, {"$set": {"status": status, **fields}})
+
+
+class SceneRepository:
+    """Read side of the scene service's ``scenes`` collection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("sceneId", ASCENDING)], unique=True)
+        # Same key as the scene service's history index; it also covers latest_for_player
+        await self.collection.create_index([("playerId", ASCENDING), ("createdAt", DESCENDING), ("sceneId", DESCENDING)])
+
+    async def get(self, scene_id: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"sceneId": scene_id}, projection)
+
+    async def latest_for_player(self, player_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({"playerId": player_id}).sort("createdAt", DESCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+
+
+class Repositories:
+    """Every repository the story service uses, over one database handle.
+
+    ``db`` is a Motor database or a :class:`MemoryDatabase`; the repositories
+    issue the same calls against either.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.saves = SaveRepository(db.saves)
+        self.players = PlayerRepository(db.players)
+        self.friends = FriendRepository(db.friends)
+        self.puzzle_progress = PuzzleProgressRepository(db.puzzle_arcade_progress)
+        self.challenges = ChallengeRepository(db.daily_challenges, db.challenge_streaks)
+        self.cameo_invites = CameoInviteRepository(db.cameo_invites)
+        self.scenes = SceneRepository(db.scenes)
+        self.snapshots = SaveSnapshotStore(db.save_snapshots)
+
+    async def ensure_indexes(self) -> None:
+        for repository in (
+            self.saves,
+            self.players,
+            self.friends,
+            self.puzzle_progress,
+            self.challenges,
+            self.cameo_invites,
+            self.scenes,
+            self.snapshots,
+        ):
+            await repository.ensure_indexes()
+
+    @classmethod
+    def in_memory(cls) -> "Repositories":
+        return cls(MemoryDatabase("ai_dungeon_master"))
@@ -0,0 +1,170 @@
+import logging
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+import bson
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# v1: gameState stored whole as nested BSON. v2: cold gameState fields in one compressed blob.
+SAVE_SCHEMA_VERSION = 2
+COLD_STATE_CODEC = "zlib-bson"
+COLD_STATE_LEVEL = 6
+
+# gameState fields that stay plain BSON: what autosaves $set by dotted path, what
+# the turn path, leaderboards, friend stats and scene GC query or project, and
+# the client's own nested ``gameState`` counters. Everything else is cold.
+HOT_STATE_FIELDS = frozenset(
+    (
+        "player",
+        "genre",
+        "gameState",
+        "previousEvents",
+        "choice",
+        "story",
+        "choices",
+        "storyPhase",
+        "turnCount",
+        "combatEncounters",
+        "combatEscapes",
+        "isAfterCombat",
+        "isFinalPhase",
+        "puzzle",
+        "questProgress",
+        "activeQuest",
+        "currentLocation",
+        "language",
+        "sessionVersion",
+        "sceneId",
+        "badges",
+        "cameos",
+        "storyLog",
+    )
+)
+
+
+def split_game_state(game_state: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split a gameState into its plain (hot) and compressed (cold) parts."""
+    hot: Dict[str, Any] = {}
+    cold: Dict[str, Any] = {}
+    for key, value in (game_state or {}).items():
+        (hot if key in HOT_STATE_FIELDS else cold)[key] = value
+    return hot, cold
+
+
+def encode_cold_state(cold: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The ``coldState`` subdocument for ``cold``, or ``None`` when there is nothing cold."""
+    if not cold:
+        return None
+    raw = bson.encode(cold)
+    return {
+        "codec": COLD_STATE_CODEC,
+        "size": len(raw),
+        "data": bson.Binary(zlib.compress(raw, COLD_STATE_LEVEL)),
+    }
+
+
+def decode_cold_state(cold_state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not isinstance(cold_state, dict) or not cold_state.get("data"):
+        return {}
+    if cold_state.get("codec") != COLD_STATE_CODEC:
+        raise ValueError(f"Unknown cold state codec: {cold_state.get('codec')}")
+    return bson.decode(zlib.decompress(bytes(cold_state["data"])))
+
+
+def expand_game_state(save: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The save's full gameState: plain fields with the cold blob merged back in.
+
+    Plain fields win over cold ones, since autosaves only ever write plain fields.
+    """
+    state = save.get("gameState")
+    if not isinstance(state, dict):
+        return state
+    cold = decode_cold_state(save.get("coldState"))
+    return {**cold, **state} if cold else state
+
+
+def compact_save_doc(save: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, str]]]:
+    """``($set, $unset)`` turning a v1 save into v2, or ``None`` if it is already v2.
+
+    Only the cold ``gameState.<field>`` paths are unset, so the update never
+    clobbers a hot field an autosave wrote meanwhile.
+    """
+    if save.get("schemaVersion", 1) >= SAVE_SCHEMA_VERSION:
+        return None
+    game_state = save.get("gameState") if isinstance(save.get("gameState"), dict) else {}
+    _, cold = split_game_state(game_state)
+    updates: Dict[str, Any] = {"schemaVersion": SAVE_SCHEMA_VERSION}
+    cold_state = encode_cold_state({**decode_cold_state(save.get("coldState")), **cold})
+    if cold_state is not None:
+        updates["coldState"] = cold_state
+    return updates, {f"gameState.{key}": "" for key in cold}
+
+
+def _migration_filter(save: Dict[str, Any]) -> Dict[str, Any]:
+    return {"_id": save["_id"], "schemaVersion": {"$not": {"$gte": SAVE_SCHEMA_VERSION}}}
+
+
+def _apply_compaction(save: Dict[str, Any], updates: Dict[str, Any], unset_fields: Dict[str, str]) -> Dict[str, Any]:
+    game_state = save.get("gameState")
+    migrated = {**save, **updates}
+    if isinstance(game_state, dict):
+        migrated["gameState"] = {
+            key: value for key, value in game_state.items() if f"gameState.{key}" not in unset_fields
+        }
+    return migrated
+
+
+async def migrate_save_schema(saves, save: Dict[str, Any]) -> Dict[str, Any]:
+    """Rewrite a v1 save as v2 on read; returns the save as it looks after migration.
+
+    Saves projected without ``gameState`` are left alone (the cold fields would be
+    unknown), as are saves already at v2.
+    """
+    if save.get("schemaVersion", 1) >= SAVE_SCHEMA_VERSION or "gameState" not in save or "_id" not in save:
+        return save
+    compacted = compact_save_doc(save)
+    if compacted is None:
+        return save
+    updates, unset_fields = compacted
+    update: Dict[str, Any] = {"$set": updates}
+    if unset_fields:
+        update["$unset"] = unset_fields
+    await saves.update_one(_migration_filter(save), update)
+    return _apply_compaction(save, updates, unset_fields)
+
+
+async def migrate_save_documents(db, batch_size: int = 200, dry_run: bool = False) -> Dict[str, int]:
+    """Bulk-convert every v1 save to v2. Returns counts and BSON bytes before/after."""
+    stats = {"scanned": 0, "migrated": 0, "skipped": 0, "bytesBefore": 0, "bytesAfter": 0}
+    operations = []
+
+    async def _flush():
+        if operations and not dry_run:
+            await db.saves.bulk_write(list(operations), ordered=False)
+        operations.clear()
+
+    cursor = db.saves.find({"schemaVersion": {"$not": {"$gte": SAVE_SCHEMA_VERSION}}}).batch_size(batch_size)
+    async for save in cursor:
+        stats["scanned"] += 1
+        try:
+            compacted = compact_save_doc(save)
+        except Exception as migrate_err:
+            logger.warning(f"Skipping save {save.get('_id')}: {migrate_err}")
+            compacted = None
+        if compacted is None:
+            stats["skipped"] += 1
+            continue
+        updates, unset_fields = compacted
+        stats["bytesBefore"] += len(bson.encode(save))
+        stats["bytesAfter"] += len(bson.encode(_apply_compaction(save, updates, unset_fields)))
+        update: Dict[str, Any] = {"$set": updates}
+        if unset_fields:
+            update["$unset"] = unset_fields
+        operations.append(UpdateOne(_migration_filter(save), update))
+        stats["migrated"] += 1
+        if len(operations) >= batch_size:
+            await _flush()
+    await _flush()
+    return stats
@@ -0,0 +1,200 @@
+import copy
+import datetime
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import bson
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from .save_codec import decode_cold_state, encode_cold_state
+from .save_summary import build_save_summary
+
+logger = logging.getLogger(__name__)
+
+# Diffs allowed after a base before the next snapshot is written as a new base;
+# restoring any point replays at most this many diffs.
+SAVE_SNAPSHOT_MAX_CHAIN = int(os.getenv("SAVE_SNAPSHOT_MAX_CHAIN", "10"))
+# Base snapshots (each with its diff chain) kept per slot; older ones are pruned.
+SAVE_SNAPSHOT_KEEP_BASES = int(os.getenv("SAVE_SNAPSHOT_KEEP_BASES", "5"))
+# Snapshot the autosave every N story turns (0 disables autosave snapshots).
+SAVE_SNAPSHOT_AUTOSAVE_EVERY = int(os.getenv("SAVE_SNAPSHOT_AUTOSAVE_EVERY", "5"))
+
+SNAPSHOT_KIND_BASE = "base"
+SNAPSHOT_KIND_DIFF = "diff"
+
+SNAPSHOT_LIST_PROJECTION = {
+    "_id": 0,
+    "seq": 1,
+    "kind": 1,
+    "source": 1,
+    "createdAt": 1,
+    "storyLogCount": 1,
+    "summary": 1,
+}
+
+
+def autosave_snapshot_due(turn_count: Any) -> bool:
+    """Whether the autosave at story turn ``turn_count`` lands in the snapshot history."""
+    every = SAVE_SNAPSHOT_AUTOSAVE_EVERY
+    return every > 0 and isinstance(turn_count, int) and turn_count > 0 and turn_count % every == 0
+
+
+def diff_state(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Paths that turn ``before`` into ``after``: ``{"set": [[path, value]], "unset": [path]}``.
+
+    Paths are key lists rather than dotted strings, since client keys (codex
+    entries, location names) may contain dots. Lists are replaced whole.
+    """
+    changes: Dict[str, List[Any]] = {"set": [], "unset": []}
+
+    def _walk(old: Dict[str, Any], new: Dict[str, Any], path: List[str]) -> None:
+        for key, value in new.items():
+            if key not in old:
+                changes["set"].append([path + [key], value])
+            elif isinstance(value, dict) and isinstance(old[key], dict):
+                _walk(old[key], value, path + [key])
+            elif old[key] != value or type(old[key]) is not type(value):
+                changes["set"].append([path + [key], value])
+        for key in old:
+            if key not in new:
+                changes["unset"].append(path + [key])
+
+    _walk(before or {}, after or {}, [])
+    return changes
+
+
+def apply_diff(state: Dict[str, Any], diff: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """Return ``state`` with ``diff`` applied (``state`` is left untouched)."""
+    result = copy.deepcopy(state)
+    for path in diff.get("unset", []):
+        target = result
+        for key in path[:-1]:
+            target = target.get(key) if isinstance(target, dict) else None
+        if isinstance(target, dict):
+            target.pop(path[-1], None)
+    for path, value in diff.get("set", []):
+        target = result
+        for key in path[:-1]:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            target = target[key]
+        target[path[-1]] = copy.deepcopy(value)
+    return result
+
+
+class SaveSnapshotStore:
+    """Point-in-time history of each save slot, as base snapshots plus diffs.
+
+    Every snapshot has a per-slot ``seq``. A base stores the whole gameState,
+    compressed like a save's cold state; the snapshots after it store only a
+    ``diff_state`` from the one before. A new base starts once the chain holds
+    ``max_chain`` diffs or a diff would be larger than a base, so storage
+    stays near one compressed copy plus deltas and restoring any point reads
+    at most ``max_chain + 1`` documents. Only the newest ``keep_bases`` chains
+    are kept.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_chain: int = SAVE_SNAPSHOT_MAX_CHAIN,
+        keep_bases: int = SAVE_SNAPSHOT_KEEP_BASES,
+    ):
+        self.collection = collection
+        self.max_chain = max(0, max_chain)
+        self.keep_bases = max(1, keep_bases)
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index(
+            [("playerId", ASCENDING), ("saveSlot", ASCENDING), ("seq", ASCENDING)], unique=True
+        )
+
+    async def latest(self, player_id: str, save_slot: int) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one(
+            {"playerId": player_id, "saveSlot": save_slot},
+            {"seq": 1, "kind": 1, "chain": 1, "summary.turnCount": 1},
+            sort=[("seq", DESCENDING)],
+        )
+
+    async def list(self, player_id: str, save_slot: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest first, without the stored states."""
+        cursor = self.collection.find({"playerId": player_id, "saveSlot": save_slot}, SNAPSHOT_LIST_PROJECTION)
+        return await cursor.sort("seq", DESCENDING).limit(limit).to_list(length=limit)
+
+    async def state_at(self, player_id: str, save_slot: int, seq: int) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """The gameState as of snapshot ``seq`` and that snapshot's document, or ``None``."""
+        base = await self.collection.find_one(
+            {"playerId": player_id, "saveSlot": save_slot, "kind": SNAPSHOT_KIND_BASE, "seq": {"$lte": seq}},
+            sort=[("seq", DESCENDING)],
+        )
+        if base is None:
+            return None
+        chain = await self.collection.find(
+            {"playerId": player_id, "saveSlot": save_slot, "seq": {"$gt": base["seq"], "$lte": seq}}
+        ).sort("seq", ASCENDING).to_list(length=None)
+        if (chain[-1]["seq"] if chain else base["seq"]) != seq:
+            return None
+        state = decode_cold_state(base.get("state"))
+        for snapshot in chain:
+            if snapshot.get("kind") != SNAPSHOT_KIND_DIFF:
+                return None
+            state = apply_diff(state, snapshot.get("diff") or {})
+        return state, (chain[-1] if chain else base)
+
+    async def record(
+        self,
+        player_id: str,
+        save_slot: int,
+        game_state: Dict[str, Any],
+        source: str,
+        story_log_count: Optional[int] = None,
+        now: Optional[datetime.datetime] = None,
+    ) -> int:
+        """Snapshot ``game_state``; returns its seq (the latest one if nothing changed)."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        game_state = game_state or {}
+        latest = await self.latest(player_id, save_slot)
+        doc: Dict[str, Any] = {
+            "playerId": player_id,
+            "saveSlot": save_slot,
+            "seq": (latest["seq"] + 1) if latest else 0,
+            "source": source,
+            "createdAt": now,
+            "storyLogCount": story_log_count,
+            "summary": build_save_summary(game_state, game_state.get("badges")),
+        }
+        encoded = encode_cold_state(game_state) or {}
+        previous = None
+        if latest is not None and latest.get("chain", 0) < self.max_chain:
+            previous = await self.state_at(player_id, save_slot, latest["seq"])
+        diff = diff_state(previous[0], game_state) if previous else None
+        if diff is not None and not diff["set"] and not diff["unset"]:
+            return latest["seq"]
+        if diff is not None and len(bson.encode(diff)) < len(encoded.get("data") or b""):
+            doc.update({"kind": SNAPSHOT_KIND_DIFF, "chain": latest.get("chain", 0) + 1, "diff": diff})
+        else:
+            doc.update({"kind": SNAPSHOT_KIND_BASE, "chain": 0, "state": encoded})
+
+        try:
+            await self.collection.insert_one(doc)
+        except DuplicateKeyError:
+            # Another writer took this seq; the next snapshot will diff against theirs.
+            logger.warning(f"Snapshot seq {doc['seq']} for '{player_id}' slot {save_slot} already taken")
+            return doc["seq"]
+        if doc["kind"] == SNAPSHOT_KIND_BASE:
+            await self.prune(player_id, save_slot)
+        return doc["seq"]
+
+    async def prune(self, player_id: str, save_slot: int) -> int:
+        """Drop chains older than the newest ``keep_bases`` bases; returns documents deleted."""
+        bases = await self.collection.find(
+            {"playerId": player_id, "saveSlot": save_slot, "kind": SNAPSHOT_KIND_BASE}, {"seq": 1}
+        ).sort("seq", DESCENDING).limit(self.keep_bases).to_list(length=self.keep_bases)
+        if len(bases) < self.keep_bases:
+            return 0
+        result = await self.collection.delete_many(
+            {"playerId": player_id, "saveSlot": save_slot, "seq": {"$lt": bases[-1]["seq"]}}
+        )
+        return result.deleted_count
@@ -0,0 +1,61 @@
+from typing import Any, Dict, List, Optional
+
+# Enough of a save to list or preview it without loading gameState.
+SAVE_LIST_PROJECTION = {
+    "saveSlot": 1,
+    "saveName": 1,
+    "updatedAt": 1,
+    "summary": 1,
+    # Saves written before summaries existed fall back to these.
+    "gameState.player.name": 1,
+    "gameState.player.level": 1,
+    "gameState.player.class": 1,
+    "gameState.player.xp": 1,
+    "gameState.turnCount": 1,
+    "gameState.genre": 1,
+    "gameState.gameState.turnCount": 1,
+}
+
+
+def player_summary(player: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    player = player or {}
+    return {
+        "playerName": player.get("name"),
+        "level": player.get("level", 1),
+        "class": player.get("class", player.get("class_name", "Unknown")),
+        "xp": player.get("xp", 0),
+    }
+
+
+def build_save_summary(game_state: Optional[Dict[str, Any]], badges: Optional[List[Any]] = None) -> Dict[str, Any]:
+    """The ``summary`` subdocument kept on every save for listings and previews.
+
+    Story turns write ``turnCount`` and ``storyPhase`` at the top of gameState;
+    the client's own saves nest them under ``gameState.gameState``.
+    """
+    game_state = game_state or {}
+    counters = game_state.get("gameState") if isinstance(game_state.get("gameState"), dict) else {}
+    summary = player_summary(game_state.get("player"))
+    summary.update(
+        {
+            "turnCount": game_state.get("turnCount", counters.get("turnCount", 0)),
+            "genre": game_state.get("genre"),
+            "storyPhase": game_state.get("storyPhase", counters.get("storyPhase")),
+        }
+    )
+    if badges is not None:
+        summary["badgesCount"] = len(badges)
+    return summary
+
+
+def summary_set_fields(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Dotted ``$set`` paths, so partial writes leave the rest of the summary alone."""
+    return {f"summary.{key}": value for key, value in summary.items()}
+
+
+def summary_from_save(save: Dict[str, Any]) -> Dict[str, Any]:
+    """The save's summary, derived from its gameState when it predates summaries."""
+    summary = save.get("summary")
+    if isinstance(summary, dict) and summary:
+        return summary
+    return build_save_summary(save.get("gameState"), save.get("badges"))
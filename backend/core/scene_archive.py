@@ -0,0 +1,186 @@
+import asyncio
+import datetime
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import bson
+from pymongo import ASCENDING, DESCENDING, ReplaceOne, UpdateOne
+
+from .scene_orchestrator import (
+    SCENE_SCHEMA_VERSION,
+    SceneRenderRequest,
+    build_scene_render_context,
+    build_shared_scene_context,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class SceneArchiver:
+    """Moves scenes older than ``archive_after_days`` out of the hot collection.
+
+    Archived docs keep their compact shape plus an ``archivedAt`` date; when
+    ``archive_ttl_days`` is set, a TTL index expires them from the archive too.
+    Batches are small so a backlog never holds a long write lock.
+    """
+
+    def __init__(
+        self,
+        scenes,
+        archive,
+        archive_after_days: float,
+        archive_ttl_days: float = 0,
+        batch_size: int = 500,
+        interval: float = 3600.0,
+    ):
+        self.scenes = scenes
+        self.archive = archive
+        self.archive_after_days = archive_after_days
+        self.archive_ttl_days = archive_ttl_days
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._worker: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {"archived": 0, "runs": 0, "lastRunAt": None}
+
+    async def ensure_indexes(self) -> None:
+        await self.scenes.create_index([("createdAt", ASCENDING)])
+        await self.archive.create_index([("sceneId", ASCENDING)], unique=True)
+        await self.archive.create_index([("playerId", ASCENDING), ("createdAt", DESCENDING), ("sceneId", DESCENDING)])
+        if self.archive_ttl_days > 0:
+            try:
+                await self.archive.create_index(
+                    [("archivedAt", ASCENDING)],
+                    expireAfterSeconds=int(self.archive_ttl_days * 86400),
+                )
+            except Exception as index_err:
+                # An existing TTL index with another expiry has to be changed with collMod.
+                logger.warning(f"Scene archive TTL index not updated: {index_err}")
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.archive_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as archive_err:
+                logger.warning(f"Scene archiver error: {archive_err}")
+            await asyncio.sleep(self.interval)
+
+    async def archive_once(self) -> int:
+        now = _utcnow()
+        # createdAt is stored as a UTC ISO string, which sorts chronologically.
+        cutoff = (now - datetime.timedelta(days=self.archive_after_days)).isoformat()
+        moved = 0
+        while True:
+            batch = await self.scenes.find({"createdAt": {"$lt": cutoff}}).limit(self.batch_size).to_list(
+                length=self.batch_size
+            )
+            if not batch:
+                break
+            operations = []
+            for doc in batch:
+                archived = {key: value for key, value in doc.items() if key != "_id"}
+                archived["archivedAt"] = now
+                operations.append(ReplaceOne({"sceneId": doc["sceneId"]}, archived, upsert=True))
+            await self.archive.bulk_write(operations, ordered=False)
+            await self.scenes.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            moved += len(batch)
+            if len(batch) < self.batch_size:
+                break
+        self._stats["archived"] += moved
+        self._stats["runs"] += 1
+        self._stats["lastRunAt"] = now.isoformat()
+        return moved
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "archiveAfterDays": self.archive_after_days,
+            "archiveTtlDays": self.archive_ttl_days,
+            "running": self._worker is not None and not self._worker.done(),
+        }
+
+
+def compact_legacy_scene_doc(doc: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], List[str], Dict[str, Any]]]:
+    """Return ``($set fields, $unset fields, shared context)`` for a v1 scene doc."""
+    if doc.get("schemaVersion", 1) >= SCENE_SCHEMA_VERSION or not doc.get("context"):
+        return None
+    request = SceneRenderRequest(**doc["context"])
+    shared = build_shared_scene_context(request)
+    updates: Dict[str, Any] = {
+        "schemaVersion": SCENE_SCHEMA_VERSION,
+        "contextKey": shared["contextKey"],
+        "context": build_scene_render_context(request),
+    }
+    scene = doc.get("scene") or {}
+    if doc.get("assets") and not scene.get("assets"):
+        updates["scene.assets"] = doc["assets"]
+    return updates, ["assets"], shared
+
+
+async def migrate_scene_documents(db, batch_size: int = 500, dry_run: bool = False) -> Dict[str, int]:
+    """Rewrite legacy scene docs into the compact v2 schema, batch by batch."""
+    stats = {"scanned": 0, "migrated": 0, "skipped": 0, "bytesBefore": 0, "bytesAfter": 0}
+    cursor = db.scenes.find({"schemaVersion": {"$not": {"$gte": SCENE_SCHEMA_VERSION}}}).batch_size(batch_size)
+    operations: List[UpdateOne] = []
+    contexts: Dict[str, Dict[str, Any]] = {}
+
+    async def _flush() -> None:
+        if dry_run:
+            operations.clear()
+            contexts.clear()
+            return
+        now = _utcnow().isoformat()
+        for key, shared in contexts.items():
+            await db.scene_contexts.update_one(
+                {"contextKey": key}, {"$setOnInsert": {**shared, "createdAt": now}}, upsert=True
+            )
+        if operations:
+            await db.scenes.bulk_write(operations, ordered=False)
+        operations.clear()
+        contexts.clear()
+
+    async for doc in cursor:
+        stats["scanned"] += 1
+        try:
+            compacted = compact_legacy_scene_doc(doc)
+        except Exception as migrate_err:
+            logger.warning(f"Skipping scene {doc.get('sceneId')}: {migrate_err}")
+            compacted = None
+        if compacted is None:
+            stats["skipped"] += 1
+            continue
+        updates, unset_fields, shared = compacted
+        after = {key: value for key, value in doc.items() if key not in unset_fields}
+        after.update({key: value for key, value in updates.items() if "." not in key})
+        stats["bytesBefore"] += len(bson.encode(doc))
+        stats["bytesAfter"] += len(bson.encode(after))
+        contexts[shared["contextKey"]] = shared
+        operations.append(
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": updates, "$unset": {field: "" for field in unset_fields}},
+            )
+        )
+        stats["migrated"] += 1
+        if len(operations) >= batch_size:
+            await _flush()
+    await _flush()
+    return stats
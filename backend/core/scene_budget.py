@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+BUDGET_SCOPE_PLAYER = "player"
+BUDGET_SCOPE_GLOBAL = "global"
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, holding at most ``burst``."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = max(0.0, rate)
+        self.burst = max(1.0, burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def peek(self, cost: float = 1.0) -> bool:
+        self._refill()
+        return self.tokens >= cost
+
+    def take(self, cost: float = 1.0) -> bool:
+        self._refill()
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+class SceneRenderBudget:
+    """Per-player and global render budgets for the scene orchestrator.
+
+    A render needs a token from both the player's bucket and the global one; a
+    rate of ``0`` disables that scope. Player buckets are kept in an LRU capped
+    at ``max_players`` so a stream of one-off player ids cannot grow memory.
+    """
+
+    def __init__(
+        self,
+        player_rate: float = 0.0,
+        player_burst: float = 1.0,
+        global_rate: float = 0.0,
+        global_burst: float = 1.0,
+        max_players: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.player_rate = player_rate
+        self.player_burst = player_burst
+        self.max_players = max(1, max_players)
+        self.clock = clock
+        self._global: Optional[TokenBucket] = (
+            TokenBucket(global_rate, global_burst, clock) if global_rate > 0 else None
+        )
+        self._players: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"allowed": 0, "throttledPlayer": 0, "throttledGlobal": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.player_rate > 0 or self._global is not None
+
+    def _player_bucket(self, player_id: str) -> TokenBucket:
+        bucket = self._players.get(player_id)
+        if bucket is None:
+            bucket = TokenBucket(self.player_rate, self.player_burst, self.clock)
+            self._players[player_id] = bucket
+            while len(self._players) > self.max_players:
+                self._players.popitem(last=False)
+        else:
+            self._players.move_to_end(player_id)
+        return bucket
+
+    def acquire(self, player_id: Optional[str]) -> Optional[str]:
+        """Spend one render token; return the exhausted scope, or ``None`` if allowed.
+
+        Tokens are only taken once both scopes have one available, so a render
+        refused globally does not also drain the player's budget.
+        """
+        with self._lock:
+            player_bucket = self._player_bucket(player_id) if self.player_rate > 0 and player_id else None
+            if player_bucket is not None and not player_bucket.peek():
+                self._stats["throttledPlayer"] += 1
+                return BUDGET_SCOPE_PLAYER
+            if self._global is not None and not self._global.take():
+                self._stats["throttledGlobal"] += 1
+                return BUDGET_SCOPE_GLOBAL
+            if player_bucket is not None:
+                player_bucket.take()
+            self._stats["allowed"] += 1
+            return None
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "trackedPlayers": len(self._players),
+            "playerRate": self.player_rate,
+            "playerBurst": self.player_burst,
+            "globalRate": self._global.rate if self._global else 0.0,
+            "globalBurst": self._global.burst if self._global else 0.0,
+        }
@@ -0,0 +1,185 @@
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+except Exception:  # pragma: no cover - optional dependency
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+class SceneServiceClient:
+    """Application-scoped, pooled HTTP client for calls into the scene service.
+
+    One instance is created in the story service lifespan so every story turn
+    reuses keep-alive connections instead of opening a fresh TCP connection.
+    A simple consecutive-failure circuit breaker makes calls fail fast while
+    the scene service is unreachable.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout if connect_timeout is not None else float(
+            os.getenv("SCENE_SERVICE_CONNECT_TIMEOUT", "2")
+        )
+        self.read_timeout = read_timeout if read_timeout is not None else float(
+            os.getenv("SCENE_SERVICE_TIMEOUT", "15")
+        )
+        self.max_connections = max_connections or int(os.getenv("SCENE_SERVICE_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.getenv("SCENE_SERVICE_MAX_KEEPALIVE", "10")
+        )
+        self.keepalive_expiry = keepalive_expiry if keepalive_expiry is not None else float(
+            os.getenv("SCENE_SERVICE_KEEPALIVE_EXPIRY", "30")
+        )
+        self.failure_threshold = failure_threshold or int(os.getenv("SCENE_SERVICE_CIRCUIT_THRESHOLD", "5"))
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else float(
+            os.getenv("SCENE_SERVICE_CIRCUIT_COOLDOWN", "30")
+        )
+
+        want_http2 = http2 if http2 is not None else _env_flag("SCENE_SERVICE_HTTP2")
+        if want_http2 and h2 is None:
+            logger.warning("SCENE_SERVICE_HTTP2 requested but 'h2' is not installed; using HTTP/1.1.")
+            want_http2 = False
+        self.http2 = want_http2
+
+        self._consecutive_failures = 0
+        self._circuit_opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._stats: Dict[str, int] = {
+            "requests": 0,
+            "connectionsOpened": 0,
+            "connectionsReused": 0,
+            "failures": 0,
+            "shortCircuited": 0,
+            "circuitOpens": 0,
+        }
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(
+                self.read_timeout,
+                connect=self.connect_timeout,
+                read=self.read_timeout,
+                write=self.read_timeout,
+                pool=self.connect_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            http2=self.http2,
+            transport=transport,
+        )
+
+    @property
+    def circuit_open(self) -> bool:
+        if self._circuit_opened_at is None:
+            return False
+        if time.monotonic() - self._circuit_opened_at >= self.cooldown_seconds:
+            # Half-open: let the next request through as a probe.
+            return False
+        return True
+
+    async def render_scene(self, scene_payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.post_json("/api/scene/render", scene_payload)
+
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Half-open admits exactly one probe; everyone else fails fast until it settles
+        probing = self._circuit_opened_at is not None
+        if self.circuit_open or (probing and self._probe_in_flight):
+            self._stats["shortCircuited"] += 1
+            logger.debug("Scene service circuit open; skipping %s", path)
+            return None
+        if probing:
+            self._probe_in_flight = True
+        try:
+            return await self._post_json(path, payload)
+        finally:
+            if probing:
+                self._probe_in_flight = False
+
+    async def _post_json(self, path: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self._stats["requests"] += 1
+        opened_connection = False
+
+        async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal opened_connection
+            if event_name == "connection.connect_tcp.complete":
+                opened_connection = True
+
+        try:
+            response = await self._client.post(path, json=payload, extensions={"trace": _trace})
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPStatusError as http_error:
+            logger.warning(
+                f"Scene service returned error {http_error.response.status_code}: {http_error.response.text}"
+            )
+            if http_error.response.status_code >= 500:
+                self._record_failure()
+            return None
+        except Exception as scene_error:
+            logger.warning(f"Scene service request failed: {scene_error}")
+            self._record_failure()
+            return None
+
+        if opened_connection:
+            self._stats["connectionsOpened"] += 1
+        else:
+            self._stats["connectionsReused"] += 1
+        self._record_success()
+        return data
+
+    def _record_success(self) -> None:
+        if self._circuit_opened_at is not None:
+            logger.info("Scene service circuit closed after successful probe.")
+        self._consecutive_failures = 0
+        self._circuit_opened_at = None
+
+    def _record_failure(self) -> None:
+        self._stats["failures"] += 1
+        self._consecutive_failures += 1
+        if self._circuit_opened_at is not None or self._consecutive_failures >= self.failure_threshold:
+            if self._circuit_opened_at is None:
+                self._stats["circuitOpens"] += 1
+                logger.error(
+                    "Scene service circuit opened after %s consecutive failures.",
+                    self._consecutive_failures,
+                )
+            self._circuit_opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "circuitOpen": self.circuit_open,
+            "consecutiveFailures": self._consecutive_failures,
+            "http2": self.http2,
+            "maxConnections": self.max_connections,
+            "maxKeepaliveConnections": self.max_keepalive_connections,
+        }
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
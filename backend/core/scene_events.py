@@ -0,0 +1,49 @@
+import asyncio
+import logging
+from typing import Any, Dict, Set
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_SCENE_STATUSES = {"ready", "offline"}
+
+
+class SceneEventBroker:
+    """In-process fan-out of scene status transitions to stream subscribers.
+
+    Each subscriber gets its own bounded queue; a slow consumer drops its
+    oldest queued event rather than blocking the publisher.
+    """
+
+    def __init__(self, queue_size: int = 16):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, scene_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(scene_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, scene_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(scene_id)
+        if not subscribers:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            self._subscribers.pop(scene_id, None)
+
+    def publish(self, scene_id: str, event: Dict[str, Any]) -> int:
+        subscribers = self._subscribers.get(scene_id)
+        if not subscribers:
+            return 0
+        for queue in list(subscribers):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+        logger.debug("Published %s event for scene %s to %s subscribers.", event.get("sceneStatus"), scene_id, len(subscribers))
+        return len(subscribers)
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
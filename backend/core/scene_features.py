@@ -0,0 +1,136 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+FEATURE_MOOD = "mood"
+FEATURE_WEATHER = "weather"
+FEATURE_TIME = "timeOfDay"
+FEATURE_BIOME = "biome"
+
+# feature -> label -> {keyword: weight}. Label order breaks score ties, so the
+# most dramatic reading of a scene wins when cues are balanced.
+SCENE_FEATURE_KEYWORDS: Dict[str, Dict[str, Dict[str, float]]] = {
+    FEATURE_MOOD: {
+        "intense": {"battle": 3, "fight": 3, "attack": 3, "blood": 2, "fire": 1, "storm": 1, "clash": 2},
+        "mystic": {"arcane": 3, "mystic": 3, "runic": 3, "spirit": 2, "ancient": 1, "temple": 1},
+        "serene": {"calm": 3, "peaceful": 3, "garden": 2, "river": 1, "rest": 1, "glow": 1},
+        "ominous": {"ominous": 3, "cursed": 3, "haunted": 3, "shadow": 2, "dark": 1, "fog": 1},
+        "victorious": {"victory": 3, "celebration": 3, "treasure": 2, "reward": 2, "light": 1},
+    },
+    FEATURE_WEATHER: {
+        "storm": {"storm": 3, "thunder": 3, "lightning": 3, "rain": 2},
+        "snow": {"snow": 3, "blizzard": 3, "frost": 2, "ice": 1},
+        "fog": {"fog": 3, "mist": 2, "haze": 2},
+        "ember": {"lava": 3, "ember": 2, "ash": 2},
+        "sunny": {"sun": 2, "sunlight": 2, "bright": 1, "clear": 1},
+    },
+    FEATURE_TIME: {
+        "dawn": {"dawn": 3, "sunrise": 3, "morning": 2},
+        "day": {"noon": 3, "midday": 3, "bright": 1},
+        "dusk": {"dusk": 3, "sunset": 3, "evening": 2, "twilight": 2},
+        "night": {"midnight": 3, "night": 2, "moon": 2, "moonlight": 2, "stars": 1},
+    },
+    FEATURE_BIOME: {
+        "enchanted forest": {"forest": 3, "grove": 3, "woods": 3},
+        "sun-scorched desert": {"desert": 3, "dune": 3, "wasteland": 3, "waste": 2},
+        "ancient settlement": {"city": 3, "village": 3, "town": 3},
+        "sacred ruins": {"temple": 3, "ruin": 3},
+    },
+}
+
+SCENE_FEATURE_DEFAULTS: Dict[str, str] = {
+    FEATURE_MOOD: "serene",
+    FEATURE_WEATHER: "sunny",
+}
+
+# Features read from the location line rather than the story body.
+LOCATION_FEATURES = {FEATURE_BIOME}
+
+_INFLECTIONS = ("", "s", "es")
+_WORD_PATTERN = re.compile(r"\w+")
+# ASCII text is tokenised as bytes in one translate: letters are lowercased and
+# every non-word byte becomes a space, then split().
+_ASCII_FOLD = bytes(
+    ord(chr(byte).lower()) if chr(byte).isalnum() or chr(byte) == "_" else ord(" ") for byte in range(128)
+) + bytes(range(128, 256))
+
+
+class SceneFeatures(NamedTuple):
+    mood: str
+    weather: str
+    timeOfDay: Optional[str]
+    biome: Optional[str]
+    scores: Dict[str, Dict[str, float]]
+
+
+class SceneFeatureExtractor:
+    """Extract mood, weather, time of day and biome in a single pass.
+
+    The text is tokenised once on word boundaries (a bytes translate/split for
+    ASCII text, ``\\w+`` otherwise) and every token is looked up in one
+    precompiled vote table (keywords plus simple plurals), so
+    "sun" no longer fires inside "sunset" and "fire" no longer fires inside
+    "fireplace". Matches add weighted votes and the best-scoring label per
+    feature wins.
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None):
+        self.keywords = keywords or SCENE_FEATURE_KEYWORDS
+        self._feature_keys = [
+            (feature, [(feature, label) for label in labels]) for feature, labels in self.keywords.items()
+        ]
+        # One table per source (story body / location line), so scoring needs no per-vote filter.
+        self._votes: Dict[bool, Dict[str, List[Tuple[Tuple[str, str], float]]]] = {False: {}, True: {}}
+        for feature, labels in self.keywords.items():
+            table = self._votes[feature in LOCATION_FEATURES]
+            for label, words in labels.items():
+                key = (feature, label)
+                for word, weight in words.items():
+                    for suffix in _INFLECTIONS:
+                        table.setdefault(f"{word}{suffix}", []).append((key, weight))
+        self._ascii_votes = {
+            source: {word.encode("utf-8"): votes for word, votes in table.items()}
+            for source, table in self._votes.items()
+        }
+
+    def extract(self, story_text: str, location: Optional[str] = None) -> SceneFeatures:
+        totals: Dict[Tuple[str, str], float] = {}
+        self._score(story_text, totals, from_location=False)
+        if location:
+            self._score(location, totals, from_location=True)
+
+        scores: Dict[str, Dict[str, float]] = {}
+        for (feature, label), total in totals.items():
+            scores.setdefault(feature, {})[label] = total
+        # Labels are walked in table order with a strict ">", so ties go to the earlier label.
+        best: Dict[str, Optional[str]] = {}
+        for feature, keys in self._feature_keys:
+            best_label, best_total = SCENE_FEATURE_DEFAULTS.get(feature), 0
+            for key in keys:
+                total = totals.get(key, 0)
+                if total > best_total:
+                    best_label, best_total = key[1], total
+            best[feature] = best_label
+        return SceneFeatures(
+            mood=best[FEATURE_MOOD],
+            weather=best[FEATURE_WEATHER],
+            timeOfDay=best.get(FEATURE_TIME),
+            biome=best.get(FEATURE_BIOME),
+            scores=scores,
+        )
+
+    def _score(self, text: Optional[str], totals: Dict[Tuple[str, str], float], from_location: bool) -> None:
+        if not text:
+            return
+        if text.isascii():
+            votes = self._ascii_votes[from_location]
+            tokens = text.encode("ascii").translate(_ASCII_FOLD).split()
+        else:
+            votes = self._votes[from_location]
+            tokens = _WORD_PATTERN.findall(text.casefold())
+        # map/filter keep the per-token lookups in C; only keyword hits reach Python.
+        for hits in filter(None, map(votes.get, tokens)):
+            for key, weight in hits:
+                totals[key] = totals.get(key, 0) + weight
+
+
+scene_feature_extractor = SceneFeatureExtractor()
@@ -0,0 +1,225 @@
+import asyncio
+import datetime
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import bson
+from pymongo import ASCENDING
+
+from .scene_mirror import SceneImageMirror
+
+logger = logging.getLogger(__name__)
+
+SCENE_GC_PROJECTION = {"_id": 0, "sceneId": 1, "playerId": 1, "status": 1, "createdAt": 1, "scene.assets": 1}
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _saved_scene_ids(save: Dict[str, Any]) -> Iterable[str]:
+    for entry in save.get("storyLog") or []:
+        if isinstance(entry, dict) and entry.get("sceneId"):
+            yield entry["sceneId"]
+    scene_id = (save.get("gameState") or {}).get("sceneId")
+    if scene_id:
+        yield scene_id
+
+
+class SceneGarbageCollector:
+    """Deletes scenes nothing points at any more, plus their mirrored files.
+
+    A scene is an orphan once it is older than ``min_age_hours``, is not
+    referenced by any live save or ``story_events`` entry, and either
+
+    * it ended ``offline`` (every retry failed, so there is no image), or
+    * its player has no live save at all (a session that never came back).
+
+    A live player's unreferenced scenes are kept: initialize, combat and
+    rerender scenes are never written to the story log but are still served
+    by the scene history gallery, and log references can lag behind renders.
+    The pre-generated branch cache lives in the story service's memory for
+    minutes, so ``min_age_hours`` well past that keeps cached branches safe.
+    With ``dry_run`` the periodic passes only report what they would delete.
+    Deletes run in batches of ``batch_size`` with a pause between them so at
+    most ``max_deletes_per_second`` documents are removed.
+    """
+
+    def __init__(
+        self,
+        scenes,
+        saves,
+        archive=None,
+        story_events=None,
+        image_mirror: Optional[SceneImageMirror] = None,
+        min_age_hours: float = 24.0,
+        batch_size: int = 200,
+        max_deletes_per_second: float = 500.0,
+        interval: float = 6 * 3600.0,
+        dry_run: bool = False,
+        sleep=asyncio.sleep,
+    ):
+        self.scenes = scenes
+        self.saves = saves
+        self.archive = archive
+        self.story_events = story_events
+        self.image_mirror = image_mirror
+        self.min_age_hours = min_age_hours
+        self.batch_size = max(1, batch_size)
+        self.max_deletes_per_second = max_deletes_per_second
+        self.interval = interval
+        self.dry_run = dry_run
+        self._sleep = sleep
+        self._worker: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {
+            "runs": 0,
+            "deletedDocs": 0,
+            "reclaimedDocBytes": 0,
+            "deletedFiles": 0,
+            "reclaimedFileBytes": 0,
+            "lastRun": None,
+        }
+
+    async def ensure_indexes(self) -> None:
+        await self.scenes.create_index([("scene.assets.contentHash", ASCENDING)], sparse=True)
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.collect_once(dry_run=self.dry_run)
+            except asyncio.CancelledError:
+                raise
+            except Exception as gc_err:
+                logger.warning(f"Scene GC error: {gc_err}")
+            await asyncio.sleep(self.interval)
+
+    async def _load_references(self):
+        referenced: Set[str] = set()
+        live_players: Set[str] = set()
+        cursor = self.saves.find(
+            {"deletedAt": None},
+            {"_id": 0, "playerId": 1, "storyLog.sceneId": 1, "gameState.sceneId": 1},
+        )
+        async for save in cursor:
+            if save.get("playerId"):
+                live_players.add(save["playerId"])
+            referenced.update(_saved_scene_ids(save))
+        if self.story_events is not None:
+            events = self.story_events.find({"sceneId": {"$exists": True}}, {"_id": 0, "sceneId": 1})
+            async for event in events:
+                referenced.add(event["sceneId"])
+        return referenced, live_players
+
+    def _is_orphan(self, doc: Dict[str, Any], referenced: Set[str], live_players: Set[str]) -> bool:
+        if doc.get("sceneId") in referenced:
+            return False
+        return doc.get("status") == "offline" or doc.get("playerId") not in live_players
+
+    async def collect_once(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Run one GC pass and return what it reclaimed (or would have, with ``dry_run``)."""
+        started = time.monotonic()
+        cutoff = (_utcnow() - datetime.timedelta(hours=self.min_age_hours)).isoformat()
+        referenced, live_players = await self._load_references()
+
+        run = {
+            "scanned": 0,
+            "deletedDocs": 0,
+            "reclaimedDocBytes": 0,
+            "deletedFiles": 0,
+            "reclaimedFileBytes": 0,
+            "dryRun": dry_run,
+        }
+        batch: List[Dict[str, Any]] = []
+        cursor = self.scenes.find({"createdAt": {"$lt": cutoff}}, SCENE_GC_PROJECTION).batch_size(self.batch_size)
+        async for doc in cursor:
+            run["scanned"] += 1
+            if self._is_orphan(doc, referenced, live_players):
+                batch.append(doc)
+            if len(batch) >= self.batch_size:
+                await self._delete_batch(batch, run, dry_run)
+                batch = []
+        if batch:
+            await self._delete_batch(batch, run, dry_run)
+
+        run["durationMs"] = round((time.monotonic() - started) * 1000, 1)
+        if not dry_run:
+            self._stats["runs"] += 1
+            for key in ("deletedDocs", "reclaimedDocBytes", "deletedFiles", "reclaimedFileBytes"):
+                self._stats[key] += run[key]
+        self._stats["lastRun"] = {**run, "finishedAt": _utcnow().isoformat()}
+        logger.info(
+            "Scene GC %s: %s of %s scanned scenes, %s doc bytes, %s files (%s bytes).",
+            "dry run" if dry_run else "run",
+            run["deletedDocs"],
+            run["scanned"],
+            run["reclaimedDocBytes"],
+            run["deletedFiles"],
+            run["reclaimedFileBytes"],
+        )
+        return run
+
+    async def _delete_batch(self, batch: List[Dict[str, Any]], run: Dict[str, Any], dry_run: bool) -> None:
+        batch_started = time.monotonic()
+        scene_ids = [doc["sceneId"] for doc in batch]
+        hashes = {
+            ((doc.get("scene") or {}).get("assets") or {}).get("contentHash")
+            for doc in batch
+        } - {None}
+        if dry_run:
+            run["deletedDocs"] += len(batch)
+            run["reclaimedDocBytes"] += sum(len(bson.encode(doc)) for doc in batch)
+            return
+
+        # Sizes are taken from the full docs just before they go.
+        full_docs = await self.scenes.find({"sceneId": {"$in": scene_ids}}).to_list(length=len(scene_ids))
+        result = await self.scenes.delete_many({"sceneId": {"$in": scene_ids}})
+        run["deletedDocs"] += getattr(result, "deleted_count", len(scene_ids))
+        run["reclaimedDocBytes"] += sum(len(bson.encode(doc)) for doc in full_docs)
+
+        if hashes and self.image_mirror is not None:
+            for digest in hashes - await self._hashes_still_used(hashes):
+                removed, freed = await asyncio.to_thread(self.image_mirror.remove, digest)
+                run["deletedFiles"] += removed
+                run["reclaimedFileBytes"] += freed
+
+        if self.max_deletes_per_second > 0:
+            pause = len(batch) / self.max_deletes_per_second - (time.monotonic() - batch_started)
+            if pause > 0:
+                await self._sleep(pause)
+
+    async def _hashes_still_used(self, hashes: Set[str]) -> Set[str]:
+        """Mirrored files are shared by content hash; keep any another scene still uses."""
+        in_use: Set[str] = set()
+        query = {"scene.assets.contentHash": {"$in": list(hashes)}}
+        projection = {"_id": 0, "scene.assets.contentHash": 1}
+        for collection in (self.scenes, self.archive):
+            if collection is None:
+                continue
+            async for doc in collection.find(query, projection):
+                digest = ((doc.get("scene") or {}).get("assets") or {}).get("contentHash")
+                if digest:
+                    in_use.add(digest)
+        return in_use
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "minAgeHours": self.min_age_hours,
+            "maxDeletesPerSecond": self.max_deletes_per_second,
+            "dryRun": self.dry_run,
+            "running": self._worker is not None and not self._worker.done(),
+        }
@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+try:
+    from PIL import Image
+except Exception:  # pragma: no cover - optional dependency
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_THUMB = "thumb"
+DERIVATIVE_MID = "mid"
+
+# <sha256>[-thumb|-mid].<ext>
+ASSET_NAME_PATTERN = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:-(?P<variant>thumb|mid))?\.(?P<ext>webp|png|jpg|jpeg)$")
+
+CONTENT_TYPES = {
+    "webp": "image/webp",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+}
+
+_EXTENSIONS_BY_TYPE = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/webp": "webp",
+}
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=start-end`` range into inclusive offsets.
+
+    Returns ``None`` when the header is absent or not a single byte range, and
+    raises ``ValueError`` when the range cannot be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if not start_text:
+            # Suffix range: the last N bytes.
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError("Empty suffix range.")
+            return max(size - length, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError as range_err:
+        raise ValueError(f"Invalid range header: {header}") from range_err
+    if start >= size or start > end:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, min(end, size - 1)
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_derivatives(source_path: str, targets: Dict[str, Tuple[str, int]], quality: int) -> Dict[str, Dict[str, int]]:
+    """Resize ``source_path`` into WebP derivatives. Runs in a worker process."""
+    results: Dict[str, Dict[str, int]] = {}
+    with Image.open(source_path) as original:
+        original = original.convert("RGB")
+        for variant, (target_path, max_width) in targets.items():
+            image = original.copy()
+            if image.width > max_width:
+                height = max(1, round(image.height * max_width / image.width))
+                image = image.resize((max_width, height), Image.LANCZOS)
+            tmp_path = f"{target_path}.tmp-{os.getpid()}"
+            image.save(tmp_path, format="WEBP", quality=quality, method=4)
+            os.replace(tmp_path, target_path)
+            results[variant] = {"width": image.width, "height": image.height}
+    return results
+
+
+class SceneImageMirror:
+    """Content-addressed local copy of finished scene images.
+
+    The original is downloaded once and stored under its SHA-256 digest; WebP
+    thumbnail and mid-size derivatives are built in a process pool so resizing
+    never blocks the event loop. Identical images map to the same files.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        public_base_url: str = "",
+        thumb_width: int = 320,
+        mid_width: int = 960,
+        quality: int = 80,
+        workers: int = 2,
+        max_bytes: int = 20 * 1024 * 1024,
+        download_timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.root_dir = root_dir
+        self.public_base_url = public_base_url.rstrip("/")
+        self.thumb_width = thumb_width
+        self.mid_width = mid_width
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self._owns_executor = executor is None and workers > 0
+        self._executor = executor or (ProcessPoolExecutor(max_workers=workers) if workers > 0 else None)
+        self._client = httpx.AsyncClient(timeout=download_timeout, follow_redirects=True, transport=transport)
+        self._stats: Dict[str, int] = {"mirrored": 0, "deduplicated": 0, "failures": 0, "bytesDownloaded": 0}
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def asset_path(self, name: str) -> Optional[str]:
+        match = ASSET_NAME_PATTERN.match(name)
+        if not match:
+            return None
+        digest = match.group("digest")
+        return os.path.join(self.root_dir, digest[:2], name)
+
+    def asset_url(self, name: str) -> str:
+        return f"{self.public_base_url}/api/scene/assets/{name}"
+
+    async def mirror(self, assets: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Mirror ``assets['imageUrl']`` and return assets pointing at local files."""
+        source_url = assets.get("imageUrl")
+        if not source_url or not self.available:
+            return None
+        try:
+            response = await self._client.get(source_url)
+            response.raise_for_status()
+            data = response.content
+            if len(data) > self.max_bytes:
+                raise ValueError(f"image is {len(data)} bytes, limit is {self.max_bytes}")
+        except Exception as download_err:
+            self._stats["failures"] += 1
+            logger.warning(f"Scene image mirror download failed for {source_url}: {download_err}")
+            return None
+        self._stats["bytesDownloaded"] += len(data)
+
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        extension = _EXTENSIONS_BY_TYPE.get(content_type, "png")
+        digest = hashlib.sha256(data).hexdigest()
+        directory = os.path.join(self.root_dir, digest[:2])
+        os.makedirs(directory, exist_ok=True)
+
+        original_name = f"{digest}.{extension}"
+        thumb_name = f"{digest}-{DERIVATIVE_THUMB}.webp"
+        mid_name = f"{digest}-{DERIVATIVE_MID}.webp"
+        original_path = os.path.join(directory, original_name)
+        targets = {
+            DERIVATIVE_THUMB: (os.path.join(directory, thumb_name), self.thumb_width),
+            DERIVATIVE_MID: (os.path.join(directory, mid_name), self.mid_width),
+        }
+
+        if all(os.path.exists(path) for path, _ in targets.values()) and os.path.exists(original_path):
+            self._stats["deduplicated"] += 1
+        else:
+            await asyncio.to_thread(_write_atomic, original_path, data)
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._executor, build_derivatives, original_path, targets, self.quality)
+            except Exception as resize_err:
+                self._stats["failures"] += 1
+                logger.warning(f"Scene image derivatives failed for {digest}: {resize_err}")
+                return None
+            self._stats["mirrored"] += 1
+
+        return {
+            **assets,
+            "imageUrl": self.asset_url(original_name),
+            "thumbnailUrl": self.asset_url(thumb_name),
+            "midUrl": self.asset_url(mid_name),
+            "sourceUrl": source_url,
+            "contentHash": digest,
+        }
+
+    def remove(self, digest: str) -> Tuple[int, int]:
+        """Delete the original and derivatives stored for ``digest``; return ``(files, bytes)``."""
+        directory = os.path.join(self.root_dir, digest[:2])
+        try:
+            names = [name for name in os.listdir(directory) if name.startswith(digest)]
+        except FileNotFoundError:
+            return 0, 0
+        removed = freed = 0
+        for name in names:
+            if not ASSET_NAME_PATTERN.match(name):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError as remove_err:
+                logger.warning(f"Could not remove mirrored scene file {name}: {remove_err}")
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "available": self.available, "root": self.root_dir}
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
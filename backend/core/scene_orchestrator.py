@@ -1,23 +1,45 @@
 import asyncio
 import base64
 import datetime
+import hashlib
+import json
 import logging
 import os
 import random
 import re
 import secrets
+import time
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from .scene_budget import SceneRenderBudget
+from .scene_events import SceneEventBroker
+from .scene_features import SceneFeatureExtractor, scene_feature_extractor
+from .scene_metrics import SceneMetrics
+from .scene_mirror import SceneImageMirror
+from .scene_providers import PROVIDER_TYPE_FAL, create_image_client
+from .scene_retry_queue import (
+    RETRY_OUTCOME_DEFERRED,
+    RETRY_OUTCOME_FAILED,
+    RETRY_OUTCOME_READY,
+    SceneRetryQueue,
+    compute_backoff,
+)
+
 try:
-    from fal_client import AsyncClient as FalAsyncClient
+    from pymongo import UpdateOne
 except Exception:  # pragma: no cover - optional dependency
-    FalAsyncClient = None
+    UpdateOne = None
+
 
 logger = logging.getLogger(__name__)
 
 
+class SceneServiceDraining(RuntimeError):
+    """Raised for new render work once the orchestrator has started draining."""
+
+
 class SceneSubject(BaseModel):
     name: str
     role: str
@@ -31,6 +53,9 @@ class SceneAssets(BaseModel):
     height: Optional[int] = None
     provider: Optional[str] = None
     model: Optional[str] = None
+    midUrl: Optional[str] = None
+    sourceUrl: Optional[str] = None
+    contentHash: Optional[str] = None
 
 
 class ScenePayload(BaseModel):
@@ -68,21 +93,9 @@ class SceneRenderRequest(BaseModel):
     preGeneratedKey: Optional[str] = None
 
 
-SCENE_MOOD_KEYWORDS = {
-    "intense": ["battle", "fight", "fire", "attack", "blood", "storm"],
-    "mystic": ["arcane", "mystic", "ancient", "temple", "spirit", "runic"],
-    "serene": ["calm", "river", "garden", "peaceful", "rest", "glow"],
-    "ominous": ["shadow", "dark", "cursed", "ominous", "fog", "haunted"],
-    "victorious": ["victory", "treasure", "celebration", "light", "reward"],
-}
+class SceneBatchRenderRequest(BaseModel):
+    requests: List[SceneRenderRequest] = Field(default_factory=list)
 
-SCENE_WEATHER_KEYWORDS = {
-    "storm": ["storm", "rain", "thunder", "lightning"],
-    "snow": ["snow", "ice", "frost"],
-    "fog": ["fog", "mist", "haze"],
-    "sunny": ["sun", "bright", "clear"],
-    "ember": ["lava", "ember", "ash"],
-}
 
 SCENE_COLOR_PALETTES = {
     "intense": ["#ff7847", "#ffb347", "#1f1f1f", "#d13438", "#f0c808"],
@@ -108,20 +121,199 @@ CAMERA_STYLES = [
     "over-the-shoulder perspective",
 ]
 
+RENDER_PLAN_SINGLE = "single"
+RENDER_PLAN_PROGRESSIVE = "progressive"
+RENDER_TIER_PREVIEW = "preview"
+RENDER_TIER_FULL = "full"
+
+PROVIDER_STATE_HEALTHY = "healthy"
+PROVIDER_STATE_QUARANTINED = "quarantined"
+PROVIDER_STATE_HALF_OPEN = "half-open"
+
+
+SCENE_SCHEMA_VERSION = 2
+# Player fields the prompt builder reads; everything else in the snapshot is dropped.
+SCENE_CONTEXT_PLAYER_FIELDS = ("name", "class", "level")
+
+
+def scene_context_key(player: Dict[str, Any], genre: str) -> str:
+    """Content hash of the player context shared by a run of scenes."""
+    shared = {
+        "player": {field: player.get(field) for field in SCENE_CONTEXT_PLAYER_FIELDS},
+        "genre": genre,
+    }
+    return hashlib.sha1(json.dumps(shared, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+
+
+def build_shared_scene_context(request: SceneRenderRequest) -> Dict[str, Any]:
+    player = request.player or {}
+    return {
+        "contextKey": scene_context_key(player, request.genre),
+        "playerId": player.get("name"),
+        "player": {field: player.get(field) for field in SCENE_CONTEXT_PLAYER_FIELDS if player.get(field) is not None},
+        "genre": request.genre,
+    }
+
+
+def build_scene_render_context(request: SceneRenderRequest) -> Dict[str, Any]:
+    """Per-scene inputs ``rerender_scene`` needs beyond the shared player context."""
+    context: Dict[str, Any] = {"storyText": request.storyText}
+    if request.currentLocation:
+        context["currentLocation"] = request.currentLocation
+    if request.activeQuest:
+        quest = {key: request.activeQuest.get(key) for key in ("title", "description") if request.activeQuest.get(key)}
+        if quest:
+            context["activeQuest"] = quest
+    return context
+
+
+def scene_prompt_key(request: SceneRenderRequest) -> str:
+    """Content hash of every input a scene prompt is built from, before pose/camera are picked."""
+    inputs = {
+        "contextKey": scene_context_key(request.player or {}, request.genre),
+        **build_scene_render_context(request),
+    }
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+
+
+def request_from_scene_doc(
+    scene_doc: Dict[str, Any], shared_context: Optional[Dict[str, Any]]
+) -> Optional[SceneRenderRequest]:
+    """Rebuild the render request from a compact (v2) or legacy scene document."""
+    context = scene_doc.get("context")
+    if not context:
+        return None
+    if scene_doc.get("schemaVersion", 1) < SCENE_SCHEMA_VERSION:
+        return SceneRenderRequest(**context)
+    shared = shared_context or {}
+    return SceneRenderRequest(
+        player=shared.get("player") or {"name": scene_doc.get("playerId")},
+        genre=shared.get("genre") or scene_doc.get("genre"),
+        storyText=context.get("storyText", ""),
+        activeQuest=context.get("activeQuest"),
+        currentLocation=context.get("currentLocation"),
+        gameState={"turnCount": scene_doc.get("turn", 0)},
+        preGeneratedKey=scene_doc.get("preGeneratedKey"),
+    )
+
+
+# Gallery/replay views only need the public card fields, never the render context.
+SCENE_HISTORY_PROJECTION = {
+    "_id": 0,
+    "sceneId": 1,
+    "turn": 1,
+    "status": 1,
+    "createdAt": 1,
+    "scene.title": 1,
+    "scene.subtitle": 1,
+    "scene.summary": 1,
+    "scene.mood": 1,
+    "scene.locationName": 1,
+    "scene.timeOfDay": 1,
+    "scene.assets": 1,
+}
+
+
+def encode_history_cursor(created_at: str, scene_id: str) -> str:
+    raw = json.dumps([created_at, scene_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, scene_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as cursor_err:
+        raise ValueError("Invalid history cursor.") from cursor_err
+    return str(created_at), str(scene_id)
+
+
+def _parse_image_size(value: Any) -> Any:
+    """Accept FAL preset names (``landscape_16_9``) or explicit ``WIDTHxHEIGHT`` sizes."""
+    if isinstance(value, str):
+        match = re.fullmatch(r"\s*(\d+)\s*[xX]\s*(\d+)\s*", value)
+        if match:
+            return {"width": int(match.group(1)), "height": int(match.group(2))}
+    return value
+
+
 DEFAULT_NEGATIVE_PROMPT = "lowres, bad anatomy, text artifacts, watermarks, distorted hands, extra limbs"
 
 
 class SceneOrchestrator:
-    def __init__(self, db, provider_pool: Optional[List[Dict[str, Any]]] = None):
+    def __init__(
+        self,
+        db,
+        provider_pool: Optional[List[Dict[str, Any]]] = None,
+        event_broker: Optional[SceneEventBroker] = None,
+        image_mirror: Optional[SceneImageMirror] = None,
+        feature_extractor: Optional[SceneFeatureExtractor] = None,
+        metrics: Optional[SceneMetrics] = None,
+        render_budget: Optional[SceneRenderBudget] = None,
+    ):
         self.db = db
+        self.metrics = metrics or SceneMetrics()
+        self.event_broker = event_broker
+        self.image_mirror = image_mirror
+        self.feature_extractor = feature_extractor or scene_feature_extractor
         self.fal_model = os.getenv("FAL_MODEL", "fal-ai/flux/dev")
         self.fal_resolution = os.getenv("FAL_RESOLUTION", "landscape_16_9")
         self.fal_timeout = int(os.getenv("FAL_TIMEOUT", "45"))
         self.fal_max_retries = int(os.getenv("FAL_MAX_RETRIES", "2"))
-        self.fal_retry_delay = int(os.getenv("FAL_RETRY_DELAY", "0"))
+        self.fal_retry_delay = float(os.getenv("FAL_RETRY_DELAY", "2"))
+        self.fal_retry_max_delay = float(os.getenv("FAL_RETRY_MAX_DELAY", "60"))
+        self.retry_concurrency = int(os.getenv("SCENE_RETRY_CONCURRENCY", "1"))
+        self.batch_max_items = int(os.getenv("SCENE_BATCH_MAX_ITEMS", "16"))
+        self.routing_alpha = float(os.getenv("SCENE_ROUTING_EWMA_ALPHA", "0.3"))
+        self.quarantine_threshold = int(os.getenv("SCENE_PROVIDER_FAILURE_THRESHOLD", "3"))
+        self.quarantine_seconds = float(os.getenv("SCENE_PROVIDER_QUARANTINE_SECONDS", "30"))
+        self.quarantine_max_seconds = float(os.getenv("SCENE_PROVIDER_QUARANTINE_MAX_SECONDS", "600"))
+        self.render_plan = os.getenv("SCENE_RENDER_PLAN", RENDER_PLAN_SINGLE).strip().lower()
+        self.fal_preview_model = os.getenv("FAL_PREVIEW_MODEL", "fal-ai/flux/schnell")
+        self.fal_preview_resolution = os.getenv("FAL_PREVIEW_RESOLUTION", "512x288")
+        self.fal_preview_steps = int(os.getenv("FAL_PREVIEW_STEPS", "4"))
+        self.render_budget = render_budget or SceneRenderBudget(
+            player_rate=float(os.getenv("SCENE_PLAYER_RENDER_RATE", "0.2")),
+            player_burst=float(os.getenv("SCENE_PLAYER_RENDER_BURST", "6")),
+            global_rate=float(os.getenv("SCENE_GLOBAL_RENDER_RATE", "0")),
+            global_burst=float(os.getenv("SCENE_GLOBAL_RENDER_BURST", "20")),
+            max_players=int(os.getenv("SCENE_BUDGET_MAX_PLAYERS", "10000")),
+        )
         self._retry_tasks: Dict[str, asyncio.Task] = {}
+        self._upgrade_tasks: Dict[str, asyncio.Task] = {}
+        self._mirror_tasks: Dict[str, asyncio.Task] = {}
+        self._known_context_keys: set = set()
+        self._queue_waits: Dict[str, float] = {}
+        self._retry_slots = asyncio.Semaphore(max(1, self.retry_concurrency))
+        self.retry_queue: Optional[SceneRetryQueue] = None
+        if self.db is not None:
+            self.retry_queue = SceneRetryQueue(
+                self.db.scene_jobs,
+                handler=self._process_retry_job,
+                on_exhausted=self._mark_scene_offline,
+                max_attempts=self.fal_max_retries,
+                base_delay=self.fal_retry_delay,
+                max_delay=self.fal_retry_max_delay,
+                concurrency=self.retry_concurrency,
+            )
         self._active_renders: Dict[str, bool] = {}
-        self._provider_index = 0
+        # Foreground render calls (single and batch) still running, and the
+        # payloads of background work that must survive a shutdown.
+        self._foreground_renders = 0
+        self._handoff_payloads: Dict[str, Dict[str, Any]] = {}
+        self.draining = False
+        self.drain_poll_interval = 0.05
+        self.metrics.register_gauge(
+            "scene_retry_tasks_active",
+            "Scene retries currently running (durable queue workers plus in-process tasks).",
+            lambda: len(self._retry_tasks) + (self.retry_queue.get_stats()["active"] if self.retry_queue else 0),
+        )
+        self.metrics.register_gauge(
+            "scene_upgrade_tasks_active", "Full-quality upgrade renders in flight.", lambda: len(self._upgrade_tasks)
+        )
+        self.metrics.register_gauge(
+            "scene_active_renders", "Foreground scene renders in flight.", lambda: len(self._active_renders)
+        )
 
         self.providers: List[Dict[str, Any]] = []
         raw_pool = provider_pool or []
@@ -144,36 +336,166 @@ class SceneOrchestrator:
                 self.providers.append(fallback)
 
     def _create_provider_entry(self, idx: int, raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        label = raw.get("label") or f"fal-{idx + 1}"
-        api_key = raw.get("api_key") or os.getenv("FAL_API_KEY")
-        if not api_key:
-            logger.warning("Skipping FAL provider '%s' - API key missing.", label)
-            return None
-        if FalAsyncClient is None:
-            logger.warning("fal_client not installed; cannot use FAL provider '%s'.", label)
+        provider_type = raw.get("type") or PROVIDER_TYPE_FAL
+        label = raw.get("label") or f"{provider_type}-{idx + 1}"
+        api_key = raw.get("api_key")
+        if provider_type == PROVIDER_TYPE_FAL:
+            api_key = api_key or os.getenv("FAL_API_KEY")
+            if not api_key:
+                logger.warning("Skipping FAL provider '%s' - API key missing.", label)
+                return None
+        client = create_image_client(provider_type, {**raw, "api_key": api_key})
+        if client is None:
+            logger.warning("Cannot create %s image provider '%s' (client library or config missing).", provider_type, label)
             return None
         entry: Dict[str, Any] = {
             "id": label,
-            "type": "fal",
+            "type": provider_type,
             "api_key": api_key,
+            "client": client,
             "model": raw.get("model") or self.fal_model,
             "resolution": raw.get("resolution") or self.fal_resolution,
+            "preview_model": raw.get("preview_model") or self.fal_preview_model,
+            "preview_resolution": raw.get("preview_resolution") or self.fal_preview_resolution,
+            "preview_steps": raw.get("preview_steps") or self.fal_preview_steps,
             "lock": asyncio.Lock(),
             "failure_count": 0,
-            "disabled": False,
-            "disabled_reason": None,
+            "latency_ewma": {},
+            "success_ewma": 1.0,
+            "quarantined_until": None,
+            "quarantine_streak": 0,
+            "quarantine_reason": None,
+            "probe_in_flight": False,
         }
         return entry
 
-    def _disable_provider(self, provider: Dict[str, Any], reason: str) -> None:
-        provider["disabled"] = True
-        provider["disabled_reason"] = reason
-        logger.error("Provider %s disabled: %s", provider["id"], reason)
+    def _provider_state(self, provider: Dict[str, Any]) -> str:
+        until = provider.get("quarantined_until")
+        if until is None:
+            return PROVIDER_STATE_HEALTHY
+        if time.monotonic() < until:
+            return PROVIDER_STATE_QUARANTINED
+        return PROVIDER_STATE_HALF_OPEN
+
+    def _provider_available(self, provider: Dict[str, Any]) -> bool:
+        state = self._provider_state(provider)
+        if state == PROVIDER_STATE_HEALTHY:
+            return True
+        # Half-open providers accept exactly one probe at a time.
+        return state == PROVIDER_STATE_HALF_OPEN and not provider.get("probe_in_flight")
+
+    def _quarantine_provider(self, provider: Dict[str, Any], reason: str) -> None:
+        streak = provider.get("quarantine_streak", 0)
+        duration = min(self.quarantine_max_seconds, self.quarantine_seconds * (2 ** streak))
+        provider["quarantine_streak"] = streak + 1
+        provider["quarantined_until"] = time.monotonic() + duration
+        provider["quarantine_reason"] = reason
+        logger.error("Provider %s quarantined for %.0fs: %s", provider["id"], duration, reason)
+
+    def _record_provider_result(
+        self, provider: Dict[str, Any], success: bool, latency: float, tier: str = RENDER_TIER_FULL
+    ) -> None:
+        alpha = self.routing_alpha
+        was_probe = provider.get("probe_in_flight", False)
+        provider["probe_in_flight"] = False
+        provider["success_ewma"] = (1 - alpha) * provider.get("success_ewma", 1.0) + alpha * (1.0 if success else 0.0)
+        if success:
+            latencies = provider.setdefault("latency_ewma", {})
+            previous = latencies.get(tier)
+            latencies[tier] = latency if previous is None else (1 - alpha) * previous + alpha * latency
+            provider["failure_count"] = 0
+            if provider.get("quarantined_until") is not None:
+                logger.info("Provider %s recovered after half-open probe.", provider["id"])
+            provider["quarantined_until"] = None
+            provider["quarantine_streak"] = 0
+            provider["quarantine_reason"] = None
+            return
+
+        provider["failure_count"] = provider.get("failure_count", 0) + 1
+        if was_probe:
+            self._quarantine_provider(provider, "half-open probe failed")
+        elif provider["failure_count"] >= self.quarantine_threshold:
+            self._quarantine_provider(provider, f"{provider['failure_count']} consecutive failures")
+
+    def _provider_score(self, provider: Dict[str, Any], tier: str) -> float:
+        latency = (provider.get("latency_ewma") or {}).get(tier)
+        if latency is None:
+            # Unmeasured providers get an optimistic score so they are tried early.
+            latency = 0.0
+        return latency / max(provider.get("success_ewma", 1.0), 0.05)
+
+    def _rank_providers(self, tier: str = RENDER_TIER_FULL) -> List[Dict[str, Any]]:
+        """Available providers, half-open probes first, then fastest healthy by EWMA score."""
+        candidates = [provider for provider in self.providers if self._provider_available(provider)]
+        if tier == RENDER_TIER_PREVIEW:
+            candidates = [provider for provider in candidates if provider.get("preview_model")]
+        return sorted(
+            candidates,
+            key=lambda provider: (
+                self._provider_state(provider) != PROVIDER_STATE_HALF_OPEN,
+                self._provider_score(provider, tier),
+            ),
+        )
+
+    async def _run_on_provider(
+        self, scene_payload: ScenePayload, provider: Dict[str, Any], tier: str = RENDER_TIER_FULL
+    ) -> Optional[Dict[str, Any]]:
+        if self._provider_state(provider) == PROVIDER_STATE_HALF_OPEN:
+            provider["probe_in_flight"] = True
+        started = time.monotonic()
+        call_started = None
+        try:
+            async with provider["lock"]:
+                call_started = time.monotonic()
+                self._note_queue_wait(scene_payload.sceneId, call_started - started, provider)
+                assets = await self._attempt_scene_render_with_fal(scene_payload, provider, tier=tier)
+        except Exception:
+            self._record_provider_result(provider, False, time.monotonic() - started, tier)
+            if call_started is not None:
+                self._observe_provider_call(provider, tier, "error", call_started)
+            raise
+        self._record_provider_result(provider, bool(assets), time.monotonic() - started, tier)
+        self._observe_provider_call(provider, tier, "ready" if assets else "failed", call_started)
+        return assets
+
+    def _observe_provider_call(self, provider: Dict[str, Any], tier: str, outcome: str, call_started: float) -> None:
+        self.metrics.provider_render_seconds.observe(
+            time.monotonic() - call_started, provider=provider["id"], tier=tier, outcome=outcome
+        )
+
+    def _note_queue_wait(self, scene_id: str, waited: float, provider: Dict[str, Any]) -> None:
+        self.metrics.provider_lock_wait_seconds.observe(waited, provider=provider["id"])
+        # Only foreground renders report timings; background upgrades/retries would leak entries.
+        if scene_id in self._active_renders:
+            self._queue_waits[scene_id] = self._queue_waits.get(scene_id, 0.0) + waited
+
+    def _pop_timings(self, scene_id: str, started: float) -> Dict[str, float]:
+        return {
+            "queueWaitMs": round(self._queue_waits.pop(scene_id, 0.0) * 1000, 1),
+            "totalMs": round((time.monotonic() - started) * 1000, 1),
+        }
+
+    def _reject_if_draining(self) -> None:
+        if self.draining:
+            raise SceneServiceDraining("Scene service is draining; retry against another instance.")
 
     async def render_scene(self, request: SceneRenderRequest) -> Dict[str, Any]:
+        self._reject_if_draining()
+        # Invalid requests must not spend the player's or the global render budget
         if not request.storyText:
             raise ValueError("storyText is required to generate scenes.")
+        player_id = (request.player or {}).get("name")
+        exhausted_scope = self.render_budget.acquire(player_id)
+        if exhausted_scope is not None:
+            return await self._throttled_response(request, player_id, exhausted_scope)
+        self._foreground_renders += 1
+        try:
+            return await self._render_scene(request)
+        finally:
+            self._foreground_renders -= 1
 
+    async def _render_scene(self, request: SceneRenderRequest) -> Dict[str, Any]:
+        started = time.monotonic()
         payload = self._compose_scene_payload(request)
         
         # Prevent duplicate renders for the same sceneId
@@ -187,8 +509,26 @@ class SceneOrchestrator:
         # Mark as active render
         self._active_renders[payload.sceneId] = True
         
+        upgrade_pending = False
         try:
-            render_metadata = await self._render_with_provider(payload)
+            if self._progressive_enabled():
+                render_metadata = await self._render_with_provider(payload, tier=RENDER_TIER_PREVIEW)
+                if render_metadata.get("status") == "ready":
+                    # Serve the fast preview now; the full-quality render upgrades it later.
+                    preview_assets = render_metadata.get("assets") or {}
+                    render_metadata = {
+                        "status": "pending",
+                        "assets": {
+                            "thumbnailUrl": preview_assets.get("imageUrl"),
+                            "provider": preview_assets.get("provider"),
+                            "model": preview_assets.get("model"),
+                        },
+                    }
+                    upgrade_pending = True
+                else:
+                    render_metadata = await self._render_with_provider(payload)
+            else:
+                render_metadata = await self._render_with_provider(payload)
         finally:
             # Remove from active renders after completion
             self._active_renders.pop(payload.sceneId, None)
@@ -202,25 +542,230 @@ class SceneOrchestrator:
         now = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
         if self.db is not None:
-            scene_doc = {
-                "sceneId": payload.sceneId,
-                "playerId": request.player.get("name"),
-                "turn": (request.gameState or {}).get("turnCount", 0),
-                "genre": request.genre,
-                "status": status,
-                "scene": public_scene,
-                "assets": assets,
-                "createdAt": payload.createdAt or now,
-                "updatedAt": now,
-                "context": request.model_dump(exclude_none=True),
-                "preGeneratedKey": request.preGeneratedKey,
-            }
+            await self._store_shared_contexts([request])
+            scene_doc = self._build_scene_doc(payload, request, public_scene, status, assets, now)
+            write_started = time.monotonic()
             await self.db.scenes.update_one(
                 {"sceneId": payload.sceneId},
                 {"$set": scene_doc},
                 upsert=True,
             )
+            self.metrics.mongo_write_seconds.observe(time.monotonic() - write_started, operation="render_scene")
+
+        if upgrade_pending:
+            self._schedule_full_render(payload)
+
+        self._publish_scene_event(
+            payload.sceneId,
+            {
+                "sceneId": payload.sceneId,
+                "scene": public_scene,
+                "sceneStatus": status,
+                "sceneAssets": assets,
+                "updatedAt": now,
+            },
+        )
+        if status == "ready":
+            self._schedule_mirror(payload.sceneId, assets)
+        self.metrics.render_outcomes.inc(status=status)
+        response_payload = self._build_scene_response(payload, request, public_scene, status, assets)
+        response_payload["timings"] = self._pop_timings(payload.sceneId, started)
+        return response_payload
+
+    async def _throttled_response(
+        self, request: SceneRenderRequest, player_id: Optional[str], scope: str
+    ) -> Dict[str, Any]:
+        """Answer an over-budget render with the player's latest ready scene instead of a new one."""
+        latest = await self._latest_ready_scene(player_id)
+        self.metrics.render_throttled.inc(scope=scope, fallback="reused" if latest else "none")
+        if latest is not None:
+            return {**latest, "preGeneratedKey": request.preGeneratedKey, "throttled": True}
+
+        # Nothing to reuse: hand back the composed scene without spending a render on it.
+        payload = self._compose_scene_payload(request)
+        payload.status = "offline"
+        public_scene = payload.model_dump(exclude={"prompts"})
+        response_payload = self._build_scene_response(payload, request, public_scene, "offline", None)
+        response_payload["throttled"] = True
+        return response_payload
+
+    async def _latest_ready_scene(self, player_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if self.db is None or not player_id:
+            return None
+        try:
+            scene_doc = await self.db.scenes.find_one(
+                {"playerId": player_id, "status": "ready"},
+                {"sceneId": 1, "scene": 1, "status": 1, "assets": 1, "updatedAt": 1},
+                sort=[("createdAt", -1)],
+            )
+        except Exception as lookup_err:
+            logger.warning(f"Could not load latest scene for throttled player {player_id}: {lookup_err}")
+            return None
+        return self._scene_doc_response(scene_doc) if scene_doc else None
+
+    async def render_scene_batch(self, requests: List[SceneRenderRequest]) -> List[Dict[str, Any]]:
+        """Render many scenes with shared FAL calls and a single bulk write.
+
+        Requests built from identical inputs get the same pose/camera and so
+        share one multi-image FAL call (``num_images`` only varies the seed,
+        not the prompt); distinct prompts are spread across the ranked
+        providers concurrently. Every item gets its
+        own status, so one failure does not fail the batch. Each item is
+        charged to the render budget; over-budget items get the throttled
+        response of a single render instead of a provider call.
+        """
+        if len(requests) > self.batch_max_items:
+            raise ValueError(f"Batch exceeds the maximum of {self.batch_max_items} scenes.")
+        self._reject_if_draining()
+        self._foreground_renders += 1
+        try:
+            return await self._render_scene_batch(requests)
+        finally:
+            self._foreground_renders -= 1
+
+    async def _render_scene_batch(self, requests: List[SceneRenderRequest]) -> List[Dict[str, Any]]:
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        groups: Dict[tuple, List[tuple]] = {}
+        for index, request in enumerate(requests):
+            if not request.storyText:
+                results[index] = {"index": index, "error": "storyText is required to generate scenes."}
+                continue
+            # Each item spends a render token, like a single render; over-budget items reuse a scene
+            player_id = (request.player or {}).get("name")
+            exhausted_scope = self.render_budget.acquire(player_id)
+            if exhausted_scope is not None:
+                throttled = await self._throttled_response(request, player_id, exhausted_scope)
+                results[index] = {"index": index, **throttled}
+                continue
+            # Pose/camera/time-of-day are seeded from the inputs, so identical requests share a prompt
+            key = scene_prompt_key(request)
+            payload = self._compose_scene_payload(request, rng=random.Random(key))
+            groups.setdefault(key, []).append((index, request, payload))
+
+        ranked = self._rank_providers()
+        group_list = list(groups.values())
+
+        async def _render_group(position: int, members: List[tuple]) -> List[Optional[Dict[str, Any]]]:
+            payloads = [payload for _, _, payload in members]
+            # Same rules as single renders: busy or probing providers are skipped, and
+            # groups no provider could take are left pending for the retry queue.
+            for offset in range(len(ranked)):
+                provider = ranked[(position + offset) % len(ranked)]
+                if provider["lock"].locked() or not self._provider_available(provider):
+                    continue
+                try:
+                    images = await self._run_batch_on_provider(payloads[0], provider, num_images=len(payloads))
+                except Exception as batch_err:
+                    logger.warning(f"Batch render group failed on provider {provider['id']}: {batch_err}")
+                    images = []
+                if images:
+                    return [images[idx] if idx < len(images) else None for idx in range(len(payloads))]
+            return [None] * len(members)
+
+        group_assets = await asyncio.gather(
+            *[_render_group(position, members) for position, members in enumerate(group_list)]
+        )
+
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        operations = []
+        retry_payloads: List[ScenePayload] = []
+        events: List[Dict[str, Any]] = []
+        for members, assets_list in zip(group_list, group_assets):
+            for (index, request, payload), assets in zip(members, assets_list):
+                status = "ready" if assets else ("pending" if self.providers else "offline")
+                payload.status = status
+                if assets:
+                    payload.assets = SceneAssets(**assets)
+                else:
+                    retry_payloads.append(payload)
+                public_scene = payload.model_dump(exclude={"prompts"})
+                if self.db is not None and UpdateOne is not None:
+                    scene_doc = self._build_scene_doc(payload, request, public_scene, status, assets, now)
+                    operations.append(UpdateOne({"sceneId": payload.sceneId}, {"$set": scene_doc}, upsert=True))
+                events.append(
+                    {
+                        "sceneId": payload.sceneId,
+                        "scene": public_scene,
+                        "sceneStatus": status,
+                        "sceneAssets": assets,
+                        "updatedAt": now,
+                    }
+                )
+                results[index] = {
+                    "index": index,
+                    **self._build_scene_response(payload, request, public_scene, status, assets),
+                }
+
+        if operations:
+            await self._store_shared_contexts([request for members in group_list for _, request, _ in members])
+            write_started = time.monotonic()
+            await self.db.scenes.bulk_write(operations, ordered=False)
+            self.metrics.mongo_write_seconds.observe(time.monotonic() - write_started, operation="render_batch")
+        for event in events:
+            self.metrics.render_outcomes.inc(status=event["sceneStatus"])
+            self._publish_scene_event(event["sceneId"], event)
+            if event["sceneStatus"] == "ready":
+                self._schedule_mirror(event["sceneId"], event["sceneAssets"])
+        for payload in retry_payloads:
+            await self._schedule_scene_retry(payload)
+        return [result for result in results if result is not None]
+
+    def _build_scene_doc(
+        self,
+        payload: ScenePayload,
+        request: SceneRenderRequest,
+        public_scene: Dict[str, Any],
+        status: str,
+        assets: Optional[Dict[str, Any]],
+        now: str,
+    ) -> Dict[str, Any]:
+        # Assets live only under scene.assets, and the player snapshot is
+        # referenced through contextKey instead of being copied per scene.
+        return {
+            "sceneId": payload.sceneId,
+            "schemaVersion": SCENE_SCHEMA_VERSION,
+            "playerId": request.player.get("name"),
+            "turn": (request.gameState or {}).get("turnCount", 0),
+            "genre": request.genre,
+            "status": status,
+            "scene": public_scene,
+            "createdAt": payload.createdAt or now,
+            "updatedAt": now,
+            "contextKey": scene_context_key(request.player or {}, request.genre),
+            "context": build_scene_render_context(request),
+            "preGeneratedKey": request.preGeneratedKey,
+        }
+
+    async def _store_shared_contexts(self, requests: List[SceneRenderRequest]) -> None:
+        if self.db is None:
+            return
+        pending: Dict[str, Dict[str, Any]] = {}
+        for request in requests:
+            shared = build_shared_scene_context(request)
+            if shared["contextKey"] not in self._known_context_keys:
+                pending[shared["contextKey"]] = shared
+        if not pending:
+            return
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        for key, shared in pending.items():
+            await self.db.scene_contexts.update_one(
+                {"contextKey": key},
+                {"$setOnInsert": {**shared, "createdAt": now}},
+                upsert=True,
+            )
+        if len(self._known_context_keys) > 10000:
+            self._known_context_keys.clear()
+        self._known_context_keys.update(pending)
 
+    def _build_scene_response(
+        self,
+        payload: ScenePayload,
+        request: SceneRenderRequest,
+        public_scene: Dict[str, Any],
+        status: str,
+        assets: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
         response_payload: Dict[str, Any] = {
             "scene": public_scene,
             "sceneId": payload.sceneId,
@@ -231,40 +776,127 @@ class SceneOrchestrator:
             response_payload["sceneAssets"] = assets
         return response_payload
 
+    async def _find_scene_doc(self, scene_id: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        scene_doc = await self.db.scenes.find_one({"sceneId": scene_id}, projection)
+        if scene_doc is None:
+            # Old scenes are moved out of the hot collection by the archiver.
+            scene_doc = await self.db.scene_archive.find_one({"sceneId": scene_id}, projection)
+        return scene_doc
+
     async def get_scene(self, scene_id: str) -> Optional[Dict[str, Any]]:
         if self.db is None:
             return None
-        scene_doc = await self.db.scenes.find_one({"sceneId": scene_id})
+        scene_doc = await self._find_scene_doc(
+            scene_id, {"sceneId": 1, "scene": 1, "status": 1, "assets": 1, "updatedAt": 1}
+        )
         if not scene_doc:
             return None
+        return self._scene_doc_response(scene_doc)
+
+    def _scene_doc_response(self, scene_doc: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "sceneId": scene_doc.get("sceneId"),
             "scene": scene_doc.get("scene"),
             "sceneStatus": scene_doc.get("status", "offline"),
-            "sceneAssets": scene_doc.get("assets"),
+            "sceneAssets": (scene_doc.get("scene") or {}).get("assets") or scene_doc.get("assets"),
             "updatedAt": scene_doc.get("updatedAt"),
         }
 
+    async def get_scene_history(
+        self,
+        player_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        turn_from: Optional[int] = None,
+        turn_to: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Newest-first page of a player's scenes using keyset pagination.
+
+        The cursor encodes the last ``(createdAt, sceneId)`` served, so each
+        page is an index range scan no matter how deep the client pages. Once
+        the hot collection runs out the same query continues in the archive,
+        which only ever holds older scenes.
+        """
+        if self.db is None:
+            return {"playerId": player_id, "items": [], "nextCursor": None}
+
+        query: Dict[str, Any] = {"playerId": player_id}
+        if turn_from is not None or turn_to is not None:
+            turn_filter: Dict[str, int] = {}
+            if turn_from is not None:
+                turn_filter["$gte"] = turn_from
+            if turn_to is not None:
+                turn_filter["$lte"] = turn_to
+            query["turn"] = turn_filter
+        if cursor:
+            created_at, scene_id = decode_history_cursor(cursor)
+            query["$or"] = [
+                {"createdAt": {"$lt": created_at}},
+                {"createdAt": created_at, "sceneId": {"$lt": scene_id}},
+            ]
+
+        sort = [("createdAt", -1), ("sceneId", -1)]
+        docs: List[Dict[str, Any]] = []
+        seen = set()
+        for collection in (self.db.scenes, self.db.scene_archive):
+            remaining = limit + 1 - len(docs)
+            if remaining <= 0:
+                break
+            batch = await collection.find(query, SCENE_HISTORY_PROJECTION).sort(sort).limit(remaining).to_list(
+                length=remaining
+            )
+            for doc in batch:
+                # A scene caught mid-archive can briefly exist in both collections.
+                if doc.get("sceneId") not in seen:
+                    seen.add(doc.get("sceneId"))
+                    docs.append(doc)
+
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        items = [
+            {
+                "sceneId": doc.get("sceneId"),
+                "turn": doc.get("turn"),
+                "sceneStatus": doc.get("status", "offline"),
+                "createdAt": doc.get("createdAt"),
+                "scene": doc.get("scene") or {},
+                "sceneAssets": (doc.get("scene") or {}).get("assets"),
+            }
+            for doc in docs
+        ]
+        next_cursor = None
+        if has_more and docs:
+            next_cursor = encode_history_cursor(docs[-1].get("createdAt") or "", docs[-1].get("sceneId") or "")
+        return {"playerId": player_id, "items": items, "nextCursor": next_cursor}
+
     async def rerender_scene(self, scene_id: str) -> Optional[Dict[str, Any]]:
+        self._reject_if_draining()
         if self.db is None:
             return None
-        scene_doc = await self.db.scenes.find_one({"sceneId": scene_id})
+        scene_doc = await self._find_scene_doc(scene_id)
         if not scene_doc:
             return None
-        context = scene_doc.get("context")
-        if not context:
+        shared_context = None
+        if scene_doc.get("contextKey"):
+            shared_context = await self.db.scene_contexts.find_one({"contextKey": scene_doc["contextKey"]})
+        request = request_from_scene_doc(scene_doc, shared_context)
+        if request is None:
             return None
-        request = SceneRenderRequest(**context)
+        # Goes through render_scene so rerenders spend the same player/global budget.
         return await self.render_scene(request)
 
-    def _compose_scene_payload(self, request: SceneRenderRequest) -> ScenePayload:
+    def _compose_scene_payload(
+        self, request: SceneRenderRequest, rng: Optional[random.Random] = None
+    ) -> ScenePayload:
+        rng = rng or random
         player = request.player or {}
         scene_id = secrets.token_hex(12)
-        mood = self._infer_scene_mood(request.storyText)
-        weather = self._infer_scene_weather(request.storyText)
-        time_of_day = self._infer_time_of_day(request.storyText)
+        features = self.feature_extractor.extract(request.storyText, request.currentLocation)
+        mood = features.mood
+        weather = features.weather
+        time_of_day = features.timeOfDay or rng.choice(["day", "dusk"])
         palette = self._select_palette(mood, request.genre)
-        biome = self._derive_biome(request.genre, request.currentLocation)
+        biome = features.biome or self._default_biome(request.genre)
         summary = self._safe_story_excerpt(request.storyText)
         subtitle = (request.activeQuest or {}).get("title") or request.currentLocation or request.genre
         hero_subject = SceneSubject(
@@ -291,8 +923,8 @@ class SceneOrchestrator:
             lighting="dramatic rim light" if mood in {"intense", "ominous"} else "soft bounce light",
             timeOfDay=time_of_day,
             palette=palette,
-            heroPose=random.choice(HERO_POSES),
-            camera=random.choice(CAMERA_STYLES),
+            heroPose=rng.choice(HERO_POSES),
+            camera=rng.choice(CAMERA_STYLES),
             summary=summary,
             focalSubjects=[hero_subject],
             supportingDetails=supporting,
@@ -303,145 +935,340 @@ class SceneOrchestrator:
         payload.prompts = self._build_scene_prompts(payload, player, summary, request.activeQuest)
         return payload
 
-    async def _render_with_provider(self, scene_payload: ScenePayload) -> Dict[str, Any]:
+    def _progressive_enabled(self) -> bool:
+        if self.render_plan != RENDER_PLAN_PROGRESSIVE:
+            return False
+        return any(provider.get("preview_model") and self._provider_available(provider) for provider in self.providers)
+
+    async def _render_with_provider(
+        self, scene_payload: ScenePayload, tier: str = RENDER_TIER_FULL
+    ) -> Dict[str, Any]:
         if not self.providers:
             return {"status": "offline"}
 
-        tried_ids = set()
-        attempts = 0
-        total = len(self.providers)
-
-        while attempts < total:
-            provider = self._next_provider()
-            attempts += 1
-            if not provider or provider["id"] in tried_ids:
-                continue
-            if provider.get("disabled"):
-                continue
-            tried_ids.add(provider["id"])
-
-            lock: asyncio.Lock = provider["lock"]
-            if lock.locked():
+        for provider in self._rank_providers(tier):
+            if provider["lock"].locked() or not self._provider_available(provider):
                 continue
-
-            async with lock:
-                assets = await self._attempt_scene_render_with_fal(scene_payload, provider)
-
+            assets = await self._run_on_provider(scene_payload, provider, tier=tier)
             if assets:
-                provider["failure_count"] = 0
                 return {"status": "ready", "assets": assets}
 
-            provider["failure_count"] = provider.get("failure_count", 0) + 1
+        if tier == RENDER_TIER_PREVIEW:
+            return {"status": "offline"}
 
-        self._schedule_scene_retry(scene_payload)
+        await self._schedule_scene_retry(scene_payload)
         return {"status": "pending"}
 
         return {"status": "offline"}
 
-    def _next_provider(self) -> Optional[Dict[str, Any]]:
-        if not self.providers:
-            return None
-        provider = self.providers[self._provider_index % len(self.providers)]
-        self._provider_index = (self._provider_index + 1) % len(self.providers)
-        return provider if not provider.get("disabled") else self._get_primary_provider()
+    async def _run_batch_on_provider(
+        self, scene_payload: ScenePayload, provider: Dict[str, Any], num_images: int
+    ) -> List[Dict[str, Any]]:
+        if self._provider_state(provider) == PROVIDER_STATE_HALF_OPEN:
+            provider["probe_in_flight"] = True
+        started = time.monotonic()
+        try:
+            async with provider["lock"]:
+                call_started = time.monotonic()
+                self._note_queue_wait(scene_payload.sceneId, call_started - started, provider)
+                images = await self._request_fal_images(scene_payload, provider, num_images=num_images)
+        except Exception:
+            self._record_provider_result(provider, False, time.monotonic() - started)
+            raise
+        self._record_provider_result(provider, bool(images), time.monotonic() - started)
+        self._observe_provider_call(provider, RENDER_TIER_FULL, "ready" if images else "failed", call_started)
+        return images
 
     async def _attempt_scene_render_with_fal(
-        self, scene_payload: ScenePayload, provider: Dict[str, Any]
+        self, scene_payload: ScenePayload, provider: Dict[str, Any], tier: str = RENDER_TIER_FULL
     ) -> Optional[Dict[str, Any]]:
-        if FalAsyncClient is None:
-            logger.error("fal_client library unavailable. Cannot use FAL image provider.")
-            self._disable_provider(provider, "fal_client missing")
+        images = await self._request_fal_images(scene_payload, provider, tier=tier)
+        if not images:
             return None
+        if len(images) > 1:
+            logger.warning(
+                "Scene %s: FAL returned %s images, using the first.",
+                scene_payload.sceneId,
+                len(images),
+            )
+        return images[0]
 
-        client = FalAsyncClient(key=provider["api_key"])
+    async def _request_fal_images(
+        self,
+        scene_payload: ScenePayload,
+        provider: Dict[str, Any],
+        tier: str = RENDER_TIER_FULL,
+        num_images: int = 1,
+    ) -> List[Dict[str, Any]]:
+        client = provider.get("client")
+        if client is None:
+            logger.error("Provider %s has no image client.", provider.get("id"))
+            return []
+
+        if tier == RENDER_TIER_PREVIEW:
+            model_name = provider.get("preview_model") or self.fal_preview_model
+            image_size = provider.get("preview_resolution") or self.fal_preview_resolution
+        else:
+            model_name = provider.get("model") or self.fal_model
+            image_size = provider.get("resolution") or self.fal_resolution
         arguments = {
             "prompt": scene_payload.prompts.get("base"),
-            "image_size": provider.get("resolution") or self.fal_resolution,
-            "num_images": 1,
+            "image_size": _parse_image_size(image_size),
+            "num_images": num_images,
         }
+        if tier == RENDER_TIER_PREVIEW and provider.get("preview_steps"):
+            arguments["num_inference_steps"] = int(provider["preview_steps"])
         negative_prompt = scene_payload.prompts.get("negative")
         if negative_prompt:
             arguments["negative_prompt"] = negative_prompt
 
         try:
-            response = await client.run(provider.get("model") or self.fal_model, arguments=arguments)
+            response = await client.run(model_name, arguments=arguments)
         except Exception as fal_error:
-            logger.warning(f"FAL render failed for scene {scene_payload.sceneId}: {fal_error}")
-            return None
-        finally:
-            closer = getattr(client, "close", None)
-            if callable(closer):
-                try:
-                    await closer()
-                except Exception:
-                    pass
+            logger.warning(f"{provider['type']} render failed for scene {scene_payload.sceneId}: {fal_error}")
+            return []
 
         images = None
         if isinstance(response, dict):
             images = response.get("images") or response.get("image")
         if not images:
-            return None
+            return []
+        if not isinstance(images, list):
+            images = [images]
+
+        results: List[Dict[str, Any]] = []
+        for image in images:
+            if not isinstance(image, dict):
+                logger.error("Scene %s: Invalid FAL image payload.", scene_payload.sceneId)
+                continue
+            url = image.get("url") or image.get("signed_url") or image.get("image_url")
+            if not url:
+                continue
+            results.append(
+                {
+                    "imageUrl": url,
+                    "thumbnailUrl": image.get("thumbnail") or url,
+                    "width": image.get("width"),
+                    "height": image.get("height"),
+                    "provider": provider["type"],
+                    "model": model_name,
+                }
+            )
+        return results
 
-        if isinstance(images, list):
-            if len(images) > 1:
-                logger.warning(
-                    "Scene %s: FAL returned %s images, using the first.",
-                    scene_payload.sceneId,
-                    len(images),
-                )
-            first = images[0]
-        else:
-            first = images
+    def _with_preview_thumbnail(self, scene_payload: ScenePayload, assets: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep the fast preview as the thumbnail once the full render lands."""
+        preview = scene_payload.assets.thumbnailUrl if scene_payload.assets else None
+        if preview:
+            return {**assets, "thumbnailUrl": preview}
+        return assets
 
-        if not isinstance(first, dict):
-            logger.error("Scene %s: Invalid FAL image payload.", scene_payload.sceneId)
-            return None
+    def _schedule_full_render(self, scene_payload: ScenePayload) -> None:
+        if scene_payload.sceneId in self._upgrade_tasks:
+            return
+        payload_data = scene_payload.model_dump()
 
-        url = first.get("url") or first.get("signed_url") or first.get("image_url")
-        if not url:
-            return None
+        async def _runner() -> None:
+            fresh_payload = ScenePayload(**payload_data)
+            try:
+                render_metadata = await self._render_with_provider(fresh_payload)
+            except Exception as upgrade_err:
+                logger.warning(f"Full-quality render failed for scene {fresh_payload.sceneId}: {upgrade_err}")
+                await self._schedule_scene_retry(fresh_payload)
+                return
+            if render_metadata.get("status") == "ready" and render_metadata.get("assets"):
+                assets = self._with_preview_thumbnail(fresh_payload, render_metadata["assets"])
+                await self._update_scene_assets(fresh_payload.sceneId, assets, "ready")
 
-        return {
-            "imageUrl": url,
-            "thumbnailUrl": first.get("thumbnail") or url,
-            "width": first.get("width"),
-            "height": first.get("height"),
-            "provider": "fal",
-            "model": provider.get("model") or self.fal_model,
-        }
+        task = asyncio.create_task(_runner())
 
-    def _schedule_scene_retry(self, scene_payload: ScenePayload) -> None:
-        if scene_payload.sceneId in self._retry_tasks:
+        def _cleanup_task(_: asyncio.Task) -> None:
+            self._upgrade_tasks.pop(scene_payload.sceneId, None)
+            self._handoff_payloads.pop(scene_payload.sceneId, None)
+
+        task.add_done_callback(_cleanup_task)
+        self._upgrade_tasks[scene_payload.sceneId] = task
+        self._handoff_payloads[scene_payload.sceneId] = payload_data
+
+    def _schedule_mirror(self, scene_id: str, assets: Optional[Dict[str, Any]]) -> None:
+        """Copy a finished image into the local store, then repoint the scene at it."""
+        if self.image_mirror is None or not assets or assets.get("contentHash"):
             return
-        provider = self._next_provider()
-        if provider is None or provider.get("disabled"):
+        if scene_id in self._mirror_tasks:
             return
-        if self.fal_max_retries <= 0:
+
+        async def _runner() -> None:
+            try:
+                mirrored = await self.image_mirror.mirror(assets)
+            except Exception as mirror_err:
+                logger.warning(f"Scene image mirror failed for {scene_id}: {mirror_err}")
+                return
+            if mirrored:
+                await self._update_scene_assets(scene_id, mirrored, "ready")
+
+        task = asyncio.create_task(_runner())
+
+        def _cleanup_task(_: asyncio.Task) -> None:
+            self._mirror_tasks.pop(scene_id, None)
+
+        task.add_done_callback(_cleanup_task)
+        self._mirror_tasks[scene_id] = task
+
+    async def start_background_workers(self) -> None:
+        if self.retry_queue is not None:
+            await self.retry_queue.ensure_indexes()
+            self.retry_queue.start()
+
+    async def drain(self, timeout: float) -> Dict[str, int]:
+        """Stop accepting renders and let in-flight work finish within ``timeout`` seconds.
+
+        Foreground renders are waited on first (they may still schedule upgrades
+        or retries), then upgrade, retry and mirror tasks, then the durable
+        retry queue's in-flight attempts. Upgrades and in-process retries still
+        running at the deadline are persisted to the retry queue before being
+        cancelled, so the next instance finishes them instead of re-paying for
+        a render that was thrown away.
+        """
+        self.draining = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, timeout)
+
+        while self._foreground_renders and loop.time() < deadline:
+            await asyncio.sleep(self.drain_poll_interval)
+
+        background = {*self._upgrade_tasks.values(), *self._retry_tasks.values(), *self._mirror_tasks.values()}
+        if background:
+            await asyncio.wait(background, timeout=max(0.0, deadline - loop.time()))
+        completed = sum(1 for task in background if task.done())
+
+        persisted = 0
+        unfinished = [
+            (scene_id, task)
+            for tasks in (self._upgrade_tasks, self._retry_tasks)
+            for scene_id, task in list(tasks.items())
+            if not task.done()
+        ]
+        for scene_id, task in unfinished:
+            payload_data = self._handoff_payloads.get(scene_id)
+            task.cancel()
+            if payload_data is None or self.retry_queue is None:
+                continue
+            try:
+                await self.retry_queue.enqueue(scene_id, payload_data)
+                persisted += 1
+            except Exception as enqueue_err:
+                logger.warning(f"Could not persist scene {scene_id} during drain: {enqueue_err}")
+        if unfinished:
+            await asyncio.gather(*[task for _, task in unfinished], return_exceptions=True)
+
+        if self.retry_queue is not None:
+            await self.retry_queue.stop(drain_timeout=max(0.0, deadline - loop.time()))
+
+        stats = {
+            "completed": completed,
+            "persisted": persisted,
+            "cancelled": len(unfinished),
+            "foregroundAbandoned": self._foreground_renders,
+        }
+        logger.info(
+            "Scene orchestrator drained: %(completed)s background tasks finished, "
+            "%(persisted)s persisted, %(cancelled)s cancelled.",
+            stats,
+        )
+        return stats
+
+    async def stop_background_workers(self) -> None:
+        if self.retry_queue is not None:
+            await self.retry_queue.stop()
+        for task in list(self._mirror_tasks.values()):
+            task.cancel()
+        if self._mirror_tasks:
+            await asyncio.gather(*self._mirror_tasks.values(), return_exceptions=True)
+
+    async def _schedule_scene_retry(self, scene_payload: ScenePayload) -> None:
+        if self.fal_max_retries <= 0 or not self.providers:
             return
         payload_data = scene_payload.model_dump()
 
+        if self.retry_queue is not None:
+            try:
+                await self.retry_queue.enqueue(scene_payload.sceneId, payload_data)
+                return
+            except Exception as enqueue_err:
+                logger.warning(f"Failed to persist retry job for scene {scene_payload.sceneId}: {enqueue_err}")
+
+        # No durable store available: retry in-process with the same backoff and rotation.
+        if scene_payload.sceneId in self._retry_tasks:
+            return
+
         async def _runner() -> None:
             for attempt in range(1, self.fal_max_retries + 1):
-                try:
-                    fresh_payload = ScenePayload(**payload_data)
-                    async with provider["lock"]:
-                        assets = await self._attempt_scene_render_with_fal(fresh_payload, provider)
-                    if assets:
-                        await self._update_scene_assets(fresh_payload.sceneId, assets, "ready")
-                        return
-                except Exception as retry_err:
-                    logger.warning(f"Scene retry attempt {attempt} failed: {retry_err}")
-                if self.fal_retry_delay > 0:
-                    await asyncio.sleep(self.fal_retry_delay)
-            await self._update_scene_assets(payload_data.get("sceneId"), None, "offline")
+                await asyncio.sleep(compute_backoff(attempt, self.fal_retry_delay, self.fal_retry_max_delay))
+                async with self._retry_slots:
+                    try:
+                        outcome = await self._process_retry_job(
+                            {"sceneId": scene_payload.sceneId, "payload": payload_data, "attempt": attempt}
+                        )
+                    except Exception as retry_err:
+                        logger.warning(f"Scene retry attempt {attempt} failed: {retry_err}")
+                        outcome = RETRY_OUTCOME_FAILED
+                if outcome == RETRY_OUTCOME_READY:
+                    return
+            await self._mark_scene_offline(payload_data.get("sceneId"))
 
         task = asyncio.create_task(_runner())
 
         def _cleanup_task(_: asyncio.Task) -> None:
             self._retry_tasks.pop(scene_payload.sceneId, None)
+            self._handoff_payloads.pop(scene_payload.sceneId, None)
 
         task.add_done_callback(_cleanup_task)
         self._retry_tasks[scene_payload.sceneId] = task
+        self._handoff_payloads[scene_payload.sceneId] = payload_data
+
+    def _pick_retry_provider(self, attempt: int) -> Optional[Dict[str, Any]]:
+        """Rotate through the ranked providers per attempt, skipping ones busy with fresh renders."""
+        candidates = self._rank_providers()
+        if not candidates:
+            return None
+        start = (attempt - 1) % len(candidates)
+        for offset in range(len(candidates)):
+            provider = candidates[(start + offset) % len(candidates)]
+            if not provider["lock"].locked():
+                return provider
+        return None
+
+    async def _process_retry_job(self, job: Dict[str, Any]) -> str:
+        try:
+            outcome = await self._run_retry_attempt(job)
+        except Exception:
+            self.metrics.retry_attempts.inc(outcome="error")
+            raise
+        self.metrics.retry_attempts.inc(outcome=outcome)
+        return outcome
+
+    async def _run_retry_attempt(self, job: Dict[str, Any]) -> str:
+        attempt = int(job.get("attempt", 1))
+        provider = self._pick_retry_provider(attempt)
+        if provider is None:
+            # Busy or quarantined providers free up over time; do not burn an attempt.
+            return RETRY_OUTCOME_DEFERRED
+
+        job["lastProvider"] = provider["id"]
+        fresh_payload = ScenePayload(**job["payload"])
+        assets = await self._run_on_provider(fresh_payload, provider)
+        if not assets:
+            logger.warning(
+                "Scene retry attempt %s for %s failed on provider %s.", attempt, fresh_payload.sceneId, provider["id"]
+            )
+            return RETRY_OUTCOME_FAILED
+
+        assets = self._with_preview_thumbnail(fresh_payload, assets)
+        await self._update_scene_assets(fresh_payload.sceneId, assets, "ready")
+        return RETRY_OUTCOME_READY
+
+    async def _mark_scene_offline(self, scene_id: Optional[str]) -> None:
+        await self._update_scene_assets(scene_id, None, "offline")
 
     async def _update_scene_assets(self, scene_id: Optional[str], assets: Optional[Dict[str, Any]], status: str) -> None:
         if not scene_id or self.db is None:
@@ -453,12 +1280,32 @@ class SceneOrchestrator:
             "updatedAt": now,
         }
         if assets:
-            update_fields["assets"] = assets
             update_fields["scene.assets"] = assets
+        write_started = time.monotonic()
         await self.db.scenes.update_one(
             {"sceneId": scene_id},
             {"$set": update_fields},
         )
+        self.metrics.mongo_write_seconds.observe(time.monotonic() - write_started, operation="update_assets")
+        self._publish_scene_event(
+            scene_id,
+            {
+                "sceneId": scene_id,
+                "sceneStatus": status,
+                "sceneAssets": assets,
+                "updatedAt": now,
+            },
+        )
+        if status == "ready":
+            self._schedule_mirror(scene_id, assets)
+
+    def _publish_scene_event(self, scene_id: str, event: Dict[str, Any]) -> None:
+        if self.event_broker is None:
+            return
+        try:
+            self.event_broker.publish(scene_id, event)
+        except Exception as publish_err:
+            logger.warning(f"Failed to publish scene event for {scene_id}: {publish_err}")
 
     def _safe_story_excerpt(self, text: str, limit: int = 320) -> str:
         if not text:
@@ -471,55 +1318,43 @@ class SceneOrchestrator:
             return {"providerPool": []}
         primary = self._get_primary_provider()
         pool_info = []
+        now = time.monotonic()
         for provider in self.providers:
+            state = self._provider_state(provider)
+            latencies = provider.get("latency_ewma") or {}
+            quarantined_until = provider.get("quarantined_until")
             pool_info.append(
                 {
                     "id": provider["id"],
                     "provider": provider["type"],
                     "model": provider.get("model"),
+                    "previewModel": provider.get("preview_model"),
                     "busy": provider["lock"].locked(),
                     "failures": provider.get("failure_count", 0),
-                    "disabled": provider.get("disabled", False),
-                    "reason": provider.get("disabled_reason"),
+                    "state": state,
+                    "disabled": state == PROVIDER_STATE_QUARANTINED,
+                    "reason": provider.get("quarantine_reason"),
+                    "quarantineRemainingSeconds": (
+                        round(max(0.0, quarantined_until - now), 1) if quarantined_until is not None else None
+                    ),
+                    "latencyMs": {tier: round(value * 1000) for tier, value in latencies.items()},
+                    "successRate": round(provider.get("success_ewma", 1.0), 3),
+                    "score": round(self._provider_score(provider, RENDER_TIER_FULL), 3),
                 }
             )
         return {
             "provider": primary.get("type"),
             "model": primary.get("model"),
+            "renderPlan": RENDER_PLAN_PROGRESSIVE if self._progressive_enabled() else RENDER_PLAN_SINGLE,
+            "retryQueue": self.retry_queue.get_stats() if self.retry_queue else {"active": len(self._retry_tasks)},
+            "imageMirror": self.image_mirror.get_stats() if self.image_mirror else None,
+            "renderBudget": self.render_budget.get_stats(),
             "providerPool": pool_info,
         }
 
     def _get_primary_provider(self) -> Dict[str, Any]:
-        for provider in self.providers:
-            if not provider.get("disabled"):
-                return provider
-        return self.providers[0]
-
-    def _infer_scene_mood(self, story_text: str) -> str:
-        lowered = story_text.lower()
-        for mood, keywords in SCENE_MOOD_KEYWORDS.items():
-            if any(word in lowered for word in keywords):
-                return mood
-        return "serene"
-
-    def _infer_scene_weather(self, story_text: str) -> str:
-        lowered = story_text.lower()
-        for weather, keywords in SCENE_WEATHER_KEYWORDS.items():
-            if any(word in lowered for word in keywords):
-                return weather
-        return "sunny"
-
-    def _infer_time_of_day(self, story_text: str) -> str:
-        lowered = story_text.lower()
-        if any(word in lowered for word in ["dawn", "sunrise", "morning"]):
-            return "dawn"
-        if any(word in lowered for word in ["noon", "bright"]):
-            return "day"
-        if any(word in lowered for word in ["dusk", "evening", "sunset"]):
-            return "dusk"
-        if any(word in lowered for word in ["night", "moon", "stars", "midnight"]):
-            return "night"
-        return random.choice(["day", "dusk"])
+        ranked = self._rank_providers()
+        return ranked[0] if ranked else self.providers[0]
 
     def _select_palette(self, mood: str, genre: str) -> List[str]:
         if mood in SCENE_COLOR_PALETTES:
@@ -532,17 +1367,7 @@ class SceneOrchestrator:
             return ["#331832", "#c84b31", "#f3ecc8", "#daa49a", "#c1a57b"]
         return SCENE_COLOR_PALETTES["serene"]
 
-    def _derive_biome(self, genre: str, location: Optional[str]) -> str:
-        if location:
-            lowered = location.lower()
-            if any(token in lowered for token in ["forest", "grove", "woods"]):
-                return "enchanted forest"
-            if any(token in lowered for token in ["desert", "dune", "waste"]):
-                return "sun-scorched desert"
-            if any(token in lowered for token in ["city", "village", "town"]):
-                return "ancient settlement"
-            if "temple" in lowered or "ruin" in lowered:
-                return "sacred ruins"
+    def _default_biome(self, genre: str) -> str:
         genre_defaults = {
             "Fantasy": "mossy dungeon hall",
             "Mystery": "fog-laced alley",
@@ -0,0 +1,129 @@
+import abc
+import asyncio
+import logging
+import random
+import secrets
+from typing import Any, Dict, List, Optional
+
+try:
+    from fal_client import AsyncClient as FalAsyncClient
+except Exception:  # pragma: no cover - optional dependency
+    FalAsyncClient = None
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_TYPE_FAL = "fal"
+PROVIDER_TYPE_FAKE = "fake"
+
+FAKE_PAYLOAD_SHAPES = ("images", "image", "signed_url", "empty", "invalid")
+
+
+class ImageProviderError(RuntimeError):
+    pass
+
+
+class ImageProviderClient(abc.ABC):
+    """Minimal image provider interface: FAL's ``run(model, arguments)`` shape.
+
+    ``run`` returns the raw provider response (``{"images": [...]}``); the
+    orchestrator owns parsing, routing and retries so every client stays thin.
+    """
+
+    provider_type = "base"
+
+    @abc.abstractmethod
+    async def run(self, model: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Render with ``model``; returns the provider's raw response."""
+
+    async def close(self) -> None:
+        return None
+
+
+class FalImageClient(ImageProviderClient):
+    provider_type = PROVIDER_TYPE_FAL
+
+    def __init__(self, api_key: str):
+        if FalAsyncClient is None:
+            raise ImageProviderError("fal_client library unavailable.")
+        self.api_key = api_key
+
+    async def run(self, model: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        client = FalAsyncClient(key=self.api_key)
+        try:
+            return await client.run(model, arguments=arguments)
+        finally:
+            closer = getattr(client, "close", None)
+            if callable(closer):
+                try:
+                    await closer()
+                except Exception:
+                    pass
+
+
+class FakeImageClient(ImageProviderClient):
+    """Local stand-in for FAL with tunable latency, failures and payload shape.
+
+    Lets the orchestrator, retry queue and routing be exercised (and load
+    tested) without API keys or spend. Latency is ``latency_ms`` plus uniform
+    jitter; ``failure_rate`` is the probability that a call raises.
+    """
+
+    provider_type = PROVIDER_TYPE_FAKE
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        jitter_ms: float = 200.0,
+        failure_rate: float = 0.0,
+        payload_shape: str = "images",
+        seed: Optional[int] = None,
+    ):
+        if payload_shape not in FAKE_PAYLOAD_SHAPES:
+            raise ValueError(f"Unknown fake payload shape '{payload_shape}'.")
+        self.latency_ms = max(0.0, latency_ms)
+        self.jitter_ms = max(0.0, jitter_ms)
+        self.failure_rate = min(max(failure_rate, 0.0), 1.0)
+        self.payload_shape = payload_shape
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    async def run(self, model: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        if self._random.random() < self.failure_rate:
+            raise ImageProviderError("Fake provider failure.")
+
+        size = arguments.get("image_size")
+        width, height = (size.get("width"), size.get("height")) if isinstance(size, dict) else (1344, 768)
+        images: List[Dict[str, Any]] = []
+        for _ in range(int(arguments.get("num_images") or 1)):
+            url = f"https://fake-images.local/{model.replace('/', '-')}/{secrets.token_hex(8)}.png"
+            key = "signed_url" if self.payload_shape == "signed_url" else "url"
+            images.append({key: url, "width": width, "height": height})
+
+        if self.payload_shape == "empty":
+            return {"images": []}
+        if self.payload_shape == "invalid":
+            return {"images": [image[next(iter(image))] for image in images]}
+        if self.payload_shape == "image":
+            return {"image": images[0]}
+        return {"images": images}
+
+
+def create_image_client(provider_type: str, raw: Dict[str, Any]) -> Optional[ImageProviderClient]:
+    """Build the client for a provider-pool entry, or ``None`` if it cannot run."""
+    if provider_type == PROVIDER_TYPE_FAKE:
+        return FakeImageClient(
+            latency_ms=float(raw.get("latency_ms", 800)),
+            jitter_ms=float(raw.get("jitter_ms", 200)),
+            failure_rate=float(raw.get("failure_rate", 0.0)),
+            payload_shape=raw.get("payload_shape") or "images",
+            seed=raw.get("seed"),
+        )
+    if provider_type == PROVIDER_TYPE_FAL:
+        if FalAsyncClient is None or not raw.get("api_key"):
+            return None
+        return FalImageClient(raw["api_key"])
+    logger.warning("Unknown image provider type '%s'.", provider_type)
+    return None
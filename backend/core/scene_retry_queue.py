@@ -0,0 +1,252 @@
+import asyncio
+import datetime
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from pymongo import ASCENDING, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+RETRY_OUTCOME_READY = "ready"
+RETRY_OUTCOME_FAILED = "failed"
+RETRY_OUTCOME_DEFERRED = "deferred"
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+
+
+def compute_backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with equal jitter: half fixed, half random."""
+    if base_delay <= 0:
+        return 0.0
+    ceiling = min(max_delay, base_delay * (2 ** max(attempt - 1, 0)))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class SceneRetryQueue:
+    """Durable retry queue for scene renders backed by a Mongo collection.
+
+    Jobs survive restarts: a worker started from the service lifespan claims
+    due jobs with a lease, so jobs left ``running`` by a crashed process are
+    picked up again once their lease expires. Concurrency is capped so retries
+    never occupy every provider while fresh renders are waiting.
+    """
+
+    def __init__(
+        self,
+        collection,
+        handler: Callable[[Dict[str, Any]], Awaitable[str]],
+        on_exhausted: Callable[[str], Awaitable[None]],
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        concurrency: int = 1,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 120.0,
+    ):
+        self.collection = collection
+        self.handler = handler
+        self.on_exhausted = on_exhausted
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._stats: Dict[str, int] = {
+            "enqueued": 0,
+            "attempts": 0,
+            "succeeded": 0,
+            "exhausted": 0,
+            "deferred": 0,
+            "released": 0,
+        }
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("sceneId", ASCENDING)], unique=True)
+        await self.collection.create_index([("status", ASCENDING), ("nextAttemptAt", ASCENDING)])
+
+    async def enqueue(self, scene_id: str, payload: Dict[str, Any]) -> None:
+        now = _utcnow()
+        delay = compute_backoff(1, self.base_delay, self.max_delay)
+        await self.collection.update_one(
+            {"sceneId": scene_id},
+            {
+                "$setOnInsert": {
+                    "sceneId": scene_id,
+                    "payload": payload,
+                    "attempts": 0,
+                    "status": JOB_STATUS_QUEUED,
+                    "nextAttemptAt": now + datetime.timedelta(seconds=delay),
+                    "leaseUntil": None,
+                    "createdAt": now,
+                    "updatedAt": now,
+                }
+            },
+            upsert=True,
+        )
+        self._stats["enqueued"] += 1
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, drain_timeout: float = 0.0) -> None:
+        """Stop claiming jobs; give in-flight attempts ``drain_timeout`` to finish.
+
+        Attempts still running after that are cancelled and their jobs released
+        back to ``queued`` so the next process resumes them immediately instead
+        of waiting for the lease to expire.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._inflight and drain_timeout > 0:
+            await asyncio.wait(set(self._inflight), timeout=drain_timeout)
+        for task in list(self._inflight):
+            task.cancel()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while len(self._inflight) < self.concurrency:
+                    job = await self._claim_due_job()
+                    if job is None:
+                        break
+                    task = asyncio.create_task(self._process(job))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._on_job_done)
+            except asyncio.CancelledError:
+                raise
+            except Exception as worker_err:
+                logger.warning(f"Scene retry worker error: {worker_err}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_job_done(self, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        self._wakeup.set()
+
+    async def _claim_due_job(self) -> Optional[Dict[str, Any]]:
+        now = _utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": JOB_STATUS_QUEUED, "nextAttemptAt": {"$lte": now}},
+                    # Resume jobs whose worker died mid-attempt (e.g. a restart).
+                    {"status": JOB_STATUS_RUNNING, "leaseUntil": {"$lte": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": JOB_STATUS_RUNNING,
+                    "leaseUntil": now + datetime.timedelta(seconds=self.lease_seconds),
+                    "updatedAt": now,
+                }
+            },
+            sort=[("nextAttemptAt", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        scene_id = job.get("sceneId")
+        attempt = int(job.get("attempts", 0)) + 1
+        job = {**job, "attempt": attempt}
+        try:
+            outcome = await self.handler(job)
+        except asyncio.CancelledError:
+            await self._release(job)
+            raise
+        except Exception as retry_err:
+            logger.warning(f"Scene retry attempt {attempt} for {scene_id} raised: {retry_err}")
+            outcome = RETRY_OUTCOME_FAILED
+
+        now = _utcnow()
+        if outcome == RETRY_OUTCOME_READY:
+            self._stats["attempts"] += 1
+            self._stats["succeeded"] += 1
+            await self.collection.delete_one({"_id": job["_id"]})
+            return
+
+        if outcome == RETRY_OUTCOME_DEFERRED:
+            # Every provider was busy with fresh renders; try again shortly without
+            # spending an attempt.
+            self._stats["deferred"] += 1
+            await self.collection.update_one(
+                {"_id": job["_id"]},
+                {
+                    "$set": {
+                        "status": JOB_STATUS_QUEUED,
+                        "nextAttemptAt": now + datetime.timedelta(seconds=max(self.base_delay, self.poll_interval)),
+                        "leaseUntil": None,
+                        "updatedAt": now,
+                    }
+                },
+            )
+            return
+
+        self._stats["attempts"] += 1
+        if attempt >= self.max_attempts:
+            self._stats["exhausted"] += 1
+            await self.on_exhausted(scene_id)
+            await self.collection.delete_one({"_id": job["_id"]})
+            return
+
+        delay = compute_backoff(attempt + 1, self.base_delay, self.max_delay)
+        await self.collection.update_one(
+            {"_id": job["_id"]},
+            {
+                "$set": {
+                    "status": JOB_STATUS_QUEUED,
+                    "attempts": attempt,
+                    "nextAttemptAt": now + datetime.timedelta(seconds=delay),
+                    "leaseUntil": None,
+                    "lastProvider": job.get("lastProvider"),
+                    "updatedAt": now,
+                }
+            },
+        )
+
+    async def _release(self, job: Dict[str, Any]) -> None:
+        try:
+            await self.collection.update_one(
+                {"_id": job["_id"]},
+                {
+                    "$set": {
+                        "status": JOB_STATUS_QUEUED,
+                        "nextAttemptAt": _utcnow(),
+                        "leaseUntil": None,
+                        "updatedAt": _utcnow(),
+                    }
+                },
+            )
+            self._stats["released"] += 1
+        except Exception as release_err:
+            logger.warning(f"Could not release scene retry job {job.get('sceneId')}: {release_err}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "active": len(self._inflight),
+            "concurrency": self.concurrency,
+            "running": self._worker is not None and not self._worker.done(),
+        }
@@ -0,0 +1,176 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Entries kept inline on the save (storyLog / gameState.storyLog); the rest lives in story_events.
+STORY_LOG_TAIL = int(os.getenv("STORY_LOG_TAIL", "30"))
+STORY_EVENTS_PAGE_MAX = 200
+
+_EVENT_KEY_FIELDS = ("_id", "playerId", "saveSlot", "turn")
+
+
+def story_log_tail(log: Optional[List[Dict[str, Any]]], tail_size: int = STORY_LOG_TAIL) -> List[Dict[str, Any]]:
+    return list(log or [])[-tail_size:] if tail_size > 0 else []
+
+
+def story_log_last(log: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """Timestamp of the log's newest entry, stored as the save's ``storyLogLast``.
+
+    Together with ``storyLogCount`` it tells whether a log is the one stored:
+    two timelines of the same length almost never end on the same instant.
+    """
+    last = log[-1] if log else None
+    return last.get("t") if isinstance(last, dict) else None
+
+
+class StoryEventStore:
+    """Story history for a save slot, one document per entry.
+
+    ``turn`` is the entry's position in the slot's log (0-based). It pairs with
+    the save's ``storyLogCount`` cursor: the save keeps the last
+    ``STORY_LOG_TAIL`` entries inline, and anything older is paged from here.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index(
+            [("playerId", ASCENDING), ("saveSlot", ASCENDING), ("turn", ASCENDING)], unique=True
+        )
+        await self.collection.create_index([("sceneId", ASCENDING)], sparse=True)
+
+    async def append(self, player_id: str, save_slot: int, turn: int, entry: Dict[str, Any]) -> None:
+        await self.collection.update_one(
+            {"playerId": player_id, "saveSlot": save_slot, "turn": turn},
+            {"$set": {**entry, "playerId": player_id, "saveSlot": save_slot, "turn": turn}},
+            upsert=True,
+        )
+
+    async def append_many(self, save_slot: int, rows: List[Tuple[str, int, Dict[str, Any]]]) -> None:
+        """Upsert ``(player, turn, entry)`` rows in one unordered batch (queued autosave turns)."""
+        if rows:
+            await self.collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"playerId": player_id, "saveSlot": save_slot, "turn": turn},
+                        {"$set": {**entry, "playerId": player_id, "saveSlot": save_slot, "turn": turn}},
+                        upsert=True,
+                    )
+                    for player_id, turn, entry in rows
+                ],
+                ordered=False,
+            )
+
+    async def replace(self, player_id: str, save_slot: int, entries: List[Dict[str, Any]]) -> int:
+        """Make ``entries`` the slot's whole history (manual saves, diverged timelines)."""
+        await self.collection.delete_many({"playerId": player_id, "saveSlot": save_slot})
+        if entries:
+            await self.collection.insert_many(
+                [
+                    {**entry, "playerId": player_id, "saveSlot": save_slot, "turn": turn}
+                    for turn, entry in enumerate(entries)
+                    if isinstance(entry, dict)
+                ],
+                ordered=False,
+            )
+        return len(entries)
+
+    async def extend(self, player_id: str, save_slot: int, start: int, entries: List[Dict[str, Any]]) -> int:
+        """Write ``entries`` as turns ``start`` on; earlier turns are left as stored."""
+        await self.truncate(player_id, save_slot, start)
+        docs = [
+            {**entry, "playerId": player_id, "saveSlot": save_slot, "turn": turn}
+            for turn, entry in enumerate(entries, start)
+            if isinstance(entry, dict)
+        ]
+        if docs:
+            await self.collection.insert_many(docs, ordered=False)
+        return len(docs)
+
+    async def truncate(self, player_id: str, save_slot: int, length: int) -> int:
+        """Drop entries from turn ``length`` on (a save rolled back to an earlier point)."""
+        result = await self.collection.delete_many(
+            {"playerId": player_id, "saveSlot": save_slot, "turn": {"$gte": length}}
+        )
+        return result.deleted_count
+
+    async def page(
+        self, player_id: str, save_slot: int, before: Optional[int] = None, limit: int = 50
+    ) -> Dict[str, Any]:
+        """Return up to ``limit`` entries older than turn ``before``, oldest first."""
+        limit = max(1, min(limit, STORY_EVENTS_PAGE_MAX))
+        query: Dict[str, Any] = {"playerId": player_id, "saveSlot": save_slot}
+        if before is not None:
+            query["turn"] = {"$lt": before}
+        docs = (
+            await self.collection.find(query)
+            .sort("turn", DESCENDING)
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+        has_more = len(docs) > limit
+        docs = list(reversed(docs[:limit]))
+        items = [
+            {"turn": doc["turn"], **{key: value for key, value in doc.items() if key not in _EVENT_KEY_FIELDS}}
+            for doc in docs
+        ]
+        return {
+            "playerId": player_id,
+            "saveSlot": save_slot,
+            "items": items,
+            "nextBefore": items[0]["turn"] if has_more and items else None,
+        }
+
+
+def story_cursor(save: Dict[str, Any], tail_length: int) -> Dict[str, Any]:
+    total = save.get("storyLogCount")
+    if total is None:
+        total = tail_length
+    return {"saveSlot": save.get("saveSlot", 1), "total": total, "before": max(0, total - tail_length)}
+
+
+def story_log_appendix(
+    stored_count: int, client_log: Optional[List[Dict[str, Any]]], offset: int = 0
+) -> List[Dict[str, Any]]:
+    """Entries of ``client_log`` that lie past the ``stored_count`` entries already stored.
+
+    ``client_log`` starts at turn ``offset`` (a loaded save's ``storyCursor.before``);
+    a client that loaded a save only holds its tail, so anything below the
+    stored cursor is already in story_events and is never sent back down.
+    """
+    return list(client_log or [])[max(0, stored_count - max(0, offset)):]
+
+
+async def migrate_save_story_log(saves, events: StoryEventStore, save: Dict[str, Any]) -> Dict[str, Any]:
+    """Move a legacy save's inline history into story_events and trim the save to its tail.
+
+    Saves written before story_events have no ``storyLogCount``; their full
+    history is ``gameState.storyLog`` (what clients restore) or, failing that,
+    the top-level ``storyLog``. Returns the save as it looks after migration.
+    """
+    if save.get("storyLogCount") is not None:
+        return save
+    game_state = save.get("gameState") if isinstance(save.get("gameState"), dict) else {}
+    history = game_state.get("storyLog") or save.get("storyLog") or []
+    player_id, save_slot = save.get("playerId"), save.get("saveSlot", 1)
+    await events.replace(player_id, save_slot, history)
+
+    tail = story_log_tail(history)
+    updates: Dict[str, Any] = {"storyLogCount": len(history), "storyLogLast": story_log_last(history)}
+    if game_state:
+        updates["gameState.storyLog"] = tail
+    # Trim the top-level log server-side; callers may have projected it away.
+    trim = {"storyLog": {"$each": [], "$slice": -STORY_LOG_TAIL}}
+    await saves.update_one({"_id": save["_id"]}, {"$set": updates, "$push": trim})
+
+    migrated = {**save, "storyLogCount": len(history)}
+    if "storyLog" in save:
+        migrated["storyLog"] = story_log_tail(save.get("storyLog"))
+    if game_state:
+        migrated["gameState"] = {**game_state, "storyLog": tail}
+    return migrated
@@ -0,0 +1,200 @@
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .autosave import AUTOSAVE_EVENTS_TAIL, AUTOSAVE_SLOT
+
+# gameState fields a story turn reads; everything else on the save is history or presentation.
+SESSION_STATE_FIELDS = (
+    "turnCount",
+    "storyPhase",
+    "combatEncounters",
+    "combatEscapes",
+    "isAfterCombat",
+    "isFinalPhase",
+    "questProgress",
+    "badges",
+    "cameos",
+)
+# gameState fields a session is rebuilt from (``session_from_save``).
+SESSION_SAVE_FIELDS = (
+    "sessionVersion",
+    "player",
+    "genre",
+    "previousEvents",
+    "activeQuest",
+    "currentLocation",
+    "language",
+    *SESSION_STATE_FIELDS,
+)
+SESSION_PROJECTION = {"_id": 0, **{f"gameState.{field}": 1 for field in SESSION_SAVE_FIELDS}}
+
+
+class StorySessionConflict(RuntimeError):
+    """The client's session version is not the server's; it must resend its full state."""
+
+    def __init__(self, player_id: str, expected: Optional[int], current: Optional[int]):
+        super().__init__(f"Story session for '{player_id}' is at version {current}, not {expected}.")
+        self.expected = expected
+        self.current = current
+
+
+def session_from_save(save: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Rebuild a session from the autosave that backs it, or ``None`` if it has none."""
+    game_state = (save or {}).get("gameState") or {}
+    if game_state.get("sessionVersion") is None or not game_state.get("player"):
+        return None
+    return {
+        "version": int(game_state["sessionVersion"]),
+        "player": game_state.get("player"),
+        "genre": game_state.get("genre"),
+        "events": list(game_state.get("previousEvents") or []),
+        "gameState": {field: game_state[field] for field in SESSION_STATE_FIELDS if field in game_state},
+        "activeQuest": game_state.get("activeQuest"),
+        "currentLocation": game_state.get("currentLocation"),
+        "language": game_state.get("language"),
+    }
+
+
+def carry_session_state(stored_state: Optional[Dict[str, Any]], game_state: Dict[str, Any]) -> Dict[str, Any]:
+    """``game_state`` plus the session fields of ``stored_state`` it does not set itself.
+
+    The client saves the autosave slot after every turn with a gameState that
+    has no ``sessionVersion`` (and nests its counters elsewhere). Carrying the
+    stored session over keeps that save from ending the session, so the next
+    turn can still send a delta. ``game_state`` is returned as-is when the
+    slot has no session.
+    """
+    if not stored_state or stored_state.get("sessionVersion") is None:
+        return game_state
+    carried = {
+        field: stored_state[field]
+        for field in SESSION_SAVE_FIELDS
+        if field in stored_state and (field == "sessionVersion" or field not in game_state)
+    }
+    return {**game_state, **carried}
+
+
+class StorySessionStore:
+    """Server-held story state so ``/api/story`` clients can send deltas.
+
+    A session is keyed by player and save slot. It holds what a turn needs (the
+    last ``events_tail`` story events, the player, scalar game state) and a
+    ``version`` that increases with every turn. Versions are at least the
+    wall-clock time in milliseconds, so two instances that each start a
+    session never hand out the same one.
+
+    The autosave document is the durable copy; this store keeps a hot copy per
+    process in an LRU capped at ``max_sessions``, dropping sessions idle for
+    ``idle_ttl`` seconds. A client whose version disagrees with both copies
+    gets a conflict and resends its full state, which starts a new version.
+    """
+
+    def __init__(
+        self,
+        saves=None,
+        max_sessions: int = 5000,
+        idle_ttl: float = 1800.0,
+        events_tail: int = AUTOSAVE_EVENTS_TAIL,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.saves = saves
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.events_tail = max(1, events_tail)
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._sessions: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+        self._stats = {"hits": 0, "loads": 0, "conflicts": 0, "commits": 0, "evicted": 0}
+
+    def _evict(self) -> None:
+        now = self.clock()
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - session["touched"] < self.idle_ttl:
+                break
+            del self._sessions[key]
+            self._stats["evicted"] += 1
+
+    def _remember(self, key: Tuple[str, int], session: Dict[str, Any]) -> Dict[str, Any]:
+        session["touched"] = self.clock()
+        self._sessions[key] = session
+        self._sessions.move_to_end(key)
+        self._evict()
+        return session
+
+    async def _load(self, player_id: str, save_slot: int) -> Optional[Dict[str, Any]]:
+        if self.saves is None:
+            return None
+        self._stats["loads"] += 1
+        save = await self.saves.find_one({"playerId": player_id, "saveSlot": save_slot}, SESSION_PROJECTION)
+        session = session_from_save(save)
+        if session is not None:
+            self._remember((player_id, save_slot), session)
+        return session
+
+    async def resolve(self, player_id: str, version: int, save_slot: int = AUTOSAVE_SLOT) -> Dict[str, Any]:
+        """Return a copy of the session at ``version``, raising ``StorySessionConflict`` otherwise.
+
+        A stale hot copy (another instance served the last turn) is refreshed
+        from the save before giving up.
+        """
+        key = (player_id, save_slot)
+        self._evict()
+        session = self._sessions.get(key)
+        if session is not None and session["version"] == version:
+            self._stats["hits"] += 1
+            return copy.deepcopy(self._remember(key, session))
+        session = await self._load(player_id, save_slot) or session
+        if session is None or session["version"] != version:
+            self._stats["conflicts"] += 1
+            raise StorySessionConflict(player_id, version, session["version"] if session else None)
+        return copy.deepcopy(session)
+
+    def commit(
+        self,
+        player_id: str,
+        events: List[Dict[str, Any]],
+        player: Dict[str, Any],
+        genre: str,
+        game_state: Dict[str, Any],
+        active_quest: Optional[Dict[str, Any]] = None,
+        current_location: Optional[str] = None,
+        language: Optional[str] = None,
+        save_slot: int = AUTOSAVE_SLOT,
+    ) -> int:
+        """Record the state after a turn and return the new version.
+
+        A turn started from a full client payload also commits here, so a
+        legacy request both works and hands the client a session to continue.
+        """
+        key = (player_id, save_slot)
+        previous = self._sessions.get(key)
+        version = max((previous["version"] if previous else 0) + 1, int(self.wall_clock() * 1000))
+        self._remember(
+            key,
+            {
+                "version": version,
+                "player": player,
+                "genre": genre,
+                "events": list(events)[-self.events_tail:],
+                "gameState": {field: game_state[field] for field in SESSION_STATE_FIELDS if field in game_state},
+                "activeQuest": active_quest,
+                "currentLocation": current_location,
+                "language": language,
+            },
+        )
+        self._stats["commits"] += 1
+        return version
+
+    def forget(self, player_id: str, save_slot: int = AUTOSAVE_SLOT) -> None:
+        self._sessions.pop((player_id, save_slot), None)
+
+    def reset(self) -> None:
+        """Drop every hot session, e.g. when ``saves`` is rebound."""
+        self._sessions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "sessions": len(self._sessions), "maxSessions": self.max_sessions}
@@ -1,15 +1,28 @@
+import asyncio
+import json
 import logging
 import os
 from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import ASCENDING, DESCENDING
 
-from core.scene_orchestrator import SceneOrchestrator, SceneRenderRequest
+from core.scene_archive import SceneArchiver
+from core.scene_events import TERMINAL_SCENE_STATUSES, SceneEventBroker
+from core.scene_gc import SceneGarbageCollector
+from core.scene_metrics import SceneMetrics
+from core.scene_mirror import ASSET_NAME_PATTERN, CONTENT_TYPES, SceneImageMirror, parse_byte_range
+from core.scene_orchestrator import (
+    SceneBatchRenderRequest,
+    SceneOrchestrator,
+    SceneRenderRequest,
+    SceneServiceDraining,
+)
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -18,6 +31,30 @@ mongo_client: Optional[AsyncIOMotorClient] = None
 db = None
 scene_orchestrator: Optional[SceneOrchestrator] = None
 scene_provider_pool: List[Dict[str, Any]] = []
+scene_event_broker = SceneEventBroker()
+scene_metrics = SceneMetrics()
+scene_metrics.register_gauge(
+    "scene_stream_subscribers", "Open scene status streams.", scene_event_broker.subscriber_count
+)
+scene_image_mirror: Optional[SceneImageMirror] = None
+scene_archiver: Optional[SceneArchiver] = None
+scene_gc: Optional[SceneGarbageCollector] = None
+SCENE_STREAM_HEARTBEAT = float(os.getenv("SCENE_STREAM_HEARTBEAT", "15"))
+SCENE_STREAM_MAX_SECONDS = float(os.getenv("SCENE_STREAM_MAX_SECONDS", "300"))
+SCENE_MIRROR_ENABLED = os.getenv("SCENE_MIRROR_ENABLED", "true").lower() in ("1", "true", "yes")
+SCENE_ASSET_CACHE_SECONDS = 31536000
+SCENE_ARCHIVE_AFTER_DAYS = float(os.getenv("SCENE_ARCHIVE_AFTER_DAYS", "30"))
+SCENE_ARCHIVE_TTL_DAYS = float(os.getenv("SCENE_ARCHIVE_TTL_DAYS", "0"))
+SCENE_ARCHIVE_INTERVAL = float(os.getenv("SCENE_ARCHIVE_INTERVAL", "3600"))
+SCENE_GC_ENABLED = os.getenv("SCENE_GC_ENABLED", "false").lower() in ("1", "true", "yes")
+SCENE_GC_DRY_RUN = os.getenv("SCENE_GC_DRY_RUN", "true").lower() in ("1", "true", "yes")
+SCENE_GC_MIN_AGE_HOURS = float(os.getenv("SCENE_GC_MIN_AGE_HOURS", "24"))
+SCENE_GC_BATCH_SIZE = int(os.getenv("SCENE_GC_BATCH_SIZE", "200"))
+SCENE_GC_MAX_DELETES_PER_SECOND = float(os.getenv("SCENE_GC_MAX_DELETES_PER_SECOND", "500"))
+SCENE_GC_INTERVAL = float(os.getenv("SCENE_GC_INTERVAL", "21600"))
+SCENE_DRAIN_TIMEOUT = float(os.getenv("SCENE_DRAIN_TIMEOUT", "25"))
+SCENE_DRAIN_RETRY_AFTER = os.getenv("SCENE_DRAIN_RETRY_AFTER", "5")
+SCENE_DRAIN_TOKEN = os.getenv("SCENE_DRAIN_TOKEN")
 
 
 def _build_provider_pool() -> List[Dict[str, Any]]:
@@ -27,22 +64,49 @@ def _build_provider_pool() -> List[Dict[str, Any]]:
             "api_key": os.getenv("FAL_API_KEY"),
             "model": os.getenv("FAL_MODEL", "fal-ai/flux/dev"),
             "resolution": os.getenv("FAL_RESOLUTION", "landscape_16_9"),
+            "preview_model": os.getenv("FAL_PREVIEW_MODEL"),
+            "preview_resolution": os.getenv("FAL_PREVIEW_RESOLUTION"),
+            "preview_steps": os.getenv("FAL_PREVIEW_STEPS"),
         },
         {
             "label": "fal-2",
             "api_key": os.getenv("FAL_API_KEY_2"),
             "model": os.getenv("FAL_MODEL_2") or os.getenv("FAL_MODEL", "fal-ai/flux/dev"),
             "resolution": os.getenv("FAL_RESOLUTION_2") or os.getenv("FAL_RESOLUTION", "landscape_16_9"),
+            "preview_model": os.getenv("FAL_PREVIEW_MODEL_2") or os.getenv("FAL_PREVIEW_MODEL"),
+            "preview_resolution": os.getenv("FAL_PREVIEW_RESOLUTION_2") or os.getenv("FAL_PREVIEW_RESOLUTION"),
+            "preview_steps": os.getenv("FAL_PREVIEW_STEPS_2") or os.getenv("FAL_PREVIEW_STEPS"),
         },
         {
             "label": "fal-3",
             "api_key": os.getenv("FAL_API_KEY_3"),
             "model": os.getenv("FAL_MODEL_3") or os.getenv("FAL_MODEL", "fal-ai/flux/dev"),
             "resolution": os.getenv("FAL_RESOLUTION_3") or os.getenv("FAL_RESOLUTION", "landscape_16_9"),
+            "preview_model": os.getenv("FAL_PREVIEW_MODEL_3") or os.getenv("FAL_PREVIEW_MODEL"),
+            "preview_resolution": os.getenv("FAL_PREVIEW_RESOLUTION_3") or os.getenv("FAL_PREVIEW_RESOLUTION"),
+            "preview_steps": os.getenv("FAL_PREVIEW_STEPS_3") or os.getenv("FAL_PREVIEW_STEPS"),
         },
     ]
 
     pool: List[Dict[str, Any]] = []
+    provider_types = [item.strip().lower() for item in os.getenv("SCENE_IMAGE_PROVIDERS", "fal").split(",") if item.strip()]
+    if "fake" in provider_types:
+        # Local stand-in for FAL: no keys, no spend; used for development and load tests.
+        for idx in range(max(1, int(os.getenv("SCENE_FAKE_PROVIDERS", "1")))):
+            pool.append(
+                {
+                    "type": "fake",
+                    "label": f"fake-{idx + 1}",
+                    "model": os.getenv("FAL_MODEL", "fal-ai/flux/dev"),
+                    "resolution": os.getenv("FAL_RESOLUTION", "landscape_16_9"),
+                    "latency_ms": float(os.getenv("SCENE_FAKE_LATENCY_MS", "800")),
+                    "jitter_ms": float(os.getenv("SCENE_FAKE_JITTER_MS", "200")),
+                    "failure_rate": float(os.getenv("SCENE_FAKE_FAILURE_RATE", "0")),
+                    "payload_shape": os.getenv("SCENE_FAKE_PAYLOAD", "images"),
+                }
+            )
+        return pool
+
     for conf in fal_configs:
         if conf["api_key"]:
             pool.append(
@@ -52,6 +116,9 @@ def _build_provider_pool() -> List[Dict[str, Any]]:
                     "api_key": conf["api_key"],
                     "model": conf["model"],
                     "resolution": conf["resolution"],
+                    "preview_model": conf["preview_model"],
+                    "preview_resolution": conf["preview_resolution"],
+                    "preview_steps": int(conf["preview_steps"]) if conf["preview_steps"] else None,
                 }
             )
         if len(pool) >= 3:
@@ -62,7 +129,7 @@ def _build_provider_pool() -> List[Dict[str, Any]]:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global mongo_client, db, scene_orchestrator, scene_provider_pool
+    global mongo_client, db, scene_orchestrator, scene_provider_pool, scene_image_mirror, scene_archiver, scene_gc
     mongo_uri = os.getenv("MONGODB_URI")
     if not mongo_uri:
         logger.error("MONGODB_URI not configured for scene service.")
@@ -72,18 +139,87 @@ async def lifespan(app: FastAPI):
     db = mongo_client.ai_dungeon_master
     await db.command("ping")
     await db.scenes.create_index([("sceneId", ASCENDING)], unique=True)
-    await db.scenes.create_index([("playerId", ASCENDING), ("createdAt", DESCENDING)])
+    # Also serves (playerId, createdAt desc) lookups, which only need its prefix
+    await db.scenes.create_index([("playerId", ASCENDING), ("createdAt", DESCENDING), ("sceneId", DESCENDING)])
+    try:
+        await db.scenes.drop_index("playerId_1_createdAt_-1")
+    except Exception:
+        pass  # Already dropped, or never created on this deployment
+    await db.scene_contexts.create_index([("contextKey", ASCENDING)], unique=True)
 
     # Load provider pool once at startup
     scene_provider_pool = _build_provider_pool()
     if not scene_provider_pool:
-        raise RuntimeError("No FAL image provider configured. Set FAL_API_KEY (and optional _2/_3).")
+        raise RuntimeError(
+            "No FAL image provider configured. Set FAL_API_KEY (and optional _2/_3), "
+            "or SCENE_IMAGE_PROVIDERS=fake for the local stand-in."
+        )
 
-    scene_orchestrator = SceneOrchestrator(db, provider_pool=scene_provider_pool)
+    if SCENE_MIRROR_ENABLED:
+        scene_image_mirror = SceneImageMirror(
+            os.getenv("SCENE_MIRROR_DIR", os.path.join(os.path.dirname(__file__), "scene_assets")),
+            public_base_url=os.getenv("SCENE_PUBLIC_URL", "http://localhost:8100"),
+            thumb_width=int(os.getenv("SCENE_MIRROR_THUMB_WIDTH", "320")),
+            mid_width=int(os.getenv("SCENE_MIRROR_MID_WIDTH", "960")),
+            quality=int(os.getenv("SCENE_MIRROR_QUALITY", "80")),
+            workers=int(os.getenv("SCENE_MIRROR_WORKERS", "2")),
+        )
+        if not scene_image_mirror.available:
+            logger.warning("Pillow not installed; scene images will not be mirrored locally.")
+
+    scene_orchestrator = SceneOrchestrator(
+        db,
+        provider_pool=scene_provider_pool,
+        event_broker=scene_event_broker,
+        image_mirror=scene_image_mirror,
+        metrics=scene_metrics,
+    )
+    # Resume durable scene retries left over from a previous run
+    await scene_orchestrator.start_background_workers()
+
+    if SCENE_ARCHIVE_AFTER_DAYS > 0:
+        scene_archiver = SceneArchiver(
+            db.scenes,
+            db.scene_archive,
+            archive_after_days=SCENE_ARCHIVE_AFTER_DAYS,
+            archive_ttl_days=SCENE_ARCHIVE_TTL_DAYS,
+            interval=SCENE_ARCHIVE_INTERVAL,
+        )
+        await scene_archiver.ensure_indexes()
+        scene_archiver.start()
+
+    if SCENE_GC_ENABLED:
+        scene_gc = SceneGarbageCollector(
+            db.scenes,
+            db.saves,
+            archive=db.scene_archive,
+            story_events=db.story_events,
+            image_mirror=scene_image_mirror,
+            min_age_hours=SCENE_GC_MIN_AGE_HOURS,
+            batch_size=SCENE_GC_BATCH_SIZE,
+            max_deletes_per_second=SCENE_GC_MAX_DELETES_PER_SECOND,
+            interval=SCENE_GC_INTERVAL,
+            dry_run=SCENE_GC_DRY_RUN,
+        )
+        await scene_gc.ensure_indexes()
+        scene_gc.start()
 
     try:
         yield
     finally:
+        if scene_archiver is not None:
+            await scene_archiver.stop()
+            scene_archiver = None
+        if scene_gc is not None:
+            await scene_gc.stop()
+            scene_gc = None
+        if scene_orchestrator is not None:
+            # Finish or hand off in-flight renders before the mirror and Mongo go away.
+            await scene_orchestrator.drain(SCENE_DRAIN_TIMEOUT)
+            await scene_orchestrator.stop_background_workers()
+        if scene_image_mirror is not None:
+            await scene_image_mirror.aclose()
+            scene_image_mirror = None
         if mongo_client:
             mongo_client.close()
         scene_orchestrator = None
@@ -109,13 +245,32 @@ app.add_middleware(
 )
 
 
+def _draining_error(err: Optional[Exception] = None) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(err) if err else "Scene service is draining.",
+        headers={"Retry-After": SCENE_DRAIN_RETRY_AFTER},
+    )
+
+
+def _apply_server_timing(result: Dict[str, Any], response: Response) -> Dict[str, Any]:
+    timings = result.pop("timings", None)
+    if timings:
+        response.headers["Server-Timing"] = (
+            f"queue;dur={timings.get('queueWaitMs', 0)}, total;dur={timings.get('totalMs', 0)}"
+        )
+    return result
+
+
 @app.post("/api/scene/render")
-async def render_scene(request: SceneRenderRequest):
+async def render_scene(request: SceneRenderRequest, response: Response):
     if scene_orchestrator is None:
         raise HTTPException(status_code=503, detail="Scene orchestrator unavailable.")
     try:
         result = await scene_orchestrator.render_scene(request)
-        return result
+        return _apply_server_timing(result, response)
+    except SceneServiceDraining as draining:
+        raise _draining_error(draining) from draining
     except ValueError as value_error:
         raise HTTPException(status_code=400, detail=str(value_error)) from value_error
     except Exception as err:
@@ -123,6 +278,24 @@ async def render_scene(request: SceneRenderRequest):
         raise HTTPException(status_code=500, detail="Failed to render scene.") from err
 
 
+@app.post("/api/scene/render/batch")
+async def render_scene_batch(request: SceneBatchRenderRequest):
+    if scene_orchestrator is None:
+        raise HTTPException(status_code=503, detail="Scene orchestrator unavailable.")
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="At least one scene request is required.")
+    try:
+        results = await scene_orchestrator.render_scene_batch(request.requests)
+        return {"results": results}
+    except SceneServiceDraining as draining:
+        raise _draining_error(draining) from draining
+    except ValueError as value_error:
+        raise HTTPException(status_code=400, detail=str(value_error)) from value_error
+    except Exception as err:
+        logger.error(f"Batch scene render failed: {err}")
+        raise HTTPException(status_code=500, detail="Failed to render scene batch.") from err
+
+
 @app.get("/api/scene/status/{scene_id}")
 async def get_scene(scene_id: str):
     if scene_orchestrator is None:
@@ -133,20 +306,166 @@ async def get_scene(scene_id: str):
     return scene_doc
 
 
+def _format_sse(event: Dict[str, Any]) -> str:
+    return f"event: scene\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@app.get("/api/scene/history/{player_id}")
+async def get_scene_history(
+    player_id: str,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None),
+    turnFrom: Optional[int] = Query(default=None, ge=0),
+    turnTo: Optional[int] = Query(default=None, ge=0),
+):
+    if scene_orchestrator is None:
+        raise HTTPException(status_code=503, detail="Scene orchestrator unavailable.")
+    try:
+        return await scene_orchestrator.get_scene_history(
+            player_id, limit=limit, cursor=cursor, turn_from=turnFrom, turn_to=turnTo
+        )
+    except ValueError as value_error:
+        raise HTTPException(status_code=400, detail=str(value_error)) from value_error
+
+
+@app.get("/api/scene/stream/{scene_id}")
+async def stream_scene(scene_id: str, request: Request):
+    """Server-sent events stream of status transitions for one scene.
+
+    The current state is sent first, then every transition published by the
+    orchestrator until the scene reaches a terminal status. Clients fall back
+    to polling /api/scene/status when the stream is unavailable.
+    """
+    if scene_orchestrator is None:
+        raise HTTPException(status_code=503, detail="Scene orchestrator unavailable.")
+
+    # Subscribe before reading the current state so no transition is missed.
+    queue = scene_event_broker.subscribe(scene_id)
+    try:
+        scene_doc = await scene_orchestrator.get_scene(scene_id)
+    except Exception:
+        scene_event_broker.unsubscribe(scene_id, queue)
+        raise
+    if not scene_doc:
+        scene_event_broker.unsubscribe(scene_id, queue)
+        raise HTTPException(status_code=404, detail="Scene not found.")
+
+    async def event_source():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SCENE_STREAM_MAX_SECONDS
+        try:
+            yield _format_sse(scene_doc)
+            if scene_doc.get("sceneStatus") in TERMINAL_SCENE_STATUSES:
+                return
+            while loop.time() < deadline:
+                if await request.is_disconnected():
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SCENE_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_sse(event)
+                if event.get("sceneStatus") in TERMINAL_SCENE_STATUSES:
+                    return
+        finally:
+            scene_event_broker.unsubscribe(scene_id, queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/scene/assets/{asset_name}")
+async def get_scene_asset(asset_name: str, request: Request):
+    if scene_image_mirror is None:
+        raise HTTPException(status_code=503, detail="Scene image mirror unavailable.")
+    match = ASSET_NAME_PATTERN.match(asset_name)
+    asset_path = scene_image_mirror.asset_path(asset_name)
+    if not match or not asset_path or not os.path.exists(asset_path):
+        raise HTTPException(status_code=404, detail="Scene asset not found.")
+
+    # Names are content hashes, so the name itself is a strong validator.
+    etag = f'"{asset_name.rsplit(".", 1)[0]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={SCENE_ASSET_CACHE_SECONDS}, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    size = os.path.getsize(asset_path)
+    media_type = CONTENT_TYPES[match.group("ext")]
+    if_range = request.headers.get("if-range")
+    range_header = request.headers.get("range") if not if_range or if_range == etag else None
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    start, end = byte_range if byte_range else (0, size - 1)
+    length = end - start + 1
+
+    def _read() -> bytes:
+        with open(asset_path, "rb") as handle:
+            handle.seek(start)
+            return handle.read(length)
+
+    body = await asyncio.to_thread(_read)
+    if byte_range is None:
+        return Response(content=body, media_type=media_type, headers=headers)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(content=body, status_code=206, media_type=media_type, headers=headers)
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=scene_metrics.render(), media_type=SceneMetrics.CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health_check():
     info = scene_orchestrator.get_provider_snapshot() if scene_orchestrator else {}
-    return {"status": "ok", **info}
+    draining = bool(scene_orchestrator and scene_orchestrator.draining)
+    payload = {
+        "status": "draining" if draining else "ok",
+        "streamSubscribers": scene_event_broker.subscriber_count(),
+        "sceneArchive": scene_archiver.get_stats() if scene_archiver else None,
+        "sceneGc": scene_gc.get_stats() if scene_gc else None,
+        **info,
+    }
+    if draining:
+        # Failing health takes the instance out of the load balancer rotation.
+        return JSONResponse(status_code=503, content=payload)
+    return payload
+
+
+@app.post("/api/scene/drain")
+async def drain_scene_service(x_drain_token: Optional[str] = Header(default=None)):
+    """Start draining ahead of shutdown (e.g. from a preStop hook)."""
+    if not SCENE_DRAIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found.")
+    if x_drain_token != SCENE_DRAIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid drain token.")
+    if scene_orchestrator is None:
+        raise HTTPException(status_code=503, detail="Scene orchestrator unavailable.")
+    return await scene_orchestrator.drain(SCENE_DRAIN_TIMEOUT)
 
 
 @app.post("/api/scene/rerender/{scene_id}")
-async def rerender_scene(scene_id: str):
+async def rerender_scene(scene_id: str, response: Response):
     if scene_orchestrator is None:
         raise HTTPException(status_code=503, detail="Scene orchestrator unavailable.")
-    result = await scene_orchestrator.rerender_scene(scene_id)
+    try:
+        result = await scene_orchestrator.rerender_scene(scene_id)
+    except SceneServiceDraining as draining:
+        raise _draining_error(draining) from draining
     if not result:
         raise HTTPException(status_code=404, detail="Scene context not found.")
-    return result
+    return _apply_server_timing(result, response)
 
 
 @app.get("/api/provider")
@@ -0,0 +1,48 @@
+"""Convert v1 saves to schema v2 (cold gameState fields compressed into coldState).
+
+Saves are migrated lazily when loaded; this migrates the rest in one pass.
+Run from the backend directory:
+
+    python -m scripts.migrate_save_schema [--dry-run] [--batch-size 200]
+"""
+import argparse
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+try:
+    from backend.core.save_codec import migrate_save_documents
+except ImportError:  # Fallback when running from the backend directory
+    from core.save_codec import migrate_save_documents
+
+
+async def _main(batch_size: int, dry_run: bool) -> None:
+    load_dotenv()
+    mongo_uri = os.getenv("MONGODB_URI")
+    if not mongo_uri:
+        raise SystemExit("MONGODB_URI is required.")
+    client = AsyncIOMotorClient(mongo_uri)
+    try:
+        stats = await migrate_save_documents(client.ai_dungeon_master, batch_size=batch_size, dry_run=dry_run)
+    finally:
+        client.close()
+
+    saved = stats["bytesBefore"] - stats["bytesAfter"]
+    ratio = (saved / stats["bytesBefore"] * 100) if stats["bytesBefore"] else 0.0
+    mode = "would migrate" if dry_run else "migrated"
+    print(f"scanned {stats['scanned']}, {mode} {stats['migrated']}, skipped {stats['skipped']}")
+    print(f"bytes {stats['bytesBefore']} -> {stats['bytesAfter']} ({ratio:.1f}% smaller)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate saves to schema v2.")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
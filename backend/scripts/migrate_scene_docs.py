@@ -0,0 +1,47 @@
+"""Rewrite legacy scene documents into the compact v2 schema.
+
+Run from the backend directory:
+
+    python -m scripts.migrate_scene_docs [--dry-run] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+try:
+    from backend.core.scene_archive import migrate_scene_documents
+except ImportError:  # Fallback when running from the backend directory
+    from core.scene_archive import migrate_scene_documents
+
+
+async def _main(batch_size: int, dry_run: bool) -> None:
+    load_dotenv()
+    mongo_uri = os.getenv("MONGODB_URI")
+    if not mongo_uri:
+        raise SystemExit("MONGODB_URI is required.")
+    client = AsyncIOMotorClient(mongo_uri)
+    try:
+        stats = await migrate_scene_documents(client.ai_dungeon_master, batch_size=batch_size, dry_run=dry_run)
+    finally:
+        client.close()
+
+    saved = stats["bytesBefore"] - stats["bytesAfter"]
+    ratio = (saved / stats["bytesBefore"] * 100) if stats["bytesBefore"] else 0.0
+    mode = "would migrate" if dry_run else "migrated"
+    print(f"scanned {stats['scanned']}, {mode} {stats['migrated']}, skipped {stats['skipped']}")
+    print(f"bytes {stats['bytesBefore']} -> {stats['bytesAfter']} ({ratio:.1f}% smaller)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact legacy scene documents.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Move inline save history into the story_events collection.
+
+Saves are migrated lazily when loaded or autosaved; this migrates the rest in
+one pass. Run from the backend directory:
+
+    python -m scripts.migrate_story_events [--dry-run] [--batch-size 200]
+"""
+import argparse
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+try:
+    from backend.core.story_events import StoryEventStore, migrate_save_story_log
+except ImportError:  # Fallback when running from the backend directory
+    from core.story_events import StoryEventStore, migrate_save_story_log
+
+
+async def _main(batch_size: int, dry_run: bool) -> None:
+    load_dotenv()
+    mongo_uri = os.getenv("MONGODB_URI")
+    if not mongo_uri:
+        raise SystemExit("MONGODB_URI is required.")
+    client = AsyncIOMotorClient(mongo_uri)
+    db = client.ai_dungeon_master
+    events = StoryEventStore(db.story_events)
+    migrated = entries = 0
+    try:
+        if not dry_run:
+            await events.ensure_indexes()
+        cursor = db.saves.find({"storyLogCount": {"$exists": False}}).batch_size(batch_size)
+        async for save in cursor:
+            game_state = save.get("gameState") if isinstance(save.get("gameState"), dict) else {}
+            entries += len(game_state.get("storyLog") or save.get("storyLog") or [])
+            migrated += 1
+            if not dry_run:
+                await migrate_save_story_log(db.saves, events, save)
+    finally:
+        client.close()
+
+    mode = "would migrate" if dry_run else "migrated"
+    print(f"{mode} {migrated} saves, {entries} story entries")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move save story logs into story_events.")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -25,7 +25,7 @@ from dotenv import load_dotenv
 from bson import ObjectId
 import logging
 from contextlib import asynccontextmanager
-from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
 from google.oauth2 import id_token as google_id_token
 from google.auth.transport import requests as google_requests
 import asyncio
@@ -33,6 +33,53 @@ import time
 import random
 import httpx
 
+try:
+    from .core.autosave import (
+        AUTOSAVE_EVENTS_TAIL,
+        AUTOSAVE_SLOT,
+        build_combat_turn_update,
+        queue_story_autosave,
+        write_story_autosave,
+    )
+    from .core.hot_saves import HotSaveCache
+    from .core.repositories import STORAGE_BACKEND_MEMORY, STORAGE_BACKEND_MONGO, Repositories
+    from .core.save_codec import SAVE_SCHEMA_VERSION, encode_cold_state, expand_game_state, migrate_save_schema, split_game_state
+    from .core.save_snapshots import autosave_snapshot_due
+    from .core.save_summary import SAVE_LIST_PROJECTION, build_save_summary, summary_from_save
+    from .core.scene_client import SceneServiceClient
+    from .core.story_events import (
+        StoryEventStore,
+        migrate_save_story_log,
+        story_cursor,
+        story_log_appendix,
+        story_log_last,
+        story_log_tail,
+    )
+    from .core.story_session import SESSION_PROJECTION, StorySessionConflict, StorySessionStore, carry_session_state
+except ImportError:  # Fallback when running as script
+    from core.autosave import (
+        AUTOSAVE_EVENTS_TAIL,
+        AUTOSAVE_SLOT,
+        build_combat_turn_update,
+        queue_story_autosave,
+        write_story_autosave,
+    )
+    from core.hot_saves import HotSaveCache
+    from core.repositories import STORAGE_BACKEND_MEMORY, STORAGE_BACKEND_MONGO, Repositories
+    from core.save_codec import SAVE_SCHEMA_VERSION, encode_cold_state, expand_game_state, migrate_save_schema, split_game_state
+    from core.save_snapshots import autosave_snapshot_due
+    from core.save_summary import SAVE_LIST_PROJECTION, build_save_summary, summary_from_save
+    from core.scene_client import SceneServiceClient
+    from core.story_events import (
+        StoryEventStore,
+        migrate_save_story_log,
+        story_cursor,
+        story_log_appendix,
+        story_log_last,
+        story_log_tail,
+    )
+    from core.story_session import SESSION_PROJECTION, StorySessionConflict, StorySessionStore, carry_session_state
+
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -43,46 +90,84 @@ load_dotenv()
 # --- Application Lifespan (for MongoDB connection) ---
 mongo_client: Optional[AsyncIOMotorClient] = None
 db: Optional[Any] = None
+repos: Optional[Repositories] = None
+# "memory" runs without MongoDB: state lives in-process and is lost on restart
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", STORAGE_BACKEND_MONGO).strip().lower()
+scene_client: Optional[SceneServiceClient] = None
+story_events: Optional[StoryEventStore] = None
+hot_saves = HotSaveCache(
+    mode=os.getenv("HOT_SAVE_MODE", "write-behind"),
+    flush_interval=float(os.getenv("HOT_SAVE_FLUSH_INTERVAL", "2")),
+    max_pending=int(os.getenv("HOT_SAVE_MAX_PENDING", "20")),
+    idle_ttl=float(os.getenv("HOT_SAVE_IDLE_TTL", "600")),
+    max_players=int(os.getenv("HOT_SAVE_MAX_PLAYERS", "5000")),
+    batch_size=int(os.getenv("HOT_SAVE_BATCH_SIZE", "500")),
+)
+story_sessions = StorySessionStore(
+    max_sessions=int(os.getenv("STORY_SESSION_MAX", "5000")),
+    idle_ttl=float(os.getenv("STORY_SESSION_IDLE_TTL", "1800")),
+)
+
+def bind_storage(database: Optional[Any]) -> Optional[Repositories]:
+    """Point the service (repositories, story events, caches) at a database handle.
+
+    ``database`` is a Motor database or a ``MemoryDatabase``; ``None`` unbinds.
+    """
+    global db, repos, story_events
+    db = database
+    repos = Repositories(database) if database is not None else None
+    story_events = StoryEventStore(database.story_events) if database is not None else None
+    # Hot copies belong to the previous database; sessions missing from memory
+    # are rebuilt from the autosave
+    story_sessions.reset()
+    hot_saves.reset()
+    story_sessions.saves = repos.saves.collection if repos else None
+    hot_saves.saves = repos.saves.collection if repos else None
+    hot_saves.events = story_events
+    return repos
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Connect to MongoDB
-    global mongo_client, db
-    mongo_uri = os.getenv("MONGODB_URI")
-    if not mongo_uri:
-        logger.error("MONGODB_URI not found in environment variables.")
-        raise RuntimeError("MONGODB_URI is required.")
-    try:
-        mongo_client = AsyncIOMotorClient(mongo_uri)
-        db = mongo_client.ai_dungeon_master
-        logger.info("Successfully connected to MongoDB.")
-        # Optional: Test connection
-        await db.command('ping')
-        logger.info("MongoDB ping successful.")
-        # Ensure indexes for saves, players, and cameo invites
+    # Startup: Connect to MongoDB (or the in-memory store)
+    global mongo_client, scene_client
+    if STORAGE_BACKEND == STORAGE_BACKEND_MEMORY:
+        bind_storage(Repositories.in_memory().db)
+        logger.warning("STORAGE_BACKEND=memory: saves and players are kept in-process only.")
+    else:
+        mongo_uri = os.getenv("MONGODB_URI")
+        if not mongo_uri:
+            logger.error("MONGODB_URI not found in environment variables.")
+            raise RuntimeError("MONGODB_URI is required.")
         try:
-            await db.saves.create_index([("playerId", ASCENDING), ("saveSlot", ASCENDING)], unique=True)
-            await db.saves.create_index([("playerId", ASCENDING), ("updatedAt", DESCENDING)])
-            await db.saves.create_index([("deletedAt", ASCENDING)])
-            await db.players.create_index([("name", ASCENDING)], unique=True)
-            await db.players.create_index([("googleId", ASCENDING)], unique=True, sparse=True)
-            await db.cameo_invites.create_index("code", unique=True)
-            await db.cameo_invites.create_index("expiresAt", expireAfterSeconds=0)
-            await db.cameo_invites.create_index([("playerId", ASCENDING)])
-            await db.puzzle_arcade_progress.create_index([("playerId", ASCENDING), ("puzzleId", ASCENDING)], unique=True)
-            await db.puzzle_arcade_progress.create_index([("puzzleId", ASCENDING), ("highestScore", DESCENDING)])
-            await db.scenes.create_index([("sceneId", ASCENDING)], unique=True)
-            await db.scenes.create_index([("playerId", ASCENDING), ("createdAt", DESCENDING)])
-            logger.info("MongoDB indexes ensured.")
-        except Exception as idx_err:
-            logger.warning(f"Failed to ensure MongoDB indexes: {idx_err}")
-    except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
-        raise RuntimeError(f"Failed to connect to MongoDB: {e}")
+            mongo_client = AsyncIOMotorClient(mongo_uri)
+            bind_storage(mongo_client.ai_dungeon_master)
+            logger.info("Successfully connected to MongoDB.")
+            # Optional: Test connection
+            await db.command('ping')
+            logger.info("MongoDB ping successful.")
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            raise RuntimeError(f"Failed to connect to MongoDB: {e}")
+    # Ensure indexes for saves, players, cameo invites and the rest
+    try:
+        await repos.ensure_indexes()
+        await story_events.ensure_indexes()
+        logger.info("MongoDB indexes ensured.")
+    except Exception as idx_err:
+        logger.warning(f"Failed to ensure MongoDB indexes: {idx_err}")
+
+    # Shared keep-alive client for story -> scene service calls
+    scene_client = SceneServiceClient(SCENE_SERVICE_URL, read_timeout=SCENE_SERVICE_TIMEOUT)
+    hot_saves.start()
 
     yield # Application runs here
 
-    # Shutdown: Disconnect from MongoDB
+    # Shutdown: write queued autosaves, close the scene client and disconnect from MongoDB
+    await hot_saves.stop()
+    if scene_client:
+        await scene_client.aclose()
+        scene_client = None
     if mongo_client:
         mongo_client.close()
         logger.info("Closed MongoDB connection.")
@@ -362,17 +447,10 @@ async def request_scene_generation(scene_payload: Dict[str, Any]) -> Optional[Di
     """Send a scene render request to the dedicated scene service."""
     if not scene_payload.get("storyText"):
         return None
-    url = f"{SCENE_SERVICE_URL.rstrip('/')}/api/scene/render"
-    try:
-        async with httpx.AsyncClient(timeout=SCENE_SERVICE_TIMEOUT) as client:
-            response = await client.post(url, json=scene_payload)
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as http_error:
-        logger.warning(f"Scene service returned error {http_error.response.status_code}: {http_error.response.text}")
-    except Exception as scene_error:
-        logger.warning(f"Scene service request failed: {scene_error}")
-    return None
+    if scene_client is None:
+        logger.warning("Scene service client not initialized; skipping scene render.")
+        return None
+    return await scene_client.render_scene(scene_payload)
 
 if gemini_story_key_order:
     if not _configure_next_available_key():
@@ -460,6 +538,21 @@ class StoryRequest(BaseModel):
     currentLocation: Optional[str] = None  # Current location ID
     language: Optional[str] = "en"  # Language code: 'en', 'kn', 'te'
 
+class StoryTurnRequest(StoryRequest):
+    """Body of /api/story: the legacy full payload, or a delta against a server-held session.
+
+    With ``sessionVersion`` (the value returned by the previous turn) the client
+    may omit ``previousEvents``, ``player`` and ``genre``; it sends only events it
+    added locally since then in ``newEvents``, and any ``gameState`` fields that
+    changed. Requests that carry ``previousEvents`` are handled as before.
+    """
+    player: Optional[Player] = None
+    genre: Optional[str] = None
+    previousEvents: Optional[List[StoryEvent]] = None
+    playerId: Optional[str] = None  # Session key when no player payload is sent
+    sessionVersion: Optional[int] = None
+    newEvents: Optional[List[StoryEvent]] = None
+
 class CombatRequest(BaseModel):
     player: Player
     enemy: Enemy
@@ -467,6 +560,7 @@ class CombatRequest(BaseModel):
     itemId: Optional[str] = None
     abilityId: Optional[str] = None
     badgeEvents: Optional[List[str]] = None
+    badges: Optional[List[Dict[str, Any]]] = None  # Client's current badges; avoids reading the save
 
 class SaveData(BaseModel):
     playerId: str = Field(..., description="Identifier for the player (e.g., user ID or player name)")
@@ -758,30 +852,32 @@ async def resolve_badges(
     existing_badges: Optional[List[Dict[str, Any]]],
     triggered_badges: Set[str],
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    """Merge triggered badge IDs into the player's badge collection."""
+    """Merge triggered badge IDs into the player's badge collection.
 
-    badges = _sanitize_badge_list(existing_badges)
+    The stored badges (the cached autosave) are the record: once earned, a
+    badge stays with the server's ``earnedAt``. ``existing_badges`` from the
+    request can only add badges the server has not recorded yet, and only
+    ones defined in ``BADGE_DEFINITIONS``.
+    """
 
-    if badges is None:
-        badges = []
-    if db is not None:
-            try:
-                snapshot = await db.saves.find_one(
-                    {"playerId": player_name, "saveSlot": 1},
-                    {"badges": 1},
-                )
-                if snapshot and snapshot.get("badges"):
-                    badges = _sanitize_badge_list(snapshot.get("badges")) or []
-            except Exception as e:
-                logger.warning(f"Failed to fetch badges for {player_name}: {e}")
+    badges: List[Dict[str, Any]] = []
+    try:
+        snapshot = await hot_saves.get(player_name)
+        badges = _sanitize_badge_list(snapshot.get("badges")) or []
+    except Exception as e:
+        logger.warning(f"Failed to fetch badges for {player_name}: {e}")
+
+    stored_ids = {badge["id"] for badge in badges}
+    for badge in _sanitize_badge_list(existing_badges) or []:
+        if badge["id"] in BADGE_DEFINITIONS and badge["id"] not in stored_ids:
+            badges.append(badge)
+            stored_ids.add(badge["id"])
 
-    badges = badges or []
-    existing_ids = {badge.get("id") for badge in badges}
     new_badges: List[Dict[str, Any]] = []
 
     for badge_id in triggered_badges:
         badge_id = str(badge_id).strip()
-        if not badge_id or badge_id in existing_ids:
+        if not badge_id or badge_id in stored_ids:
             continue
         definition = BADGE_DEFINITIONS.get(badge_id)
         if not definition:
@@ -797,7 +893,7 @@ async def resolve_badges(
         }
         badges.append(entry)
         new_badges.append(entry)
-        existing_ids.add(badge_id)
+        stored_ids.add(badge_id)
         logger.info(f"Badge unlocked for {player_name}: {badge_id}")
 
     return badges, new_badges
@@ -850,8 +946,7 @@ async def upsert_arcade_progress(
         return {}
 
     now = datetime.datetime.now(datetime.timezone.utc)
-    progress_collection = db.puzzle_arcade_progress
-    existing = await progress_collection.find_one({"playerId": player_id, "puzzleId": puzzle_id})
+    existing = await repos.puzzle_progress.get(player_id, puzzle_id)
 
     plays = (existing or {}).get("plays", 0) + 1
     wins = (existing or {}).get("wins", 0) + (1 if correct else 0)
@@ -880,11 +975,7 @@ async def upsert_arcade_progress(
         },
     }
 
-    await progress_collection.update_one(
-        {"playerId": player_id, "puzzleId": puzzle_id},
-        {"$set": record},
-        upsert=True,
-    )
+    await repos.puzzle_progress.put(player_id, puzzle_id, record)
 
     return record
 
@@ -892,9 +983,8 @@ async def upsert_arcade_progress(
 async def get_arcade_progress_map(player_id: str) -> Dict[str, Dict[str, Any]]:
     if db is None:
         return {}
-    cursor = db.puzzle_arcade_progress.find({"playerId": player_id})
     progress: Dict[str, Dict[str, Any]] = {}
-    async for doc in cursor:
+    for doc in await repos.puzzle_progress.for_player(player_id):
         progress[doc.get("puzzleId")] = doc
     return progress
 
@@ -902,11 +992,8 @@ async def get_arcade_progress_map(player_id: str) -> Dict[str, Dict[str, Any]]:
 async def fetch_arcade_leaderboard(puzzle_id: str, limit: int = 5) -> List[Dict[str, Any]]:
     if db is None:
         return []
-    cursor = db.puzzle_arcade_progress.find({"puzzleId": puzzle_id}).sort(
-        [("highestScore", DESCENDING), ("bestTime", ASCENDING)]
-    ).limit(limit)
     leaderboard: List[Dict[str, Any]] = []
-    async for doc in cursor:
+    for doc in await repos.puzzle_progress.leaderboard(puzzle_id, limit):
         leaderboard.append(
             {
                 "playerId": doc.get("playerId"),
@@ -923,7 +1010,7 @@ async def player_completed_all_puzzles(player_id: str) -> bool:
     total_required = len(PUZZLE_ARCADE_CATALOG)
     if total_required == 0:
         return False
-    wins = await db.puzzle_arcade_progress.count_documents({"playerId": player_id, "wins": {"$gt": 0}})
+    wins = await repos.puzzle_progress.count_won(player_id)
     return wins >= total_required
 
 
@@ -1884,51 +1971,6 @@ async def process_combat_with_ai(player: Player, enemy: Enemy, action: str, item
             scale_factor = 1 + (dungeon_level - 1) * 0.3
             result["rewards"]["xp"] = int(result["rewards"].get("xp", 0) * scale_factor)
             result["rewards"]["gold"] = int(result["rewards"].get("gold", 0) * scale_factor)
-        
-        # --- Auto-save a combat turn (best-effort) ---
-        try:
-            if db is not None:
-                now = datetime.datetime.now(datetime.timezone.utc)
-                combat_entry = {
-                    "t": now.isoformat(),
-                    "text": "Combat turn processed",
-                    "type": "combat",
-                    "meta": {
-                        "action": action,
-                        "playerDamage": result.get("playerDamage"),
-                        "enemyDamage": result.get("enemyDamage"),
-                        "victory": result.get("victory"),
-                        "defeat": result.get("defeat"),
-                    },
-                }
-                existing = await db.saves.find_one({"playerId": player.name, "saveSlot": 1})
-                existing_log = existing.get("storyLog", []) if existing else []
-                story_log = existing_log + [combat_entry]
-                next_state = (existing or {}).get("gameState", {})
-                next_state.update({
-                    "player": player.model_dump(by_alias=True),
-                })
-                await db.saves.update_one(
-                    {"playerId": player.name, "saveSlot": 1},
-                    {
-                        "$setOnInsert": {
-                            "createdAt": now,
-                            "schemaVersion": 1,
-                        },
-                        "$set": {
-                            "playerId": player.name,
-                            "saveSlot": 1,
-                            "saveName": "AutoSave",
-                            "gameState": next_state,
-                            "storyLog": story_log,
-                            "updatedAt": now,
-                            "deletedAt": None,
-                        },
-                    },
-                    upsert=True,
-                )
-        except Exception as autosave_err:
-            logger.warning(f"Autosave failed in /api/combat: {autosave_err}")
 
         return result
     except Exception as e:
@@ -2086,16 +2128,16 @@ async def api_submit_arcade_puzzle(request: PuzzleSubmitRequest):
         )
         if db is not None:
             now = datetime.datetime.now(datetime.timezone.utc)
-            await db.saves.update_one(
-                {"playerId": request.playerId, "saveSlot": 1},
+            await hot_saves.write(
+                request.playerId,
                 {
                     "$set": {
                         "badges": badges,
+                        "summary.badgesCount": len(badges),
                         "updatedAt": now,
                         "deletedAt": None,
                     }
                 },
-                upsert=True,
             )
 
     leaderboard_raw = await fetch_arcade_leaderboard(request.puzzleId)
@@ -2211,9 +2253,56 @@ async def api_initialize_game(request: StoryRequest):
             "choices": ["Explore", "Investigate", "Proceed"]
         }
 
+async def _resolve_story_turn(request: StoryTurnRequest) -> StoryTurnRequest:
+    """Fill a session-delta request in from the server-held session.
+
+    Full-payload requests pass through unchanged. A delta whose
+    ``sessionVersion`` is not the session's gets a 409 carrying the current
+    version; the client then resends its full state.
+    """
+    if request.previousEvents is not None:
+        if request.player is None or not request.genre:
+            raise HTTPException(status_code=422, detail="player and genre are required with previousEvents.")
+        return request
+    if request.sessionVersion is None:
+        raise HTTPException(status_code=422, detail="Send previousEvents, or the sessionVersion of the previous turn.")
+    player_id = request.player.name if request.player else request.playerId
+    if not player_id:
+        raise HTTPException(status_code=422, detail="playerId is required when player is omitted.")
+    try:
+        try:
+            session = await story_sessions.resolve(player_id, request.sessionVersion)
+        except StorySessionConflict:
+            # An evicted session reloads from the autosave; queued story turns must land first
+            if not hot_saves.has_pending(player_id):
+                raise
+            await hot_saves.flush_player(player_id)
+            session = await story_sessions.resolve(player_id, request.sessionVersion)
+    except StorySessionConflict as conflict:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "session_conflict", "message": str(conflict), "sessionVersion": conflict.current},
+        )
+
+    sent = request.model_fields_set
+    events = [StoryEvent.model_validate(event) for event in session["events"]]
+    return request.model_copy(
+        update={
+            "player": request.player or Player.model_validate(session["player"]),
+            "genre": request.genre or session["genre"],
+            "previousEvents": events + list(request.newEvents or []),
+            "gameState": {**session["gameState"], **(request.gameState or {})},
+            "activeQuest": request.activeQuest if "activeQuest" in sent else session["activeQuest"],
+            "currentLocation": request.currentLocation if "currentLocation" in sent else session["currentLocation"],
+            "language": request.language if "language" in sent else (session["language"] or "en"),
+        }
+    )
+
+
 @app.post("/api/story")
-async def api_generate_story(request: StoryRequest):
+async def api_generate_story(request: StoryTurnRequest):
     """Endpoint to generate the next part of the story."""
+    request = await _resolve_story_turn(request)
     try:
         # Cleanup cache periodically
         cleanup_cache()
@@ -2420,76 +2509,102 @@ async def api_generate_story(request: StoryRequest):
             except AttributeError:
                 continue
 
-        badges: List[Dict[str, Any]] = []
-        unlocked_badges: List[Dict[str, Any]] = []
-
-        if badge_triggers or existing_badges_state is None:
-            badges, unlocked_badges = await resolve_badges(
-                request.player.name,
-                existing_badges_state,
-                badge_triggers,
-            )
-        else:
-            badges = _sanitize_badge_list(existing_badges_state) or []
+        badges, unlocked_badges = await resolve_badges(
+            request.player.name,
+            existing_badges_state,
+            badge_triggers,
+        )
 
         if unlocked_badges:
             result["unlockedBadges"] = unlocked_badges
 
         result["cameos"] = existing_cameos_state
 
+        # The turn's state becomes the player's session: later turns may send deltas only
+        now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        session_events = [e.model_dump() for e in (request.previousEvents or [])]
+        if result.get("story"):
+            session_events.append(
+                StoryEvent(id=secrets.token_hex(8), text=str(result["story"]), timestamp=now_iso, type="story").model_dump()
+            )
+        state_fields: Dict[str, Any] = {
+            "player": request.player.model_dump(by_alias=True),
+            "genre": request.genre,
+            "previousEvents": session_events,
+            "choice": request.choice,
+            "story": result.get("story"),
+            "choices": result.get("choices", []),
+            "storyPhase": result.get("storyPhase") or (request.gameState or {}).get("storyPhase"),
+            "turnCount": ((request.gameState or {}).get("turnCount", 0)) + 1,
+            "combatEncounters": (request.gameState or {}).get("combatEncounters", 0),
+            "combatEscapes": (request.gameState or {}).get("combatEscapes", 0),
+            "isAfterCombat": False,
+            "isFinalPhase": result.get("isFinalPhase", (request.gameState or {}).get("isFinalPhase", False)),
+            "puzzle": result.get("puzzle"),
+            "questProgress": result.get("questProgress", (request.gameState or {}).get("questProgress")),
+            "activeQuest": request.activeQuest,
+            "currentLocation": request.currentLocation,
+            "language": request.language,
+        }
+        session_version = story_sessions.commit(
+            request.player.name,
+            session_events,
+            state_fields["player"],
+            request.genre,
+            {**state_fields, "badges": badges, "cameos": existing_cameos_state},
+            active_quest=request.activeQuest,
+            current_location=request.currentLocation,
+            language=request.language,
+        )
+        state_fields["sessionVersion"] = session_version
+        result["sessionVersion"] = session_version
+
         # --- Auto-save to MongoDB (best-effort) ---
         try:
             if db is not None:
                 # Build compact story log entry
                 story_entry = {
-                    "t": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    "t": now_iso,
                     "text": result.get("story", ""),
                     "type": "story"
                 }
-                previous_log = request.gameState.get("storyLog", []) if request.gameState else []
-                story_log = previous_log + [story_entry]
-                next_state: Dict[str, Any] = {
-                    "player": request.player.model_dump(by_alias=True),
-                    "genre": request.genre,
-                    "previousEvents": [e.model_dump() for e in (request.previousEvents or [])],
-                    "choice": request.choice,
-                    "story": result.get("story"),
-                    "choices": result.get("choices", []),
-                    "storyPhase": result.get("storyPhase") or (request.gameState or {}).get("storyPhase"),
-                    "turnCount": ((request.gameState or {}).get("turnCount", 0)) + 1,
-                    "combatEncounters": (request.gameState or {}).get("combatEncounters", 0),
-                    "combatEscapes": (request.gameState or {}).get("combatEscapes", 0),
-                    "isAfterCombat": False,
-                    "isFinalPhase": result.get("isFinalPhase", (request.gameState or {}).get("isFinalPhase", False)),
-                    "puzzle": result.get("puzzle"),
-                    "questProgress": result.get("questProgress", (request.gameState or {}).get("questProgress")),
-                    "activeQuest": request.activeQuest,
-                    "storyLog": story_log,
-                    "badges": badges,
-                    "cameos": existing_cameos_state,
-                }
-                now = datetime.datetime.now(datetime.timezone.utc)
-                await db.saves.update_one(
-                    {"playerId": request.player.name, "saveSlot": 1},
-                    {
-                        "$setOnInsert": {
-                            "createdAt": now,
-                            "schemaVersion": 1,
-                        },
-                        "$set": {
-                            "playerId": request.player.name,
-                            "saveSlot": 1,
-                            "saveName": "AutoSave",
-                            "gameState": next_state,
-                            "storyLog": story_log,
-                            "updatedAt": now,
-                            "deletedAt": None,
-                            "badges": badges,
-                            "cameos": existing_cameos_state,
-                        },
-                    },
-                    upsert=True,
-                )
+                if result.get("sceneId"):
+                    # Keeps the rendered scene referenced so the scene GC leaves it alone
+                    story_entry["sceneId"] = result["sceneId"]
+                # The game client sends previousEvents, never gameState.storyLog, so the
+                # server-held history is extended; a caller that does send a log gets it
+                # checked against the stored count and last entry.
+                previous_log = (request.gameState or {}).get("storyLog")
+                if previous_log is None:
+                    # Scalars are $set and the new entry $push'ed, queued with the player's combat
+                    # writes; the story_events row is written when the queue is flushed
+                    await queue_story_autosave(
+                        hot_saves,
+                        story_events,
+                        request.player.name,
+                        state_fields,
+                        story_entry,
+                        badges=badges,
+                        cameos=existing_cameos_state,
+                    )
+                else:
+                    # The count/last-entry check needs the save as stored: land queued writes first
+                    await hot_saves.flush_player(request.player.name)
+                    await write_story_autosave(
+                        repos.saves.collection,
+                        request.player.name,
+                        state_fields,
+                        previous_log,
+                        story_entry,
+                        badges=badges,
+                        cameos=existing_cameos_state,
+                        events=story_events,
+                    )
+                    hot_saves.invalidate(request.player.name)
+                # Every few turns the autosave also lands in the slot's snapshot history
+                if autosave_snapshot_due(state_fields["turnCount"]):
+                    await hot_saves.flush_player(request.player.name)
+                    await _snapshot_slot(request.player.name, AUTOSAVE_SLOT, "autosave")
         except Exception as autosave_err:
             logger.warning(f"Autosave failed in /api/story: {autosave_err}")
 
@@ -2523,7 +2638,15 @@ async def api_process_combat(request: CombatRequest):
             except AttributeError:
                 continue
 
-        # --- Auto-save a combat turn (best-effort) ---
+        # Request badges are merged into the cached autosave's; combat turns without either leave them alone
+        badges = None
+        if badge_triggers or request.badges is not None:
+            badges, unlocked_badges = await resolve_badges(request.player.name, request.badges, badge_triggers)
+            if unlocked_badges:
+                result.setdefault("unlockedBadges", []).extend(unlocked_badges)
+
+        # --- Auto-save a combat turn (best-effort): one atomic write, no prior read,
+        # coalesced with the player's other queued autosave writes ---
         try:
             if db is not None:
                 now = datetime.datetime.now(datetime.timezone.utc)
@@ -2539,54 +2662,15 @@ async def api_process_combat(request: CombatRequest):
                         "defeat": result.get("defeat"),
                     },
                 }
-                existing = await db.saves.find_one({"playerId": request.player.name, "saveSlot": 1})
-                existing_log = existing.get("storyLog", []) if existing else []
-                story_log = existing_log + [combat_entry]
-                existing_badges_state = None
-                if existing:
-                    existing_badges_state = existing.get("badges") or (existing.get("gameState", {}) or {}).get("badges")
-                existing_cameos_state = _sanitize_cameo_list(
-                    (existing or {}).get("cameos")
-                    or ((existing or {}).get("gameState", {}) or {}).get("cameos")
-                )
-
-                badges, unlocked_badges = await resolve_badges(
+                await hot_saves.write(
                     request.player.name,
-                    existing_badges_state,
-                    badge_triggers,
-                )
-
-                if unlocked_badges:
-                    result.setdefault("unlockedBadges", []).extend(unlocked_badges)
-
-                result["cameos"] = existing_cameos_state
-
-                next_state = dict((existing or {}).get("gameState", {}) or {})
-                next_state.update({
-                    "player": request.player.model_dump(by_alias=True),
-                    "badges": badges,
-                    "cameos": existing_cameos_state,
-                })
-                await db.saves.update_one(
-                    {"playerId": request.player.name, "saveSlot": 1},
-                    {
-                        "$setOnInsert": {
-                            "createdAt": now,
-                            "schemaVersion": 1,
-                        },
-                        "$set": {
-                            "playerId": request.player.name,
-                            "saveSlot": 1,
-                            "saveName": "AutoSave",
-                            "gameState": next_state,
-                            "storyLog": story_log,
-                            "updatedAt": now,
-                            "deletedAt": None,
-                            "badges": badges,
-                            "cameos": existing_cameos_state,
-                        },
-                    },
-                    upsert=True,
+                    build_combat_turn_update(
+                        request.player.name,
+                        request.player.model_dump(by_alias=True),
+                        combat_entry,
+                        now,
+                        badges=badges,
+                    ),
                 )
         except Exception as autosave_err:
             logger.warning(f"Autosave failed in /api/combat: {autosave_err}")
@@ -2620,35 +2704,92 @@ async def save_game(save_data: SaveData):
                 )
                 await _create_or_update_player_internal(player_record)
 
-        # Use playerId and saveSlot to uniquely identify the save, upserting it
-        result = await db.saves.update_one(
-            {"playerId": save_dict["playerId"], "saveSlot": save_dict["saveSlot"]},
-            {
-                "$setOnInsert": {
-                    "createdAt": now,
-                },
-                "$set": {
-                    "playerId": save_dict["playerId"],
-                    "saveSlot": save_dict.get("saveSlot", 1),
-                    "saveName": save_dict.get("saveName", "AutoSave"),
-                    "gameState": save_dict.get("gameState", {}),
-                    "storyLog": save_dict.get("storyLog", []),
-                    "schemaVersion": save_dict.get("schemaVersion", 1),
-                    "updatedAt": now,
-                    "deletedAt": None,
-                    "badges": save_dict.get("badges", []),
-                    "cameos": save_dict.get("cameos", []),
-                }
+        player_id, save_slot = save_dict["playerId"], save_dict.get("saveSlot", 1)
+        # Queued autosave writes are older than this save; land them first
+        await hot_saves.flush_player(player_id)
+
+        # History goes to story_events; the save keeps the recent tail plus a cursor.
+        # A client that loaded a save holds only its tail, so history already stored
+        # is kept and only entries past the stored cursor are written.
+        game_state_doc = dict(save_dict.get("gameState", {}) or {})
+        client_log = game_state_doc.get("storyLog") or save_dict.get("storyLog") or []
+        cursor = game_state_doc.pop("storyCursor", None)
+        stored_projection = {"storyLog": 1, "storyLogCount": 1, "deletedAt": 1}
+        if save_slot == AUTOSAVE_SLOT:
+            stored_projection.update({key: 1 for key in SESSION_PROJECTION if key != "_id"})
+        stored = await repos.saves.get_slot(player_id, save_slot, stored_projection) or {}
+        if stored.get("deletedAt") is not None:
+            # A deleted slot's history is not carried into the new save
+            stored = {}
+        elif stored and stored.get("storyLogCount") is None and story_events is not None:
+            stored = await migrate_save_story_log(
+                repos.saves.collection, story_events, await repos.saves.get_slot(player_id, save_slot)
+            )
+        stored_count = stored.get("storyLogCount") or 0
+        offset = cursor.get("before", 0) if isinstance(cursor, dict) else 0
+        new_entries = story_log_appendix(stored_count, client_log, offset)
+        if story_events is not None and (new_entries or not stored):
+            await story_events.extend(player_id, save_slot, stored_count, new_entries)
+        story_log_count = stored_count + len(new_entries)
+        full_tail = story_log_tail(list(stored.get("storyLog") or []) + new_entries)
+        game_state_doc["storyLog"] = full_tail
+        # The autosave slot keeps the story session it backs
+        if save_slot == AUTOSAVE_SLOT:
+            game_state_doc = carry_session_state(stored.get("gameState"), game_state_doc)
+
+        # Queryable fields stay plain; the rest of gameState is stored compressed
+        hot_state, cold_state = split_game_state(game_state_doc)
+        cold_doc = encode_cold_state(cold_state)
+        summary = build_save_summary(game_state_doc, save_dict.get("badges", []))
+        save_update: Dict[str, Any] = {
+            "$setOnInsert": {
+                "createdAt": now,
             },
-            upsert=True
-        )
+            "$set": {
+                "playerId": save_dict["playerId"],
+                "saveSlot": save_dict.get("saveSlot", 1),
+                "saveName": save_dict.get("saveName", "AutoSave"),
+                "gameState": hot_state,
+                "storyLog": full_tail,
+                "storyLogCount": story_log_count,
+                "storyLogLast": story_log_last(full_tail),
+                "summary": summary,
+                "schemaVersion": SAVE_SCHEMA_VERSION,
+                "updatedAt": now,
+                "deletedAt": None,
+                "badges": save_dict.get("badges", []),
+                "cameos": save_dict.get("cameos", []),
+            },
+        }
+        if cold_doc is not None:
+            save_update["$set"]["coldState"] = cold_doc
+        else:
+            save_update["$unset"] = {"coldState": ""}
+
+        # Use playerId and saveSlot to uniquely identify the save, upserting it
+        result = await repos.saves.upsert_slot(save_dict["playerId"], save_dict["saveSlot"], save_update)
+        # A save that carried no session over (a new or deleted slot) ends any hot copy
+        if game_state_doc.get("sessionVersion") is None:
+            story_sessions.forget(player_id, save_slot)
+        hot_saves.invalidate(save_dict["playerId"])
+        try:
+            # The client saves the autosave slot after every turn: those saves join the
+            # snapshot history on the autosave cadence, once per turn
+            snapshot_source = "manual"
+            if save_slot == AUTOSAVE_SLOT:
+                latest = await repos.snapshots.latest(player_id, save_slot)
+                latest_turn = ((latest or {}).get("summary") or {}).get("turnCount")
+                due = autosave_snapshot_due(summary["turnCount"]) and latest_turn != summary["turnCount"]
+                snapshot_source = "autosave" if due else None
+            if snapshot_source:
+                await repos.snapshots.record(player_id, save_slot, game_state_doc, snapshot_source, story_log_count, now)
+        except Exception as snapshot_err:
+            # The save itself has landed; only this point in its history is missing
+            logger.warning(f"Snapshot failed for '{save_dict['playerId']}' slot {save_dict.get('saveSlot', 1)}: {snapshot_err}")
         
         # Update googleId if provided
         if save_dict.get("googleId"):
-            await db.saves.update_one(
-                {"playerId": save_dict["playerId"], "saveSlot": save_dict["saveSlot"]},
-                {"$set": {"googleId": save_dict["googleId"]}}
-            )
+            await repos.saves.set_slot_fields(save_dict["playerId"], save_dict["saveSlot"], {"googleId": save_dict["googleId"]})
 
         if result.upserted_id:
             save_id = str(result.upserted_id)
@@ -2656,7 +2797,7 @@ async def save_game(save_data: SaveData):
             return {"success": True, "saveId": save_id}
         else:
             # Return existing document ID
-            existing_save = await db.saves.find_one({"playerId": save_dict["playerId"], "saveSlot": save_dict["saveSlot"]})
+            existing_save = await repos.saves.get_slot(save_dict["playerId"], save_dict["saveSlot"], {"_id": 1})
             save_id = str(existing_save["_id"]) if existing_save else "unknown"
             logger.info(f"Game save upserted for slot: {save_data.saveSlot}, Player: {save_data.playerId}")
             return {"success": True, "saveId": save_id}
@@ -2666,6 +2807,36 @@ async def save_game(save_data: SaveData):
         raise HTTPException(status_code=500, detail=f"Failed to save game: {str(e)}")
 
 
+async def _snapshot_slot(player_id: str, save_slot: int, source: str) -> Optional[int]:
+    """Record the slot's current stored state in its snapshot history."""
+    save = await repos.saves.get_slot(player_id, save_slot, {"gameState": 1, "coldState": 1, "storyLogCount": 1})
+    if not save or not isinstance(save.get("gameState"), dict):
+        return None
+    return await repos.snapshots.record(player_id, save_slot, expand_game_state(save), source, save.get("storyLogCount"))
+
+
+async def _working_game_state(save: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The part of a save needed to resume play: state, recent log tail and a history cursor."""
+    if story_events is not None:
+        save = await migrate_save_story_log(repos.saves.collection, story_events, save)
+    try:
+        save = await migrate_save_schema(repos.saves.collection, save)
+    except Exception as migrate_err:
+        # The v1 document is still readable as-is; the bulk migration can retry it
+        logger.warning(f"Save schema migration failed for {save.get('_id')}: {migrate_err}")
+    state = expand_game_state(save)
+    if not isinstance(state, dict):
+        return state
+    tail = story_log_tail(state.get("storyLog"))
+    state["storyLog"] = tail
+    if state.get("previousEvents"):
+        state["previousEvents"] = state["previousEvents"][-AUTOSAVE_EVENTS_TAIL:]
+    state["storyCursor"] = story_cursor(save, len(tail))
+    state["badges"] = save.get("badges", state.get("badges", []))
+    state["cameos"] = save.get("cameos", state.get("cameos", []))
+    return state
+
+
 # Helper to convert ObjectId to string for JSON serialization
 def serialize_save(save):
     if save and "_id" in save:
@@ -2678,11 +2849,17 @@ async def get_saves(player_id: str):
     if db is None:
         raise HTTPException(status_code=503, detail="Database connection not available.")
     try:
-        saves_cursor = db.saves.find({"playerId": player_id, "deletedAt": None}).sort("updatedAt", -1)
-        saves = await saves_cursor.to_list(length=None) # Fetch all saves for the player
-        # Return only essential info for the list, not the full gameState
+        await hot_saves.flush_player(player_id)
+        # Project to the listing fields and summary; gameState and storyLog stay on the server
+        saves = await repos.saves.list_for_player(player_id, SAVE_LIST_PROJECTION)
         save_list = [
-            {"saveId": str(s.get("_id")), "name": s.get("saveName", f"Slot {s.get('saveSlot', '?')}") , "updatedAt": s.get("updatedAt"), "saveSlot": s.get("saveSlot", 1)}
+            {
+                "saveId": str(s.get("_id")),
+                "name": s.get("saveName", f"Slot {s.get('saveSlot', '?')}"),
+                "updatedAt": s.get("updatedAt"),
+                "saveSlot": s.get("saveSlot", 1),
+                "summary": summary_from_save(s),
+            }
             for s in saves
         ]
         return save_list
@@ -2690,6 +2867,26 @@ async def get_saves(player_id: str):
         logger.error(f"Error fetching saves for player {player_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch saves: {str(e)}")
 
+@app.get("/api/load/by-name")
+async def load_by_name(name: str):
+    """Load latest autosave for a player by name."""
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database connection not available.")
+
+    try:
+        await hot_saves.flush_player(name)
+        save = await repos.saves.latest_for_player(name, {"storyLog": 0})
+        if not save:
+            raise HTTPException(status_code=404, detail="No saves found for player.")
+        if not save.get("gameState"):
+            raise HTTPException(status_code=404, detail="Save data missing gameState.")
+        return await _working_game_state(save)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading by name '{name}': {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to load by name: {str(e)}")
+
 @app.get("/api/load/{save_id}")
 async def load_game(save_id: str):
     """Endpoint to load a specific game save state by its MongoDB ObjectId."""
@@ -2701,18 +2898,17 @@ async def load_game(save_id: str):
         raise HTTPException(status_code=400, detail="Invalid save ID format.")
 
     try:
-        save = await db.saves.find_one({"_id": obj_id})
+        save = await repos.saves.get(obj_id, {"storyLog": 0})
         if not save:
             raise HTTPException(status_code=404, detail="Save not found.")
+        if hot_saves.has_pending(save.get("playerId")):
+            await hot_saves.flush_player(save["playerId"])
+            save = await repos.saves.get(obj_id, {"storyLog": 0})
 
-        # Return the gameState part of the save document
-        loaded_state = save.get("gameState")
-        if not loaded_state:
+        # Return the working set of the gameState; older history pages from story_events
+        if not save.get("gameState"):
              raise HTTPException(status_code=404, detail="Save data is corrupt or missing gameState.")
-
-        if isinstance(loaded_state, dict):
-            loaded_state["badges"] = save.get("badges", loaded_state.get("badges", []))
-            loaded_state["cameos"] = save.get("cameos", loaded_state.get("cameos", []))
+        loaded_state = await _working_game_state(save)
 
         logger.info(f"Game loaded successfully for save ID: {save_id}")
         return loaded_state # Return only the game state
@@ -2723,28 +2919,44 @@ async def load_game(save_id: str):
         logger.error(f"Error loading game for save ID {save_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to load game: {str(e)}")
 
-@app.get("/api/load/by-name")
-async def load_by_name(name: str):
-    """Load latest autosave for a player by name."""
-    if db is None:
+@app.get("/api/story-events/{player_id}")
+async def get_story_events(
+    player_id: str,
+    saveSlot: int = Query(1, ge=1),
+    before: Optional[int] = Query(None, ge=0, description="Return entries older than this turn"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Page backwards through a save slot's story history, oldest entry first in each page."""
+    if db is None or story_events is None:
         raise HTTPException(status_code=503, detail="Database connection not available.")
-
     try:
-        save = await db.saves.find_one({"playerId": name, "deletedAt": None}, sort=[("updatedAt", DESCENDING)])
-        if not save:
-            raise HTTPException(status_code=404, detail="No saves found for player.")
-        state = save.get("gameState")
-        if not state:
-            raise HTTPException(status_code=404, detail="Save data missing gameState.")
-        if isinstance(state, dict):
-            state["badges"] = save.get("badges", state.get("badges", []))
-            state["cameos"] = save.get("cameos", state.get("cameos", []))
-        return state
-    except HTTPException:
-        raise
+        # Queued autosave turns write their story_events rows on flush
+        if saveSlot == AUTOSAVE_SLOT and hot_saves.has_pending(player_id):
+            await hot_saves.flush_player(player_id)
+        return await story_events.page(player_id, saveSlot, before=before, limit=limit)
     except Exception as e:
-        logger.error(f"Error loading by name '{name}': {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to load by name: {str(e)}")
+        logger.error(f"Error paging story events for '{player_id}': {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to load story events: {str(e)}")
+
+@app.get("/api/load/{save_id}/events")
+async def get_save_story_events(
+    save_id: str,
+    before: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Same as /api/story-events, addressed by save id."""
+    if db is None or story_events is None:
+        raise HTTPException(status_code=503, detail="Database connection not available.")
+    try:
+        obj_id = ObjectId(save_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid save ID format.")
+    save = await repos.saves.get(obj_id, {"playerId": 1, "saveSlot": 1})
+    if not save:
+        raise HTTPException(status_code=404, detail="Save not found.")
+    if save.get("saveSlot", 1) == AUTOSAVE_SLOT and hot_saves.has_pending(save["playerId"]):
+        await hot_saves.flush_player(save["playerId"])
+    return await story_events.page(save["playerId"], save.get("saveSlot", 1), before=before, limit=limit)
 
 @app.get("/api/check-save/{name}")
 async def check_save_exists(name: str):
@@ -2753,12 +2965,11 @@ async def check_save_exists(name: str):
         raise HTTPException(status_code=503, detail="Database connection not available.")
     
     try:
-        save = await db.saves.find_one({"playerId": name, "deletedAt": None}, sort=[("updatedAt", DESCENDING)])
+        save = await repos.saves.latest_for_player(name, SAVE_LIST_PROJECTION)
         if not save:
             return {"exists": False}
         
-        game_state = save.get("gameState", {})
-        player = game_state.get("player", {})
+        summary = summary_from_save(save)
         
         return {
             "exists": True,
@@ -2767,8 +2978,8 @@ async def check_save_exists(name: str):
                 "name": save.get("saveName", "AutoSave"),
                 "updatedAt": save.get("updatedAt").isoformat() if save.get("updatedAt") else None,
                 "preview": {
-                    "level": player.get("level", 1),
-                    "class": player.get("class", "Unknown"),
+                    "level": summary.get("level", 1),
+                    "class": summary.get("class", "Unknown"),
                     "lastPlayed": save.get("updatedAt").isoformat() if save.get("updatedAt") else None,
                 }
             }
@@ -2784,29 +2995,8 @@ async def _create_or_update_player_internal(player_data: PlayerData):
     
     try:
         now = datetime.datetime.now(datetime.timezone.utc)
-        player_dict = player_data.model_dump(exclude_none=True)
-        
-        # Determine query based on whether it's a Google user or guest
-        if player_dict.get("googleId"):
-            query = {"googleId": player_dict["googleId"]}
-        else:
-            query = {"name": player_dict["name"]}
-        
-        # Upsert player record
-        await db.players.update_one(
-            query,
-            {
-                "$setOnInsert": {
-                    "createdAt": now,
-                },
-                "$set": {
-                    **player_dict,
-                    "updatedAt": now,
-                    "lastLoginAt": now,
-                }
-            },
-            upsert=True
-        )
+        # Google users are keyed by googleId, guests by name
+        await repos.players.upsert(player_data.model_dump(exclude_none=True), now)
         return True
     except Exception as e:
         logger.warning(f"Error in internal player update: {e}")
@@ -2820,32 +3010,11 @@ async def create_or_update_player(player_data: PlayerData):
     
     try:
         now = datetime.datetime.now(datetime.timezone.utc)
-        player_dict = player_data.model_dump(exclude_none=True)
-        
-        # Determine query based on whether it's a Google user or guest
-        if player_dict.get("googleId"):
-            query = {"googleId": player_dict["googleId"]}
-        else:
-            query = {"name": player_dict["name"]}
-        
-        # Upsert player record
-        result = await db.players.update_one(
-            query,
-            {
-                "$setOnInsert": {
-                    "createdAt": now,
-                },
-                "$set": {
-                    **player_dict,
-                    "updatedAt": now,
-                    "lastLoginAt": now,
-                }
-            },
-            upsert=True
-        )
+        # Upsert player record (Google users by googleId, guests by name)
+        query = await repos.players.upsert(player_data.model_dump(exclude_none=True), now)
         
         # Get the created/updated player
-        player = await db.players.find_one(query)
+        player = await repos.players.find(query)
         if not player:
             raise HTTPException(status_code=500, detail="Failed to create/update player")
         
@@ -2869,7 +3038,7 @@ async def get_player_by_google_id(google_id: str):
         raise HTTPException(status_code=503, detail="Database connection not available.")
     
     try:
-        player = await db.players.find_one({"googleId": google_id})
+        player = await repos.players.by_google_id(google_id)
         if not player:
             raise HTTPException(status_code=404, detail="Player not found")
         
@@ -2895,7 +3064,7 @@ async def get_player_by_name(name: str):
         raise HTTPException(status_code=503, detail="Database connection not available.")
     
     try:
-        player = await db.players.find_one({"name": name})
+        player = await repos.players.by_name(name)
         if not player:
             raise HTTPException(status_code=404, detail="Player not found")
         
@@ -2928,11 +3097,7 @@ async def rename_save(save_id: str, body: RenameSaveRequest):
 
     try:
         now = datetime.datetime.now(datetime.timezone.utc)
-        result = await db.saves.update_one(
-            {"_id": obj_id},
-            {"$set": {"saveName": body.saveName, "updatedAt": now}}
-        )
-        if result.matched_count == 0:
+        if not await repos.saves.set_fields(obj_id, {"saveName": body.saveName, "updatedAt": now}):
             raise HTTPException(status_code=404, detail="Save not found.")
         return {"success": True}
     except HTTPException:
@@ -2955,12 +3120,14 @@ async def delete_save(save_id: str):
 
     try:
         now = datetime.datetime.now(datetime.timezone.utc)
-        result = await db.saves.update_one(
-            {"_id": obj_id},
-            {"$set": {"deletedAt": now, "updatedAt": now}}
-        )
-        if result.matched_count == 0:
+        # A queued autosave write landing after the delete would un-delete the slot
+        owner = await repos.saves.get(obj_id, {"playerId": 1})
+        if owner:
+            await hot_saves.flush_player(owner["playerId"])
+        if not await repos.saves.soft_delete(obj_id, now):
             raise HTTPException(status_code=404, detail="Save not found.")
+        if owner:
+            hot_saves.invalidate(owner["playerId"])
         return {"success": True}
     except HTTPException:
         raise
@@ -2969,6 +3136,88 @@ async def delete_save(save_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to delete save: {str(e)}")
 
 
+@app.get("/api/saves/{save_id}/snapshots")
+async def list_save_snapshots(save_id: str, limit: int = Query(50, ge=1, le=200)):
+    """Points in a save slot's history that can be restored, newest first."""
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database connection not available.")
+    try:
+        obj_id = ObjectId(save_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid save ID format.")
+    save = await repos.saves.get(obj_id, {"playerId": 1, "saveSlot": 1})
+    if not save:
+        raise HTTPException(status_code=404, detail="Save not found.")
+    snapshots = await repos.snapshots.list(save["playerId"], save.get("saveSlot", 1), limit=limit)
+    for snapshot in snapshots:
+        if isinstance(snapshot.get("createdAt"), datetime.datetime):
+            snapshot["createdAt"] = snapshot["createdAt"].isoformat()
+    return {"saveId": save_id, "saveSlot": save.get("saveSlot", 1), "snapshots": snapshots}
+
+
+@app.post("/api/saves/{save_id}/snapshots/{seq}/restore")
+async def restore_save_snapshot(save_id: str, seq: int):
+    """Roll a save slot back to snapshot ``seq``; the rollback is itself recorded as a snapshot."""
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database connection not available.")
+    try:
+        obj_id = ObjectId(save_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid save ID format.")
+
+    try:
+        save = await repos.saves.get(obj_id, {"playerId": 1, "saveSlot": 1, "badges": 1})
+        if not save:
+            raise HTTPException(status_code=404, detail="Save not found.")
+        player_id, save_slot = save["playerId"], save.get("saveSlot", 1)
+        restored = await repos.snapshots.state_at(player_id, save_slot, seq)
+        if restored is None:
+            raise HTTPException(status_code=404, detail="Snapshot not found.")
+        game_state_doc, snapshot = restored
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        hot_state, cold_state = split_game_state(game_state_doc)
+        cold_doc = encode_cold_state(cold_state)
+        save_update: Dict[str, Any] = {
+            "$set": {
+                "gameState": hot_state,
+                "summary": build_save_summary(game_state_doc, save.get("badges", [])),
+                "schemaVersion": SAVE_SCHEMA_VERSION,
+                "updatedAt": now,
+                "deletedAt": None,
+            },
+        }
+        if cold_doc is not None:
+            save_update["$set"]["coldState"] = cold_doc
+        else:
+            save_update["$unset"] = {"coldState": ""}
+        # The inline log tail goes back with the state it belongs to
+        story_log = story_log_tail(game_state_doc.get("storyLog"))
+        save_update["$set"]["storyLog"] = story_log
+        save_update["$set"]["storyLogLast"] = story_log_last(story_log)
+        story_log_count = snapshot.get("storyLogCount")
+        if story_log_count is not None:
+            save_update["$set"]["storyLogCount"] = story_log_count
+
+        # Queued autosave writes are newer than the snapshot; land them before overwriting
+        await hot_saves.flush_player(player_id)
+        await repos.saves.upsert_slot(player_id, save_slot, save_update)
+        if story_events is not None and story_log_count is not None:
+            # History written after the snapshot belongs to the abandoned timeline
+            await story_events.truncate(player_id, save_slot, story_log_count)
+        story_sessions.forget(player_id, save_slot)
+        hot_saves.invalidate(player_id)
+
+        new_seq = await repos.snapshots.record(player_id, save_slot, game_state_doc, "restore", story_log_count, now)
+        logger.info(f"Restored '{player_id}' slot {save_slot} to snapshot {seq}")
+        return {"success": True, "saveId": save_id, "restoredSeq": seq, "seq": new_seq}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error restoring snapshot {seq} of save {save_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to restore snapshot: {str(e)}")
+
+
 @app.post("/api/cameo/invite")
 async def create_cameo_invite(request: CameoInviteRequest):
     if db is None:
@@ -2983,7 +3232,7 @@ async def create_cameo_invite(request: CameoInviteRequest):
     for _ in range(5):
         code = generate_cameo_code()
         try:
-            await db.cameo_invites.insert_one(
+            await repos.cameo_invites.create(
                 {
                     "code": code,
                     "playerId": request.playerId,
@@ -3000,11 +3249,12 @@ async def create_cameo_invite(request: CameoInviteRequest):
                 "guest": cameo_payload,
                 "message": request.personalMessage,
             }
+        except DuplicateKeyError:
+            # Code collision; try another
+            continue
         except Exception as e:
-            # Retry on duplicate key (code collision)
-            if "E11000" not in str(e):
-                logger.error(f"Failed to create cameo invite for {request.playerId}: {e}")
-                raise HTTPException(status_code=500, detail="Failed to create cameo invite")
+            logger.error(f"Failed to create cameo invite for {request.playerId}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to create cameo invite")
 
     raise HTTPException(status_code=500, detail="Unable to allocate cameo invite code. Please try again.")
 
@@ -3017,7 +3267,7 @@ async def accept_cameo_invite(request: CameoAcceptRequest):
     code = request.inviteCode.strip().upper()
     now = datetime.datetime.now(datetime.timezone.utc)
 
-    invite = await db.cameo_invites.find_one({"code": code})
+    invite = await repos.cameo_invites.by_code(code)
     if not invite:
         raise HTTPException(status_code=404, detail="Invite code not found.")
 
@@ -3025,8 +3275,11 @@ async def accept_cameo_invite(request: CameoAcceptRequest):
         raise HTTPException(status_code=409, detail="Invite code already used.")
 
     expires_at = invite.get("expiresAt")
+    if isinstance(expires_at, datetime.datetime) and expires_at.tzinfo is None:
+        # Mongo hands datetimes back naive (UTC)
+        expires_at = expires_at.replace(tzinfo=datetime.timezone.utc)
     if expires_at and isinstance(expires_at, datetime.datetime) and expires_at < now:
-        await db.cameo_invites.update_one({"_id": invite["_id"]}, {"$set": {"status": "expired"}})
+        await repos.cameo_invites.set_status(invite["_id"], "expired")
         raise HTTPException(status_code=410, detail="Invite code expired.")
 
     cameo_entry = {
@@ -3040,16 +3293,16 @@ async def accept_cameo_invite(request: CameoAcceptRequest):
 
     # Merge cameo into player save
     try:
-        existing = await db.saves.find_one({"playerId": request.playerId, "saveSlot": 1})
-        cameos = _sanitize_cameo_list((existing or {}).get("cameos"))
+        existing = await hot_saves.get(request.playerId)
+        cameos = _sanitize_cameo_list(existing.get("cameos"))
         cameos.append(cameo_entry)
 
-        await db.saves.update_one(
-            {"playerId": request.playerId, "saveSlot": 1},
+        await hot_saves.write(
+            request.playerId,
             {
                 "$setOnInsert": {
                     "createdAt": now,
-                    "schemaVersion": 1,
+                    "schemaVersion": SAVE_SCHEMA_VERSION,
                 },
                 "$set": {
                     "updatedAt": now,
@@ -3058,13 +3311,11 @@ async def accept_cameo_invite(request: CameoAcceptRequest):
                     "gameState.cameos": cameos,
                 },
             },
-            upsert=True,
         )
+        # The invite is consumed below, so the cameo must be durable first
+        await hot_saves.flush_player(request.playerId)
 
-        await db.cameo_invites.update_one(
-            {"_id": invite["_id"]},
-            {"$set": {"status": "used", "consumedBy": request.playerId, "consumedAt": now}},
-        )
+        await repos.cameo_invites.set_status(invite["_id"], "used", consumedBy=request.playerId, consumedAt=now)
 
         return {"cameo": cameo_entry}
     except HTTPException:
@@ -3146,7 +3397,7 @@ async def get_daily_challenge(player_id: str):
         today = datetime.datetime.now(datetime.timezone.utc).date().isoformat()
         
         # Check if challenge exists for today
-        existing = await db.daily_challenges.find_one({"date": today, "playerId": player_id})
+        existing = await repos.challenges.daily(player_id, today)
         if existing:
             return {
                 "id": str(existing["_id"]),
@@ -3185,7 +3436,7 @@ async def get_daily_challenge(player_id: str):
         challenge = random.choice(challenge_types)
         expires_at = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)).isoformat()
         
-        result = await db.daily_challenges.insert_one({
+        challenge_id = await repos.challenges.create({
             "playerId": player_id,
             "date": today,
             "title": challenge["title"],
@@ -3198,7 +3449,7 @@ async def get_daily_challenge(player_id: str):
         })
         
         return {
-            "id": str(result.inserted_id),
+            "id": str(challenge_id),
             "date": today,
             **challenge,
             "completed": False,
@@ -3219,34 +3470,20 @@ async def complete_daily_challenge(request: Dict[str, Any]):
         challenge_id = request.get("challengeId")
         player_id = request.get("playerId")
         
-        challenge = await db.daily_challenges.find_one({"_id": ObjectId(challenge_id)})
+        challenge = await repos.challenges.get(ObjectId(challenge_id))
         if not challenge:
             raise HTTPException(status_code=404, detail="Challenge not found")
         
         if challenge.get("completed"):
             return {"message": "Challenge already completed", "rewards": challenge.get("rewards", {})}
         
-        await db.daily_challenges.update_one(
-            {"_id": ObjectId(challenge_id)},
-            {"$set": {"completed": True, "completedAt": datetime.datetime.now(datetime.timezone.utc).isoformat()}}
-        )
+        completed_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        await repos.challenges.complete(ObjectId(challenge_id), completed_at)
         
         # Update streak
-        streak_doc = await db.challenge_streaks.find_one({"playerId": player_id})
-        if streak_doc:
-            new_streak = streak_doc.get("streak", 0) + 1
-            await db.challenge_streaks.update_one(
-                {"playerId": player_id},
-                {"$set": {"streak": new_streak, "lastCompleted": datetime.datetime.now(datetime.timezone.utc).isoformat()}}
-            )
-        else:
-            await db.challenge_streaks.insert_one({
-                "playerId": player_id,
-                "streak": 1,
-                "lastCompleted": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            })
+        streak = await repos.challenges.record_completion(player_id, completed_at)
         
-        return {"rewards": challenge.get("rewards", {}), "streak": streak_doc.get("streak", 0) + 1 if streak_doc else 1}
+        return {"rewards": challenge.get("rewards", {}), "streak": streak}
     except Exception as e:
         logger.error(f"Error completing challenge: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to complete challenge: {str(e)}")
@@ -3267,24 +3504,14 @@ async def send_friend_request(request: Dict[str, Any]):
             raise HTTPException(status_code=400, detail="Cannot friend yourself")
         
         # Check if request already exists
-        existing = await db.friends.find_one({
-            "$or": [
-                {"fromPlayerId": from_player, "toPlayerId": to_player},
-                {"fromPlayerId": to_player, "toPlayerId": from_player}
-            ]
-        })
+        existing = await repos.friends.between(from_player, to_player)
         
         if existing:
             if existing.get("status") == "accepted":
                 raise HTTPException(status_code=409, detail="Already friends")
             raise HTTPException(status_code=409, detail="Friend request already exists")
         
-        await db.friends.insert_one({
-            "fromPlayerId": from_player,
-            "toPlayerId": to_player,
-            "status": "pending",
-            "createdAt": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        })
+        await repos.friends.create_request(from_player, to_player, datetime.datetime.now(datetime.timezone.utc))
         
         return {"message": "Friend request sent"}
     except HTTPException:
@@ -3304,19 +3531,12 @@ async def accept_friend_request(request: Dict[str, Any]):
         from_player = request.get("fromPlayerId")
         to_player = request.get("toPlayerId")
         
-        friend_request = await db.friends.find_one({
-            "fromPlayerId": from_player,
-            "toPlayerId": to_player,
-            "status": "pending"
-        })
+        friend_request = await repos.friends.pending(from_player, to_player)
         
         if not friend_request:
             raise HTTPException(status_code=404, detail="Friend request not found")
         
-        await db.friends.update_one(
-            {"_id": friend_request["_id"]},
-            {"$set": {"status": "accepted", "acceptedAt": datetime.datetime.now(datetime.timezone.utc).isoformat()}}
-        )
+        await repos.friends.accept(friend_request["_id"], datetime.datetime.now(datetime.timezone.utc))
         
         return {"message": "Friend request accepted"}
     except HTTPException:
@@ -3333,25 +3553,20 @@ async def get_friends(player_id: str):
         raise HTTPException(status_code=503, detail="Database connection not available.")
     
     try:
-        friends_list = await db.friends.find({
-            "$or": [
-                {"fromPlayerId": player_id, "status": "accepted"},
-                {"toPlayerId": player_id, "status": "accepted"}
-            ]
-        }).to_list(length=None)
+        friends_list = await repos.friends.accepted_for(player_id)
         
         result = []
         for f in friends_list:
             friend_id = f["toPlayerId"] if f["fromPlayerId"] == player_id else f["fromPlayerId"]
             # Get friend's stats
-            friend_save = await db.saves.find_one({"playerId": friend_id, "saveSlot": 1})
+            friend_save = await hot_saves.get(friend_id)
             friend_stats = None
-            if friend_save and friend_save.get("gameState", {}).get("player"):
-                p = friend_save["gameState"]["player"]
+            if friend_save.get("gameState.player"):
+                p = friend_save["gameState.player"]
                 friend_stats = {
                     "level": p.get("level", 1),
                     "totalXp": p.get("xp", 0),
-                    "badgesCount": len(friend_save.get("badges", []))
+                    "badgesCount": len(friend_save.get("badges") or [])
                 }
             
             result.append({
@@ -3378,27 +3593,7 @@ async def get_global_leaderboard(limit: int = 100):
     
     try:
         # Aggregate player stats from saves
-        pipeline = [
-            {"$match": {"saveSlot": 1, "deletedAt": None}},
-            {"$group": {
-                "_id": "$playerId",
-                "level": {"$max": "$gameState.player.level"},
-                "totalXp": {"$max": "$gameState.player.xp"},
-                "badgesCount": {"$max": {"$size": {"$ifNull": ["$badges", []]}}},
-                "lastPlayed": {"$max": "$updatedAt"}
-            }},
-            {"$project": {
-                "playerId": "$_id",
-                "level": 1,
-                "totalXp": 1,
-                "badgesCount": 1,
-                "score": {"$add": [{"$multiply": ["$level", 100]}, "$totalXp", {"$multiply": ["$badgesCount", 50]}]}
-            }},
-            {"$sort": {"score": -1}},
-            {"$limit": limit}
-        ]
-        
-        results = await db.saves.aggregate(pipeline).to_list(length=limit)
+        results = await repos.saves.global_leaderboard(limit)
         
         leaderboard = []
         for idx, entry in enumerate(results, 1):
@@ -3425,31 +3620,25 @@ async def get_friends_leaderboard(player_id: str):
     
     try:
         # Get friend IDs
-        friends_list = await db.friends.find({
-            "$or": [
-                {"fromPlayerId": player_id, "status": "accepted"},
-                {"toPlayerId": player_id, "status": "accepted"}
-            ]
-        }).to_list(length=None)
-        
-        friend_ids = set()
-        for f in friends_list:
-            friend_ids.add(f["toPlayerId"] if f["fromPlayerId"] == player_id else f["fromPlayerId"])
+        friend_ids = set(await repos.friends.friend_ids(player_id))
         friend_ids.add(player_id)  # Include self
         
         # Get stats for friends
-        saves = await db.saves.find({"playerId": {"$in": list(friend_ids)}, "saveSlot": 1, "deletedAt": None}).to_list(length=None)
+        saves = await repos.saves.autosaves_for_players(
+            list(friend_ids), {**SAVE_LIST_PROJECTION, "playerId": 1, "badges.id": 1}
+        )
         
         leaderboard = []
         for save in saves:
-            player = save.get("gameState", {}).get("player", {})
-            score = (player.get("level", 1) * 100) + player.get("xp", 0) + (len(save.get("badges", [])) * 50)
+            summary = summary_from_save(save)
+            badges_count = summary.get("badgesCount", len(save.get("badges") or []))
+            score = (summary.get("level", 1) * 100) + summary.get("xp", 0) + (badges_count * 50)
             leaderboard.append({
                 "playerId": save["playerId"],
                 "name": save["playerId"],
                 "score": score,
-                "level": player.get("level", 1),
-                "badgesCount": len(save.get("badges", [])),
+                "level": summary.get("level", 1),
+                "badgesCount": badges_count,
                 "isFriend": save["playerId"] != player_id
             })
         
@@ -3463,6 +3652,20 @@ async def get_friends_leaderboard(player_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to get friends leaderboard: {str(e)}")
 
 
+@app.get("/api/autosave/stats")
+async def get_autosave_stats():
+    """Hot save cache counters plus bulk flush batch size, latency and queue lag."""
+    return hot_saves.get_stats()
+
+
+@app.get("/api/scene-client/stats")
+async def get_scene_client_stats():
+    """Connection reuse and circuit breaker counters for scene service calls."""
+    if scene_client is None:
+        raise HTTPException(status_code=503, detail="Scene service client not initialized.")
+    return scene_client.get_stats()
+
+
 # --- Root Endpoint ---
 @app.get("/")
 async def read_root():
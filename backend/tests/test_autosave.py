@@ -0,0 +1,278 @@
+import copy
+
+import bson
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from backend.core.autosave import (
+    AUTOSAVE_EVENTS_TAIL,
+    AUTOSAVE_MODE_APPEND,
+    AUTOSAVE_MODE_REWRITE,
+    build_append_update,
+    build_combat_turn_update,
+    queue_story_autosave,
+    write_story_autosave,
+)
+from backend.core.hot_saves import HotSaveCache
+from backend.core.story_events import STORY_LOG_TAIL
+
+
+def _set_path(doc, dotted, value):
+    parts = dotted.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _get_path(doc, dotted):
+    for part in dotted.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = _get_path(doc, key)
+        if isinstance(condition, dict) and "$exists" in condition:
+            if (value is not None) != condition["$exists"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class _Saves:
+    """Just enough of a Motor collection to apply autosave updates for real."""
+
+    def __init__(self, docs=None):
+        self.docs = docs or []
+        self.updates = []
+        self.reads = 0
+
+    def _apply(self, doc, update, inserting):
+        for key, value in update.get("$set", {}).items():
+            _set_path(doc, key, copy.deepcopy(value))
+        if inserting:
+            for key, value in update.get("$setOnInsert", {}).items():
+                _set_path(doc, key, value)
+        for key, amount in update.get("$inc", {}).items():
+            _set_path(doc, key, (_get_path(doc, key) or 0) + amount)
+        for key, push in update.get("$push", {}).items():
+            values = list(_get_path(doc, key) or []) + list(push["$each"])
+            _set_path(doc, key, values[push["$slice"]:] if "$slice" in push else values)
+
+    def _find(self, query):
+        return next((doc for doc in self.docs if _matches(doc, query)), None)
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return self._find(query)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        self.updates.append(update)
+        doc = self._find(query)
+        if doc is None:
+            if not upsert:
+                return None
+            if any(d["playerId"] == query["playerId"] and d["saveSlot"] == query["saveSlot"] for d in self.docs):
+                raise DuplicateKeyError("duplicate playerId/saveSlot")
+            doc = {"_id": len(self.docs) + 1, "playerId": query["playerId"], "saveSlot": query["saveSlot"]}
+            self.docs.append(doc)
+            self._apply(doc, update, inserting=True)
+        else:
+            self._apply(doc, update, inserting=False)
+        return doc
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append(update)
+        doc = self._find(query)
+        if doc is None and upsert:
+            doc = {"_id": len(self.docs) + 1, **query}
+            self.docs.append(doc)
+            self._apply(doc, update, inserting=True)
+        elif doc is not None:
+            self._apply(doc, update, inserting=False)
+
+
+class _Events:
+    def __init__(self):
+        self.entries = {}
+
+    async def append(self, player_id, save_slot, turn, entry):
+        self.entries[(player_id, save_slot, turn)] = entry
+
+    async def append_many(self, save_slot, rows):
+        for player_id, turn, entry in rows:
+            self.entries[(player_id, save_slot, turn)] = entry
+
+    async def replace(self, player_id, save_slot, entries):
+        self.entries = {key: value for key, value in self.entries.items() if key[:2] != (player_id, save_slot)}
+        for turn, entry in enumerate(entries):
+            self.entries[(player_id, save_slot, turn)] = entry
+        return len(entries)
+
+
+def _entry(turn):
+    return {"t": f"{turn:04d}", "text": "A long corridor stretches ahead." * 4, "type": "story"}
+
+
+def _log(turns):
+    return [_entry(i) for i in range(turns)]
+
+
+def _client_events(turns):
+    """previousEvents as the game client sends them: its own ids and timestamps."""
+    return [
+        {"id": str(1700000000000 + i), "text": "A long corridor stretches ahead." * 4, "timestamp": f"{i:04d}", "type": "story"}
+        for i in range(turns)
+    ]
+
+
+def _client_state_fields(turn):
+    # /api/story carries the client's log as previousEvents and no gameState.storyLog
+    return {"turnCount": turn + 1, "storyPhase": "exploration", "previousEvents": _client_events(turn)}
+
+
+def test_append_update_size_is_flat_in_turn_count():
+    sizes = []
+    for turns in (30, 200):
+        fields = {**_client_state_fields(turns), "previousEvents": _client_events(turns)[-AUTOSAVE_EVENTS_TAIL:]}
+        sizes.append(len(bson.encode(build_append_update("Aria", fields, _entry(turns), None, [], []))))
+    assert sizes[0] == sizes[1]
+
+
+@pytest.mark.asyncio
+async def test_client_turns_append_and_tail_capped():
+    saves, events = _Saves(), _Events()
+    turns = STORY_LOG_TAIL + 5
+    for turn in range(turns):
+        mode = await write_story_autosave(saves, "Aria", _client_state_fields(turn), None, _entry(turn), events=events)
+        assert mode == AUTOSAVE_MODE_APPEND
+
+    save = saves.docs[0]
+    assert save["storyLogCount"] == turns
+    assert save["storyLogLast"] == _entry(turns - 1)["t"]
+    assert len(save["storyLog"]) == STORY_LOG_TAIL == len(save["gameState"]["storyLog"])
+    assert save["gameState"]["storyLog"][-1] == _entry(turns - 1)
+    assert len(save["gameState"]["previousEvents"]) == AUTOSAVE_EVENTS_TAIL
+    assert sorted(turn for _, _, turn in events.entries) == list(range(turns))
+    # Every turn is one write carrying just the new entry
+    assert all(len(update["$push"]["storyLog"]["$each"]) == 1 for update in saves.updates)
+
+
+@pytest.mark.asyncio
+async def test_sent_log_matching_count_and_last_entry_appends():
+    saves, events = _Saves(), _Events()
+    for turn in range(3):
+        await write_story_autosave(saves, "Aria", {"turnCount": turn + 1}, None, _entry(turn), events=events)
+
+    mode = await write_story_autosave(saves, "Aria", {"turnCount": 4}, _log(3), _entry(3), events=events)
+
+    assert mode == AUTOSAVE_MODE_APPEND
+    assert saves.docs[0]["storyLogCount"] == 4
+
+
+@pytest.mark.asyncio
+async def test_sent_log_of_same_length_from_another_timeline_is_rewritten():
+    saves, events = _Saves(), _Events()
+    for turn in range(3):
+        await write_story_autosave(saves, "Aria", {"turnCount": turn + 1}, None, _entry(turn), events=events)
+
+    other = _log(2) + [{"t": "other", "text": "You took the other door.", "type": "story"}]
+    mode = await write_story_autosave(saves, "Aria", {"turnCount": 4}, other, _entry(3), events=events)
+
+    assert mode == AUTOSAVE_MODE_REWRITE
+    save = saves.docs[0]
+    assert save["storyLogCount"] == 4
+    assert save["gameState"]["storyLog"][-2] == other[-1]
+    assert events.entries[("Aria", 1, 2)] == other[-1]
+
+
+@pytest.mark.asyncio
+async def test_client_log_that_diverged_is_rewritten():
+    saves, events = _Saves(), _Events()
+    await write_story_autosave(saves, "Aria", {"turnCount": 1}, [], _entry(0), events=events)
+    mode = await write_story_autosave(saves, "Aria", {"turnCount": 4}, _log(3), _entry(3), events=events)
+
+    assert mode == AUTOSAVE_MODE_REWRITE
+    assert saves.docs[0]["storyLogCount"] == 4
+    assert len(events.entries) == 4
+
+
+@pytest.mark.asyncio
+async def test_legacy_save_is_migrated_before_first_append():
+    legacy_log = _log(STORY_LOG_TAIL + 10)
+    saves = _Saves([{"_id": 1, "playerId": "Aria", "saveSlot": 1, "storyLog": legacy_log, "gameState": {"storyLog": legacy_log}}])
+    events = _Events()
+
+    await write_story_autosave(saves, "Aria", {"turnCount": 99}, None, _entry(999), events=events)
+
+    save = saves.docs[0]
+    assert save["storyLogCount"] == len(legacy_log) + 1
+    assert events.entries[("Aria", 1, 0)] == legacy_log[0]
+    assert events.entries[("Aria", 1, len(legacy_log))] == _entry(999)
+    assert save["gameState"]["storyLog"][-1] == _entry(999)
+
+
+@pytest.mark.asyncio
+async def test_combat_turn_is_one_write_without_reads():
+    legacy_log = _log(5)
+    saves = _Saves([{"_id": 1, "playerId": "Aria", "saveSlot": 1, "storyLog": legacy_log, "badges": [{"id": "old"}]}])
+    entry = {"t": "0001", "text": "Combat turn processed", "type": "combat"}
+
+    query = {"playerId": "Aria", "saveSlot": 1}
+    await saves.update_one(query, build_combat_turn_update("Aria", {"name": "Aria", "health": 12}, entry, None), upsert=True)
+    await saves.update_one(
+        query, build_combat_turn_update("Aria", {"name": "Aria", "health": 7}, entry, None, badges=[{"id": "new"}]), upsert=True
+    )
+
+    save = saves.docs[0]
+    assert saves.reads == 0 and len(saves.updates) == 2
+    assert save["gameState"]["player"]["health"] == 7
+    assert save["combatLog"] == [entry, entry]
+    assert save["storyLog"] == legacy_log  # story history is untouched
+    assert save["badges"] == [{"id": "new"}] == save["gameState"]["badges"]
+
+
+@pytest.mark.asyncio
+async def test_queued_story_turns_merge_with_combat_and_write_events_on_flush():
+    saves, events = _Saves(), _Events()
+    cache = HotSaveCache(saves, events)
+    combat_entry = {"t": "c1", "text": "Combat turn processed", "type": "combat"}
+
+    assert await queue_story_autosave(cache, events, "Aria", _client_state_fields(0), _entry(0)) == 0
+    await cache.write("Aria", build_combat_turn_update("Aria", {"name": "Aria", "health": 9}, combat_entry, None))
+    assert await queue_story_autosave(cache, events, "Aria", _client_state_fields(1), _entry(1)) == 1
+
+    # Only the first turn read the save (view + cursor); nothing is written before the flush
+    assert saves.reads == 2 and saves.updates == [] and events.entries == {}
+
+    await cache.stop()
+    save = saves.docs[0]
+    assert len(saves.updates) == 1
+    assert save["storyLogCount"] == 2 and save["storyLogLast"] == "0001"
+    assert save["gameState"]["storyLog"] == [_entry(0), _entry(1)] and save["combatLog"] == [combat_entry]
+    assert events.entries == {("Aria", 1, 0): _entry(0), ("Aria", 1, 1): _entry(1)}
+
+    stats = cache.get_stats()
+    assert (stats["writes"], stats["storyWrites"], stats["storyEvents"], stats["coalesced"]) == (3, 2, 2, 2)
+
+
+@pytest.mark.asyncio
+async def test_queued_story_turn_migrates_a_legacy_save_first():
+    legacy_log = _log(STORY_LOG_TAIL + 10)
+    saves = _Saves([{"_id": 1, "playerId": "Aria", "saveSlot": 1, "storyLog": legacy_log, "gameState": {"storyLog": legacy_log}}])
+    events = _Events()
+    cache = HotSaveCache(saves, events)
+
+    turn = await queue_story_autosave(cache, events, "Aria", {"turnCount": 99}, _entry(999))
+    await cache.flush()
+
+    assert turn == len(legacy_log)
+    assert saves.docs[0]["storyLogCount"] == len(legacy_log) + 1
+    assert events.entries[("Aria", 1, 0)] == legacy_log[0]
+    assert events.entries[("Aria", 1, turn)] == _entry(999)
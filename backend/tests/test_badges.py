@@ -1,6 +1,7 @@
 import datetime
 import pytest
 
+from backend import story_service
 from backend.story_service import resolve_badges, BADGE_DEFINITIONS
 
 
@@ -36,3 +37,36 @@ async def test_resolve_badges_ignores_unknown_ids():
     assert newly_unlocked == []
 
 
+class _CachedAutosave:
+    def __init__(self, badges):
+        self.badges = badges
+
+    async def get(self, player_id):
+        return {"badges": self.badges}
+
+
+@pytest.mark.asyncio
+async def test_resolve_badges_merges_request_into_stored_badges(monkeypatch):
+    stored = [{"id": "trailblazer", "earnedAt": "2026-01-01T00:00:00+00:00"}]
+    monkeypatch.setattr(story_service, "hot_saves", _CachedAutosave(stored))
+    sent = [
+        {"id": "trailblazer", "earnedAt": "2026-06-01T00:00:00+00:00"},
+        {"id": "puzzle_master", "earnedAt": "2026-02-01T00:00:00+00:00"},
+        {"id": "made_up", "title": "Not a real badge"},
+    ]
+
+    badges, newly_unlocked = await resolve_badges("PlayerThree", sent, {"treasure_seeker"})
+
+    assert [badge["id"] for badge in badges] == ["trailblazer", "puzzle_master", "treasure_seeker"]
+    assert badges[0]["earnedAt"] == "2026-01-01T00:00:00+00:00"
+    assert [badge["id"] for badge in newly_unlocked] == ["treasure_seeker"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_badges_keeps_stored_badges_when_request_sends_none(monkeypatch):
+    monkeypatch.setattr(story_service, "hot_saves", _CachedAutosave([{"id": "trailblazer"}]))
+
+    badges, newly_unlocked = await resolve_badges("PlayerFour", [], set())
+
+    assert [badge["id"] for badge in badges] == ["trailblazer"]
+    assert newly_unlocked == []
@@ -0,0 +1,151 @@
+import pytest
+from pymongo.errors import BulkWriteError
+
+from backend.core.autosave import build_combat_turn_update
+from backend.core.hot_saves import HOT_SAVE_MODE_WRITE_THROUGH, HotSaveCache, merge_updates
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Saves:
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+        self.reads = 0
+        self.writes = []
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return self.docs.get(query["playerId"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.writes.append((query["playerId"], update))
+
+
+class _BulkSaves(_Saves):
+    def __init__(self, fail_players=()):
+        super().__init__()
+        self.batches = []
+        self.fail_players = set(fail_players)
+
+    async def bulk_write(self, operations, ordered=True):
+        assert ordered is False
+        batch = [(op._filter["playerId"], op._doc) for op in operations]
+        self.batches.append(batch)
+        errors = [{"index": i, "errmsg": "boom"} for i, (player, _) in enumerate(batch) if player in self.fail_players]
+        self.writes.extend(write for write in batch if write[0] not in self.fail_players)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+def _combat(health, badges=None):
+    entry = {"t": str(health), "text": "Combat turn processed", "type": "combat"}
+    return build_combat_turn_update("Aria", {"name": "Aria", "health": health}, entry, None, badges=badges)
+
+
+def test_merge_updates_combines_sets_pushes_and_incs():
+    merged = merge_updates(
+        {"$set": {"a": 1}, "$push": {"log": {"$each": [1], "$slice": -5}}, "$inc": {"n": 1}},
+        {"$set": {"a": 2, "b": 3}, "$push": {"log": {"$each": [2], "$slice": -5}}, "$inc": {"n": 2}},
+    )
+    assert merged == {"$set": {"a": 2, "b": 3}, "$push": {"log": {"$each": [1, 2], "$slice": -5}}, "$inc": {"n": 3}}
+    # A parent and child path, or one path under two operators, cannot be folded together
+    assert merge_updates({"$set": {"gameState": {}}}, {"$set": {"gameState.player": {}}}) is None
+    assert merge_updates({"$set": {"n": 1}}, {"$inc": {"n": 1}}) is None
+    # A counter seeded at zero on insert and then bumped is the bump alone
+    seeded = {"$setOnInsert": {"createdAt": 1, "n": 0}}
+    assert merge_updates(seeded, {"$inc": {"n": 1}}) == {"$setOnInsert": {"createdAt": 1}, "$inc": {"n": 1}}
+    assert merge_updates({"$setOnInsert": {"n": 5}}, {"$inc": {"n": 1}}) is None
+
+
+@pytest.mark.asyncio
+async def test_write_behind_coalesces_a_burst_into_one_write():
+    saves = _BulkSaves()
+    saves.docs = {"Aria": {"badges": [{"id": "old"}], "gameState": {"player": {"health": 20}}}}
+    cache = HotSaveCache(saves)
+
+    assert (await cache.get("Aria"))["badges"] == [{"id": "old"}]
+    for health in (15, 10, 5):
+        await cache.write("Aria", _combat(health))
+    await cache.write("Aria", _combat(3, badges=[{"id": "new"}]))
+
+    view = await cache.get("Aria")
+    assert saves.reads == 1 and view["gameState.player"]["health"] == 3 and view["badges"] == [{"id": "new"}]
+    assert saves.writes == []
+
+    await cache.stop()
+    assert len(saves.writes) == 1
+    update = saves.writes[0][1]
+    assert update["$set"]["gameState.player"]["health"] == 3
+    assert [entry["t"] for entry in update["$push"]["combatLog"]["$each"]] == ["15", "10", "5", "3"]
+    assert cache.get_stats()["coalesced"] == 3
+
+
+@pytest.mark.asyncio
+async def test_max_pending_and_write_through_flush_immediately():
+    saves = _Saves()
+    cache = HotSaveCache(saves, max_pending=2)
+    await cache.write("Aria", _combat(9))
+    assert saves.writes == []
+    await cache.write("Aria", _combat(8))
+    assert len(saves.writes) == 1 and not cache.has_pending("Aria")
+
+    through = HotSaveCache(saves, mode=HOT_SAVE_MODE_WRITE_THROUGH)
+    await through.write("Aria", _combat(7))
+    assert len(saves.writes) == 2
+
+
+@pytest.mark.asyncio
+async def test_idle_players_are_flushed_and_evicted():
+    clock = _Clock()
+    saves = _BulkSaves()
+    cache = HotSaveCache(saves, idle_ttl=60, clock=clock)
+    await cache.get("Aria")
+    await cache.write("Aria", _combat(4))
+
+    clock.now = 61
+    await cache.get("Bram")
+    assert cache.get_stats()["players"] == 1
+    assert [player for player, _ in saves.writes] == ["Aria"]
+
+
+@pytest.mark.asyncio
+async def test_flush_batches_players_and_keeps_each_players_order():
+    clock = _Clock()
+    saves = _BulkSaves()
+    cache = HotSaveCache(saves, batch_size=2, clock=clock)
+    for player in ("Aria", "Bram", "Cyra"):
+        await cache.write(player, _combat(9))
+    # Not mergeable with the combat update ($set parent vs child): a second, ordered write
+    await cache.write("Aria", {"$set": {"gameState": {"turnCount": 2}}})
+    clock.now = 1.5
+
+    assert await cache.flush() == 3
+    assert [[player for player, _ in batch] for batch in saves.batches] == [["Aria", "Bram"], ["Aria"], ["Cyra"]]
+    assert [update for player, update in saves.writes if player == "Aria"][1] == {"$set": {"gameState": {"turnCount": 2}}}
+
+    stats = cache.get_stats()
+    assert stats["bulkWrites"] == 3 and stats["mongoWrites"] == 4 and stats["pendingUpdates"] == 0
+    assert stats["batchSize"]["max"] == 2 and stats["queueLagSeconds"]["max"] == 1.5
+
+
+@pytest.mark.asyncio
+async def test_failed_bulk_writes_stay_queued_for_that_player_only():
+    saves = _BulkSaves(fail_players={"Bram"})
+    cache = HotSaveCache(saves)
+    await cache.write("Aria", _combat(9))
+    await cache.write("Bram", _combat(8))
+
+    assert await cache.flush() == 1
+    assert [player for player, _ in saves.writes] == ["Aria"]
+    assert cache.has_pending("Bram") and not cache.has_pending("Aria")
+
+    saves.fail_players.clear()
+    await cache.stop()
+    assert [player for player, _ in saves.writes] == ["Aria", "Bram"]
+    assert cache.get_stats()["flushErrors"] == 1
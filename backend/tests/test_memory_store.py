@@ -0,0 +1,77 @@
+import datetime
+
+import pytest
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from backend.core.memory_store import MemoryDatabase
+from backend.core.repositories import Repositories
+
+
+@pytest.mark.asyncio
+async def test_upsert_operators_and_projection_match_mongo():
+    saves = MemoryDatabase().saves
+    query = {"playerId": "Aria", "saveSlot": 1}
+    update = {
+        "$set": {"gameState.player": {"name": "Aria", "level": 2}},
+        "$push": {"storyLog": {"$each": [1, 2, 3], "$slice": -2}},
+        "$inc": {"storyLogCount": 1},
+    }
+    doc = await saves.find_one_and_update(query, update, upsert=True, return_document=ReturnDocument.AFTER)
+    assert doc["storyLogCount"] == 1 and doc["storyLog"] == [2, 3] and doc["playerId"] == "Aria"
+
+    await saves.update_one(query, {"$unset": {"gameState.player.level": ""}, "$set": {"deletedAt": None}})
+    projected = await saves.find_one(query, {"_id": 0, "gameState.player.name": 1, "storyLog": 1})
+    assert projected == {"gameState": {"player": {"name": "Aria"}}, "storyLog": [2, 3]}
+    assert await saves.find_one({"deletedAt": None, "schemaVersion": {"$not": {"$gte": 2}}}) is not None
+    assert await saves.count_documents({"storyLog": 3}) == 1
+
+
+@pytest.mark.asyncio
+async def test_unique_indexes_and_unordered_bulk_errors():
+    saves = MemoryDatabase().saves
+    await saves.create_index([("playerId", 1), ("saveSlot", 1)], unique=True)
+    await saves.insert_one({"playerId": "Aria", "saveSlot": 1})
+    with pytest.raises(DuplicateKeyError):
+        await saves.insert_one({"playerId": "Aria", "saveSlot": 1})
+
+    with pytest.raises(BulkWriteError) as err:
+        await saves.bulk_write(
+            [
+                UpdateOne({"playerId": "Bram", "saveSlot": 1}, {"$set": {"n": 1}}, upsert=True),
+                UpdateOne({"playerId": "Aria", "saveSlot": 1}, {"$set": {"saveSlot": 1, "playerId": "Bram"}}),
+                UpdateOne({"playerId": "Cyra", "saveSlot": 1}, {"$set": {"n": 3}}, upsert=True),
+            ],
+            ordered=False,
+        )
+    assert [error["index"] for error in err.value.details["writeErrors"]] == [1]
+    assert await saves.count_documents({}) == 3
+
+
+@pytest.mark.asyncio
+async def test_stored_documents_are_copies_with_naive_utc_datetimes():
+    players = MemoryDatabase().players
+    now = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    doc = {"name": "Aria", "tags": ["a"], "createdAt": now}
+    await players.insert_one(doc)
+    doc["tags"].append("b")
+
+    stored = await players.find_one({"name": "Aria"})
+    assert stored["tags"] == ["a"] and "_id" in doc
+    assert stored["createdAt"] == now.replace(tzinfo=None)
+    stored["tags"].append("c")
+    assert (await players.find_one({"name": "Aria"}))["tags"] == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_global_leaderboard_pipeline_runs_in_memory():
+    repos = Repositories.in_memory()
+    await repos.saves.upsert_slot("Aria", 1, {"$set": {"summary": {"level": 3, "xp": 50, "badgesCount": 2}, "deletedAt": None}})
+    await repos.saves.upsert_slot("Bram", 1, {"$set": {"gameState": {"player": {"level": 5, "xp": 10}}, "badges": [{}]}})
+    await repos.saves.upsert_slot("Cyra", 1, {"$set": {"summary": {"level": 9, "xp": 0}, "deletedAt": datetime.datetime(2026, 1, 1)}})
+
+    board = await repos.saves.global_leaderboard(10)
+    assert [(row["playerId"], row["score"]) for row in board] == [("Bram", 560), ("Aria", 450)]
+
+    sorted_saves = await repos.saves.collection.find({}, {"playerId": 1}).sort("playerId", DESCENDING).to_list(None)
+    assert [doc["playerId"] for doc in sorted_saves] == ["Cyra", "Bram", "Aria"]
@@ -3,7 +3,9 @@ import pytest
 from fastapi.testclient import TestClient
 
 # Import the app without executing code that depends on runtime state
+from backend import story_service
 from backend.app import app
+from backend.core.memory_store import MemoryDatabase
 
 
 @pytest.fixture(scope="session")
@@ -59,3 +61,217 @@ def test_cameo_accept_endpoint(client):
     assert resp.status_code in (200, 404, 410, 409, 503)
 
 
+# --- Deterministic endpoint tests against the in-memory storage backend ---
+
+
+@pytest.fixture
+def memory_client():
+    story_service.bind_storage(MemoryDatabase())
+    try:
+        yield TestClient(app)
+    finally:
+        story_service.bind_storage(None)
+
+
+def _player(name):
+    return {
+        "name": name,
+        "class": "Warrior",
+        "gender": "Other",
+        "level": 3,
+        "health": 100,
+        "maxHealth": 100,
+        "xp": 120,
+        "maxXp": 300,
+        "position": {"x": 0, "y": 0},
+        "inventory": [],
+        "stats": {"strength": 10, "intelligence": 5, "agility": 7},
+    }
+
+
+def test_save_list_load_rename_delete_in_memory(memory_client):
+    resp = memory_client.post(
+        "/api/save",
+        json={
+            "playerId": "Aria",
+            "saveSlot": 2,
+            "saveName": "Before the gate",
+            "gameState": {"player": _player("Aria"), "turnCount": 4, "codex": {"gate": "Sealed"}},
+        },
+    )
+    assert resp.status_code == 200
+    save_id = resp.json()["saveId"]
+
+    listing = memory_client.get("/api/saves/Aria").json()
+    assert [(s["saveId"], s["name"], s["summary"]["level"]) for s in listing] == [(save_id, "Before the gate", 3)]
+
+    loaded = memory_client.get(f"/api/load/{save_id}").json()
+    assert loaded["codex"] == {"gate": "Sealed"} and loaded["turnCount"] == 4
+
+    assert memory_client.patch(f"/api/saves/{save_id}", json={"saveName": "At the gate"}).status_code == 200
+    assert memory_client.get("/api/check-save/Aria").json()["save"]["name"] == "At the gate"
+    assert memory_client.get("/api/players/name/Aria").json()["name"] == "Aria"
+
+    assert memory_client.delete(f"/api/saves/{save_id}").status_code == 200
+    assert memory_client.get("/api/saves/Aria").json() == []
+    assert memory_client.get("/api/load/by-name", params={"name": "Aria"}).status_code == 404
+    assert memory_client.delete("/api/saves/64b7f0c2a1b2c3d4e5f60718").status_code == 404
+
+
+def test_friends_and_leaderboards_in_memory(memory_client):
+    for name in ("Aria", "Bram"):
+        memory_client.post(
+            "/api/save",
+            json={"playerId": name, "saveSlot": 1, "saveName": "AutoSave", "gameState": {"player": _player(name)}},
+        )
+    assert memory_client.post("/api/friends/request", json={"fromPlayerId": "Aria", "toPlayerId": "Bram"}).status_code == 200
+    assert memory_client.post("/api/friends/request", json={"fromPlayerId": "Bram", "toPlayerId": "Aria"}).status_code == 409
+    assert memory_client.post("/api/friends/accept", json={"fromPlayerId": "Aria", "toPlayerId": "Bram"}).status_code == 200
+
+    friends = memory_client.get("/api/friends/Aria").json()
+    assert [(f["playerId"], f["stats"]["level"]) for f in friends] == [("Bram", 3)]
+    board = memory_client.get("/api/leaderboard/friends/Aria").json()
+    assert sorted(entry["playerId"] for entry in board) == ["Aria", "Bram"]
+    assert [entry["score"] for entry in memory_client.get("/api/leaderboard/global").json()] == [420, 420]
+
+
+def test_cameo_invite_and_daily_challenge_in_memory(memory_client):
+    invite = memory_client.post(
+        "/api/cameo/invite", json={"playerId": "Aria", "cameoPlayer": _player("Aria"), "expiresInMinutes": 30}
+    ).json()
+    accepted = memory_client.post("/api/cameo/accept", json={"playerId": "Bram", "inviteCode": invite["code"]})
+    assert accepted.status_code == 200 and accepted.json()["cameo"]["hostPlayerId"] == "Aria"
+    assert memory_client.post("/api/cameo/accept", json={"playerId": "Bram", "inviteCode": invite["code"]}).status_code == 409
+
+    challenge = memory_client.get("/api/challenges/daily", params={"player_id": "Aria"}).json()
+    assert memory_client.get("/api/challenges/daily", params={"player_id": "Aria"}).json()["id"] == challenge["id"]
+    done = memory_client.post("/api/challenges/complete", json={"challengeId": challenge["id"], "playerId": "Aria"})
+    assert done.json()["streak"] == 1
+
+
+def test_restore_save_snapshot_in_memory(memory_client):
+    save = {"playerId": "Aria", "saveSlot": 2, "saveName": "Gate"}
+    log = [{"t": str(i), "text": f"turn {i}"} for i in range(3)]
+    first = memory_client.post(
+        "/api/save", json={**save, "gameState": {"player": _player("Aria"), "turnCount": 3, "storyLog": log}}
+    ).json()
+    memory_client.post(
+        "/api/save",
+        json={**save, "gameState": {"player": _player("Aria"), "turnCount": 9, "storyLog": log * 2, "codex": {"x": 1}}},
+    )
+
+    listed = memory_client.get(f"/api/saves/{first['saveId']}/snapshots").json()["snapshots"]
+    assert [(s["seq"], s["summary"]["turnCount"]) for s in listed] == [(1, 9), (0, 3)]
+
+    restored = memory_client.post(f"/api/saves/{first['saveId']}/snapshots/0/restore")
+    assert restored.json() == {"success": True, "saveId": first["saveId"], "restoredSeq": 0, "seq": 2}
+    loaded = memory_client.get(f"/api/load/{first['saveId']}").json()
+    assert loaded["turnCount"] == 3 and "codex" not in loaded
+    assert loaded["storyCursor"]["total"] == 3
+    events = memory_client.get(f"/api/load/{first['saveId']}/events").json()
+    assert [item["turn"] for item in events["items"]] == [0, 1, 2]
+    assert memory_client.post(f"/api/saves/{first['saveId']}/snapshots/7/restore").status_code == 404
+
+
+def test_save_after_load_keeps_older_history_in_memory(memory_client):
+    save = {"playerId": "Aria", "saveSlot": 1, "saveName": "AutoSave"}
+    log = [{"t": f"{i:04d}", "text": f"turn {i}", "sceneId": f"scene-{i}"} for i in range(40)]
+    save_id = memory_client.post("/api/save", json={**save, "gameState": {"player": _player("Aria"), "storyLog": log}}).json()["saveId"]
+
+    loaded = memory_client.get(f"/api/load/{save_id}").json()
+    assert len(loaded["storyLog"]) == 30 and loaded["storyCursor"] == {"saveSlot": 1, "total": 40, "before": 10}
+
+    # The client saves back the tail it holds, as the game does after every turn
+    client_log = [{"id": "1", "text": event["text"], "timestamp": event["t"], "type": "story"} for event in loaded["storyLog"]]
+    memory_client.post("/api/save", json={**save, "gameState": {"player": _player("Aria"), "storyLog": client_log}})
+    assert memory_client.get(f"/api/load/{save_id}").json()["storyCursor"]["total"] == 40
+
+    # With the cursor it loaded, entries past the stored history are appended
+    new_entry = {"id": "2", "text": "turn 40", "timestamp": "0040", "type": "story"}
+    memory_client.post(
+        "/api/save",
+        json={**save, "gameState": {"player": _player("Aria"), "storyLog": client_log + [new_entry], "storyCursor": loaded["storyCursor"]}},
+    )
+    reloaded = memory_client.get(f"/api/load/{save_id}").json()
+    assert reloaded["storyCursor"]["total"] == 41 and reloaded["storyLog"][-1]["text"] == "turn 40"
+
+    events = memory_client.get(f"/api/load/{save_id}/events", params={"limit": 50}).json()
+    assert [item["turn"] for item in events["items"]] == list(range(41))
+    assert events["items"][0]["sceneId"] == "scene-0"
+
+
+def test_story_turn_session_survives_the_client_autosave_in_memory(memory_client, monkeypatch):
+    async def _story(*args, **kwargs):
+        return {"story": "The gate creaks open.", "choices": ["Enter", "Wait"]}
+
+    monkeypatch.setattr(story_service, "generate_story_with_ai", _story)
+    turn = {"player": _player("Cato"), "genre": "Fantasy", "choice": "Knock", "gameState": {"turnCount": 1}}
+    first = memory_client.post("/api/story", json={**turn, "previousEvents": []}).json()
+
+    # The client's per-turn save of slot 1: counters nested, no sessionVersion
+    client_state = {
+        "player": _player("Cato"),
+        "genre": "Fantasy",
+        "storyLog": [{"id": "1", "text": first["story"], "timestamp": "2026-01-01T00:00:00Z", "type": "story"}],
+        "gameState": {"turnCount": 1, "storyPhase": "exploration"},
+    }
+    saved = memory_client.post("/api/save", json={"playerId": "Cato", "saveSlot": 1, "saveName": "AutoSave", "gameState": client_state})
+    assert saved.status_code == 200
+
+    # Another instance, with no hot copy, rebuilds the session from the save
+    story_service.story_sessions.forget("Cato")
+    delta = {**turn, "choice": "Enter", "sessionVersion": first["sessionVersion"], "newEvents": [], "gameState": {"turnCount": 2}}
+    second = memory_client.post("/api/story", json=delta)
+    assert second.status_code == 200 and second.json()["sessionVersion"] > first["sessionVersion"]
+
+
+def test_story_turns_queue_on_the_hot_save_cache_in_memory(memory_client, monkeypatch):
+    async def _story(*args, **kwargs):
+        return {"story": "The gate creaks open.", "choices": ["Enter", "Wait"]}
+
+    monkeypatch.setattr(story_service, "generate_story_with_ai", _story)
+    turn = {"player": _player("Fen"), "genre": "Fantasy", "choice": "Knock", "previousEvents": []}
+    before = story_service.hot_saves.get_stats()
+    for count in (1, 2, 3):
+        assert memory_client.post("/api/story", json={**turn, "gameState": {"turnCount": count}}).status_code == 200
+
+    hot = story_service.hot_saves.get_stats()
+    assert hot["storyWrites"] - before["storyWrites"] == 3 and hot["mongoWrites"] == before["mongoWrites"]
+    assert hot["pendingStoryEvents"] == 3
+
+    # Paging the history lands the queued turns first
+    events = memory_client.get("/api/story-events/Fen").json()
+    assert [item["turn"] for item in events["items"]] == [0, 1, 2]
+    assert story_service.hot_saves.get_stats()["storyEvents"] - before["storyEvents"] == 3
+
+
+@pytest.mark.asyncio
+async def test_rebinding_storage_drops_hot_copies(memory_client):
+    story_service.story_sessions.commit("Dara", [], _player("Dara"), "Fantasy", {"turnCount": 2})
+    await story_service.hot_saves.write("Dara", {"$set": {"badges": []}})
+
+    story_service.bind_storage(MemoryDatabase())
+
+    assert story_service.story_sessions.get_stats()["sessions"] == 0
+    hot = story_service.hot_saves.get_stats()
+    assert (hot["players"], hot["pendingPlayers"]) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_autosave_slot_snapshots_follow_the_autosave_cadence(memory_client, monkeypatch):
+    monkeypatch.setattr("backend.core.save_snapshots.SAVE_SNAPSHOT_AUTOSAVE_EVERY", 5)
+    save = {"playerId": "Eda", "saveSlot": 1, "saveName": "AutoSave"}
+    log = []
+    for turn in range(1, 11):
+        log.append({"t": f"{turn:04d}", "text": f"turn {turn}"})
+        state = {"player": _player("Eda"), "storyLog": list(log), "gameState": {"turnCount": turn}}
+        save_id = memory_client.post("/api/save", json={**save, "gameState": state}).json()["saveId"]
+    memory_client.post("/api/save", json={**save, "gameState": state})
+
+    listed = memory_client.get(f"/api/saves/{save_id}/snapshots").json()["snapshots"]
+    assert [(s["source"], s["summary"]["turnCount"]) for s in listed] == [("autosave", 10), ("autosave", 5)]
+
+    memory_client.post(f"/api/saves/{save_id}/snapshots/0/restore")
+    stored = await story_service.repos.saves.get_slot("Eda", 1)
+    assert [entry["text"] for entry in stored["storyLog"]] == [f"turn {turn}" for turn in range(1, 6)]
+    assert stored["storyLogCount"] == 5 and stored["storyLogLast"] == "0005"
@@ -0,0 +1,70 @@
+import bson
+import pytest
+
+from backend.core.save_codec import (
+    SAVE_SCHEMA_VERSION,
+    compact_save_doc,
+    encode_cold_state,
+    expand_game_state,
+    migrate_save_schema,
+    split_game_state,
+)
+
+LORE = "Beneath the drowned abbey the bells still toll."
+
+
+def _state():
+    return {
+        "player": {"name": "Aria", "level": 7, "xp": 900},
+        "genre": "Fantasy",
+        "turnCount": 40,
+        "badges": [{"id": "first-blood"}],
+        "storyLog": [{"t": "0001", "text": LORE}],
+        "codex": {f"entry-{i}": {"text": LORE} for i in range(40)},
+        "completedQuests": [{"id": f"q{i}", "description": LORE} for i in range(20)],
+    }
+
+
+class _Saves:
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+
+
+def test_cold_fields_round_trip_through_the_blob():
+    hot, cold = split_game_state(_state())
+    assert set(cold) == {"codex", "completedQuests"}
+    assert hot["player"]["level"] == 7 and hot["badges"] == [{"id": "first-blood"}]
+
+    save = {"gameState": hot, "coldState": encode_cold_state(cold)}
+    assert expand_game_state(save) == _state()
+    assert len(bson.encode(save)) < len(bson.encode({"gameState": _state()})) / 2
+
+
+def test_save_without_cold_fields_has_no_blob():
+    hot, cold = split_game_state({"player": {"name": "Aria"}, "turnCount": 1})
+    assert encode_cold_state(cold) is None
+    assert expand_game_state({"gameState": hot}) == hot
+
+
+@pytest.mark.asyncio
+async def test_v1_save_is_migrated_on_read_without_touching_hot_fields():
+    saves = _Saves()
+    save = {"_id": 1, "playerId": "Aria", "saveSlot": 2, "gameState": _state()}
+
+    migrated = await migrate_save_schema(saves, save)
+
+    query, update = saves.updates[0]
+    assert query["_id"] == 1 and "schemaVersion" in query
+    assert set(update["$unset"]) == {"gameState.codex", "gameState.completedQuests"}
+    assert not any(key.startswith("gameState") for key in update["$set"])
+    assert migrated["schemaVersion"] == SAVE_SCHEMA_VERSION
+    assert "codex" not in migrated["gameState"]
+    assert expand_game_state(migrated) == _state()
+
+    # Already v2: nothing more to write.
+    assert await migrate_save_schema(saves, migrated) is migrated
+    assert len(saves.updates) == 1
+    assert compact_save_doc(migrated) is None
@@ -0,0 +1,61 @@
+import hashlib
+
+import bson
+import pytest
+
+from backend.core.memory_store import MemoryDatabase
+from backend.core.save_snapshots import SaveSnapshotStore, apply_diff, diff_state
+
+
+def _lore(i):
+    return hashlib.sha256(str(i).encode()).hexdigest()
+
+
+def _state(turn):
+    return {
+        "player": {"name": "Aria", "level": 1 + turn // 3, "xp": turn * 40},
+        "turnCount": turn,
+        "currentLocation": f"room-{turn}",
+        "codex": {f"entry.{i}": {"text": _lore(i)} for i in range(30 + turn)},
+    }
+
+
+def test_diff_round_trips_nested_changes_and_dotted_keys():
+    before, after = _state(1), _state(2)
+    after["player"].pop("xp")
+    diff = diff_state(before, after)
+    assert ["codex", "entry.31"] in [path for path, _ in diff["set"]]
+    assert diff["unset"] == [["player", "xp"]]
+    assert apply_diff(before, diff) == after
+    assert before == _state(1)
+    assert diff_state(after, after) == {"set": [], "unset": []}
+
+
+@pytest.mark.asyncio
+async def test_chain_is_bounded_and_every_point_restores():
+    snapshots = SaveSnapshotStore(MemoryDatabase().save_snapshots, max_chain=3, keep_bases=10)
+    seqs = [await snapshots.record("Aria", 1, _state(turn), "autosave", turn) for turn in range(9)]
+    assert seqs == list(range(9))
+
+    docs = await snapshots.collection.find({}).sort("seq", 1).to_list(length=None)
+    assert [doc["kind"] for doc in docs] == ["base", "diff", "diff", "diff"] * 2 + ["base"]
+    diff_bytes = max(len(bson.encode(doc)) for doc in docs if doc["kind"] == "diff")
+    assert diff_bytes * 5 < len(bson.encode(_state(8)))
+
+    for turn in range(9):
+        state, doc = await snapshots.state_at("Aria", 1, turn)
+        assert state == _state(turn) and doc["storyLogCount"] == turn
+    assert await snapshots.state_at("Aria", 1, 9) is None
+    # Unchanged state is not recorded again
+    assert await snapshots.record("Aria", 1, _state(8), "manual") == 8
+
+
+@pytest.mark.asyncio
+async def test_old_chains_are_pruned_past_keep_bases():
+    snapshots = SaveSnapshotStore(MemoryDatabase().save_snapshots, max_chain=1, keep_bases=2)
+    for turn in range(7):
+        await snapshots.record("Aria", 2, _state(turn), "manual")
+    listed = await snapshots.list("Aria", 2)
+    assert [item["seq"] for item in listed] == [6, 5, 4]
+    assert listed[0]["summary"]["turnCount"] == 6 and "state" not in listed[0]
+    assert await snapshots.state_at("Aria", 2, 3) is None
@@ -0,0 +1,46 @@
+from backend.core.autosave import build_append_update, build_combat_turn_update, build_rewrite_update
+from backend.core.save_summary import build_save_summary, summary_from_save
+
+PLAYER = {"name": "Aria", "class": "Mage", "level": 4, "xp": 320}
+
+
+def test_every_autosave_write_maintains_the_summary():
+    state = {"player": PLAYER, "genre": "Fantasy", "turnCount": 12, "storyPhase": "danger"}
+    entry = {"t": "0", "text": "...", "type": "story"}
+
+    appended = build_append_update("Aria", state, entry, None, badges=[{"id": "a"}])["$set"]
+    assert appended["summary.level"] == 4 and appended["summary.turnCount"] == 12
+    assert appended["summary.badgesCount"] == 1
+
+    rewritten = build_rewrite_update("Aria", state, [entry], None, badges=[])["$set"]["summary"]
+    assert rewritten == build_save_summary(state, [])
+
+    combat = build_combat_turn_update("Aria", {**PLAYER, "level": 5}, entry, None)["$set"]
+    assert combat["summary.level"] == 5 and "summary.badgesCount" not in combat
+    assert "summary.turnCount" not in combat  # combat leaves story progress alone
+
+
+def test_client_save_summary_reads_nested_counters():
+    # serializeGameState on the client nests its counters under gameState.gameState
+    client_state = {
+        "player": PLAYER,
+        "genre": "Sci-Fi",
+        "storyLog": [],
+        "gameState": {"turnCount": 27, "storyPhase": "climax", "combatEncounters": 3, "isInitialized": True},
+        "activeQuests": [],
+        "codex": {},
+    }
+    summary = build_save_summary(client_state, [{"id": "a"}])
+    assert (summary["turnCount"], summary["storyPhase"], summary["genre"]) == (27, "climax", "Sci-Fi")
+
+    legacy = {"gameState": client_state}
+    assert summary_from_save(legacy)["turnCount"] == 27
+
+
+def test_legacy_saves_are_summarised_from_game_state():
+    legacy = {"saveName": "Old", "gameState": {"player": PLAYER, "turnCount": 3}, "badges": [{"id": "x"}, {"id": "y"}]}
+    summary = summary_from_save(legacy)
+    assert summary["class"] == "Mage" and summary["turnCount"] == 3 and summary["badgesCount"] == 2
+
+    stored = {"summary": {"level": 9}, "gameState": {"player": PLAYER}}
+    assert summary_from_save(stored) == {"level": 9}
@@ -0,0 +1,59 @@
+from backend.core.scene_archive import compact_legacy_scene_doc
+from backend.core.scene_orchestrator import (
+    SCENE_SCHEMA_VERSION,
+    SceneOrchestrator,
+    SceneRenderRequest,
+    request_from_scene_doc,
+)
+
+
+def _request() -> SceneRenderRequest:
+    return SceneRenderRequest(
+        player={"name": "Aria", "class": "Mage", "level": 4, "inventory": [{"name": "Wand"}] * 20},
+        genre="Fantasy",
+        storyText="Runes flare across the sunken temple.",
+        previousEvents=[{"text": "Earlier turn"}] * 5,
+        activeQuest={"title": "The Drowned Sigil", "description": "Recover the sigil", "progress": 40},
+        currentLocation="Sunken Temple",
+        gameState={"turnCount": 7, "inventory": ["lots", "of", "state"]},
+    )
+
+
+def test_compact_scene_doc_round_trips_to_the_same_prompt():
+    orchestrator = SceneOrchestrator(db=None)
+    request = _request()
+    payload = orchestrator._compose_scene_payload(request)
+    public_scene = payload.model_dump(exclude={"prompts"})
+    doc = orchestrator._build_scene_doc(payload, request, public_scene, "ready", None, "2026-01-01T00:00:00+00:00")
+
+    assert doc["schemaVersion"] == SCENE_SCHEMA_VERSION
+    assert "assets" not in doc
+    assert set(doc["context"]) == {"storyText", "currentLocation", "activeQuest"}
+
+    shared = {"player": {"name": "Aria", "class": "Mage", "level": 4}, "genre": "Fantasy"}
+    rebuilt = request_from_scene_doc(doc, shared)
+    assert rebuilt.gameState == {"turnCount": 7}
+    replayed = orchestrator._compose_scene_payload(rebuilt)
+    assert replayed.mood == payload.mood
+    assert replayed.subtitle == payload.subtitle
+    assert replayed.focalSubjects == payload.focalSubjects
+
+
+def test_legacy_scene_doc_is_compacted_by_migration():
+    request = _request()
+    legacy = {
+        "sceneId": "legacy-1",
+        "status": "ready",
+        "scene": {"title": "Old"},
+        "assets": {"imageUrl": "https://example.com/old.png"},
+        "context": request.model_dump(exclude_none=True),
+    }
+    assert request_from_scene_doc(legacy, None).previousEvents == request.previousEvents
+
+    updates, unset_fields, shared = compact_legacy_scene_doc(legacy)
+    assert updates["schemaVersion"] == SCENE_SCHEMA_VERSION
+    assert updates["scene.assets"] == legacy["assets"]
+    assert updates["contextKey"] == shared["contextKey"]
+    assert "inventory" not in shared["player"]
+    assert unset_fields == ["assets"]
+    assert compact_legacy_scene_doc({**legacy, "schemaVersion": SCENE_SCHEMA_VERSION}) is None
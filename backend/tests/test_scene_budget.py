@@ -0,0 +1,122 @@
+import pytest
+
+from backend.core.scene_budget import BUDGET_SCOPE_GLOBAL, BUDGET_SCOPE_PLAYER, SceneRenderBudget, TokenBucket
+from backend.core.scene_orchestrator import SceneOrchestrator, SceneRenderRequest
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_up_to_burst():
+    clock = _Clock()
+    bucket = TokenBucket(rate=1.0, burst=2, clock=clock)
+    assert bucket.take() and bucket.take()
+    assert not bucket.take()
+    clock.now = 10.0
+    assert bucket.take() and bucket.take()
+    assert not bucket.take()
+
+
+def test_budget_limits_each_player_and_the_global_pool():
+    clock = _Clock()
+    budget = SceneRenderBudget(player_rate=0.1, player_burst=2, global_rate=0.1, global_burst=3, clock=clock)
+    assert budget.acquire("aria") is None
+    assert budget.acquire("aria") is None
+    assert budget.acquire("aria") == BUDGET_SCOPE_PLAYER
+    assert budget.acquire("bram") is None
+    # The global refusal must not also spend bram's player token.
+    assert budget.acquire("bram") == BUDGET_SCOPE_GLOBAL
+    clock.now = 10.0
+    assert budget.acquire("bram") is None
+
+    stats = budget.get_stats()
+    assert stats["allowed"] == 4
+    assert stats["throttledPlayer"] == 1 and stats["throttledGlobal"] == 1
+
+
+def test_budget_evicts_least_recent_players():
+    budget = SceneRenderBudget(player_rate=1, player_burst=1, max_players=2)
+    for player in ("a", "b", "c"):
+        budget.acquire(player)
+    assert budget.get_stats()["trackedPlayers"] == 2
+
+
+class _Scenes:
+    def __init__(self, doc):
+        self.doc = doc
+        self.queries = []
+
+    async def find_one(self, query, projection=None, sort=None):
+        self.queries.append((query, sort))
+        return self.doc
+
+
+class _Db:
+    def __init__(self, doc):
+        self.scenes = _Scenes(doc)
+        self.scene_jobs = None
+
+
+@pytest.mark.asyncio
+async def test_over_budget_render_reuses_latest_ready_scene(monkeypatch):
+    monkeypatch.setenv("SCENE_RENDER_PLAN", "single")
+    db = _Db({"sceneId": "scene-old", "scene": {"title": "Old"}, "status": "ready", "assets": {"imageUrl": "x"}})
+    orchestrator = SceneOrchestrator(
+        db=None,
+        provider_pool=[{"type": "fake", "label": "fake-1", "latency_ms": 0, "jitter_ms": 0}],
+        render_budget=SceneRenderBudget(player_rate=0.001, player_burst=1),
+    )
+    request = SceneRenderRequest(player={"name": "Aria"}, genre="Fantasy", storyText="A bright meadow.")
+
+    first = await orchestrator.render_scene(request)
+    assert first["sceneStatus"] == "ready" and "throttled" not in first
+
+    fallback = await orchestrator.render_scene(request)
+    assert fallback["throttled"] is True and fallback["sceneStatus"] == "offline"
+    assert orchestrator.providers[0]["client"].calls == 1
+
+    orchestrator.db = db
+    reused = await orchestrator.render_scene(request)
+    assert reused["sceneId"] == "scene-old" and reused["throttled"] is True
+    assert db.scenes.queries[0][0] == {"playerId": "Aria", "status": "ready"}
+    assert orchestrator.metrics.render_throttled.value(scope="player", fallback="reused") == 1
+    assert orchestrator.metrics.render_throttled.value(scope="player", fallback="none") == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_render_does_not_spend_budget(monkeypatch):
+    monkeypatch.setenv("SCENE_RENDER_PLAN", "single")
+    orchestrator = SceneOrchestrator(
+        db=None,
+        provider_pool=[{"type": "fake", "label": "fake-1", "latency_ms": 0, "jitter_ms": 0}],
+        render_budget=SceneRenderBudget(player_rate=0.001, player_burst=1),
+    )
+    with pytest.raises(ValueError):
+        await orchestrator.render_scene(SceneRenderRequest(player={"name": "Aria"}, genre="Fantasy", storyText=""))
+
+    request = SceneRenderRequest(player={"name": "Aria"}, genre="Fantasy", storyText="A bright meadow.")
+    assert "throttled" not in await orchestrator.render_scene(request)
+
+
+@pytest.mark.asyncio
+async def test_batch_items_are_charged_to_the_render_budget(monkeypatch):
+    monkeypatch.setenv("SCENE_RENDER_PLAN", "single")
+    orchestrator = SceneOrchestrator(
+        db=None,
+        provider_pool=[{"type": "fake", "label": "fake-1", "latency_ms": 0, "jitter_ms": 0}],
+        render_budget=SceneRenderBudget(player_rate=0.001, player_burst=1),
+    )
+    request = SceneRenderRequest(player={"name": "Aria"}, genre="Fantasy", storyText="A bright meadow.")
+    await orchestrator.render_scene(request)
+
+    results = await orchestrator.render_scene_batch([request, request, request])
+
+    assert [result["throttled"] for result in results] == [True, True, True]
+    assert orchestrator.providers[0]["client"].calls == 1
+    assert orchestrator.render_budget.get_stats()["throttledPlayer"] == 3
+    assert orchestrator.metrics.render_throttled.value(scope="player", fallback="none") == 3
@@ -0,0 +1,96 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.core.scene_client import SceneServiceClient
+
+
+def _make_client(handler, **overrides) -> SceneServiceClient:
+    options = {
+        "failure_threshold": 2,
+        "cooldown_seconds": 60,
+        "transport": httpx.MockTransport(handler),
+    }
+    options.update(overrides)
+    return SceneServiceClient("http://scene.test", **options)
+
+
+@pytest.mark.asyncio
+async def test_scene_client_returns_json_and_counts_requests():
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/scene/render"
+        return httpx.Response(200, json={"sceneId": "abc", "sceneStatus": "ready"})
+
+    client = _make_client(handler)
+    try:
+        result = await client.render_scene({"storyText": "A quiet glade."})
+        assert result["sceneId"] == "abc"
+        stats = client.get_stats()
+        assert stats["requests"] == 1
+        assert stats["failures"] == 0
+        assert stats["circuitOpen"] is False
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_scene_client_opens_circuit_and_fails_fast():
+    calls = {"count": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls["count"] += 1
+        return httpx.Response(503, json={"detail": "down"})
+
+    client = _make_client(handler)
+    try:
+        assert await client.render_scene({"storyText": "x"}) is None
+        assert await client.render_scene({"storyText": "x"}) is None
+        assert client.circuit_open is True
+
+        assert await client.render_scene({"storyText": "x"}) is None
+        stats = client.get_stats()
+        assert calls["count"] == 2
+        assert stats["shortCircuited"] == 1
+        assert stats["circuitOpens"] == 1
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_scene_client_client_errors_do_not_trip_circuit():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, json={"detail": "bad request"})
+
+    client = _make_client(handler, failure_threshold=1)
+    try:
+        assert await client.render_scene({"storyText": "x"}) is None
+        assert client.circuit_open is False
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_scene_client_half_open_admits_a_single_probe():
+    gate = asyncio.Event()
+    calls = {"count": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls["count"] += 1
+        await gate.wait()
+        return httpx.Response(200, json={"sceneId": "abc"})
+
+    client = _make_client(handler, failure_threshold=1, cooldown_seconds=0)
+    client._circuit_opened_at = 0.0
+    try:
+        probe = asyncio.create_task(client.render_scene({"storyText": "x"}))
+        await asyncio.sleep(0)
+        herd = await asyncio.gather(*(client.render_scene({"storyText": "x"}) for _ in range(5)))
+        assert herd == [None] * 5
+        gate.set()
+        assert (await probe)["sceneId"] == "abc"
+        assert calls["count"] == 1 and client.get_stats()["shortCircuited"] == 5
+
+        assert await client.render_scene({"storyText": "x"}) == {"sceneId": "abc"}
+    finally:
+        await client.aclose()
@@ -0,0 +1,48 @@
+import pytest
+
+from backend.core.scene_events import SceneEventBroker
+from backend.core.scene_orchestrator import SceneOrchestrator, SceneRenderRequest
+
+
+@pytest.mark.asyncio
+async def test_broker_fans_out_and_drops_oldest_when_full():
+    broker = SceneEventBroker(queue_size=2)
+    first = broker.subscribe("scene-1")
+    second = broker.subscribe("scene-1")
+
+    for status in ("pending", "pending", "ready"):
+        assert broker.publish("scene-1", {"sceneId": "scene-1", "sceneStatus": status}) == 2
+
+    assert first.qsize() == 2
+    assert (await first.get())["sceneStatus"] == "pending"
+    assert (await first.get())["sceneStatus"] == "ready"
+
+    broker.unsubscribe("scene-1", first)
+    broker.unsubscribe("scene-1", second)
+    assert broker.subscriber_count() == 0
+    assert broker.publish("scene-1", {"sceneStatus": "ready"}) == 0
+
+
+@pytest.mark.asyncio
+async def test_render_scene_publishes_completion(monkeypatch):
+    broker = SceneEventBroker()
+    orchestrator = SceneOrchestrator(db=None, event_broker=broker)
+
+    async def fake_render(self, payload):
+        self._test_scene_id = payload.sceneId
+        self._test_queue = broker.subscribe(payload.sceneId)
+        return {"status": "ready", "assets": {"imageUrl": "https://example.com/a.png"}}
+
+    monkeypatch.setattr(SceneOrchestrator, "_render_with_provider", fake_render)
+
+    request = SceneRenderRequest(
+        player={"name": "Aria", "class": "Mage", "level": 3},
+        genre="Fantasy",
+        storyText="Arcane runes glow along the temple walls.",
+    )
+    result = await orchestrator.render_scene(request)
+
+    event = orchestrator._test_queue.get_nowait()
+    assert event["sceneId"] == result["sceneId"] == orchestrator._test_scene_id
+    assert event["sceneStatus"] == "ready"
+    assert event["sceneAssets"]["imageUrl"] == "https://example.com/a.png"
@@ -0,0 +1,25 @@
+from backend.core.scene_features import SceneFeatureExtractor
+
+
+def test_word_boundaries_prevent_substring_misfires():
+    features = SceneFeatureExtractor().extract("The sunset glows over the crackling fireplace.")
+    assert features.mood == "serene"
+    assert features.timeOfDay == "dusk"
+    assert "weather" not in features.scores
+
+
+def test_weighted_scores_pick_the_strongest_cue():
+    text = "Haunted halls, cursed shadows, a single fire in the dark. Thunder and rain outside."
+    features = SceneFeatureExtractor().extract(text)
+    assert features.mood == "ominous"
+    assert features.weather == "storm"
+    assert features.timeOfDay is None
+
+
+def test_biome_reads_location_with_plurals_and_punctuation():
+    extractor = SceneFeatureExtractor()
+    features = extractor.extract("Mist and fog cling to the storm-torn ridge.", "The Ruins of Kel'dar")
+    assert features.biome == "sacred ruins"
+    assert features.weather == "fog"
+    # Story text alone never sets the biome.
+    assert extractor.extract("Deep in the forest we rest.").biome is None
@@ -0,0 +1,118 @@
+import types
+
+import pytest
+
+from backend.core.scene_gc import SceneGarbageCollector
+from backend.core.scene_mirror import SceneImageMirror
+
+OLD = "2020-01-01T00:00:00+00:00"
+NEW = "2999-01-01T00:00:00+00:00"
+
+
+def _lookup(doc, dotted):
+    value = doc
+    for part in dotted.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = _lookup(doc, key)
+        if isinstance(condition, dict):
+            if "$lt" in condition and not (value is not None and value < condition["$lt"]):
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def batch_size(self, _):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+    def __aiter__(self):
+        self._iter = iter(list(self.docs))
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Collection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        return _Cursor([doc for doc in self.docs if _matches(doc, query)])
+
+    async def delete_many(self, query):
+        doomed = [doc for doc in self.docs if _matches(doc, query)]
+        self.docs = [doc for doc in self.docs if doc not in doomed]
+        return types.SimpleNamespace(deleted_count=len(doomed))
+
+
+def _scene(scene_id, player, status="ready", created=OLD, digest=None):
+    assets = {"contentHash": digest} if digest else {}
+    return {"sceneId": scene_id, "playerId": player, "status": status, "createdAt": created, "scene": {"assets": assets}}
+
+
+@pytest.mark.asyncio
+async def test_gc_deletes_orphans_in_paced_batches_and_shared_files_survive(tmp_path):
+    mirror = SceneImageMirror(str(tmp_path), workers=0)
+    shared, lonely = "a" * 64, "b" * 64
+    for digest in (shared, lonely):
+        (tmp_path / digest[:2]).mkdir(exist_ok=True)
+        for name in (f"{digest}.png", f"{digest}-thumb.webp", f"{digest}-mid.webp"):
+            (tmp_path / digest[:2] / name).write_bytes(b"x" * 10)
+
+    scenes = _Collection(
+        [
+            _scene("kept-ref", "aria", digest=shared),
+            _scene("branch", "aria", digest=shared),
+            _scene("failed", "legacy", status="offline"),
+            _scene("legacy-kept", "legacy"),
+            _scene("gone-player", "ghost", digest=lonely),
+            _scene("too-new", "ghost", created=NEW),
+        ]
+    )
+    saves = _Collection(
+        [
+            {"playerId": "aria", "deletedAt": None, "storyLog": [{"text": "hi", "sceneId": "kept-ref"}]},
+            {"playerId": "legacy", "deletedAt": None, "storyLog": [{"text": "no scene ids yet"}]},
+        ]
+    )
+    pauses = []
+
+    async def _sleep(seconds):
+        pauses.append(seconds)
+
+    gc = SceneGarbageCollector(
+        scenes, saves, image_mirror=mirror, batch_size=2, max_deletes_per_second=1, sleep=_sleep
+    )
+
+    preview = await gc.collect_once(dry_run=True)
+    assert preview["deletedDocs"] == 2 and len(scenes.docs) == 6
+
+    run = await gc.collect_once()
+    await mirror.aclose()
+
+    # A live player's unreferenced scene ("branch") may still be in their gallery
+    assert sorted(doc["sceneId"] for doc in scenes.docs) == ["branch", "kept-ref", "legacy-kept", "too-new"]
+    assert run["deletedDocs"] == 2 and run["reclaimedDocBytes"] > 0
+    assert run["deletedFiles"] == 3 and run["reclaimedFileBytes"] == 30
+    assert (tmp_path / shared[:2] / f"{shared}.png").exists()
+    assert not (tmp_path / lonely[:2] / f"{lonely}.png").exists()
+    assert len(pauses) == 1 and all(pause > 0 for pause in pauses)
+    assert gc.get_stats()["deletedDocs"] == 2
@@ -0,0 +1,50 @@
+import pytest
+
+from backend.core.scene_metrics import Histogram, SceneMetrics
+from backend.core.scene_orchestrator import SceneOrchestrator, SceneRenderRequest
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ("provider",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, provider="fal-1")
+    histogram.observe(0.5, provider="fal-1")
+    histogram.observe(3.0, provider="fal-1")
+
+    lines = histogram.render()
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{provider="fal-1",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{provider="fal-1",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{provider="fal-1",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{provider="fal-1"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_records_render_metrics(monkeypatch):
+    monkeypatch.setenv("SCENE_RENDER_PLAN", "single")
+    metrics = SceneMetrics()
+    orchestrator = SceneOrchestrator(
+        db=None,
+        provider_pool=[{"type": "fake", "label": "fake-1", "latency_ms": 0, "jitter_ms": 0}],
+        metrics=metrics,
+    )
+    request = SceneRenderRequest(player={"name": "Aria"}, genre="Fantasy", storyText="A bright meadow.")
+    await orchestrator.render_scene(request)
+
+    assert metrics.render_outcomes.value(status="ready") == 1
+    assert metrics.provider_render_seconds.count(provider="fake-1", tier="full", outcome="ready") == 1
+    assert metrics.provider_lock_wait_seconds.count(provider="fake-1") == 1
+
+    text = metrics.render()
+    assert 'scene_render_outcomes_total{status="ready"} 1' in text
+    assert "scene_retry_tasks_active 0" in text
+
+
+def test_recreated_orchestrator_rebinds_gauges_instead_of_duplicating():
+    metrics = SceneMetrics()
+    SceneOrchestrator(db=None, metrics=metrics)
+    latest = SceneOrchestrator(db=None, metrics=metrics)
+    latest._active_renders["scene-1"] = True
+
+    text = metrics.render()
+    assert text.count("# TYPE scene_active_renders gauge") == 1
+    assert "scene_active_renders 1" in text
@@ -0,0 +1,70 @@
+import io
+import os
+
+import httpx
+import pytest
+
+from backend.core.scene_mirror import SceneImageMirror, parse_byte_range
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png_bytes(width: int = 1600, height: int = 900) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (40, 90, 160)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_parse_byte_range_variants():
+    assert parse_byte_range(None, 100) is None
+    assert parse_byte_range("bytes=0-9", 100) == (0, 9)
+    assert parse_byte_range("bytes=90-", 100) == (90, 99)
+    assert parse_byte_range("bytes=-10", 100) == (90, 99)
+    assert parse_byte_range("bytes=50-500", 100) == (50, 99)
+    assert parse_byte_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_byte_range("bytes=200-300", 100)
+
+
+@pytest.mark.asyncio
+async def test_mirror_builds_local_derivatives_once(tmp_path):
+    image_data = _png_bytes()
+    downloads = {"count": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        downloads["count"] += 1
+        return httpx.Response(200, content=image_data, headers={"content-type": "image/png"})
+
+    mirror = SceneImageMirror(
+        str(tmp_path),
+        public_base_url="http://scene.test",
+        workers=0,
+        transport=httpx.MockTransport(handler),
+    )
+    try:
+        source = {"imageUrl": "https://fal.example/scene.png", "provider": "fal"}
+        mirrored = await mirror.mirror(source)
+        assert mirrored["sourceUrl"] == source["imageUrl"]
+        assert mirrored["imageUrl"].startswith("http://scene.test/api/scene/assets/")
+        assert mirrored["thumbnailUrl"].endswith("-thumb.webp")
+        assert mirrored["midUrl"].endswith("-mid.webp")
+
+        thumb_path = mirror.asset_path(mirrored["thumbnailUrl"].rsplit("/", 1)[-1])
+        with Image.open(thumb_path) as thumb:
+            assert thumb.format == "WEBP"
+            assert thumb.width == 320
+        assert os.path.exists(mirror.asset_path(mirrored["midUrl"].rsplit("/", 1)[-1]))
+
+        again = await mirror.mirror(source)
+        assert again["contentHash"] == mirrored["contentHash"]
+        stats = mirror.get_stats()
+        assert stats["mirrored"] == 1
+        assert stats["deduplicated"] == 1
+    finally:
+        await mirror.aclose()
+
+
+def test_asset_path_rejects_unknown_names(tmp_path):
+    mirror = SceneImageMirror(str(tmp_path), workers=0)
+    assert mirror.asset_path("../../etc/passwd") is None
+    assert mirror.asset_path("a" * 64 + "-thumb.webp").endswith("-thumb.webp")
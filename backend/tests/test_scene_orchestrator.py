@@ -68,3 +68,199 @@ async def test_scene_orchestrator_includes_assets_when_renderer_ready(monkeypatc
     assert result["sceneStatus"] == "ready"
     assert result["sceneAssets"]["imageUrl"] == "https://example.com/scene.png"
 
+
+
+@pytest.mark.asyncio
+async def test_progressive_plan_serves_preview_then_upgrades(monkeypatch):
+    monkeypatch.setenv("SCENE_RENDER_PLAN", "progressive")
+    orchestrator = SceneOrchestrator(db=None, provider_pool=[{"label": "fal-1", "api_key": "test-key"}])
+    if not orchestrator.providers:
+        pytest.skip("fal_client not installed")
+
+    async def fake_attempt(self, payload, provider, tier="full"):
+        return {
+            "imageUrl": f"https://example.com/{tier}.png",
+            "thumbnailUrl": f"https://example.com/{tier}.png",
+            "provider": "fal",
+            "model": provider["preview_model"] if tier == "preview" else provider["model"],
+        }
+
+    updates = []
+
+    async def fake_update(self, scene_id, assets, status):
+        updates.append((scene_id, assets, status))
+
+    monkeypatch.setattr(SceneOrchestrator, "_attempt_scene_render_with_fal", fake_attempt)
+    monkeypatch.setattr(SceneOrchestrator, "_update_scene_assets", fake_update)
+
+    result = await orchestrator.render_scene(_make_request())
+
+    assert result["sceneStatus"] == "pending"
+    assert result["sceneAssets"]["thumbnailUrl"] == "https://example.com/preview.png"
+
+    await orchestrator._upgrade_tasks[result["sceneId"]]
+
+    scene_id, assets, status = updates[-1]
+    assert scene_id == result["sceneId"]
+    assert status == "ready"
+    assert assets["imageUrl"] == "https://example.com/full.png"
+    assert assets["thumbnailUrl"] == "https://example.com/preview.png"
+
+
+def _routing_orchestrator(monkeypatch, count=2):
+    monkeypatch.setenv("SCENE_PROVIDER_FAILURE_THRESHOLD", "2")
+    monkeypatch.setenv("SCENE_PROVIDER_QUARANTINE_SECONDS", "30")
+    orchestrator = SceneOrchestrator(
+        db=None,
+        provider_pool=[{"label": f"fal-{idx + 1}", "api_key": "test-key"} for idx in range(count)],
+    )
+    if len(orchestrator.providers) != count:
+        pytest.skip("fal_client not installed")
+    return orchestrator
+
+
+def test_routing_prefers_fastest_healthy_provider(monkeypatch):
+    orchestrator = _routing_orchestrator(monkeypatch)
+    slow, fast = orchestrator.providers
+    orchestrator._record_provider_result(slow, True, 9.0)
+    orchestrator._record_provider_result(fast, True, 2.0)
+
+    assert [provider["id"] for provider in orchestrator._rank_providers()] == ["fal-2", "fal-1"]
+
+    snapshot = orchestrator.get_provider_snapshot()
+    assert snapshot["providerPool"][1]["latencyMs"]["full"] == 2000
+    assert snapshot["providerPool"][1]["state"] == "healthy"
+
+
+def test_routing_quarantines_then_probes_half_open(monkeypatch):
+    orchestrator = _routing_orchestrator(monkeypatch)
+    flaky = orchestrator.providers[0]
+    orchestrator._record_provider_result(flaky, False, 1.0)
+    orchestrator._record_provider_result(flaky, False, 1.0)
+
+    assert orchestrator._provider_state(flaky) == "quarantined"
+    assert [provider["id"] for provider in orchestrator._rank_providers()] == ["fal-2"]
+
+    # Quarantine elapses: the provider becomes a half-open probe candidate and is ranked first.
+    flaky["quarantined_until"] = 0
+    assert orchestrator._provider_state(flaky) == "half-open"
+    assert orchestrator._rank_providers()[0]["id"] == "fal-1"
+
+    flaky["probe_in_flight"] = True
+    orchestrator._record_provider_result(flaky, False, 1.0)
+    assert orchestrator._provider_state(flaky) == "quarantined"
+    assert flaky["quarantine_streak"] == 2
+
+    flaky["quarantined_until"] = 0
+    flaky["probe_in_flight"] = True
+    orchestrator._record_provider_result(flaky, True, 1.5)
+    assert orchestrator._provider_state(flaky) == "healthy"
+    assert flaky["quarantine_streak"] == 0
+
+
+@pytest.mark.asyncio
+async def test_render_scene_batch_groups_identical_prompts(monkeypatch):
+    orchestrator = _routing_orchestrator(monkeypatch)
+    calls = []
+
+    async def fake_images(self, payload, provider, tier="full", num_images=1):
+        calls.append((provider["id"], num_images))
+        if "storm" in payload.prompts["base"].lower():
+            return []
+        return [{"imageUrl": f"https://example.com/{idx}.png", "provider": "fal"} for idx in range(num_images)]
+
+    async def fake_retry(self, payload):
+        return None
+
+    monkeypatch.setattr(SceneOrchestrator, "_request_fal_images", fake_images)
+    monkeypatch.setattr(SceneOrchestrator, "_schedule_scene_retry", fake_retry)
+
+    calm = _make_request(storyText="Lanterns drift over a calm harbor.")
+    stormy = _make_request(storyText="A storm lashes the broken tower.")
+    missing = _make_request(storyText="")
+    results = await orchestrator.render_scene_batch([calm, calm, stormy, missing])
+
+    # One shared call for the calm pair; the stormy scene fails over to the other provider
+    assert sorted(calls) == [("fal-1", 1), ("fal-1", 2), ("fal-2", 1)]
+    by_index = {result["index"]: result for result in results}
+    assert by_index[0]["sceneStatus"] == by_index[1]["sceneStatus"] == "ready"
+    assert by_index[0]["sceneAssets"]["imageUrl"] != by_index[1]["sceneAssets"]["imageUrl"]
+    assert by_index[2]["sceneStatus"] == "pending"
+    assert "error" in by_index[3]
+
+
+@pytest.mark.asyncio
+async def test_render_scene_batch_skips_busy_and_probing_providers(monkeypatch):
+    orchestrator = _routing_orchestrator(monkeypatch)
+    busy, probing = orchestrator.providers
+    probing["quarantined_until"] = 0.0
+    probing["probe_in_flight"] = True
+    calls = []
+
+    async def fake_images(self, payload, provider, tier="full", num_images=1):
+        calls.append(provider["id"])
+        return [{"imageUrl": "https://example.com/x.png", "provider": "fal"}]
+
+    async def fake_retry(self, payload):
+        return None
+
+    monkeypatch.setattr(SceneOrchestrator, "_request_fal_images", fake_images)
+    monkeypatch.setattr(SceneOrchestrator, "_schedule_scene_retry", fake_retry)
+
+    async with busy["lock"]:
+        results = await orchestrator.render_scene_batch([_make_request(storyText="Lanterns drift.")])
+    assert calls == [] and results[0]["sceneStatus"] == "pending"
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *_):
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append((query, projection))
+        return _FakeCursor(list(self.docs))
+
+
+class _FakeDb:
+    def __init__(self, scenes, archive):
+        self.scenes = _FakeCollection(scenes)
+        self.scene_archive = _FakeCollection(archive)
+        self.scene_jobs = _FakeCollection([])
+
+
+@pytest.mark.asyncio
+async def test_scene_history_pages_across_hot_and_archive():
+    hot = [{"sceneId": f"s{idx}", "createdAt": f"2026-01-0{idx}", "status": "ready", "scene": {"title": "T"}} for idx in (5, 4)]
+    archived = [{"sceneId": "s3", "createdAt": "2026-01-03", "status": "ready", "scene": {}}, {"sceneId": "s2", "createdAt": "2026-01-02"}]
+    orchestrator = SceneOrchestrator(db=_FakeDb(hot, archived))
+
+    page = await orchestrator.get_scene_history("Aria", limit=3, turn_from=2)
+    assert [item["sceneId"] for item in page["items"]] == ["s5", "s4", "s3"]
+    assert page["nextCursor"]
+
+    query, projection = orchestrator.db.scenes.queries[0]
+    assert query == {"playerId": "Aria", "turn": {"$gte": 2}}
+    assert "context" not in projection
+
+    await orchestrator.get_scene_history("Aria", limit=3, cursor=page["nextCursor"])
+    query, _ = orchestrator.db.scenes.queries[-1]
+    assert query["$or"][1] == {"createdAt": "2026-01-03", "sceneId": {"$lt": "s3"}}
+
+    with pytest.raises(ValueError):
+        await orchestrator.get_scene_history("Aria", cursor="not-a-cursor")
@@ -0,0 +1,70 @@
+import pytest
+
+from backend.benchmarks.scene_load import percentile
+from backend.core.scene_orchestrator import SceneOrchestrator, SceneRenderRequest
+from backend.core.scene_providers import FakeImageClient, ImageProviderClient, ImageProviderError
+
+
+def _fake_pool(**overrides):
+    entry = {"type": "fake", "label": "fake-1", "latency_ms": 0, "jitter_ms": 0, "seed": 3}
+    entry.update(overrides)
+    return [entry]
+
+
+def _request() -> SceneRenderRequest:
+    return SceneRenderRequest(
+        player={"name": "Aria", "class": "Rogue", "level": 2},
+        genre="Fantasy",
+        storyText="Lanterns sway over the quiet harbor.",
+    )
+
+
+@pytest.mark.asyncio
+async def test_fake_client_payload_shapes_and_failures():
+    images = await FakeImageClient(latency_ms=0, jitter_ms=0, payload_shape="image").run(
+        "fal-ai/flux/dev", {"image_size": {"width": 512, "height": 288}}
+    )
+    assert images["image"]["width"] == 512
+
+    with pytest.raises(ImageProviderError):
+        await FakeImageClient(latency_ms=0, jitter_ms=0, failure_rate=1.0).run("m", {})
+    with pytest.raises(ValueError):
+        FakeImageClient(payload_shape="bogus")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("shape", ["images", "image", "signed_url"])
+async def test_orchestrator_renders_with_fake_provider_without_keys(monkeypatch, shape):
+    monkeypatch.setenv("SCENE_RENDER_PLAN", "single")
+    orchestrator = SceneOrchestrator(db=None, provider_pool=_fake_pool(payload_shape=shape))
+    assert orchestrator.providers[0]["type"] == "fake"
+
+    result = await orchestrator.render_scene(_request())
+    assert result["sceneStatus"] == "ready"
+    assert result["sceneAssets"]["provider"] == "fake"
+    assert result["sceneAssets"]["imageUrl"].startswith("https://fake-images.local/")
+    assert set(result["timings"]) == {"queueWaitMs", "totalMs"}
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_marks_pending_when_fake_provider_fails(monkeypatch):
+    monkeypatch.setenv("SCENE_RENDER_PLAN", "single")
+    monkeypatch.setenv("FAL_MAX_RETRIES", "0")
+    orchestrator = SceneOrchestrator(db=None, provider_pool=_fake_pool(failure_rate=1.0))
+    result = await orchestrator.render_scene(_request())
+    assert result["sceneStatus"] == "pending"
+
+
+def test_provider_clients_must_implement_run():
+    class Incomplete(ImageProviderClient):
+        provider_type = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 51
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from backend.core.scene_orchestrator import (
+    SceneOrchestrator,
+    ScenePayload,
+    SceneRenderRequest,
+    SceneServiceDraining,
+)
+from backend.core.scene_retry_queue import RETRY_OUTCOME_DEFERRED, compute_backoff
+
+
+def _orchestrator_with_providers(count: int) -> SceneOrchestrator:
+    orchestrator = SceneOrchestrator(
+        db=None,
+        provider_pool=[{"label": f"fal-{idx + 1}", "api_key": "test-key"} for idx in range(count)],
+    )
+    if len(orchestrator.providers) != count:
+        pytest.skip("fal_client not installed")
+    return orchestrator
+
+
+def _payload_data(scene_id: str = "scene-retry") -> dict:
+    return ScenePayload(
+        sceneId=scene_id,
+        title="Retry",
+        genre="Fantasy",
+        locationName="Hall",
+        biome="mossy dungeon hall",
+        mood="serene",
+        weather="sunny",
+        lighting="soft bounce light",
+        timeOfDay="day",
+        heroPose="kneeling",
+        camera="wide cinematic shot",
+        summary="A quiet hall.",
+        prompts={"base": "A quiet hall."},
+    ).model_dump()
+
+
+def test_compute_backoff_grows_and_is_capped():
+    for attempt in range(1, 8):
+        delay = compute_backoff(attempt, base_delay=2, max_delay=30)
+        ceiling = min(30, 2 * 2 ** (attempt - 1))
+        assert ceiling / 2 <= delay <= ceiling
+    assert compute_backoff(3, base_delay=0, max_delay=30) == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_rotates_providers_per_attempt(monkeypatch):
+    orchestrator = _orchestrator_with_providers(3)
+    seen = []
+
+    async def fake_attempt(self, payload, provider, tier="full"):
+        seen.append(provider["id"])
+        return None
+
+    monkeypatch.setattr(SceneOrchestrator, "_attempt_scene_render_with_fal", fake_attempt)
+
+    for attempt in (1, 2, 3):
+        await orchestrator._process_retry_job({"payload": _payload_data(), "attempt": attempt})
+
+    assert seen == ["fal-1", "fal-2", "fal-3"]
+
+
+@pytest.mark.asyncio
+async def test_retry_defers_when_every_provider_is_busy(monkeypatch):
+    orchestrator = _orchestrator_with_providers(2)
+    for provider in orchestrator.providers:
+        await provider["lock"].acquire()
+    try:
+        outcome = await orchestrator._process_retry_job({"payload": _payload_data(), "attempt": 1})
+    finally:
+        for provider in orchestrator.providers:
+            provider["lock"].release()
+    assert outcome == RETRY_OUTCOME_DEFERRED
+
+
+@pytest.mark.asyncio
+async def test_in_memory_retry_marks_scene_ready(monkeypatch):
+    monkeypatch.setenv("FAL_RETRY_DELAY", "0")
+    orchestrator = _orchestrator_with_providers(1)
+    updates = []
+
+    async def fake_attempt(self, payload, provider, tier="full"):
+        return {"imageUrl": "https://example.com/retry.png", "provider": "fal"}
+
+    async def fake_update(self, scene_id, assets, status):
+        updates.append(status)
+
+    monkeypatch.setattr(SceneOrchestrator, "_attempt_scene_render_with_fal", fake_attempt)
+    monkeypatch.setattr(SceneOrchestrator, "_update_scene_assets", fake_update)
+
+    await orchestrator._schedule_scene_retry(ScenePayload(**_payload_data()))
+    await asyncio.wait_for(orchestrator._retry_tasks["scene-retry"], timeout=1)
+
+    assert updates == ["ready"]
+
+
+class _RecordingQueue:
+    def __init__(self):
+        self.enqueued = []
+        self.stopped_with = None
+
+    async def enqueue(self, scene_id, payload):
+        self.enqueued.append(scene_id)
+
+    async def stop(self, drain_timeout=0.0):
+        self.stopped_with = drain_timeout
+
+    def get_stats(self):
+        return {"active": 0}
+
+
+@pytest.mark.asyncio
+async def test_drain_persists_unfinished_upgrades_and_rejects_new_renders(monkeypatch):
+    monkeypatch.setenv("SCENE_RENDER_PLAN", "single")
+    orchestrator = SceneOrchestrator(
+        db=None, provider_pool=[{"type": "fake", "label": "fake-1", "latency_ms": 0, "jitter_ms": 0}]
+    )
+    queue = _RecordingQueue()
+    orchestrator.retry_queue = queue
+
+    async def slow_render(self, payload, tier="full"):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(SceneOrchestrator, "_render_with_provider", slow_render)
+    orchestrator._schedule_full_render(ScenePayload(**_payload_data("scene-slow")))
+
+    stats = await orchestrator.drain(timeout=0.05)
+
+    assert stats["persisted"] == 1 and stats["cancelled"] == 1
+    assert queue.enqueued == ["scene-slow"]
+    assert queue.stopped_with is not None
+    assert not orchestrator._upgrade_tasks and not orchestrator._handoff_payloads
+    with pytest.raises(SceneServiceDraining):
+        await orchestrator.render_scene(SceneRenderRequest(player={"name": "Aria"}, genre="Fantasy", storyText="Late arrival."))
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_finishing_background_work(monkeypatch):
+    monkeypatch.setenv("FAL_RETRY_DELAY", "0")
+    orchestrator = SceneOrchestrator(
+        db=None, provider_pool=[{"type": "fake", "label": "fake-1", "latency_ms": 0, "jitter_ms": 0}]
+    )
+    updates = []
+
+    async def fake_update(self, scene_id, assets, status):
+        updates.append(status)
+
+    monkeypatch.setattr(SceneOrchestrator, "_update_scene_assets", fake_update)
+    await orchestrator._schedule_scene_retry(ScenePayload(**_payload_data()))
+
+    stats = await orchestrator.drain(timeout=2)
+
+    assert stats == {"completed": 1, "persisted": 0, "cancelled": 0, "foregroundAbandoned": 0}
+    assert updates == ["ready"]
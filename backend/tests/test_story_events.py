@@ -0,0 +1,58 @@
+import pytest
+
+from backend.core.story_events import StoryEventStore, story_cursor
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class _Collection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query):
+        def _match(doc):
+            turn_filter = query.get("turn")
+            return (
+                doc["playerId"] == query["playerId"]
+                and doc["saveSlot"] == query["saveSlot"]
+                and (turn_filter is None or doc["turn"] < turn_filter["$lt"])
+            )
+
+        return _Cursor([doc for doc in self.docs if _match(doc)])
+
+
+@pytest.mark.asyncio
+async def test_story_events_page_backwards_oldest_first():
+    docs = [{"_id": i, "playerId": "Aria", "saveSlot": 1, "turn": i, "text": f"turn {i}"} for i in range(7)]
+    docs.append({"_id": 99, "playerId": "Aria", "saveSlot": 2, "turn": 0, "text": "other slot"})
+    store = StoryEventStore(_Collection(docs))
+
+    first = await store.page("Aria", 1, limit=3)
+    assert [item["turn"] for item in first["items"]] == [4, 5, 6]
+    assert first["nextBefore"] == 4
+    assert "_id" not in first["items"][0] and first["items"][0]["text"] == "turn 4"
+
+    second = await store.page("Aria", 1, before=first["nextBefore"], limit=3)
+    assert [item["turn"] for item in second["items"]] == [1, 2, 3]
+    last = await store.page("Aria", 1, before=second["nextBefore"], limit=3)
+    assert [item["turn"] for item in last["items"]] == [0]
+    assert last["nextBefore"] is None
+
+
+def test_story_cursor_points_before_the_inline_tail():
+    assert story_cursor({"saveSlot": 2, "storyLogCount": 120}, 30) == {"saveSlot": 2, "total": 120, "before": 90}
+    assert story_cursor({}, 5) == {"saveSlot": 1, "total": 5, "before": 0}
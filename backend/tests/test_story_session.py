@@ -0,0 +1,105 @@
+import pytest
+from fastapi import HTTPException
+
+from backend import story_service
+from backend.core.story_session import StorySessionConflict, StorySessionStore
+
+PLAYER = {
+    "name": "Aria",
+    "class": "Mage",
+    "gender": "female",
+    "level": 2,
+    "health": 40,
+    "maxHealth": 50,
+    "xp": 10,
+    "maxXp": 100,
+    "stats": {"strength": 3, "intelligence": 9, "agility": 5},
+}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Saves:
+    def __init__(self, doc=None):
+        self.doc = doc
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return self.doc
+
+
+def _event(i):
+    return {"id": str(i), "text": f"event {i}", "timestamp": "2026-01-01T00:00:00Z", "type": "story"}
+
+
+def _commit(store, events, **state):
+    return store.commit("Aria", events, PLAYER, "Fantasy", {"turnCount": 3, **state})
+
+
+@pytest.mark.asyncio
+async def test_session_round_trip_and_version_conflict():
+    store = StorySessionStore(events_tail=5, wall_clock=lambda: 0)
+    version = _commit(store, [_event(i) for i in range(8)], choices=["ignored"])
+
+    session = await store.resolve("Aria", version)
+    assert [event["id"] for event in session["events"]] == ["3", "4", "5", "6", "7"]
+    assert session["gameState"] == {"turnCount": 3}
+
+    assert _commit(store, []) == version + 1
+    with pytest.raises(StorySessionConflict) as conflict:
+        await store.resolve("Aria", version)
+    assert conflict.value.current == version + 1
+
+
+@pytest.mark.asyncio
+async def test_session_is_rebuilt_from_the_autosave():
+    saves = _Saves({"gameState": {"sessionVersion": 42, "player": PLAYER, "genre": "Fantasy", "previousEvents": [_event(1)], "turnCount": 7}})
+    store = StorySessionStore(saves)
+
+    session = await store.resolve("Aria", 42)
+    assert session["events"] == [_event(1)] and session["gameState"]["turnCount"] == 7
+    await store.resolve("Aria", 42)
+    assert saves.reads == 1  # Second turn served from the hot copy
+    assert store.commit("Aria", [], PLAYER, "Fantasy", {}) > 42
+
+
+def test_idle_and_overflow_sessions_are_evicted():
+    clock = _Clock()
+    store = StorySessionStore(max_sessions=2, idle_ttl=60, clock=clock)
+    for name in ("a", "b", "c"):
+        store.commit(name, [], PLAYER, "Fantasy", {})
+    assert store.get_stats()["sessions"] == 2
+    clock.now = 61
+    store.commit("d", [], PLAYER, "Fantasy", {})
+    assert store.get_stats()["sessions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_delta_request_is_filled_from_the_session(monkeypatch):
+    store = StorySessionStore(wall_clock=lambda: 0)
+    monkeypatch.setattr(story_service, "story_sessions", store)
+    version = store.commit(
+        "Aria", [_event(1)], PLAYER, "Fantasy", {"turnCount": 4, "storyPhase": "exploration"}, language="kn"
+    )
+
+    request = story_service.StoryTurnRequest(
+        playerId="Aria", sessionVersion=version, choice="Open the door", newEvents=[_event(2)], gameState={"turnCount": 5}
+    )
+    resolved = await story_service._resolve_story_turn(request)
+    assert [event.id for event in resolved.previousEvents] == ["1", "2"]
+    assert resolved.player.name == "Aria" and resolved.genre == "Fantasy"
+    assert resolved.gameState == {"turnCount": 5, "storyPhase": "exploration"}
+    assert resolved.language == "kn"
+
+    stale = story_service.StoryTurnRequest(playerId="Aria", sessionVersion=version - 1)
+    with pytest.raises(HTTPException) as rejected:
+        await story_service._resolve_story_turn(stale)
+    assert rejected.value.status_code == 409
+    assert rejected.value.detail["sessionVersion"] == version
@@ -244,6 +244,7 @@ const CombatPanel = () => {
         action: abilityId ? 'ability' : (itemId ? 'use-item' : action),
         itemId,
         abilityId,
+        badges: useGameStore.getState().badges,
       });
 
       // INSTANT UI updates - apply immediately when result arrives
@@ -33,7 +33,7 @@ import { storage, setupAutoSave } from '@/utils/storage';
 import { cn } from '@/lib/utils';
 import { useTranslation } from 'react-i18next';
 import { toast } from 'sonner';
-import { api } from '@/services/api';
+import { api, type SceneResponse } from '@/services/api';
 import DailyRewardsModal from './DailyRewardsModal';
 import DailyChallengesPanel from './DailyChallengesPanel';
 import {
@@ -596,34 +596,45 @@ const MainGameUI = () => {
     loadQuickSaves();
   }, [authUser?.name, gameState.turnCount]);
 
-  // Poll for pending scene renders
+  // Stream scene status updates, falling back to polling when the stream is unavailable
   useEffect(() => {
     if (!currentScene?.sceneId || currentScene.status !== 'pending') {
       return;
     }
     let isMounted = true;
+    let isSettled = false;
+    let interval: ReturnType<typeof setInterval> | null = null;
+    const sceneId = currentScene.sceneId;
+
+    const applySceneUpdate = (latest: Partial<SceneResponse> & { sceneId: string }) => {
+      if (!isMounted) return;
+      if (latest.sceneStatus === 'ready' || latest.sceneStatus === 'offline') {
+        isSettled = true;
+      }
+      if (latest.sceneStatus) {
+        updateSceneStatus(sceneId, latest.sceneStatus, latest.sceneAssets ?? null);
+      }
+      if (latest.sceneStatus === 'ready' && latest.scene) {
+        syncSceneFromResponse(
+          {
+            sceneId: latest.sceneId,
+            scene: latest.scene,
+            sceneStatus: latest.sceneStatus,
+            sceneAssets: latest.sceneAssets,
+          },
+          { addToHistory: false },
+        );
+      }
+      if (latest.sceneStatus === 'offline') {
+        // stop polling if backend marked offline
+        isMounted = false;
+      }
+    };
+
     const pollScene = async () => {
       try {
-        const latest = await api.fetchScene(currentScene.sceneId);
-        if (!isMounted) return;
-        if (latest.sceneStatus) {
-          updateSceneStatus(currentScene.sceneId, latest.sceneStatus, latest.sceneAssets ?? null);
-        }
-        if (latest.sceneStatus === 'ready' && latest.scene) {
-          syncSceneFromResponse(
-            {
-              sceneId: latest.sceneId,
-              scene: latest.scene,
-              sceneStatus: latest.sceneStatus,
-              sceneAssets: latest.sceneAssets,
-            },
-            { addToHistory: false },
-          );
-        }
-        if (latest.sceneStatus === 'offline') {
-          // stop polling if backend marked offline
-          isMounted = false;
-        }
+        const latest = await api.fetchScene(sceneId);
+        applySceneUpdate(latest);
       } catch (error) {
         console.error('Scene polling failed', error);
         if (isMounted) {
@@ -632,11 +643,19 @@ const MainGameUI = () => {
       }
     };
 
-    const interval = setInterval(pollScene, 7000);
-    pollScene();
+    const startPolling = () => {
+      if (!isMounted || isSettled || interval) return;
+      interval = setInterval(pollScene, 7000);
+      pollScene();
+    };
+
+    const unsubscribe = api.subscribeScene(sceneId, applySceneUpdate, startPolling);
     return () => {
       isMounted = false;
-      clearInterval(interval);
+      unsubscribe();
+      if (interval) {
+        clearInterval(interval);
+      }
     };
   }, [currentScene?.sceneId, currentScene?.status, setSceneServiceStatus, syncSceneFromResponse, updateSceneStatus]);
 
@@ -1534,10 +1553,10 @@ const MainGameUI = () => {
                   </div>
                   <div className="relative flex-1 rounded-2xl border border-white/10 overflow-hidden bg-black/40">
                     <AnimatePresence mode="wait">
-                      {currentScene?.assets?.imageUrl ? (
+                      {currentScene?.assets?.imageUrl || currentScene?.assets?.thumbnailUrl ? (
                         <motion.img
                           key={currentScene.sceneId}
-                          src={currentScene.assets.imageUrl}
+                          src={currentScene.assets.midUrl || currentScene.assets.imageUrl || currentScene.assets.thumbnailUrl}
                           alt="Scene artwork"
                           className="w-full h-full object-cover"
                           initial={sceneAnimationVariants.initial}
@@ -1,11 +1,12 @@
-import { useState } from 'react';
+import { useCallback, useEffect, useState } from 'react';
 import { useGameStore } from '@/store/gameStore';
+import { api, type SceneHistoryItem } from '@/services/api';
 import { Button } from '@/components/ui/button';
 import { Card } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { ScrollArea } from '@/components/ui/scroll-area';
-import { ArrowLeft, BookOpen, Play, GitBranch, Trophy, Clock } from 'lucide-react';
+import { ArrowLeft, BookOpen, Play, GitBranch, Trophy, Clock, Image as ImageIcon } from 'lucide-react';
 import { motion } from 'framer-motion';
 
 const StoryReplayPage = () => {
@@ -19,7 +20,36 @@ const StoryReplayPage = () => {
     setScreen,
   } = useGameStore();
 
-  const [activeTab, setActiveTab] = useState<'branches' | 'endings' | 'choices'>('branches');
+  const [activeTab, setActiveTab] = useState<'branches' | 'endings' | 'choices' | 'scenes'>('branches');
+  const [scenes, setScenes] = useState<SceneHistoryItem[]>([]);
+  const [sceneCursor, setSceneCursor] = useState<string | null>(null);
+  const [scenesLoaded, setScenesLoaded] = useState(false);
+  const [scenesLoading, setScenesLoading] = useState(false);
+
+  // Scenes load in fixed-size keyset pages instead of one fetch per scene.
+  const loadScenes = useCallback(
+    async (cursor: string | null) => {
+      if (!player?.name) return;
+      setScenesLoading(true);
+      try {
+        const page = await api.getSceneHistory(player.name, { cursor, limit: 12 });
+        setScenes((prev) => (cursor ? [...prev, ...page.items] : page.items));
+        setSceneCursor(page.nextCursor);
+      } catch (error) {
+        console.error('Failed to load scene history', error);
+      } finally {
+        setScenesLoaded(true);
+        setScenesLoading(false);
+      }
+    },
+    [player?.name],
+  );
+
+  useEffect(() => {
+    if (activeTab === 'scenes' && !scenesLoaded && !scenesLoading) {
+      loadScenes(null);
+    }
+  }, [activeTab, scenesLoaded, scenesLoading, loadScenes]);
 
   if (!player) {
     setScreen('game');
@@ -57,7 +87,7 @@ const StoryReplayPage = () => {
 
           {/* Tabs */}
           <Tabs value={activeTab} onValueChange={(v) => setActiveTab(v as any)}>
-            <TabsList className="grid w-full grid-cols-3">
+            <TabsList className="grid w-full grid-cols-4">
               <TabsTrigger value="branches">
                 <GitBranch className="w-4 h-4 mr-2" />
                 Story Branches
@@ -70,6 +100,10 @@ const StoryReplayPage = () => {
                 <Play className="w-4 h-4 mr-2" />
                 Choice History
               </TabsTrigger>
+              <TabsTrigger value="scenes">
+                <ImageIcon className="w-4 h-4 mr-2" />
+                Scenes
+              </TabsTrigger>
             </TabsList>
 
             <TabsContent value="branches" className="mt-6">
@@ -184,6 +218,58 @@ const StoryReplayPage = () => {
                 )}
               </ScrollArea>
             </TabsContent>
+
+            <TabsContent value="scenes" className="mt-6">
+              <ScrollArea className="h-[calc(100vh-300px)]">
+                {scenesLoaded && scenes.length === 0 ? (
+                  <div className="text-center py-16 text-muted-foreground">
+                    <ImageIcon className="w-20 h-20 mx-auto mb-4 opacity-50" />
+                    <p className="text-xl">No scenes rendered yet</p>
+                    <p className="text-sm mt-2">Scene artwork from your adventure appears here</p>
+                  </div>
+                ) : (
+                  <div className="space-y-4">
+                    <div className="grid grid-cols-2 md:grid-cols-3 gap-4">
+                      {scenes.map((item) => {
+                        const src = item.sceneAssets?.thumbnailUrl || item.sceneAssets?.midUrl || item.sceneAssets?.imageUrl;
+                        return (
+                          <Card key={item.sceneId} className="overflow-hidden border-2 border-border">
+                            {src ? (
+                              <img src={src} alt={item.scene.title || 'Scene'} loading="lazy" className="w-full aspect-video object-cover" />
+                            ) : (
+                              <div className="w-full aspect-video bg-muted flex items-center justify-center text-xs text-muted-foreground">
+                                {item.sceneStatus}
+                              </div>
+                            )}
+                            <div className="p-3 space-y-1">
+                              <div className="flex items-center justify-between">
+                                <span className="text-sm font-semibold truncate">{item.scene.title}</span>
+                                {item.turn !== undefined && (
+                                  <Badge variant="outline" className="text-xs">Turn {item.turn}</Badge>
+                                )}
+                              </div>
+                              {item.scene.locationName && (
+                                <p className="text-xs text-muted-foreground truncate">{item.scene.locationName}</p>
+                              )}
+                            </div>
+                          </Card>
+                        );
+                      })}
+                    </div>
+                    {sceneCursor && (
+                      <Button
+                        variant="outline"
+                        className="w-full"
+                        disabled={scenesLoading}
+                        onClick={() => loadScenes(sceneCursor)}
+                      >
+                        {scenesLoading ? 'Loading...' : 'Load more scenes'}
+                      </Button>
+                    )}
+                  </div>
+                )}
+              </ScrollArea>
+            </TabsContent>
           </Tabs>
         </motion.div>
       </div>
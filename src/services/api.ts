@@ -16,6 +16,8 @@ interface StoryRequest {
   genre: string;
   previousEvents: StoryEvent[];
   choice?: string;
+  sessionVersion?: number;
+  newEvents?: StoryEvent[];
   gameState?: {
     turnCount?: number;
     storyPhase?: string;
@@ -39,6 +41,7 @@ interface StoryRequest {
 
 interface StoryResponse {
   story: string;
+  sessionVersion?: number;
   choices: string[];
   events?: Partial<StoryEvent>[];
   enemy?: Enemy;
@@ -87,6 +90,7 @@ interface CombatRequest {
   itemId?: string;
   abilityId?: string;
   badgeEvents?: string[];
+  badges?: BadgePayload[];
 }
 
 interface CombatResponse {
@@ -205,6 +209,21 @@ export interface SceneResponse {
   updatedAt?: string;
 }
 
+export interface SceneHistoryItem {
+  sceneId: string;
+  turn?: number;
+  sceneStatus: SceneStatus;
+  createdAt?: string;
+  scene: Partial<ScenePayload>;
+  sceneAssets?: SceneAssets;
+}
+
+export interface SceneHistoryPage {
+  playerId: string;
+  items: SceneHistoryItem[];
+  nextCursor: string | null;
+}
+
 class APIError extends Error {
   constructor(public status: number, message: string) {
     super(message);
@@ -232,6 +251,60 @@ const fetchWithRetry = async (
   throw new Error('Max retries reached');
 };
 
+// Server-held story session: once a turn has returned a sessionVersion, later
+// turns send only the events added locally since then instead of the whole log.
+interface StorySession {
+  playerName: string;
+  version: number;
+  syncedLength: number;
+  lastStory: string;
+}
+
+let storySession: StorySession | null = null;
+
+const toStorySessionRequest = (request: StoryRequest): Omit<StoryRequest, 'previousEvents'> | null => {
+  const log = request.previousEvents || [];
+  const session = storySession;
+  // A loaded save or a different player means the server session no longer matches this log
+  if (
+    !session ||
+    session.playerName !== request.player?.name ||
+    log.length < session.syncedLength ||
+    log[session.syncedLength - 1]?.text !== session.lastStory
+  ) {
+    return null;
+  }
+  const { previousEvents, ...rest } = request;
+  return { ...rest, sessionVersion: session.version, newEvents: log.slice(session.syncedLength) };
+};
+
+const rememberStorySession = (request: StoryRequest, data: StoryResponse) => {
+  if (typeof data.sessionVersion !== 'number' || !data.story) {
+    storySession = null;
+    return;
+  }
+  // The caller appends the returned story to its log right after this response
+  storySession = {
+    playerName: request.player.name,
+    version: data.sessionVersion,
+    syncedLength: (request.previousEvents || []).length + 1,
+    lastStory: typeof data.story === 'string' ? data.story : String(data.story),
+  };
+};
+
+const postStory = async (body: unknown, retries?: number): Promise<StoryResponse> => {
+  const response = await fetchWithRetry(
+    `${API_BASE_URL}/api/story`,
+    {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body),
+    },
+    retries
+  );
+  return response.json();
+};
+
 export const api = {
   // Initialize Game (get initial loot and quest)
   async initializeGame(request: StoryRequest): Promise<InitializeResponse> {
@@ -270,12 +343,20 @@ export const api = {
   // Story Generation
   async generateStory(request: StoryRequest): Promise<StoryResponse> {
     try {
-      const response = await fetchWithRetry(`${API_BASE_URL}/api/story`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(request),
-      });
-      const data = await response.json();
+      let data: StoryResponse | null = null;
+      const delta = toStorySessionRequest(request);
+      if (delta) {
+        try {
+          data = await postStory(delta, 1);
+        } catch (error) {
+          // 409 (session moved on) or any other failure: resend the full payload
+          console.warn('Story session delta rejected, sending full history:', error);
+        }
+      }
+      if (!data) {
+        data = await postStory(request);
+      }
+      rememberStorySession(request, data);
       return { ...data, isFallback: false };
     } catch (error) {
       console.error('Story generation failed:', error);
@@ -322,6 +403,48 @@ export const api = {
     return response.json();
   },
 
+  // Push-based scene status updates (SSE). Returns an unsubscribe function.
+  subscribeScene(
+    sceneId: string,
+    onUpdate: (scene: Partial<SceneResponse> & { sceneId: string }) => void,
+    onError: () => void,
+  ): () => void {
+    if (typeof EventSource === 'undefined') {
+      onError();
+      return () => {};
+    }
+    const source = new EventSource(`${SCENE_API_URL}/api/scene/stream/${sceneId}`);
+    source.addEventListener('scene', (event) => {
+      try {
+        onUpdate(JSON.parse((event as MessageEvent).data));
+      } catch (error) {
+        console.error('Invalid scene stream payload', error);
+      }
+    });
+    source.onerror = () => {
+      source.close();
+      onError();
+    };
+    return () => source.close();
+  },
+
+  async getSceneHistory(
+    playerId: string,
+    options: { cursor?: string | null; limit?: number; turnFrom?: number; turnTo?: number } = {},
+  ): Promise<SceneHistoryPage> {
+    const params = new URLSearchParams();
+    if (options.cursor) params.set('cursor', options.cursor);
+    if (options.limit) params.set('limit', String(options.limit));
+    if (options.turnFrom !== undefined) params.set('turnFrom', String(options.turnFrom));
+    if (options.turnTo !== undefined) params.set('turnTo', String(options.turnTo));
+    const query = params.toString();
+    const response = await fetchWithRetry(
+      `${SCENE_API_URL}/api/scene/history/${encodeURIComponent(playerId)}${query ? `?${query}` : ''}`,
+      { method: 'GET' },
+    );
+    return response.json();
+  },
+
   async rerenderScene(sceneId: string): Promise<SceneResponse> {
     const response = await fetchWithRetry(`${SCENE_API_URL}/api/scene/rerender/${sceneId}`, {
       method: 'POST',
@@ -333,7 +456,7 @@ export const api = {
     provider?: string;
     model?: string;
     geminiKeyLabel?: string;
-    providerPool?: Array<{ id: string; provider: string; model?: string; busy?: boolean; failures?: number; disabled?: boolean; reason?: string | null }>;
+    providerPool?: Array<{ id: string; provider: string; model?: string; busy?: boolean; failures?: number; disabled?: boolean; reason?: string | null; state?: 'healthy' | 'quarantined' | 'half-open'; latencyMs?: Record<string, number>; successRate?: number }>;
   }> {
     const response = await fetchWithRetry(`${SCENE_API_URL}/api/provider`, {
       method: 'GET',
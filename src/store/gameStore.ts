@@ -68,6 +68,9 @@ export interface SceneAssets {
   height?: number;
   provider?: string;
   model?: string;
+  midUrl?: string;
+  sourceUrl?: string;
+  contentHash?: string;
 }
 
 export interface SceneSubject {